@@ -0,0 +1,544 @@
+"""Measure p50/p95 latency and throughput of the hot API endpoints against local stand-ins.
+
+Run from QC_Backend with a disposable mongod listening locally (for example
+``docker run --rm -p 27017:27017 mongo:7``) after installing the benchmark
+extras (``moto[server]`` and ``httpx``) with
+``pip install -r benchmarks/requirements.txt``:
+
+    python -m benchmarks.api_latency_benchmark
+    python -m benchmarks.api_latency_benchmark --years 3 --iterations 200 --concurrency 4
+    python -m benchmarks.api_latency_benchmark --templates-dir ~/qc-templates --output baseline.json
+    python -m benchmarks.api_latency_benchmark --baseline baseline.json --max-regression 0.25
+    python -m benchmarks.api_latency_benchmark --profile-queries
+
+The app is imported only after ``MONGODB_URI``, ``MONGODB_DB_NAME`` and the AWS
+variables point at the stand-ins, so a run never touches the shared cluster or
+bucket. Each run seeds a fresh ``qc_benchmark_<pid>`` database and drops it on
+exit. Pass ``--s3-endpoint`` to reuse a running S3 stand-in (moto, MinIO)
+instead of starting moto in-process. Export scenarios need the real Excel
+templates, uploaded from ``--templates-dir`` under the Templates prefix, and
+are skipped without them. With ``--baseline`` the run exits non-zero when a
+scenario's p95 regresses by more than ``--max-regression``. With
+``--profile-queries`` the Mongo query profiler reports N+1 shapes, slow
+commands and collection scans, and the run fails when a route exceeds its
+query budget (``QUERY_PROFILER_BUDGET`` / ``QUERY_PROFILER_ROUTE_BUDGETS``).
+Register and dashboard scenarios also fail the run when a list item serializes
+to more than the scenario's byte budget, which catches summary projections
+that start pulling embedded payloads again.
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import random
+import socket
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable
+
+from openpyxl import Workbook
+
+
+BENCHMARK_BUCKET = "qc-benchmark"
+OPERATOR = {"employeeId": "BENCH-OP", "name": "Bench Operator", "role": "Operator"}
+SUPERVISOR = {"employeeId": "BENCH-SUP", "name": "Bench Supervisor", "role": "Supervisor"}
+LOCK_SESSION_ID = "benchmark-session"
+SHIFTS = ("A", "B", "C")
+IPQC_LINES = ("I", "II")
+SSH_LINE_GROUPS = ("Line-I", "Line-II")
+STRINGERS = range(1, 13)
+TIME_SLOTS = ("2 hrs", "4 hrs", "6 hrs", "8 hrs")
+# Most historical checksheets are approved; the rest is the live backlog.
+WORKFLOW_STATE_WEIGHTS = (("approved", 85), ("submitted", 8), ("draft", 5), ("returned", 2))
+SEED_BATCH_SIZE = 1000
+# Summary rows are metadata only; shift entries also carry their per-line readings.
+REPORT_ITEM_BUDGET_BYTES = 2048
+SHIFT_ENTRY_ITEM_BUDGET_BYTES = 6144
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    # Performs one call for the given iteration and raises when it fails.
+    run: Callable[[int], Any]
+    # Scenarios that mutate versioned state cannot overlap with themselves.
+    sequential: bool = False
+    # List endpoints: average serialized bytes allowed per returned item.
+    max_item_bytes: int | None = None
+
+
+def find_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_s3_stand_in(endpoint: str | None):
+    if endpoint:
+        return endpoint, None
+    try:
+        from moto.server import ThreadedMotoServer
+    except ImportError:
+        raise SystemExit('moto is required for the in-process S3 stand-in: pip install "moto[server]" (or pass --s3-endpoint)')
+    # moto serves through werkzeug, which logs every S3 call at INFO.
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    port = find_free_port()
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=port, verbose=False)
+    server.start()
+    return f"http://127.0.0.1:{port}", server
+
+
+def configure_environment(mongo_uri: str, db_name: str, s3_endpoint: str, profile_queries: bool = False) -> None:
+    # constants.py and aws_config.py read these at import; load_dotenv never overrides them.
+    os.environ.update({
+        "MONGODB_URI": mongo_uri,
+        "MONGODB_DB_NAME": db_name,
+        "AWS_ACCESS_KEY_ID": "benchmark",
+        "AWS_SECRET_ACCESS_KEY": "benchmark",
+        "AWS_REGION": "us-east-1",
+        "AWS_ENDPOINT_URL_S3": s3_endpoint,
+        "S3_BUCKET_NAME": BENCHMARK_BUCKET,
+        "DISABLE_BACKGROUND_EXTRACTORS": "true",
+        "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING"),
+    })
+    if profile_queries:
+        os.environ["QUERY_PROFILER_ENABLED"] = "true"
+
+
+def build_audit_payload(line_number: str, day: date, shift: str, stages: int, parameters: int) -> dict:
+    return {
+        "lineNumber": line_number,
+        "date": day.isoformat(),
+        "shift": shift,
+        "productionOrderNo": "PO-7001",
+        "moduleType": "M10 144 Cell",
+        "signatures": {"auditBy": OPERATOR["name"]},
+        "stages": [
+            {
+                "id": 100 + stage,
+                "name": f"Benchmark Stage {stage}",
+                "parameters": [
+                    {
+                        "id": f"{100 + stage}-{parameter}",
+                        "parameters": f"Benchmark parameter {parameter}",
+                        "observations": [{"timeSlot": slot, "value": "OK"} for slot in TIME_SLOTS],
+                    }
+                    for parameter in range(1, parameters + 1)
+                ],
+            }
+            for stage in range(1, stages + 1)
+        ],
+    }
+
+
+def build_ssh_payload(day: date, shift: str, line_group: str) -> dict:
+    line = {
+        "sealantSupplier": "Tonsan",
+        "sealantExpDate": "2027-12-31",
+        "sampleTakingTime": "08:00",
+        "sampleTestingTime": "08:30",
+        "result": "45",
+    }
+    return {
+        "date": day.isoformat(),
+        "testingDate": day.isoformat(),
+        "shift": shift,
+        "lineGroup": line_group,
+        "po": "PO-7001",
+        "checkedBy": OPERATOR["name"],
+        "lines": {"1": dict(line), "2": dict(line)},
+    }
+
+
+def build_peel_workbook(rng: random.Random, bus_pads: int = 16) -> bytes:
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "Sheet1"
+    sheet.append(["Peel Test"])
+    sheet.append(["No.", *[f"Ribbon {ribbon}" for ribbon in range(1, 8)]])
+    for position in range(1, bus_pads + 1):
+        sheet.append([f"S_{position}", *[round(rng.uniform(1.0, 3.0), 2) for _ in range(7)]])
+    output = io.BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+
+def seeded_days(years: int) -> list[date]:
+    today = date.today()
+    return [today - timedelta(days=offset) for offset in range(years * 365)]
+
+
+def pick_state(rng: random.Random) -> str:
+    states, weights = zip(*WORKFLOW_STATE_WEIGHTS)
+    return rng.choices(states, weights=weights)[0]
+
+
+def insert_in_batches(collection, documents) -> int:
+    batch, inserted = [], 0
+    for document in documents:
+        batch.append(document)
+        if len(batch) >= SEED_BATCH_SIZE:
+            inserted += len(collection.insert_many(batch, ordered=False).inserted_ids)
+            batch = []
+    if batch:
+        inserted += len(collection.insert_many(batch, ordered=False).inserted_ids)
+    return inserted
+
+
+def clone_documents(template: dict, rng: random.Random, slots, build_fields: Callable[..., dict]):
+    base = {key: value for key, value in template.items() if key != "_id"}
+    for slot in slots:
+        state = pick_state(rng)
+        yield {**base, **build_fields(*slot), "workflowState": state, "status": state}
+
+
+def check(response, expected: tuple[int, ...] = (200,)):
+    if response.status_code not in expected:
+        raise RuntimeError(f"{response.request.method} {response.request.url.path} returned {response.status_code}: {response.text[:200]}")
+    return response
+
+
+def seed(client, args, rng: random.Random) -> dict:
+    """Seed users, years of IPQC audits, SSH entries and peel records.
+
+    One IPQC audit and one SSH entry are created through the API so their
+    stored shape (metadata, S3 payload, line flags) is exactly what the app
+    writes; the history is cloned from them with varied dates, shifts, lines
+    and workflow states.
+    """
+    from models.ipqc_audit_models import ipqc_audit_collection
+    from models.peel_data_models import normalize_peel_record, peel_data_collection
+    from models.ssh_test_models import ssh_entries_collection
+    from users.user_db import users_collection
+
+    users_collection.insert_many([{**user, "status": "Active"} for user in (OPERATOR, SUPERVISOR)])
+    days = seeded_days(args.years)
+    today = days[0]
+    operator_headers = {"X-Employee-Id": OPERATOR["employeeId"], "X-Lock-Session-Id": LOCK_SESSION_ID}
+
+    created_audit = check(client.post("/api/ipqc-audits/", headers=operator_headers, json={
+        "name": "Benchmark Audit",
+        "timestamp": f"{today.isoformat()}T08:00:00Z",
+        "data": build_audit_payload("I", today, "A", args.audit_stages, args.audit_parameters),
+    })).json()
+    audit_template = ipqc_audit_collection.find_one({"name": "Benchmark Audit"})
+    audit_count = insert_in_batches(ipqc_audit_collection, clone_documents(
+        audit_template,
+        rng,
+        ((day, shift, line) for day in days for shift in SHIFTS for line in IPQC_LINES),
+        lambda day, shift, line: {
+            "name": f"Benchmark Audit {day.isoformat()} {shift} {line}",
+            "date": day.isoformat(),
+            "shift": shift,
+            "lineNumber": line,
+            "timestamp": f"{day.isoformat()}T08:00:00Z",
+            "updated_timestamp": f"{day.isoformat()}T16:00:00Z",
+            "lockedBy": None,
+            "lockSessionId": None,
+        },
+    ))
+    approved_audit = ipqc_audit_collection.find_one({"workflowState": "approved"}, {"_id": 1})
+
+    # The template entry takes today's slot, so its clones start yesterday.
+    check(client.post("/api/ssh-test-reports/entries", headers=operator_headers, json=build_ssh_payload(today, "A", "Line-I")))
+    ssh_template = ssh_entries_collection.find_one({"date": today.isoformat()})
+    ssh_count = insert_in_batches(ssh_entries_collection, clone_documents(
+        ssh_template,
+        rng,
+        ((day, shift, line_group) for day in days[1:] for shift in SHIFTS for line_group in SSH_LINE_GROUPS),
+        lambda day, shift, line_group: {
+            "date": day.isoformat(),
+            "testingDate": day.isoformat(),
+            "shift": shift,
+            "lineGroup": line_group,
+            "year": day.year,
+            "month": day.month,
+        },
+    ))
+
+    peel_count = insert_in_batches(peel_data_collection, (
+        normalize_peel_record({
+            "date": day.isoformat(),
+            "shift": shift,
+            "machine": f"STRINGER-{stringer} UNIT-A",
+            "file_name": f"{day.isoformat()}_{shift}_S{stringer}.xlsx",
+            "module_type": "M10 144 Cell",
+            **{
+                f"{side}_{position}_{ribbon}": round(rng.uniform(1.0, 3.0), 2)
+                for side in ("Front", "Back")
+                for position in range(1, 17)
+                for ribbon in range(1, 8)
+            },
+        })
+        for day in days
+        for shift in SHIFTS
+        for stringer in STRINGERS
+    ))
+
+    return {
+        "auditId": created_audit["id"],
+        "auditDataVersion": int(created_audit.get("dataVersion") or 0),
+        "approvedAuditId": str(approved_audit["_id"]) if approved_audit else None,
+        "today": today,
+        "counts": {"ipqcAudits": audit_count + 1, "sshEntries": ssh_count + 1, "peelRecords": peel_count},
+    }
+
+
+def upload_s3_fixtures(args, rng: random.Random) -> tuple[list[str], bool]:
+    from paths import get_qc_data_key, get_template_key
+    from s3_service import get_s3_client
+
+    s3_client = get_s3_client()
+    s3_client.create_bucket(Bucket=BENCHMARK_BUCKET)
+    peel_keys = []
+    for index in range(args.peel_files):
+        key = get_qc_data_key("Peel_Test", "Benchmark", f"peel_{index:03d}_Front.xlsx")
+        s3_client.put_object(Bucket=BENCHMARK_BUCKET, Key=key, Body=build_peel_workbook(rng))
+        peel_keys.append(key)
+
+    templates_dir = Path(args.templates_dir).expanduser() if args.templates_dir else None
+    if templates_dir:
+        for template_path in sorted(templates_dir.glob("*.xlsx")):
+            s3_client.upload_file(str(template_path), BENCHMARK_BUCKET, get_template_key(template_path.name))
+    return peel_keys, templates_dir is not None
+
+
+def build_scenarios(client, seeded: dict, peel_keys: list[str], with_exports: bool) -> list[Scenario]:
+    from extractors.peel_extractor import extract_data_from_excel
+    from s3_service import S3Service
+
+    today = seeded["today"]
+    supervisor = {"X-Employee-Id": SUPERVISOR["employeeId"]}
+    operator = {"X-Employee-Id": OPERATOR["employeeId"], "X-Lock-Session-Id": LOCK_SESSION_ID}
+    month_abbreviation = today.strftime("%b").upper()
+
+    def get(path: str, params: dict | None = None, headers: dict | None = None):
+        return lambda iteration: check(client.get(path, params=params, headers=headers or supervisor))
+
+    autosave_version = {"value": seeded["auditDataVersion"]}
+
+    def autosave(iteration: int):
+        response = check(client.patch(f"/api/ipqc-audits/{seeded['auditId']}/autosave", headers=operator, json={
+            "baseVersion": autosave_version["value"],
+            "observations": [{
+                "stageId": 101 + iteration % 5,
+                "parameterId": f"{101 + iteration % 5}-1",
+                "timeSlot": TIME_SLOTS[iteration % len(TIME_SLOTS)],
+                "value": "OK" if iteration % 2 else "NG",
+            }],
+        }))
+        autosave_version["value"] = response.json()["dataVersion"]
+
+    s3_service = S3Service()
+
+    def extract(iteration: int):
+        if not extract_data_from_excel(peel_keys[iteration % len(peel_keys)], "Front", s3_service):
+            raise RuntimeError("Peel extraction returned no measurements")
+
+    scenarios = [
+        Scenario(
+            "ipqc register",
+            get("/api/ipqc-audits/", {"summary": "true", "page_size": 20, "cursor": ""}),
+            max_item_bytes=REPORT_ITEM_BUDGET_BYTES,
+        ),
+        Scenario("ipqc register filtered", get("/api/ipqc-audits/", {
+            "summary": "true",
+            "page_size": 20,
+            "workflow_state": "submitted",
+            "date_from": (today - timedelta(days=90)).isoformat(),
+            "date_to": today.isoformat(),
+        }), max_item_bytes=REPORT_ITEM_BUDGET_BYTES),
+        Scenario("ipqc dashboard", get("/api/ipqc-audits/dashboard", {"view": "monthly"})),
+        Scenario(
+            "ipqc dashboard daily",
+            get("/api/ipqc-audits/dashboard", {"view": "daily"}),
+            max_item_bytes=REPORT_ITEM_BUDGET_BYTES,
+        ),
+        Scenario("ipqc autosave", autosave, sequential=True),
+        Scenario(
+            "ssh register",
+            get("/api/ssh-test-reports/entries/register", {"page_size": 20}),
+            max_item_bytes=SHIFT_ENTRY_ITEM_BUDGET_BYTES,
+        ),
+        Scenario("ssh dashboard", get("/api/ssh-test-reports/dashboard", {"view": "monthly"})),
+        Scenario(
+            "ssh dashboard daily",
+            get("/api/ssh-test-reports/dashboard", {"view": "daily"}),
+            max_item_bytes=SHIFT_ENTRY_ITEM_BUDGET_BYTES,
+        ),
+        Scenario("ssh monthly stats", get("/api/ssh-test-reports/stats/monthly", {"year": today.year, "month": today.month})),
+        Scenario("compliance matrix", get("/api/shift-compliance/matrix", {
+            "date_from": (today - timedelta(days=6)).isoformat(),
+            "date_to": today.isoformat(),
+        })),
+        Scenario("peel graph", get("/api/peel/graph-data", {
+            "month": month_abbreviation,
+            "year": today.year,
+            "stringer": 1,
+            "cell_face": "both",
+        })),
+    ]
+    if peel_keys:
+        scenarios.append(Scenario("peel extraction", extract))
+    if with_exports:
+        if seeded["approvedAuditId"]:
+            scenarios.append(Scenario("ipqc export", lambda iteration: check(client.post(
+                "/api/ipqc-audits/generate-audit-report",
+                headers=supervisor,
+                json={"audit_id": seeded["approvedAuditId"]},
+            ))))
+        scenarios.append(Scenario("ssh export", get("/api/ssh-test-reports/export/excel", {"year": today.year, "month": today.month})))
+    return scenarios
+
+
+def measure(scenario: Scenario, iterations: int, warmup: int, concurrency: int) -> dict:
+    for iteration in range(warmup):
+        scenario.run(iteration)
+
+    def timed(iteration: int) -> float:
+        started = time.perf_counter()
+        scenario.run(warmup + iteration)
+        return time.perf_counter() - started
+
+    workers = 1 if scenario.sequential else concurrency
+    started = time.perf_counter()
+    if workers == 1:
+        samples = [timed(iteration) for iteration in range(iterations)]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            samples = list(executor.map(timed, range(iterations)))
+    elapsed = time.perf_counter() - started
+    percentiles = statistics.quantiles(samples, n=20, method="inclusive")
+    return {
+        "iterations": iterations,
+        "concurrency": workers,
+        "p50_ms": statistics.median(samples) * 1000,
+        "p95_ms": percentiles[18] * 1000,
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "throughput_rps": iterations / elapsed if elapsed else 0.0,
+    }
+
+
+def measure_payload(scenario: Scenario) -> dict:
+    response = scenario.run(0)
+    body = response.json()
+    items = body if isinstance(body, list) else body.get("items") or []
+    return {
+        "payload_bytes": len(response.content),
+        "items": len(items),
+        "bytes_per_item": len(response.content) / len(items) if items else 0.0,
+    }
+
+
+def find_regressions(results: dict, baseline: dict, max_regression: float) -> list[str]:
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        limit = previous["p95_ms"] * (1 + max_regression)
+        if result["p95_ms"] > limit:
+            regressions.append(f"{name}: p95 {result['p95_ms']:.1f}ms > {limit:.1f}ms (baseline {previous['p95_ms']:.1f}ms)")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mongo-uri", default=os.getenv("BENCHMARK_MONGODB_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--s3-endpoint", help="Use a running S3 stand-in instead of starting moto in-process")
+    parser.add_argument("--years", type=int, default=2, help="Years of history to seed")
+    parser.add_argument("--audit-stages", type=int, default=30)
+    parser.add_argument("--audit-parameters", type=int, default=6)
+    parser.add_argument("--peel-files", type=int, default=20, help="Peel workbooks uploaded for the extraction scenario")
+    parser.add_argument("--templates-dir", help="Directory of report templates; enables the export scenarios")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--scenario", action="append", help="Only run scenarios whose name contains this text")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write results as JSON, e.g. to use as a later --baseline")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare p95 against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed relative p95 increase over --baseline")
+    parser.add_argument("--profile-queries", action="store_true", help="Report Mongo N+1/slow/scan findings and fail on query budget violations")
+    parser.add_argument("--keep-db", action="store_true", help="Leave the seeded database in place")
+    args = parser.parse_args()
+
+    db_name = f"qc_benchmark_{os.getpid()}"
+    s3_endpoint, moto_server = start_s3_stand_in(args.s3_endpoint)
+    configure_environment(args.mongo_uri, db_name, s3_endpoint, args.profile_queries)
+    rng = random.Random(args.seed)
+
+    from fastapi.testclient import TestClient
+    from pymongo import MongoClient
+
+    from main import app
+    from services.query_profiler_service import query_profiler
+
+    mongo_client = MongoClient(args.mongo_uri)
+    try:
+        with TestClient(app) as client:
+            seeding_started = time.perf_counter()
+            peel_keys, with_exports = upload_s3_fixtures(args, rng)
+            seeded = seed(client, args, rng)
+            counts = " ".join(f"{name}={count}" for name, count in seeded["counts"].items())
+            print(f"seeded {counts} in {time.perf_counter() - seeding_started:.1f}s")
+            if not with_exports:
+                print("export scenarios skipped: pass --templates-dir to upload the report templates")
+            # Seeding goes through the API too; only the measured scenarios count.
+            query_profiler.reset()
+
+            results, failures = {}, []
+            for scenario in build_scenarios(client, seeded, peel_keys, with_exports):
+                if args.scenario and not any(text in scenario.name for text in args.scenario):
+                    continue
+                try:
+                    result = measure(scenario, args.iterations, args.warmup, args.concurrency)
+                except Exception as exc:
+                    failures.append(scenario.name)
+                    print(f"{scenario.name:<24} FAILED {exc}")
+                    continue
+                if scenario.max_item_bytes:
+                    result.update(measure_payload(scenario))
+                results[scenario.name] = result
+                print(
+                    f"{scenario.name:<24} n={result['iterations']} c={result['concurrency']} "
+                    f"p50={result['p50_ms']:.1f}ms p95={result['p95_ms']:.1f}ms "
+                    f"throughput={result['throughput_rps']:.1f}/s"
+                    + (f" bytes/item={result['bytes_per_item']:.0f}" if scenario.max_item_bytes else "")
+                )
+                if scenario.max_item_bytes and result["bytes_per_item"] > scenario.max_item_bytes:
+                    failures.append(
+                        f"{scenario.name}: {result['bytes_per_item']:.0f} bytes/item > {scenario.max_item_bytes} "
+                        f"({result['items']} items, {result['payload_bytes']} bytes)"
+                    )
+                    print(f"PAYLOAD {failures[-1]}")
+            for finding in query_profiler.findings.values():
+                print(f"QUERY {finding.describe()}")
+            failures.extend(finding.describe() for finding in query_profiler.budget_violations())
+    finally:
+        if not args.keep_db:
+            mongo_client.drop_database(db_name)
+        mongo_client.close()
+        if moto_server:
+            moto_server.stop()
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({"counts": seeded["counts"], "scenarios": results}, indent=2), encoding="utf-8")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))["scenarios"]
+        regressions = find_regressions(results, baseline, args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        failures.extend(regressions)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
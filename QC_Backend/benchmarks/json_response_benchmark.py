@@ -0,0 +1,119 @@
+"""Compare the old per-document JSON conversion against the BSON response classes.
+
+Run from QC_Backend:
+
+    python -m benchmarks.json_response_benchmark
+    python -m benchmarks.json_response_benchmark --rows 50000 --repeat 3
+
+The "before" paths replay what the routes did: ``json.loads(json_util.dumps(doc))``
+or ``serialize_peel_docs`` per document, then FastAPI's ``jsonable_encoder`` and
+``JSONResponse.render``. The "after" paths hand the raw documents to
+``ExtendedJSONResponse`` / ``BSONJSONResponse``.
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId, json_util
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from models.peel_data_models import serialize_peel_docs
+from services.bson_json_response import BSONJSONResponse, ExtendedJSONResponse
+
+
+def build_peel_rows(count: int) -> list[dict]:
+    started = datetime(2026, 10, 1, 6, 0)
+    rows = []
+    for index in range(count):
+        row = {
+            "_id": ObjectId(),
+            "business_key": f"2026-10-{index % 28 + 1:02d}|A|{index % 12 + 1}|{index % 3 + 1}",
+            "date": f"2026-10-{index % 28 + 1:02d}",
+            "shift": "A",
+            "Stringer": index % 12 + 1,
+            "Unit": str(index % 3 + 1),
+            "machine": f"Stringer-{index % 12 + 1}",
+            "module_type": "M10",
+            "created_at": started + timedelta(minutes=index),
+            "updated_at": started + timedelta(minutes=index, seconds=30),
+        }
+        for side in ("Front", "Back"):
+            for position in range(1, 17):
+                for ribbon in range(1, 8):
+                    row[f"{side}_{position}_{ribbon}"] = round(1.2 + (index + position + ribbon) % 17 / 10, 2)
+        rows.append(row)
+    return rows
+
+
+def build_qa_rows(count: int) -> list[dict]:
+    started = datetime(2026, 1, 1)
+    rows = []
+    for index in range(count):
+        row = {
+            "_id": ObjectId(),
+            "Date": (started + timedelta(days=index % 365)).strftime("%Y-%m-%d"),
+            "Line": index % 4 + 1,
+            "Total Production": 2400 + index % 300,
+            "Total rejection": index % 40,
+            "Rejection %": round((index % 40) / 24, 3),
+            "import_timestamp": started + timedelta(minutes=index),
+            "data_source": "excel_import",
+        }
+        for defect in range(40):
+            row[f"Defect {defect}"] = (index + defect) % 7
+        rows.append(row)
+    return rows
+
+
+def render_before_peel(rows: list[dict]) -> bytes:
+    return JSONResponse(jsonable_encoder({"status": "success", "count": len(rows), "data": serialize_peel_docs(rows)})).body
+
+
+def render_after_peel(rows: list[dict]) -> bytes:
+    return BSONJSONResponse({"status": "success", "count": len(rows), "data": rows}).body
+
+
+def render_before_qa(rows: list[dict]) -> bytes:
+    data = [json.loads(json_util.dumps(doc)) for doc in rows]
+    return JSONResponse(jsonable_encoder({"total_records": len(data), "data": data})).body
+
+
+def render_after_qa(rows: list[dict]) -> bytes:
+    return ExtendedJSONResponse({"total_records": len(rows), "data": rows}).body
+
+
+def time_render(render, rows: list[dict], repeat: int) -> tuple[float, int]:
+    samples = []
+    size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = len(render(rows))
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cases = (
+        ("peel", build_peel_rows(args.rows), render_before_peel, render_after_peel),
+        ("qa", build_qa_rows(args.rows), render_before_qa, render_after_qa),
+    )
+    for label, rows, before, after in cases:
+        before_seconds, before_size = time_render(before, rows, args.repeat)
+        after_seconds, after_size = time_render(after, rows, args.repeat)
+        print(
+            f"{label:<5} rows={args.rows} before={before_seconds * 1000:.0f}ms ({before_size / 1024:.0f} KiB) "
+            f"after={after_seconds * 1000:.0f}ms ({after_size / 1024:.0f} KiB) "
+            f"speedup={before_seconds / after_seconds:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
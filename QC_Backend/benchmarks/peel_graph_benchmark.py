@@ -0,0 +1,102 @@
+"""Compare the per-record peel graph loops against summaries and daily rollups.
+
+Run from QC_Backend:
+
+    python -m benchmarks.peel_graph_benchmark
+    python -m benchmarks.peel_graph_benchmark --rows 5000 --repeat 3
+
+"loops" replays the original graph-data computation over the flat ``Front_/Back_``
+keys. "arrays" summarizes float32 measurement arrays in NumPy batches, the path
+taken for records stored before summaries existed. "summaries" groups the
+ingest-time summaries per day, which is all a rollup rebuild has to do.
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.json_response_benchmark import build_peel_rows
+from models.peel_data_models import (
+    MEASUREMENT_ARRAYS_FIELD,
+    MEASUREMENT_SUMMARY_FIELD,
+    build_measurement_arrays,
+    summarize_measurement_arrays,
+)
+from services.peel_graph_service import build_graph_points
+
+
+def _side_row_averages(record: dict, prefix: str) -> list[float]:
+    positions: dict[int, list] = {}
+    for key, value in record.items():
+        if not str(key).lower().startswith(prefix) or not isinstance(value, (int, float)):
+            continue
+        parts = str(key).split("_")
+        if len(parts) >= 3 and parts[1].isdigit():
+            positions.setdefault(int(parts[1]), []).append(value)
+    return [sum(values) / len(values) for values in positions.values() if values]
+
+
+def graph_with_loops(rows: list[dict]) -> list[dict]:
+    by_date: dict[str, list] = {}
+    for record in rows:
+        by_date.setdefault(record["date"], []).append(record)
+    points = []
+    for record_date, records in sorted(by_date.items()):
+        averages, maxima, minima = [], [], []
+        for record in records:
+            front = _side_row_averages(record, "front_")
+            back = _side_row_averages(record, "back_")
+            if front and back:
+                averages.append(sum(front + back) / len(front + back))
+                maxima.append((max(front) + max(back)) / 2)
+                minima.append((min(front) + min(back)) / 2)
+        points.append({
+            "date": record_date,
+            "average_value": round(sum(averages) / len(averages), 2) if averages else None,
+            "max_value": round(max(maxima), 2) if maxima else None,
+            "min_value": round(min(minima), 2) if minima else None,
+        })
+    return points
+
+
+def graph_from_arrays(rows: list[dict]) -> list[dict]:
+    summaries = summarize_measurement_arrays([row[MEASUREMENT_ARRAYS_FIELD] for row in rows])
+    return build_graph_points(
+        [{"date": row["date"], MEASUREMENT_SUMMARY_FIELD: summary} for row, summary in zip(rows, summaries)],
+        "both",
+    )
+
+
+def graph_from_summaries(rows: list[dict]) -> list[dict]:
+    return build_graph_points(rows, "both")
+
+
+def time_graph(build, rows: list[dict], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        build(rows)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = build_peel_rows(args.rows)
+    for row in rows:
+        row[MEASUREMENT_ARRAYS_FIELD] = build_measurement_arrays(row)
+    for row, summary in zip(rows, summarize_measurement_arrays([row[MEASUREMENT_ARRAYS_FIELD] for row in rows])):
+        row[MEASUREMENT_SUMMARY_FIELD] = summary
+
+    baseline = time_graph(graph_with_loops, rows, args.repeat)
+    print(f"loops      rows={args.rows} {baseline * 1000:.1f}ms")
+    for label, build in (("arrays", graph_from_arrays), ("summaries", graph_from_summaries)):
+        seconds = time_graph(build, rows, args.repeat)
+        print(f"{label:<10} rows={args.rows} {seconds * 1000:.1f}ms speedup={baseline / seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Compare copy_worksheet against compiled template stamping for month-long exports.
+
+Run from QC_Backend:
+
+    python -m benchmarks.template_stamping_benchmark
+    python -m benchmarks.template_stamping_benchmark --template "Blank JB Sealant Weight Report.xlsx"
+
+Without ``--template`` a synthetic bordered template (60x20 cells, merges and
+an embedded logo) stands in for the S3 templates.
+"""
+import argparse
+import io
+import statistics
+import time
+
+from openpyxl import Workbook, load_workbook
+from openpyxl.drawing.image import Image as OpenpyxlImage
+from openpyxl.styles import Alignment, Border, Font, Side
+
+from generators.excel_image_utils import add_worksheet_images, collect_worksheet_images
+from generators.excel_template_stamping import compile_sheet_template
+
+
+def build_synthetic_template(rows: int = 60, columns: int = 20) -> bytes:
+    from PIL import Image
+
+    workbook = Workbook()
+    sheet = workbook.active
+    thin = Side(style="thin")
+    border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    for row in range(1, rows + 1):
+        sheet.row_dimensions[row].height = 18
+        for column in range(1, columns + 1):
+            cell = sheet.cell(row=row, column=column, value=f"H{row}-{column}" if row < 5 else None)
+            cell.border = border
+            cell.font = Font(name="Calibri", size=10, bold=row < 5)
+            cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    for row in range(1, 4):
+        sheet.merge_cells(start_row=row, start_column=1, end_row=row, end_column=columns)
+    for row in range(5, rows - 2, 3):
+        sheet.merge_cells(start_row=row, start_column=1, end_row=row + 2, end_column=1)
+    logo = io.BytesIO()
+    Image.new("RGB", (200, 80), "navy").save(logo, format="PNG")
+    sheet.add_image(OpenpyxlImage(io.BytesIO(logo.getvalue())), "B2")
+    output = io.BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+
+def fill_sheet(worksheet) -> None:
+    for row in range(5, 23):
+        worksheet[f"C{row}"] = 1.5
+        worksheet[f"D{row}"] = "PO-7001"
+
+
+def export_with_copy_worksheet(template_bytes: bytes, sheets: int) -> dict:
+    started = time.perf_counter()
+    workbook = load_workbook(io.BytesIO(template_bytes))
+    template_sheet = workbook.active
+    template_images = collect_worksheet_images(template_sheet)
+    loaded = time.perf_counter()
+    for day in range(1, sheets + 1):
+        worksheet = workbook.copy_worksheet(template_sheet)
+        worksheet.title = f"{day:02d}"
+        add_worksheet_images(worksheet, template_images)
+        fill_sheet(worksheet)
+    workbook.remove(template_sheet)
+    built = time.perf_counter()
+    workbook.save(io.BytesIO())
+    saved = time.perf_counter()
+    return {"build": built - loaded, "save": saved - built, "total": saved - started}
+
+
+def export_with_stamping(template_bytes: bytes, sheets: int) -> dict:
+    started = time.perf_counter()
+    workbook = load_workbook(io.BytesIO(template_bytes))
+    template_sheet = workbook.active
+    compiled_template = compile_sheet_template(template_sheet)
+    loaded = time.perf_counter()
+    for day in range(1, sheets + 1):
+        fill_sheet(compiled_template.stamp(workbook, f"{day:02d}"))
+    workbook.remove(template_sheet)
+    built = time.perf_counter()
+    workbook.save(io.BytesIO())
+    saved = time.perf_counter()
+    return {"build": built - loaded, "save": saved - built, "total": saved - started}
+
+
+def summarize(samples: list[dict]) -> dict:
+    return {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--template", help="Template filename under the S3 Templates prefix")
+    parser.add_argument("--sheets", type=int, default=31)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.template:
+        from paths import download_from_s3, get_template_key
+        template_bytes = download_from_s3(get_template_key(args.template)).read_bytes()
+    else:
+        template_bytes = build_synthetic_template()
+
+    for label, export in (("copy_worksheet", export_with_copy_worksheet), ("stamping", export_with_stamping)):
+        result = summarize([export(template_bytes, args.sheets) for _ in range(args.repeat)])
+        print(
+            f"{label:<15} sheets={args.sheets} build={result['build'] * 1000:.0f}ms "
+            f"save={result['save'] * 1000:.0f}ms total={result['total'] * 1000:.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -25,6 +25,7 @@ from models.peel_data_models import (
     peel_extraction_status_collection,
     peel_data_collection,
     peel_processing_files_collection,
+    refresh_graph_rollups_for,
     serialize_peel_doc,
     upsert_extracted_peel_record,
     utc_now,
@@ -46,6 +47,8 @@ if not logger.handlers:
 EXCEL_EXTENSIONS = (".xlsx", ".xlsm", ".xls")
 METADATA_DOCX_PATTERN = re.compile(r"^PO\s*&\s*Cell-(?P<number>[12])\.docx$", re.IGNORECASE)
 PROCESSING_LOCK_TTL_HOURS = 6
+# The fields refresh_graph_rollups_for keys a graph day on.
+GRAPH_DAY_PROJECTION = {"Stringer": 1, "year": 1, "month": 1, "date": 1}
 
 YEAR_FOLDER_PATTERN = re.compile(r"^\d{4}$")
 MONTH_YEAR_PATTERN = re.compile(r"^(?P<month>[A-Za-z]{3})\s*[-_ ]\s*(?P<year>\d{4})$")
@@ -602,7 +605,8 @@ def process_file_group(
             return {"inserted": 0, "updated": 0, "skipped": 1, "errors": 0}
 
         normalized = normalize_peel_record(record)
-        result = upsert_extracted_peel_record(normalized)
+        # process_s3_prefix refreshes each touched graph day once, after the shift metadata update.
+        result = upsert_extracted_peel_record(normalized, refresh_rollups=False)
         stored = result.get("record") or {}
         business_key = stored.get("business_key") or normalized["business_key"]
 
@@ -675,16 +679,20 @@ def store_in_mongodb(df: pd.DataFrame, mongo_client=None, db_name: Optional[str]
 
     ensure_peel_indexes()
     summary = {"inserted": 0, "updated": 0, "errors": 0}
+    changed_records: List[Dict[str, Any]] = []
     for record in df.to_dict("records"):
         try:
-            result = upsert_extracted_peel_record(record)
+            result = upsert_extracted_peel_record(record, refresh_rollups=False)
             if result.get("inserted"):
                 summary["inserted"] += 1
             elif result.get("updated"):
                 summary["updated"] += 1
+            if result.get("inserted") or result.get("updated"):
+                changed_records.append(result.get("record"))
         except Exception as exc:
             summary["errors"] += 1
             logger.exception("mongodb_record_store_failed error=%s record=%s", exc, record)
+    refresh_graph_rollups_for(*changed_records)
 
     logger.info("mongodb_store_completed collection=%s summary=%s", PEEL_DATA_COLLECTION_NAME, summary)
     return summary
@@ -768,6 +776,19 @@ def _persist_shift_metadata(date: str, shift: str, documents: Dict[int, Dict[str
     return success
 
 
+def _refresh_shift_graph_rollups(shifts: Iterable[Tuple[str, str]]) -> None:
+    """Refresh every graph day of these shifts once; both the upserts and the metadata update_many change them."""
+    shift_queries = [{"date": date, "shift": shift} for date, shift in shifts]
+    if not shift_queries:
+        return
+    try:
+        records = list(peel_data_collection.find({"$or": shift_queries}, GRAPH_DAY_PROJECTION))
+    except PyMongoError as exc:
+        logger.exception("graph_rollup_refresh_lookup_failed error=%s", exc)
+        return
+    refresh_graph_rollups_for(*records)
+
+
 def _metadata_complete(documents: Dict[int, Dict[str, Any]]) -> bool:
     return bool(documents) and all(
         values.get(field) not in (None, "")
@@ -857,6 +878,7 @@ def process_s3_prefix(s3_prefix: str, *, force: bool = False, s3_service: Option
                 status_operation["$unset"] = {"error": ""}
             peel_extraction_status_collection.update_one({"date": date, "shift": shift}, status_operation)
 
+        _refresh_shift_graph_rollups(affected_shifts)
         logger.info("extraction_completed prefix=%s summary=%s", s3_prefix, summary)
         return summary
     except ClientError as exc:
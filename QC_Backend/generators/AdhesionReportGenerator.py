@@ -2,8 +2,13 @@
 from openpyxl import load_workbook
 from openpyxl.styles import Font, PatternFill
 from copy import copy
+from functools import lru_cache
 import io
-from paths import get_template_key, download_from_s3
+import os
+from paths import get_template_key
+from s3_service import get_s3_client
+from services.export_streaming import save_workbook_to_spool
+from services.request_metrics_service import OPENPYXL_BACKEND, timed_backend
 
 FRONT_ADHESION_THRESHOLD = 60
 BACK_ADHESION_THRESHOLD = 40
@@ -246,6 +251,20 @@ def generate_adhesion_filename(adhesion_data):
     else:
         return f"Adhesion_Test_{clean_name}.xlsx"
 
+TEMPLATE_FILENAME = 'Blank Adhesion Test Report.xlsx'
+
+@lru_cache(maxsize=1)
+def get_template_bytes():
+    bucket = os.getenv("S3_BUCKET_NAME")
+    if not bucket:
+        raise ValueError("S3_BUCKET_NAME environment variable not set")
+    response = get_s3_client().get_object(Bucket=bucket, Key=get_template_key(TEMPLATE_FILENAME))
+    return response["Body"].read()
+
+def load_template_workbook():
+    return load_workbook(io.BytesIO(get_template_bytes()))
+
+@timed_backend(OPENPYXL_BACKEND)
 def generate_adhesion_report(adhesion_data):
     try:
         if not adhesion_data:
@@ -255,17 +274,13 @@ def generate_adhesion_report(adhesion_data):
         log_progress(f"Form data keys: {list(adhesion_data.get('form_data', {}).keys())}")
         log_progress(f"Averages keys: {list(adhesion_data.get('averages', {}).keys())}")
         
-        template_key = get_template_key('Blank Adhesion Test Report.xlsx')
-        template_path = download_from_s3(template_key)
-        wb = load_workbook(template_path)
+        wb = load_template_workbook()
         ws = wb.active
         
         fill_adhesion_basic_info(ws, adhesion_data)
         fill_adhesion_test_data(ws, adhesion_data)
         
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
+        output = save_workbook_to_spool(wb)
         
         filename = generate_adhesion_filename(adhesion_data)
         log_progress(f"Adhesion test report generated successfully: {filename}")
@@ -2,24 +2,30 @@
 from openpyxl import load_workbook
 from openpyxl.styles import (PatternFill, Alignment, NamedStyle)
 from openpyxl.utils import get_column_letter
+from functools import lru_cache
 import base64
 import copy
 import io
 import os
+import threading
 import urllib.request
 import re
 from urllib.parse import unquote, urlparse
 from openpyxl.cell.cell import MergedCell
 from openpyxl.drawing.image import Image as OpenpyxlImage
-from generators.audit_mappings import get_audit_field_config, get_audit_observation_mapping, get_audit_template_filename
+from generators.audit_mappings import get_audit_field_config, get_audit_template_filename
+from generators.audit_mappings.export_plan import bind_export_plan, get_audit_export_plan, get_bound_export_plan
 from generators.audit_mappings.mapping_helpers import (
     AUTO_BUSSING_PATCH_PARAMETER_ID,
     LINE_I_GROUPED_LINE_SELECTION_CELL_MAPPINGS,
     LINE_I_LINE_SELECTION_CELL_MAPPINGS,
 )
-from paths import get_template_key, download_from_s3
+from paths import get_template_key
+from s3_service import get_s3_client
 from models.ipqc_audit_models import normalize_ipqc_audit_data
-from s3_service import S3Service
+from services.signature_image_cache import signature_image_cache
+from services.export_streaming import save_workbook_to_spool
+from services.request_metrics_service import OPENPYXL_BACKEND, timed_backend
 
 DYNAMIC_LINE_PARAMETER_IDS = {
     '2-4', '2-5', '2-6',
@@ -127,6 +133,8 @@ NESTED_STRING_DEFAULTS = {
 }
 NUMERIC_PATTERN = re.compile(r'^[+-]?(?:\d+(?:\.\d+)?|\.\d+)$')
 SIGNATURE_S3_PREFIX = 'users/signatures/'
+SIGNATURE_IMAGE_WIDTH = 120
+SIGNATURE_IMAGE_HEIGHT = 45
 AUTO_TAPING_LEGACY_LINE_BY_INTERNAL = {
     'line1_auto_taping_1': 'Line-1',
     'line1_auto_taping_2': 'Line-2',
@@ -423,6 +431,9 @@ def extract_safety_module_ids(stages):
 
 def get_writable_cell(worksheet, cell_ref):
     try:
+        export_plan = get_bound_export_plan(worksheet)
+        if export_plan is not None:
+            return worksheet[export_plan.writable_coordinate(cell_ref)]
         cell = worksheet[cell_ref]
         if isinstance(cell, MergedCell):
             for merged_range in worksheet.merged_cells.ranges:
@@ -479,12 +490,7 @@ def describe_signature_image_source(image_source):
 
 def load_signature_image_from_s3(signature_key):
     try:
-        s3_service = S3Service()
-        response = s3_service.s3_client.get_object(
-            Bucket=s3_service.bucket_name,
-            Key=signature_key
-        )
-        return io.BytesIO(response['Body'].read())
+        return io.BytesIO(signature_image_cache.get_thumbnail(signature_key, SIGNATURE_IMAGE_WIDTH, SIGNATURE_IMAGE_HEIGHT))
     except Exception as e:
         log_progress(f"Warning: signature image S3 reference is not accessible ({signature_key}): {str(e)}")
         return None
@@ -517,8 +523,8 @@ def insert_signature_image(worksheet, cell_ref, image_source):
             log_progress(f"Warning: signature image at {cell_ref} could not be loaded from {describe_signature_image_source(image_source)}")
             return False
         signature_image = OpenpyxlImage(image_bytes)
-        signature_image.height = 45
-        signature_image.width = 120
+        signature_image.height = SIGNATURE_IMAGE_HEIGHT
+        signature_image.width = SIGNATURE_IMAGE_WIDTH
         worksheet.add_image(signature_image, cell_ref)
         return True
     except Exception as e:
@@ -537,23 +543,50 @@ def setup_cell_styles(workbook):
         if style.name not in workbook.named_styles:
             workbook.add_named_style(style)
 
-def apply_cell_formatting(cell, horizontal='center', vertical='center', **_format_options):
-    cell.alignment = Alignment(
+@lru_cache(maxsize=None)
+def get_cell_alignment(horizontal='center', vertical='center'):
+    return Alignment(
         horizontal=horizontal,
         vertical=vertical,
         wrap_text=True
     )
 
+def apply_cell_formatting(cell, horizontal='center', vertical='center', **_format_options):
+    cell.alignment = get_cell_alignment(horizontal, vertical)
+
+
+_template_cache = {}
+_template_cache_lock = threading.Lock()
+
+def load_audit_template(line_number):
+    """Return the audit template bytes and their S3 ETag, downloading only on a new version."""
+    bucket = os.getenv("S3_BUCKET_NAME")
+    if not bucket:
+        raise ValueError("S3_BUCKET_NAME environment variable not set")
+
+    template_key = get_template_key(get_audit_template_filename(line_number))
+    s3_client = get_s3_client()
+    template_version = s3_client.head_object(Bucket=bucket, Key=template_key).get('ETag', '').strip('"')
+    with _template_cache_lock:
+        cached = _template_cache.get(template_key)
+    if cached and template_version and cached[0] == template_version:
+        return cached[1], template_version
+
+    response = s3_client.get_object(Bucket=bucket, Key=template_key)
+    template_bytes = response['Body'].read()
+    template_version = str(response.get('ETag') or template_version).strip('"')
+    with _template_cache_lock:
+        _template_cache[template_key] = (template_version, template_bytes)
+    log_progress(f"Loaded audit template {template_key} version {template_version}")
+    return template_bytes, template_version
 
 def get_template_config(line_number):
     if line_number not in ('I', 'II'):
         raise ValueError(f"Unsupported line number: {line_number}")
 
-    template_key = get_template_key(get_audit_template_filename(line_number))
-    template_path = download_from_s3(template_key)
+    template_bytes, template_version = load_audit_template(line_number)
     field_config = get_audit_field_config(line_number)
-    observation_cell_mapping = get_audit_observation_mapping(line_number)
-    return template_path, field_config, observation_cell_mapping
+    return template_bytes, template_version, field_config
 
 def resolve_signature(audit_data, signature_key):
     """Read current and legacy signature shapes without requiring schema changes."""
@@ -1210,6 +1243,7 @@ def generate_filename(audit_data):
     return f"Quality_Audit_Line{line_number}_{formatted_date}_Shift{shift}.xlsx"
 
 # Main function to generate report (this will be called from main.py)
+@timed_backend(OPENPYXL_BACKEND)
 def generate_audit_report(audit_data):
     try:
         if not audit_data:
@@ -1217,21 +1251,22 @@ def generate_audit_report(audit_data):
         audit_data = normalize_ipqc_audit_data(copy.deepcopy(audit_data))
         log_progress("Received audit data for report generation")
         line_number = audit_data.get('lineNumber', 'I')
-        template_path, field_config, observation_cell_mapping = get_template_config(line_number)
-        if not template_path or not os.path.exists(template_path):
-            raise FileNotFoundError(f"Audit template could not be loaded for line {line_number}: {template_path}")
+        template_bytes, template_version, field_config = get_template_config(line_number)
+        if not template_bytes:
+            raise FileNotFoundError(f"Audit template could not be loaded for line {line_number}")
+        wb = load_workbook(io.BytesIO(template_bytes))
+        setup_cell_styles(wb)
+        ws = wb.active
+        export_plan = get_audit_export_plan(line_number, template_version, ws)
+        bind_export_plan(ws, export_plan)
+        observation_cell_mapping = export_plan.observation_cell_mapping
         if not isinstance(observation_cell_mapping, dict):
             log_progress("Warning: observation cell mapping is invalid; continuing without observations")
             observation_cell_mapping = {}
-        wb = load_workbook(template_path)
-        setup_cell_styles(wb)
-        ws = wb.active
         fill_basic_info(ws, audit_data, field_config)
         fill_observations_data(ws, audit_data, observation_cell_mapping)
         fill_line_dropdown_values(ws, audit_data)
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
+        output = save_workbook_to_spool(wb)
         filename = generate_filename(audit_data)
         return output, filename
         
@@ -6,11 +6,13 @@ import io
 import os
 from openpyxl import load_workbook
 from openpyxl.styles import Font, PatternFill
-from generators.excel_image_utils import add_worksheet_images, collect_worksheet_images
+from generators.excel_template_stamping import compile_sheet_template
 from paths import get_template_key
 from s3_service import get_s3_client
 from services.bus_ribbon_group_service import OFF_VALUE, is_bussing_group_off
 from services.shift_prepared_by_service import format_prepared_by
+from services.export_streaming import save_workbook_to_spool
+from services.request_metrics_service import OPENPYXL_BACKEND, timed_backend
 
 LINE_BUSSING_KEYS = {
     "FAB-II Line-I": ("autoBussing1", "autoBussing2", "autoBussing3"),
@@ -147,6 +149,7 @@ def fill_bus_ribbon_data_in_sheet(worksheet, entries, date_label, line):
     if signatures.get("reviewedBy") or signatures.get("verifiedBy"):
         worksheet["Q25"] = signatures.get("reviewedBy") or signatures.get("verifiedBy", "")
 
+@timed_backend(OPENPYXL_BACKEND)
 def generate_bus_ribbon_pull_strength_report(report_data):
     try:
         if not report_data:
@@ -170,23 +173,19 @@ def generate_bus_ribbon_pull_strength_report(report_data):
                 entries_by_date.setdefault(date, []).append(entry)
         workbook = load_template_workbook()
         template_sheet = workbook.active
-        template_images = collect_worksheet_images(template_sheet)
+        compiled_template = compile_sheet_template(template_sheet)
 
         days_in_month = calendar.monthrange(year, month)[1]
         for day in range(1, days_in_month + 1):
             date_key = f"{year}-{month:02d}-{day:02d}"
             date_label = f"{day:02d}.{month:02d}.{year}"
-            worksheet = workbook.copy_worksheet(template_sheet)
-            worksheet.title = date_label
-            add_worksheet_images(worksheet, template_images)
+            worksheet = compiled_template.stamp(workbook, date_label)
             date_entries = entries_by_date.get(date_key, [])
             if date_entries:
                 fill_bus_ribbon_data_in_sheet(worksheet, date_entries, date_label, line)
         if len(workbook.worksheets) > 1:
             workbook.remove(template_sheet)
-        output = io.BytesIO()
-        workbook.save(output)
-        output.seek(0)
+        output = save_workbook_to_spool(workbook)
         month_name = datetime(year, month, 1).strftime("%B")
         filename = f"{safe_filename('Bus_Ribbon_INTC_Pull_Strength')}_{safe_filename(line)}_{month_name}_{year}.xlsx"
         return output, filename
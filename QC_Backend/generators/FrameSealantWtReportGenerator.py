@@ -1,12 +1,13 @@
 ﻿from logging_utils import log_progress
 from openpyxl import load_workbook
 from openpyxl.styles import Font, PatternFill
-import io
 from datetime import datetime
 import calendar
 from paths import get_template_key, download_from_s3
-from generators.excel_image_utils import add_worksheet_images, collect_worksheet_images
+from generators.excel_template_stamping import compile_sheet_template
 from services.shift_prepared_by_service import format_prepared_by
+from services.export_streaming import save_workbook_to_spool
+from services.request_metrics_service import OPENPYXL_BACKEND, timed_backend
 
 GLASS_GROOVE_TARGETS = {
     'Glass Groove (5.6 mm)': 40,
@@ -143,6 +144,7 @@ def fill_shift_data(worksheet, entry, date, current_row):
     write_line_rows(display_line_1, lines.get('1', {}), current_row)
     write_line_rows(display_line_2, lines.get('2', {}), current_row + 2)
 
+@timed_backend(OPENPYXL_BACKEND)
 def generate_frame_sealant_report(frame_data):
     """Generate frame sealant weight report with multiple sheets - one sheet per day of the month"""
     try:
@@ -183,17 +185,15 @@ def generate_frame_sealant_report(frame_data):
         wb = load_workbook(template_path)
         
         template_sheet = wb.active
-        template_images = collect_worksheet_images(template_sheet)
+        compiled_template = compile_sheet_template(template_sheet)
 
         # Create sheets for each day of the month
         for day in range(1, days_in_month + 1):
             date_str = f"{year}-{month:02d}-{day:02d}"
             formatted_date = f"{day:02d}.{month:02d}.{year}"
             
-            # Create new sheet by copying template
-            new_sheet = wb.copy_worksheet(template_sheet)
-            new_sheet.title = formatted_date
-            add_worksheet_images(new_sheet, template_images)
+            # Create new sheet by stamping the compiled template
+            new_sheet = compiled_template.stamp(wb, formatted_date)
             
             # Get entries for this date
             date_entries = entries_by_date.get(date_str, [])
@@ -206,10 +206,8 @@ def generate_frame_sealant_report(frame_data):
         if len(wb.worksheets) > 1:
             wb.remove(template_sheet)
         
-        # Save to BytesIO
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
+        # Save to a spooled export buffer
+        output = save_workbook_to_spool(wb)
         
         # Generate filename
         month_name = datetime(year, month, 1).strftime("%B")
@@ -2,8 +2,13 @@
 from openpyxl import load_workbook
 from openpyxl.styles import Alignment, PatternFill
 from copy import copy
+from functools import lru_cache
 import io
-from paths import get_template_key, download_from_s3
+import os
+from paths import get_template_key
+from s3_service import get_s3_client
+from services.export_streaming import save_workbook_to_spool
+from services.request_metrics_service import OPENPYXL_BACKEND, timed_backend
 
 GEL_ALERT_FILL = PatternFill(fill_type='solid', fgColor='FECACA')
 
@@ -203,6 +208,20 @@ def generate_gel_filename(gel_data):
     else:
         return f"Gel_Test_{clean_name}.xlsx"
 
+TEMPLATE_FILENAME = 'Blank Gel Content Test Report.xlsx'
+
+@lru_cache(maxsize=1)
+def get_template_bytes():
+    bucket = os.getenv("S3_BUCKET_NAME")
+    if not bucket:
+        raise ValueError("S3_BUCKET_NAME environment variable not set")
+    response = get_s3_client().get_object(Bucket=bucket, Key=get_template_key(TEMPLATE_FILENAME))
+    return response["Body"].read()
+
+def load_template_workbook():
+    return load_workbook(io.BytesIO(get_template_bytes()))
+
+@timed_backend(OPENPYXL_BACKEND)
 def generate_gel_report(gel_data):
     try:
         if not gel_data:
@@ -211,15 +230,11 @@ def generate_gel_report(gel_data):
         log_progress(f"Report name: {gel_data.get('report_name', 'N/A')}")
         log_progress(f"Form data keys: {list(gel_data.get('form_data', {}).keys())}")
         log_progress(f"Averages keys: {list(gel_data.get('averages', {}).keys())}")
-        template_key = get_template_key('Blank Gel Content Test Report.xlsx')
-        template_path = download_from_s3(template_key)
-        wb = load_workbook(template_path)
+        wb = load_template_workbook()
         ws = wb.active
         fill_gel_basic_info(ws, gel_data)
         fill_gel_test_data(ws, gel_data)
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
+        output = save_workbook_to_spool(wb)
         filename = generate_gel_filename(gel_data)
         log_progress(f"Gel test report generated successfully: {filename}")
         log_progress("Text with inline checkboxes have been added to single cells")
@@ -10,10 +10,12 @@ import re
 from openpyxl import load_workbook
 from openpyxl.styles import Font, PatternFill
 
-from generators.excel_image_utils import add_worksheet_images, collect_worksheet_images
+from generators.excel_template_stamping import compile_sheet_template
 from generators.AuditReportGenerator import insert_signature_image
 from paths import get_template_key
 from s3_service import get_s3_client
+from services.export_streaming import save_workbook_to_spool
+from services.request_metrics_service import OPENPYXL_BACKEND, timed_backend
 
 
 TEMPLATE_FILENAME = "Blank JB Contact Block Maintenance Report.xlsx"
@@ -201,6 +203,7 @@ def fill_jb_contact_block_data_in_sheet(worksheet, entry, date_label, fab):
         insert_signature_image(worksheet, f"J{signature_row + 1}", verified_details["signature"])
 
 
+@timed_backend(OPENPYXL_BACKEND)
 def generate_jb_contact_block_maintenance_report(report_data):
     try:
         if not report_data:
@@ -227,15 +230,13 @@ def generate_jb_contact_block_maintenance_report(report_data):
 
         workbook = load_template_workbook()
         template_sheet = workbook.active
-        template_images = collect_worksheet_images(template_sheet)
+        compiled_template = compile_sheet_template(template_sheet)
 
         days_in_month = calendar.monthrange(year, month)[1]
         for day in range(1, days_in_month + 1):
             date_key = f"{year}-{month:02d}-{day:02d}"
             date_label = f"{day:02d}.{month:02d}.{year}"
-            worksheet = workbook.copy_worksheet(template_sheet)
-            worksheet.title = date_label
-            add_worksheet_images(worksheet, template_images)
+            worksheet = compiled_template.stamp(workbook, date_label)
 
             entry = entry_by_date.get(date_key)
             if entry:
@@ -244,9 +245,7 @@ def generate_jb_contact_block_maintenance_report(report_data):
         if len(workbook.worksheets) > 1:
             workbook.remove(template_sheet)
 
-        output = io.BytesIO()
-        workbook.save(output)
-        output.seek(0)
+        output = save_workbook_to_spool(workbook)
 
         month_name = datetime(year, month, 1).strftime("%B")
         filename = f"{safe_filename('JB_Contact_Block_Maintenance')}_{safe_filename(fab)}_{month_name}_{year}.xlsx"
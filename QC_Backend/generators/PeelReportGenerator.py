@@ -1,8 +1,13 @@
 ﻿from logging_utils import log_progress
 from openpyxl import load_workbook
 from openpyxl.styles import (Font, PatternFill, Alignment, Border, Side, NamedStyle)
+from functools import lru_cache
 import io
-from paths import get_template_key, download_from_s3
+import os
+from paths import get_template_key
+from s3_service import get_s3_client
+from services.export_streaming import save_workbook_to_spool
+from services.request_metrics_service import OPENPYXL_BACKEND, timed_backend
 
 def fill_peel_basic_info(worksheet, peel_data):
     try:
@@ -97,6 +102,20 @@ def generate_peel_filename(peel_data):
     else:
         return f"Peel_Test_{clean_name}.xlsx"
 
+TEMPLATE_FILENAME = 'Blank Solar Cell Peel Strength Test Report.xlsx'
+
+@lru_cache(maxsize=1)
+def get_template_bytes():
+    bucket = os.getenv("S3_BUCKET_NAME")
+    if not bucket:
+        raise ValueError("S3_BUCKET_NAME environment variable not set")
+    response = get_s3_client().get_object(Bucket=bucket, Key=get_template_key(TEMPLATE_FILENAME))
+    return response["Body"].read()
+
+def load_template_workbook():
+    return load_workbook(io.BytesIO(get_template_bytes()))
+
+@timed_backend(OPENPYXL_BACKEND)
 def generate_peel_report(peel_data):
     try:
         if not peel_data:
@@ -104,15 +123,11 @@ def generate_peel_report(peel_data):
         log_progress("Received peel test data for report generation")
         log_progress(f"Report name: {peel_data.get('report_name', 'N/A')}")
         log_progress(f"Form data keys: {list(peel_data.get('form_data', {}).keys())}")
-        template_key = get_template_key('Blank Solar Cell Peel Strength Test Report.xlsx')
-        template_path = download_from_s3(template_key)
-        wb = load_workbook(template_path)
+        wb = load_template_workbook()
         ws = wb.active
         fill_peel_basic_info(ws, peel_data)
         fill_peel_test_data(ws, peel_data)
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
+        output = save_workbook_to_spool(wb)
         filename = generate_peel_filename(peel_data)
         log_progress(f"Peel test report generated successfully: {filename}")
         return output, filename
@@ -9,10 +9,12 @@ import re
 from openpyxl import load_workbook
 from openpyxl.styles import Font, PatternFill
 
-from generators.excel_image_utils import add_worksheet_images, collect_worksheet_images
+from generators.excel_template_stamping import compile_sheet_template
 from paths import get_template_key
 from s3_service import get_s3_client
 from services.shift_prepared_by_service import format_prepared_by
+from services.export_streaming import save_workbook_to_spool
+from services.request_metrics_service import OPENPYXL_BACKEND, timed_backend
 
 
 TEMPLATE_FILENAME = "Blank Peel Strength of Bus Ribbon to JB Soldering Test Report.xlsx"
@@ -176,6 +178,7 @@ def fill_peel_strength_data_in_sheet(worksheet, entries, date_label, fab):
         worksheet["L12"] = verified_by
 
 
+@timed_backend(OPENPYXL_BACKEND)
 def generate_peel_strength_bus_ribbon_jb_soldering_report(report_data):
     try:
         if not report_data:
@@ -202,15 +205,13 @@ def generate_peel_strength_bus_ribbon_jb_soldering_report(report_data):
 
         workbook = load_template_workbook()
         template_sheet = workbook.active
-        template_images = collect_worksheet_images(template_sheet)
+        compiled_template = compile_sheet_template(template_sheet)
 
         days_in_month = calendar.monthrange(year, month)[1]
         for day in range(1, days_in_month + 1):
             date_key = f"{year}-{month:02d}-{day:02d}"
             date_label = f"{day:02d}.{month:02d}.{year}"
-            worksheet = workbook.copy_worksheet(template_sheet)
-            worksheet.title = date_label
-            add_worksheet_images(worksheet, template_images)
+            worksheet = compiled_template.stamp(workbook, date_label)
 
             date_entries = entries_by_date.get(date_key, [])
             if date_entries:
@@ -219,9 +220,7 @@ def generate_peel_strength_bus_ribbon_jb_soldering_report(report_data):
         if len(workbook.worksheets) > 1:
             workbook.remove(template_sheet)
 
-        output = io.BytesIO()
-        workbook.save(output)
-        output.seek(0)
+        output = save_workbook_to_spool(workbook)
 
         month_name = datetime(year, month, 1).strftime("%B")
         filename = (
@@ -1,13 +1,14 @@
 ﻿from logging_utils import log_progress
 from openpyxl import load_workbook
 from openpyxl.styles import PatternFill
-import io
 from datetime import datetime
 import calendar
 from paths import get_template_key, download_from_s3
-from generators.excel_image_utils import add_worksheet_images, collect_worksheet_images
+from generators.excel_template_stamping import compile_sheet_template
 from services.potting_ratio_evaluation import evaluate_potting_ratio
 from services.shift_prepared_by_service import format_prepared_by
+from services.export_streaming import save_workbook_to_spool
+from services.request_metrics_service import OPENPYXL_BACKEND, timed_backend
 
 SUCCESS_FILL = PatternFill(start_color='92D050', end_color='92D050', fill_type='solid')
 FAILURE_FILL = PatternFill(start_color='FF9999', end_color='FF9999', fill_type='solid')
@@ -95,6 +96,7 @@ def fill_potting_data_in_sheet(worksheet, entries, date):
         raise
 
 
+@timed_backend(OPENPYXL_BACKEND)
 def generate_potting_report(potting_data):
     """Generate potting ratio report with multiple sheets - one sheet per day of the month"""
     try:
@@ -136,17 +138,15 @@ def generate_potting_report(potting_data):
         
         # Get the template sheet
         template_sheet = wb.active
-        template_images = collect_worksheet_images(template_sheet)
+        compiled_template = compile_sheet_template(template_sheet)
         
         # Create sheets for each day of the month
         for day in range(1, days_in_month + 1):
             date_str = f"{year}-{month:02d}-{day:02d}"
             formatted_date = f"{day:02d}.{month:02d}.{year}"
             
-            # Create new sheet by copying template
-            new_sheet = wb.copy_worksheet(template_sheet)
-            new_sheet.title = formatted_date
-            add_worksheet_images(new_sheet, template_images)
+            # Create new sheet by stamping the compiled template
+            new_sheet = compiled_template.stamp(wb, formatted_date)
             
             # Get entries for this date
             date_entries = entries_by_date.get(date_str, [])
@@ -158,10 +158,8 @@ def generate_potting_report(potting_data):
         # Remove the original template sheet
         wb.remove(template_sheet)
         
-        # Save to BytesIO
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
+        # Save to a spooled export buffer
+        output = save_workbook_to_spool(wb)
         
         # Generate filename
         month_name = datetime(year, month, 1).strftime("%B")
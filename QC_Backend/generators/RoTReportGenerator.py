@@ -1,9 +1,10 @@
 ﻿from logging_utils import log_progress
 from openpyxl import load_workbook
 from openpyxl.styles import PatternFill
-import io
 from datetime import datetime
 from paths import get_template_key, download_from_s3
+from services.export_streaming import save_workbook_to_spool
+from services.request_metrics_service import OPENPYXL_BACKEND, timed_backend
 
 def fill_rot_test_data(worksheet, entries):
     try:
@@ -65,6 +66,7 @@ def fill_rot_signatures(worksheet, form_data):
         log_progress(f"Error filling RoT signatures: {str(e)}")
         raise
 
+@timed_backend(OPENPYXL_BACKEND)
 def generate_rot_report(rot_data):
     try:
         if not rot_data:
@@ -81,9 +83,7 @@ def generate_rot_report(rot_data):
         ws = wb.active
         fill_rot_test_data(ws, entries)
         fill_rot_signatures(ws, form_data)
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
+        output = save_workbook_to_spool(wb)
         report_name = rot_data.get('name', rot_data.get('report_name', 'RoT_Test_Report'))
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         clean_name = "".join(c for c in report_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
@@ -1,11 +1,12 @@
 ﻿from logging_utils import log_progress
 from openpyxl import load_workbook
 from openpyxl.styles import PatternFill
-import io
 from datetime import datetime
 import re
 from paths import get_template_key, download_from_s3
 from report_context import file_part, logical_physical_line_pairs, normalize_fab_line
+from services.export_streaming import save_workbook_to_spool
+from services.request_metrics_service import OPENPYXL_BACKEND, timed_backend
 
 def get_display_line_numbers(line_group):
     return tuple(physical for _, physical in logical_physical_line_pairs(line_group))
@@ -188,6 +189,7 @@ def fill_ssh_signatures(worksheet, form_data):
         log_progress(f"Error filling SSH signatures: {str(e)}")
         raise
 
+@timed_backend(OPENPYXL_BACKEND)
 def generate_ssh_report(ssh_data):
     """Generate SSH test report from MongoDB data structure"""
     try:
@@ -229,10 +231,8 @@ def generate_ssh_report(ssh_data):
         if form_data:
             fill_ssh_signatures(ws, form_data)
         
-        # Save to BytesIO
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
+        # Save to a spooled export buffer
+        output = save_workbook_to_spool(wb)
         
         # Generate filename
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
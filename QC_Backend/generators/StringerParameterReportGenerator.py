@@ -12,6 +12,8 @@ from generators.stringer_parameter_mappings import (
 )
 from paths import get_template_key
 from s3_service import get_s3_client
+from services.export_streaming import save_workbook_to_spool
+from services.request_metrics_service import OPENPYXL_BACKEND, timed_backend
 
 
 NUMERIC_PATTERN = re.compile(r"^[+-]?(?:\d+(?:\.\d+)?|\.\d+)$")
@@ -176,6 +178,7 @@ def write_unit_values(worksheet, row: int, unit_label: str, values: dict, mapper
         worksheet[f"{column['excel']}{row}"] = to_excel_value(values.get(column["key"], ""))
 
 
+@timed_backend(OPENPYXL_BACKEND)
 def generate_stringer_parameter_report(report_data: dict):
     if not report_data:
         raise ValueError("No Stringer Parameter Report data provided")
@@ -198,8 +201,6 @@ def generate_stringer_parameter_report(report_data: dict):
         write_unit_values(worksheet, top_row, "A", audit_values.get("unitA") or {}, mapper)
         write_unit_values(worksheet, bottom_row, "B", audit_values.get("unitB") or {}, mapper)
 
-    output = io.BytesIO()
-    workbook.save(output)
-    output.seek(0)
+    output = save_workbook_to_spool(workbook)
     filename = f"Stringer_Parameter_Report_Line-{mapper.line}_{year}_{month:02d}.xlsx"
     return output, filename
@@ -1,9 +1,10 @@
 ﻿from logging_utils import log_progress
 from openpyxl import load_workbook
 from openpyxl.styles import PatternFill
-import io
 from datetime import datetime
 from paths import get_template_key, download_from_s3
+from services.export_streaming import save_workbook_to_spool
+from services.request_metrics_service import OPENPYXL_BACKEND, timed_backend
 
 def fill_wet_leakage_test_data(worksheet, entries):
     try:
@@ -71,6 +72,7 @@ def fill_wet_leakage_signatures(worksheet, form_data):
         log_progress(f"Error filling Wet Leakage signatures: {str(e)}")
         raise
 
+@timed_backend(OPENPYXL_BACKEND)
 def generate_wet_leakage_report(wet_leakage_data):
     try:
         if not wet_leakage_data:
@@ -87,9 +89,7 @@ def generate_wet_leakage_report(wet_leakage_data):
         ws = wb.active
         fill_wet_leakage_test_data(ws, entries)
         fill_wet_leakage_signatures(ws, form_data)
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
+        output = save_workbook_to_spool(wb)
         report_name = wet_leakage_data.get('name', wet_leakage_data.get('report_name', 'Wet_Leakage_Test_Report'))
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         clean_name = "".join(c for c in report_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
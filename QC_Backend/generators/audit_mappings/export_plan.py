@@ -0,0 +1,102 @@
+import threading
+import weakref
+
+from openpyxl.utils.cell import coordinate_to_tuple, get_column_letter
+
+from generators.excel_template_stamping import build_merged_cell_index
+
+from . import get_audit_observation_mapping
+from .mapping_helpers import CELL_REFERENCE_PATTERN
+
+
+def iter_cell_references(value):
+    """Yield every cell reference string nested anywhere inside a mapping."""
+    if isinstance(value, dict):
+        for item in value.values():
+            yield from iter_cell_references(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from iter_cell_references(item)
+    elif isinstance(value, str) and CELL_REFERENCE_PATTERN.fullmatch(value):
+        yield value
+
+
+class AuditExportPlan:
+    """An IPQC audit line mapping resolved against one template version.
+
+    The observation mapping is built once per line and shared read-only by
+    every export, and every mapped cell reference is resolved up front to the
+    coordinate that can actually be written: the top-left cell when the
+    reference falls inside a merged range. Exports then look cells up in a
+    flat dict instead of rebuilding the mapping and scanning the template's
+    merged ranges for each write.
+    """
+
+    def __init__(self, line_number, template_version, worksheet, observation_cell_mapping):
+        self.line_number = line_number
+        self.template_version = template_version
+        self.observation_cell_mapping = observation_cell_mapping
+        self.merged_cell_index = build_merged_cell_index(worksheet)
+        self.writable_cells = {}
+        for cell_ref in iter_cell_references(observation_cell_mapping):
+            self.writable_coordinate(cell_ref)
+
+    def writable_coordinate(self, cell_ref):
+        coordinate = self.writable_cells.get(cell_ref)
+        if coordinate is not None:
+            return coordinate
+        try:
+            row, column = coordinate_to_tuple(cell_ref.replace("$", ""))
+        except (AttributeError, ValueError):
+            # Leave malformed references for the worksheet lookup to report.
+            return cell_ref
+        anchor_row, anchor_column = self.merged_cell_index.get((row, column), (row, column))
+        coordinate = f"{get_column_letter(anchor_column)}{anchor_row}"
+        self.writable_cells[cell_ref] = coordinate
+        return coordinate
+
+
+_plans = {}
+_plans_lock = threading.Lock()
+_bound_plans = weakref.WeakKeyDictionary()
+
+
+def get_audit_export_plan(line_number, template_version, worksheet):
+    """Return the plan for ``line_number``, compiling it on a new template version.
+
+    Without a template version (S3 returned no ETag) the template may change
+    under the same key, so the plan is compiled for this export only.
+    """
+    plan_key = (line_number, template_version)
+    with _plans_lock:
+        plan = _plans.get(plan_key) if template_version else None
+    if plan is not None:
+        return plan
+
+    plan = AuditExportPlan(
+        line_number,
+        template_version,
+        worksheet,
+        get_audit_observation_mapping(line_number),
+    )
+    if not template_version:
+        return plan
+    with _plans_lock:
+        for stale_key in [key for key in _plans if key[0] == line_number]:
+            del _plans[stale_key]
+        _plans[plan_key] = plan
+    return plan
+
+
+def bind_export_plan(worksheet, plan):
+    """Let cell lookups on ``worksheet`` resolve merged cells through ``plan``."""
+    _bound_plans[worksheet] = plan
+
+
+def get_bound_export_plan(worksheet):
+    return _bound_plans.get(worksheet)
+
+
+def clear_audit_export_plans():
+    with _plans_lock:
+        _plans.clear()
@@ -0,0 +1,134 @@
+from copy import copy
+
+from openpyxl.cell.cell import Cell
+from openpyxl.utils.cell import coordinate_to_tuple, get_column_letter, range_boundaries
+from openpyxl.worksheet.cell_range import CellRange
+from openpyxl.worksheet.merge import MergedCellRange
+
+from generators.excel_image_utils import add_worksheet_images, collect_worksheet_images
+
+
+SHEET_SETTING_ATTRIBUTES = (
+    "sheet_format",
+    "sheet_properties",
+    "page_margins",
+    "page_setup",
+    "print_options",
+)
+
+
+def build_merged_cell_index(worksheet):
+    """Map every non-anchor coordinate of a merged range to its top-left coordinate."""
+    merged_index = {}
+    for merged_range in worksheet.merged_cells.ranges:
+        min_col, min_row, max_col, max_row = range_boundaries(merged_range.coord)
+        for row in range(min_row, max_row + 1):
+            for column in range(min_col, max_col + 1):
+                if (row, column) != (min_row, min_col):
+                    merged_index[(row, column)] = (min_row, min_col)
+    return merged_index
+
+
+def build_merged_range(worksheet, coordinate):
+    """Attach a merged range whose edge borders are already on the stamped cells.
+
+    ``MergedCellRange.__init__`` folds the bottom-right border into the
+    top-left cell through the workbook's border table on every call. The
+    template's cells already carry that border, so it is skipped here.
+    """
+    merged_range = MergedCellRange.__new__(MergedCellRange)
+    CellRange.__init__(merged_range, range_string=coordinate)
+    merged_range.ws = worksheet
+    merged_range.start_cell = worksheet._cells.get((merged_range.min_row, merged_range.min_col))
+    return merged_range
+
+
+class CompiledSheetTemplate:
+    """A template worksheet captured once and stamped into many sheets.
+
+    ``Workbook.copy_worksheet`` re-walks the source sheet, re-validates every
+    cell coordinate and re-copies every dimension object on each call. Monthly
+    reports stamp the same template 28-31 times, so the cell layout, style
+    arrays, merged ranges, dimensions and image bytes are read once here and
+    replayed directly into the target sheet's cell store.
+
+    Stamped sheets carry the same parts ``copy_worksheet`` copies (values,
+    styles, hyperlinks, comments, dimensions, merged cells, margins and
+    print/page setup) plus the template's images. Style arrays index into the
+    owning workbook's style tables, so stamps must target that workbook.
+    """
+
+    def __init__(self, template_sheet, anchors=None):
+        self.workbook = template_sheet.parent
+        self.cells = []
+        for (row, column), cell in template_sheet._cells.items():
+            self.cells.append((
+                row,
+                column,
+                cell._value,
+                cell.data_type,
+                cell._style if cell.has_style else None,
+                cell.hyperlink,
+                cell.comment,
+            ))
+        self.merged_ranges = [merged_range.coord for merged_range in template_sheet.merged_cells.ranges]
+        self.merged_cell_index = build_merged_cell_index(template_sheet)
+        self.row_dimensions = dict(template_sheet.row_dimensions.items())
+        self.column_dimensions = dict(template_sheet.column_dimensions.items())
+        self.sheet_settings = {
+            attribute: getattr(template_sheet, attribute)
+            for attribute in SHEET_SETTING_ATTRIBUTES
+        }
+        self.images = collect_worksheet_images(template_sheet)
+        self.anchors = {
+            name: self.resolve_writable_coordinate(coordinate)
+            for name, coordinate in (anchors or {}).items()
+        }
+
+    def resolve_writable_coordinate(self, coordinate):
+        """Return the top-left coordinate when ``coordinate`` falls inside a merge."""
+        row, column = coordinate_to_tuple(coordinate)
+        anchor_row, anchor_column = self.merged_cell_index.get((row, column), (row, column))
+        return f"{get_column_letter(anchor_column)}{anchor_row}"
+
+    def anchor(self, name):
+        return self.anchors[name]
+
+    def stamp(self, workbook, title):
+        if workbook is not self.workbook:
+            raise ValueError("Compiled templates can only be stamped into their own workbook")
+
+        worksheet = workbook.create_sheet(title=title)
+        target_cells = worksheet._cells
+        for row, column, value, data_type, style, hyperlink, comment in self.cells:
+            # Merged positions stay plain cells, as with copy_worksheet, so the
+            # fill functions can keep writing to any coordinate of a merge.
+            cell = Cell(worksheet, row=row, column=column)
+            cell._value = value
+            cell.data_type = data_type
+            if style is not None:
+                cell._style = copy(style)
+            if hyperlink:
+                cell._hyperlink = copy(hyperlink)
+            if comment:
+                cell.comment = copy(comment)
+            target_cells[(row, column)] = cell
+
+        for key, dimension in self.row_dimensions.items():
+            worksheet.row_dimensions[key] = copy(dimension)
+            worksheet.row_dimensions[key].worksheet = worksheet
+        for key, dimension in self.column_dimensions.items():
+            worksheet.column_dimensions[key] = copy(dimension)
+            worksheet.column_dimensions[key].worksheet = worksheet
+
+        for attribute, value in self.sheet_settings.items():
+            setattr(worksheet, attribute, copy(value))
+        for coordinate in self.merged_ranges:
+            worksheet.merged_cells.add(build_merged_range(worksheet, coordinate))
+
+        add_worksheet_images(worksheet, self.images)
+        return worksheet
+
+
+def compile_sheet_template(template_sheet, anchors=None):
+    return CompiledSheetTemplate(template_sheet, anchors=anchors)
@@ -0,0 +1,78 @@
+import re
+from copy import copy
+
+from openpyxl.cell.cell import MergedCell
+
+from generators.excel_image_utils import add_worksheet_images, collect_worksheet_images
+from generators.excel_template_stamping import SHEET_SETTING_ATTRIBUTES
+
+
+INVALID_SHEET_TITLE_CHARACTERS = re.compile(r"[\[\]:*?/\\]")
+MAX_SHEET_TITLE_LENGTH = 31
+CELL_STYLE_ATTRIBUTES = ("font", "border", "fill", "number_format", "protection", "alignment")
+
+
+def build_unique_sheet_title(name, existing_titles):
+    """Return an Excel-safe sheet title that does not clash with ``existing_titles``."""
+    base_title = INVALID_SHEET_TITLE_CHARACTERS.sub("_", str(name or "")).strip(" '") or "Report"
+    base_title = base_title[:MAX_SHEET_TITLE_LENGTH]
+    taken = {title.casefold() for title in existing_titles}
+    title = base_title
+    suffix_number = 2
+    while title.casefold() in taken:
+        suffix = f" ({suffix_number})"
+        title = f"{base_title[:MAX_SHEET_TITLE_LENGTH - len(suffix)]}{suffix}"
+        suffix_number += 1
+    return title
+
+
+def copy_sheet_into_workbook(source_sheet, target_workbook, title):
+    """Copy a worksheet from another workbook, re-registering its styles in the target.
+
+    ``Workbook.copy_worksheet`` only works inside one workbook because cells
+    keep indexes into their workbook's style tables. Here each style part is
+    copied by value so the target workbook assigns its own indexes.
+    """
+    target_sheet = target_workbook.create_sheet(title=build_unique_sheet_title(title, target_workbook.sheetnames))
+    merged_cells = []
+    for (row, column), source_cell in source_sheet._cells.items():
+        if isinstance(source_cell, MergedCell):
+            merged_cells.append(source_cell)
+            continue
+        target_cell = target_sheet.cell(row=row, column=column)
+        target_cell._value = source_cell._value
+        target_cell.data_type = source_cell.data_type
+        if source_cell.has_style:
+            for attribute in CELL_STYLE_ATTRIBUTES:
+                setattr(target_cell, attribute, copy(getattr(source_cell, attribute)))
+        if source_cell.hyperlink:
+            target_cell._hyperlink = copy(source_cell.hyperlink)
+        if source_cell.comment:
+            target_cell.comment = copy(source_cell.comment)
+
+    for merged_range in source_sheet.merged_cells.ranges:
+        target_sheet.merge_cells(merged_range.coord)
+    for source_cell in merged_cells:
+        if source_cell.has_style:
+            target_sheet._cells[(source_cell.row, source_cell.column)].border = copy(source_cell.border)
+
+    # Dimension objects carry style indexes of their own workbook, so only
+    # the geometry is carried over.
+    for key, dimension in source_sheet.row_dimensions.items():
+        target_dimension = target_sheet.row_dimensions[key]
+        target_dimension.height = dimension.height
+        target_dimension.hidden = dimension.hidden
+        target_dimension.outlineLevel = dimension.outlineLevel
+    for key, dimension in source_sheet.column_dimensions.items():
+        target_dimension = target_sheet.column_dimensions[key]
+        target_dimension.width = dimension.width
+        target_dimension.hidden = dimension.hidden
+        target_dimension.outlineLevel = dimension.outlineLevel
+        target_dimension.min = dimension.min
+        target_dimension.max = dimension.max
+
+    for attribute in SHEET_SETTING_ATTRIBUTES:
+        setattr(target_sheet, attribute, copy(getattr(source_sheet, attribute)))
+    target_sheet.freeze_panes = source_sheet.freeze_panes
+    add_worksheet_images(target_sheet, collect_worksheet_images(source_sheet))
+    return target_sheet
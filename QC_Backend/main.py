@@ -1,14 +1,28 @@
 from contextlib import asynccontextmanager
+import asyncio
 import logging
+import time
+
+_import_started = time.perf_counter()
 
 from fastapi import FastAPI, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from services.export_streaming import build_export_response
 from datetime import datetime
 import uvicorn
 import threading
 import os
 from constants import SERVER_URL, PORT
+from mongo_connection import run_startup_tasks
+from services.query_profiler_service import QueryProfilerMiddleware, install_query_profiler
+from services.request_metrics_service import RequestMetricsMiddleware, install_mongo_command_timer
+from services.response_compression import CompressionMiddleware
+
+# The shared Mongo client is created by the first model import, so command listeners must be registered first.
+install_mongo_command_timer()
+query_profiler_enabled = install_query_profiler()
+
 from routes.qa_route import qa_router
 from routes.bGrade_route import bgrade_router
 from routes.peel_route import peel_router
@@ -29,6 +43,11 @@ from routes.task_routes import task_router
 from routes.goal_routes import goal_router
 from routes.wet_leakage_route import wet_leakage_router
 from routes.ipqc_audit_route import ipqc_audit_router, get_ipqc_current_user, require_ipqc_export_access
+from routes.report_export_route import report_export_router
+from routes.report_payload_route import report_payload_router
+from routes.change_feed_route import change_feed_router
+from routes.shift_compliance_route import shift_compliance_router
+from routes.metrics_route import metrics_router
 from generators.AuditReportGenerator import generate_audit_report
 from generators.GelReportGenerator import generate_gel_report
 from generators.AdhesionReportGenerator import generate_adhesion_report
@@ -38,13 +57,19 @@ from generators.SSHReportGenerator import generate_ssh_report
 from generators.PeelReportGenerator import generate_peel_report
 from generators.RoTReportGenerator import generate_rot_report
 from generators.WetLeakageReportGenerator import generate_wet_leakage_report
-from services.po_line_mapping_service import map_po_to_fab_line
+from services.report_export_service import (
+    build_adhesion_report_data,
+    build_audit_report_data,
+    build_gel_report_data,
+    build_peel_report_data,
+)
 
 logging.basicConfig(
     level=os.getenv("LOG_LEVEL", "INFO").upper(),
     format="%(asctime)s %(levelname)s %(name)s %(message)s",
 )
 logger = logging.getLogger(__name__)
+import_seconds = time.perf_counter() - _import_started
 
 
 _extractors_started = False
@@ -95,11 +120,31 @@ def run_extractors():
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Index checks and seed rows used to run while the routers were imported;
+    # they now run concurrently here, once per worker.
+    startup_started = time.perf_counter()
+    startup_tasks = None
+    if os.getenv("STARTUP_TASKS_IN_BACKGROUND", "false").lower() in {"1", "true", "yes"}:
+        startup_tasks = asyncio.create_task(run_in_threadpool(run_startup_tasks))
+    else:
+        await run_in_threadpool(run_startup_tasks)
     if os.getenv("DISABLE_BACKGROUND_EXTRACTORS", "false").lower() in {"1", "true", "yes"}:
         logger.info("background_extractors_disabled")
     else:
         run_extractors()
+    logger.info(
+        "application_startup_ready import_seconds=%.3f startup_seconds=%.3f startup_tasks=%s",
+        import_seconds,
+        time.perf_counter() - startup_started,
+        "background" if startup_tasks else "completed",
+    )
     yield
+    if startup_tasks and not startup_tasks.done():
+        await startup_tasks
+    from services.stringer_parameter_report_service import stringer_report_materializer
+    stringer_report_materializer.shutdown()
+    from services.change_feed_service import change_feed_hub
+    await change_feed_hub.shutdown()
 
 
 app = FastAPI(
@@ -121,7 +166,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Server-Timing"],
 )
+# Inside the metrics middleware, so recorded response sizes are the bytes actually sent.
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(RequestMetricsMiddleware)
+if query_profiler_enabled:
+    # Outermost, so explain sampling after the response is not billed to the request.
+    app.add_middleware(QueryProfilerMiddleware)
 
 app.include_router(qa_router)
 app.include_router(bgrade_router)
@@ -143,6 +195,11 @@ app.include_router(task_router)
 app.include_router(goal_router)
 app.include_router(wet_leakage_router)
 app.include_router(ipqc_audit_router)
+app.include_router(report_export_router)
+app.include_router(report_payload_router)
+app.include_router(change_feed_router)
+app.include_router(shift_compliance_router)
+app.include_router(metrics_router)
 
 @app.post("/api/ipqc-audits/generate-audit-report")
 async def generate_audit_report_endpoint(request: dict, x_employee_id: str | None = Header(default=None)):
@@ -152,7 +209,7 @@ async def generate_audit_report_endpoint(request: dict, x_employee_id: str | Non
         
         if audit_id:
             # Saved report export - fetch from S3
-            from models.ipqc_audit_models import ipqc_audit_collection, IPQCAudit
+            from models.ipqc_audit_models import ipqc_audit_collection
             from bson import ObjectId
 
             if not ObjectId.is_valid(audit_id):
@@ -163,25 +220,13 @@ async def generate_audit_report_endpoint(request: dict, x_employee_id: str | Non
                 raise HTTPException(status_code=404, detail="Audit not found")
             require_ipqc_export_access(audit, user)
 
-            # Fetch data from S3
-            ipqc_audit = IPQCAudit.from_dict(audit)
-            audit_data = ipqc_audit.to_dict(include_data=True)
-
-            # Prepare data for report generation
-            s3_data = audit_data.get("data", {})
-            report_data = s3_data.copy()
-            report_data["name"] = audit["name"]
+            # Fetch data from S3 and prepare it for report generation
+            report_data = build_audit_report_data(audit)
         else:
             raise HTTPException(status_code=403, detail="Audit Excel can be generated only from submitted saved checksheets")
 
         output, filename = generate_audit_report(report_data)
-        return StreamingResponse(
-            output,
-            media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            headers={
-                'Content-Disposition': f'attachment; filename="{filename}"',
-            }
-        )
+        return build_export_response(output, filename)
     except HTTPException:
         raise
     except Exception as e:
@@ -195,7 +240,7 @@ async def generate_gel_report_endpoint(request: dict, x_employee_id: str | None
         
         if report_id:
             # Saved report export - fetch from S3
-            from models.gel_test_models import gel_test_collection, GelTestReport
+            from models.gel_test_models import gel_test_collection
             from bson import ObjectId
 
             if not ObjectId.is_valid(report_id):
@@ -207,30 +252,13 @@ async def generate_gel_report_endpoint(request: dict, x_employee_id: str | None
             user = get_gel_current_user(x_employee_id)
             require_gel_export_access(report, user)
 
-            # Fetch data from S3
-            gel_report = GelTestReport.from_dict(report)
-            gel_data = gel_report.to_dict(include_data=True)
-
-            # Prepare data for report generation
-            report_data = {
-                "form_data": gel_data.get("form_data", {}),
-                "averages": gel_data.get("averages", {}),
-                "name": report["name"]
-            }
-            mapping = map_po_to_fab_line(report.get("productionOrderNo") or report_data["form_data"].get("gel_editable_1"))
-            report_data["form_data"]["productionOrderNo"] = mapping.production_order
-            report_data["form_data"]["lineNumber"] = mapping.line
+            # Fetch data from S3 and prepare it for report generation
+            report_data = build_gel_report_data(report)
         else:
             raise HTTPException(status_code=403, detail="Gel Excel can be generated only from submitted or approved saved reports")
 
         output, filename = generate_gel_report(report_data)
-        return StreamingResponse(
-            output,
-            media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            headers={
-                'Content-Disposition': f'attachment; filename="{filename}"',
-            }
-        )
+        return build_export_response(output, filename)
     except HTTPException:
         raise
     except Exception as e:
@@ -245,7 +273,7 @@ async def generate_adhesion_report_endpoint(request: dict, x_employee_id: str |
         
         if report_id:
             # Saved report export - fetch from S3
-            from models.adhesion_test_models import adhesion_test_collection, AdhesionTestReport
+            from models.adhesion_test_models import adhesion_test_collection
             from bson import ObjectId
 
             if not ObjectId.is_valid(report_id):
@@ -256,30 +284,13 @@ async def generate_adhesion_report_endpoint(request: dict, x_employee_id: str |
                 raise HTTPException(status_code=404, detail="Report not found")
             require_adhesion_export_access(report, user)
 
-            # Fetch data from S3
-            adhesion_report = AdhesionTestReport.from_dict(report)
-            adhesion_data = adhesion_report.to_dict(include_data=True)
-
-            # Prepare data for report generation
-            report_data = {
-                "form_data": adhesion_data.get("form_data", {}),
-                "averages": adhesion_data.get("averages", {}),
-                "name": report["name"]
-            }
-            mapping = map_po_to_fab_line(report.get("productionOrderNo") or report_data["form_data"].get("adhesion_editable_1"))
-            report_data["form_data"]["productionOrderNo"] = mapping.production_order
-            report_data["form_data"]["lineNumber"] = mapping.line
+            # Fetch data from S3 and prepare it for report generation
+            report_data = build_adhesion_report_data(report)
         else:
             raise HTTPException(status_code=403, detail="Adhesion Excel can be generated only from submitted or approved saved reports")
 
         output, filename = generate_adhesion_report(report_data)
-        return StreamingResponse(
-            output,
-            media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            headers={
-                'Content-Disposition': f'attachment; filename="{filename}"',
-            }
-        )
+        return build_export_response(output, filename)
     except HTTPException:
         raise
     except Exception as e:
@@ -295,13 +306,7 @@ async def generate_ssh_report_endpoint(request: dict):
             "name": request.get("report_name", "SSH_Test_Report"),
         }
         output, filename = generate_ssh_report(report_data)
-        return StreamingResponse(
-            output,
-            media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            headers={
-                'Content-Disposition': f'attachment; filename="{filename}"',
-            }
-        )
+        return build_export_response(output, filename)
     except HTTPException:
         raise
     except Exception as e:
@@ -318,13 +323,7 @@ async def generate_potting_report_endpoint(request: dict):
             "name": request.get("report_name", "Potting_Ratio_Report")
         }
         output, filename = generate_potting_report(report_data)
-        return StreamingResponse(
-            output,
-            media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            headers={
-                'Content-Disposition': f'attachment; filename="{filename}"',
-            }
-        )
+        return build_export_response(output, filename)
     except HTTPException:
         raise
     except Exception as e:
@@ -341,13 +340,7 @@ async def generate_jb_sealant_report_endpoint(request: dict):
             "name": request.get("report_name", "JB_Sealant_Weight_Report")
         }
         output, filename = generate_jb_sealant_report(report_data)
-        return StreamingResponse(
-            output,
-            media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            headers={
-                'Content-Disposition': f'attachment; filename="{filename}"',
-            }
-        )
+        return build_export_response(output, filename)
     except HTTPException:
         raise
     except Exception as e:
@@ -362,7 +355,7 @@ async def generate_peel_report_endpoint(request: dict, x_employee_id: str | None
         
         if report_id:
             # Saved report export - fetch from S3
-            from models.peel_test_models import peel_test_collection, PeelTestReport
+            from models.peel_test_models import peel_test_collection
             from bson import ObjectId
 
             if not ObjectId.is_valid(report_id):
@@ -373,29 +366,13 @@ async def generate_peel_report_endpoint(request: dict, x_employee_id: str | None
                 raise HTTPException(status_code=404, detail="Report not found")
             require_peel_export_access(report, user)
 
-            # Fetch data from S3
-            peel_report = PeelTestReport.from_dict(report)
-            peel_data = peel_report.to_dict(include_data=True)
-
-            # Prepare data for report generation
-            report_data = {
-                "form_data": peel_data.get("form_data", {}),
-                "row_data": peel_data.get("row_data", []),
-                "averages": peel_data.get("averages", {}),
-                "name": report["name"],
-                "line": report.get("line")
-            }
+            # Fetch data from S3 and prepare it for report generation
+            report_data = build_peel_report_data(report)
         else:
             raise HTTPException(status_code=403, detail="Peel Excel can be generated only from submitted or approved saved reports")
 
         output, filename = generate_peel_report(report_data)
-        return StreamingResponse(
-            output,
-            media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            headers={
-                'Content-Disposition': f'attachment; filename="{filename}"',
-            }
-        )
+        return build_export_response(output, filename)
     except HTTPException:
         raise
     except Exception as e:
@@ -411,13 +388,7 @@ async def generate_rot_report_endpoint(request: dict):
             "name": request.get("report_name", "RoT_Test_Report")
         }
         output, filename = generate_rot_report(report_data)
-        return StreamingResponse(
-            output,
-            media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            headers={
-                'Content-Disposition': f'attachment; filename="{filename}"',
-            }
-        )
+        return build_export_response(output, filename)
     except HTTPException:
         raise
     except Exception as e:
@@ -433,13 +404,7 @@ async def generate_wet_leakage_report_endpoint(request: dict):
             "name": request.get("report_name", "Wet_Leakage_Test_Report")
         }
         output, filename = generate_wet_leakage_report(report_data)
-        return StreamingResponse(
-            output,
-            media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            headers={
-                'Content-Disposition': f'attachment; filename="{filename}"',
-            }
-        )
+        return build_export_response(output, filename)
     except HTTPException:
         raise
     except Exception as e:
@@ -539,6 +504,18 @@ async def root():
             "rot_report_generation": {
                 "base_path": "/generate-rot-report",
                 "description": "Generate RoT test reports"
+            },
+            "batch_report_export": {
+                "base_path": "/api/report-exports/batch",
+                "description": "Export gel, adhesion, peel and IPQC audit reports as one ZIP or workbook"
+            },
+            "report_payload_versions": {
+                "base_path": "/api/report-payloads/{report_type}/{report_id}/versions",
+                "description": "List, diff and restore stored versions of gel, adhesion, peel and IPQC audit payloads"
+            },
+            "change_feed": {
+                "base_path": "/api/changes/stream",
+                "description": "Server-sent events for task, goal and report changes"
             }
         },
         "documentation": {
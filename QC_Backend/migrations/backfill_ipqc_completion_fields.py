@@ -0,0 +1,80 @@
+"""Backfill indexed completion fields on IPQC audits.
+
+Run once after deploying completion-bucket filtering:
+    python -m migrations.backfill_ipqc_completion_fields --apply
+
+The command is a dry run without ``--apply``. Audits that already store
+``completionPercentage`` only get ``completionBucket`` derived in Mongo;
+audits without any completion metadata are recalculated from their payloads
+in batches.
+"""
+
+import argparse
+
+from pymongo import UpdateOne
+
+from models.ipqc_audit_models import (
+    IPQC_COMPLETION_BUCKETS,
+    IPQCAudit,
+    calculate_ipqc_completion,
+    ipqc_audit_collection,
+)
+
+
+BATCH_SIZE = 200
+
+
+def plan_bucket_updates() -> list[tuple[str, dict]]:
+    """One range update per bucket for audits whose percentage is already stored."""
+    return [
+        (
+            bucket,
+            {
+                "completionBucket": {"$ne": bucket},
+                "completionPercentage": {"$gte": low, "$lte": high},
+            },
+        )
+        for bucket, (low, high) in IPQC_COMPLETION_BUCKETS.items()
+    ]
+
+
+def recalculate_missing_completion(apply: bool, batch_size: int = BATCH_SIZE) -> int:
+    missing_query = {"completionPercentage": {"$exists": False}}
+    updates: list[UpdateOne] = []
+    changed = 0
+    for audit in ipqc_audit_collection.find(missing_query, {"name": 1, "timestamp": 1, "s3_key": 1}):
+        if not audit.get("s3_key"):
+            continue
+        changed += 1
+        if not apply:
+            continue
+        completion = calculate_ipqc_completion(IPQCAudit.from_dict(audit).get_data())
+        updates.append(UpdateOne({"_id": audit["_id"]}, {"$set": completion}))
+        if len(updates) >= batch_size:
+            ipqc_audit_collection.bulk_write(updates, ordered=False)
+            updates = []
+    if updates:
+        ipqc_audit_collection.bulk_write(updates, ordered=False)
+    return changed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--apply", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    for bucket, query in plan_bucket_updates():
+        if args.apply:
+            result = ipqc_audit_collection.update_many(query, {"$set": {"completionBucket": bucket}})
+            print(f"completionBucket={bucket}: updated={result.modified_count}")
+        else:
+            print(f"completionBucket={bucket}: pending={ipqc_audit_collection.count_documents(query)}")
+
+    recalculated = recalculate_missing_completion(args.apply, max(1, args.batch_size))
+    label = "recalculated" if args.apply else "pending_recalculation"
+    print(f"missing completion metadata: {label}={recalculated}")
+
+
+if __name__ == "__main__":
+    main()
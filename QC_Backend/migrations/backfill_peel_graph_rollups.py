@@ -0,0 +1,126 @@
+"""Backfill peel stringer numbers, measurement summaries and the daily graph rollups.
+
+Run once after deploying peel graph rollups:
+    python -m migrations.backfill_peel_graph_rollups --apply
+
+The command is a dry run without ``--apply``. Records ingested after the
+deploy get ``Stringer`` and ``measurement_summary`` from
+``normalize_peel_record`` and refresh their day's rollup on write. Older
+records that only carry ``stringer`` or ``machine`` get ``Stringer`` here
+first, because ``/api/peel/graph-data`` and the rollups match on it alone;
+then older records are summarized and every stringer/month is rolled up.
+Until then graph-data rebuilds missing days on first read.
+"""
+
+import argparse
+
+from pymongo import UpdateOne
+
+from models.peel_data_models import (
+    MEASUREMENT_ARRAYS_FIELD,
+    MEASUREMENT_SUMMARY_FIELD,
+    build_measurement_arrays,
+    ensure_peel_indexes,
+    peel_data_collection,
+    resolve_stringer,
+    summarize_measurement_arrays,
+)
+from services.peel_graph_service import graph_source_versions, rebuild_graph_rollups
+
+
+BATCH_SIZE = 500
+# Legacy records: no Stringer, or one stored as a string.
+MISSING_STRINGER_QUERY = {"Stringer": {"$not": {"$type": "number"}}}
+STRINGER_SOURCE_PROJECTION = {"Stringer": 1, "stringer": 1, "machine": 1, "Machine": 1, "unit": 1, "Unit": 1}
+
+
+def backfill_stringers(apply: bool, batch_size: int = BATCH_SIZE) -> int:
+    if not apply:
+        return peel_data_collection.count_documents(MISSING_STRINGER_QUERY)
+
+    operations: list = []
+    changed = 0
+    for record in peel_data_collection.find(MISSING_STRINGER_QUERY, STRINGER_SOURCE_PROJECTION):
+        stringer = resolve_stringer(record)
+        if stringer is None:
+            continue
+        changed += 1
+        operations.append(UpdateOne({"_id": record["_id"]}, {"$set": {"Stringer": stringer, "stringer": stringer}}))
+        if len(operations) >= batch_size:
+            peel_data_collection.bulk_write(operations, ordered=False)
+            operations = []
+    if operations:
+        peel_data_collection.bulk_write(operations, ordered=False)
+    return changed
+
+
+def _write_summaries(documents: list) -> None:
+    summaries = summarize_measurement_arrays(
+        [document.get(MEASUREMENT_ARRAYS_FIELD) or build_measurement_arrays(document) for document in documents]
+    )
+    peel_data_collection.bulk_write(
+        [
+            UpdateOne({"_id": document["_id"]}, {"$set": {MEASUREMENT_SUMMARY_FIELD: summary}})
+            for document, summary in zip(documents, summaries)
+        ],
+        ordered=False,
+    )
+
+
+def backfill_measurement_summaries(apply: bool, batch_size: int = BATCH_SIZE) -> int:
+    missing_query = {MEASUREMENT_SUMMARY_FIELD: {"$exists": False}}
+    if not apply:
+        return peel_data_collection.count_documents(missing_query)
+
+    batch: list = []
+    changed = 0
+    for record in peel_data_collection.find(missing_query):
+        changed += 1
+        batch.append(record)
+        if len(batch) >= batch_size:
+            _write_summaries(batch)
+            batch = []
+    if batch:
+        _write_summaries(batch)
+    return changed
+
+
+def backfill_graph_rollups(apply: bool) -> int:
+    months = list(
+        peel_data_collection.aggregate(
+            [
+                {"$match": {"Stringer": {"$type": "number"}}},
+                {"$group": {"_id": {"stringer": "$Stringer", "year": "$year", "month": "$month"}}},
+            ]
+        )
+    )
+    if not apply:
+        return len(months)
+
+    for item in months:
+        key = item["_id"]
+        versions = graph_source_versions(key["stringer"], key["year"], key["month"])
+        if versions:
+            rebuild_graph_rollups(key["stringer"], key["year"], key["month"], versions)
+    return len(months)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--apply", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    if args.apply:
+        ensure_peel_indexes()
+    stringers = backfill_stringers(args.apply, max(1, args.batch_size))
+    summaries = backfill_measurement_summaries(args.apply, max(1, args.batch_size))
+    months = backfill_graph_rollups(args.apply)
+    label = "updated" if args.apply else "pending"
+    print(f"peel stringer numbers: {label}={stringers}")
+    print(f"peel measurement summaries: {label}={summaries}")
+    print(f"peel graph rollup months: {label}={months}")
+
+
+if __name__ == "__main__":
+    main()
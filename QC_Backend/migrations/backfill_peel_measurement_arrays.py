@@ -0,0 +1,52 @@
+"""Backfill float32 measurement arrays on peel records.
+
+Run once after deploying columnar peel measurements:
+    python -m migrations.backfill_peel_measurement_arrays --apply
+
+The command is a dry run without ``--apply``. Records ingested after the
+deploy get ``measurement_arrays`` from ``normalize_peel_record``; older ones
+are packed here from their flat ``Front_/Back_`` keys (or ``sample_results``).
+Run ``migrations.backfill_peel_graph_rollups`` afterwards to summarize them.
+"""
+
+import argparse
+
+from pymongo import UpdateOne
+
+from models.peel_data_models import MEASUREMENT_ARRAYS_FIELD, build_measurement_arrays, peel_data_collection
+
+
+BATCH_SIZE = 500
+
+
+def backfill_measurement_arrays(apply: bool, batch_size: int = BATCH_SIZE) -> int:
+    missing_query = {MEASUREMENT_ARRAYS_FIELD: {"$exists": False}}
+    if not apply:
+        return peel_data_collection.count_documents(missing_query)
+
+    updates: list[UpdateOne] = []
+    changed = 0
+    for record in peel_data_collection.find(missing_query):
+        changed += 1
+        updates.append(UpdateOne({"_id": record["_id"]}, {"$set": {MEASUREMENT_ARRAYS_FIELD: build_measurement_arrays(record)}}))
+        if len(updates) >= batch_size:
+            peel_data_collection.bulk_write(updates, ordered=False)
+            updates = []
+    if updates:
+        peel_data_collection.bulk_write(updates, ordered=False)
+    return changed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--apply", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    changed = backfill_measurement_arrays(args.apply, max(1, args.batch_size))
+    label = "updated" if args.apply else "pending"
+    print(f"peel measurement arrays: {label}={changed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Backfill the stored per-line flags of two-line shift checksheets.
+
+Run once after deploying stored line stats, and again whenever
+``LINE_STATS_VERSION`` is bumped:
+    python -m migrations.backfill_shift_line_stats --apply
+
+The command is a dry run without ``--apply``. ``/stats/monthly`` evaluates
+stale entries in memory without writing them, so this is what makes the
+monthly aggregation cover every entry on its own.
+"""
+
+import argparse
+from importlib import import_module
+
+from services.shift_line_stats_service import (
+    LINE_STATS_REFRESH_BATCH_SIZE,
+    build_stale_line_stats_query,
+    refresh_stale_line_stats,
+)
+
+
+# (route module providing get_line_outcome, its collection attribute)
+LINE_STATS_MODULES = (
+    ("routes.ssh_route", "ssh_entries_collection"),
+    ("routes.potting_ratio_route", "potting_entries_collection"),
+    ("routes.jb_sealant_wt_route", "jb_sealant_entries_collection"),
+    ("routes.frame_sealant_wt_route", "frame_sealant_entries_collection"),
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--apply", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=LINE_STATS_REFRESH_BATCH_SIZE)
+    args = parser.parse_args()
+
+    for route_module, collection_name in LINE_STATS_MODULES:
+        route = import_module(route_module)
+        collection = getattr(route, collection_name)
+        if args.apply:
+            refreshed = refresh_stale_line_stats(collection, route.get_line_outcome, max(1, args.batch_size))
+            print(f"{collection.name}: updated={refreshed}")
+        else:
+            print(f"{collection.name}: pending={collection.count_documents(build_stale_line_stats_query())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""Replace single-field report indexes with ESR compound indexes.
+
+Query shapes are collected by driving the register and dashboard builders
+(``build_field_filter_query`` or a shift-entry module's ``build_filter_query``,
+keyset pagination, ``build_dashboard_response``) against a recording
+collection, so the plan follows the routes as they change. The model ensure
+functions create the resulting compound set and drop the single-field
+indexes it replaces.
+
+Run from QC_Backend with:
+    python -m migrations.compound_index_plan
+    python -m migrations.compound_index_plan --apply
+    python -m migrations.compound_index_plan --apply --drop-redundant
+
+The command only prints the plan without ``--apply``. ``--apply`` creates the
+proposed indexes and re-explains every collected shape; redundant single-field
+indexes the models do not already drop are removed only with
+``--drop-redundant`` and only when every shape of that collection is served by
+an index scan without a blocking SORT.
+"""
+
+import argparse
+import inspect
+from dataclasses import dataclass
+from datetime import date, timedelta
+from importlib import import_module
+
+from constants import MONGODB_DB_NAME, MONGODB_URI
+from pymongo import MongoClient
+
+from mongo_indexes import ensure_index
+from services.dashboard_analytics_service import build_dashboard_response
+from services.index_advisor_service import (
+    PlanCheck,
+    QueryShape,
+    ShapeRecordingCollection,
+    check_winning_plan,
+    find_redundant_indexes,
+    index_serves,
+    keys_of_index,
+    propose_indexes,
+)
+from services.keyset_pagination import count_with_limit, paginate_keyset
+from services.shift_entry_workflow_service import build_status_query, combine_queries
+
+
+@dataclass(frozen=True)
+class ReportRegister:
+    collection: str
+    index_prefix: str
+    route_module: str
+    # Route attribute holding the ShiftEntryModule of a daily shift-entry checksheet.
+    entry_module: str | None = None
+
+
+REGISTERS = (
+    ReportRegister("gel_test_reports", "gel", "routes.gel_route"),
+    ReportRegister("adhesion_test_reports", "adhesion", "routes.adhesion_route"),
+    ReportRegister("peel_test_reports", "peel_test", "routes.peel_test_route"),
+    ReportRegister("ipqc_audits", "ipqc", "routes.ipqc_audit_route"),
+    ReportRegister("ssh_daily_entries", "ssh", "routes.ssh_route", "SSH_ENTRY_MODULE"),
+    ReportRegister("potting_daily_entries", "potting", "routes.potting_ratio_route", "POTTING_ENTRY_MODULE"),
+    ReportRegister("jb_sealant_daily_entries", "jb_sealant", "routes.jb_sealant_wt_route", "JB_SEALANT_ENTRY_MODULE"),
+    ReportRegister("frame_sealant_daily_entries", "frame_sealant", "routes.frame_sealant_wt_route", "FRAME_SEALANT_ENTRY_MODULE"),
+    ReportRegister("bus_ribbon_pull_strength_daily_entries", "bus_ribbon", "routes.bus_ribbon_pull_strength_route", "BUS_RIBBON_ENTRY_MODULE"),
+    ReportRegister(
+        "peel_strength_bus_ribbon_jb_daily_entries",
+        "peel_bus_jb",
+        "routes.peel_strength_bus_ribbon_jb_soldering_route",
+        "PEEL_STRENGTH_ENTRY_MODULE",
+    ),
+    ReportRegister(
+        "jb_contact_block_maintenance_daily_entries",
+        "jb_contact_block",
+        "routes.jb_contact_block_maintenance_route",
+        "JB_CONTACT_BLOCK_ENTRY_MODULE",
+    ),
+    ReportRegister("wet_leakage_daily_entries", "wet_leakage", "routes.wet_leakage_route", "WET_LEAKAGE_ENTRY_MODULE"),
+    ReportRegister("rot_daily_entries", "rot", "routes.rot_route", "ROT_ENTRY_MODULE"),
+)
+
+_today = date.today()
+_week_ago = _today - timedelta(days=6)
+DATE_RANGE = {"date_from": _week_ago.isoformat(), "date_to": _today.isoformat()}
+
+# (build_field_filter_query kwargs, relative frequency) for the register filter bar.
+REGISTER_FILTERS = (
+    ({}, 6),
+    (DATE_RANGE, 4),
+    ({**DATE_RANGE, "shift": "A"}, 2),
+    ({**DATE_RANGE, "shift": "A", "line_number": "Line-1"}, 2),
+    ({**DATE_RANGE, "status_filter": "submitted"}, 2),
+    ({"status_filter": "submitted"}, 3),
+)
+REGISTER_SORTS = (("newest-created", 5), ("recently-updated", 2), ("date-newest", 1))
+DASHBOARD_WEIGHT = 4
+DASHBOARD_ITEM_SORT = [("date", -1), ("timestamp", -1)]
+
+
+def build_register_query(route, entry_module, filters: dict) -> dict | None:
+    """The register query for ``filters``, or ``None`` when the checksheet has no such filter."""
+    if entry_module is None:
+        return route.build_field_filter_query(**filters)
+    field_filters = {key: value for key, value in filters.items() if key != "status_filter"}
+    if not set(field_filters) <= set(inspect.signature(entry_module.build_filter_query).parameters):
+        return None
+    return combine_queries(entry_module.build_filter_query(**field_filters), build_status_query(filters.get("status_filter")))
+
+
+def collect_register_shapes(register: ReportRegister) -> list[QueryShape]:
+    route = import_module(register.route_module)
+    entry_module = getattr(route, register.entry_module) if register.entry_module else None
+    sort_options = entry_module.sort_options if entry_module else route.SORT_OPTIONS
+    shapes = []
+    for filters, filter_weight in REGISTER_FILTERS:
+        query = build_register_query(route, entry_module, filters)
+        if query is None:
+            continue
+        for sort_name, sort_weight in REGISTER_SORTS:
+            if sort_name not in sort_options:
+                continue
+            sort_field, sort_direction = sort_options[sort_name]
+            recorder = ShapeRecordingCollection(
+                register.collection,
+                source=f"register {sort_name} {','.join(sorted(filters)) or 'unfiltered'}",
+                weight=filter_weight * sort_weight,
+            )
+            paginate_keyset(recorder, query, sort_field, sort_direction, 20)
+            shapes.extend(recorder.shapes)
+        counter = ShapeRecordingCollection(
+            register.collection,
+            source=f"register total {','.join(sorted(filters)) or 'unfiltered'}",
+            weight=filter_weight,
+        )
+        count_with_limit(counter, query)
+        shapes.extend(counter.shapes)
+
+    if entry_module is None:
+        dashboard_options = {"item_sort": DASHBOARD_ITEM_SORT}
+    else:
+        dashboard_options = {
+            "item_sort": list(entry_module.dashboard_item_sort),
+            "daily_group_field": entry_module.dashboard_daily_group_field,
+            "state_fields": ("workflowState", "status"),
+        }
+    dashboard = ShapeRecordingCollection(register.collection, source="dashboard daily", weight=DASHBOARD_WEIGHT)
+    build_dashboard_response(
+        collection=dashboard,
+        query=build_register_query(route, entry_module, DATE_RANGE),
+        view="daily",
+        total_key="total",
+        serialize_item=lambda item: item,
+        **dashboard_options,
+    )
+    shapes.extend(dashboard.shapes)
+    return shapes
+
+
+def verify_shapes(collection, shapes: list[QueryShape]) -> list[tuple[QueryShape, PlanCheck]]:
+    checks = []
+    for shape in shapes:
+        cursor = collection.find(dict(shape.sample_filter))
+        if shape.sort:
+            cursor = cursor.sort(list(shape.sort))
+        checks.append((shape, check_winning_plan(cursor.explain())))
+    return checks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--apply", action="store_true")
+    parser.add_argument("--drop-redundant", action="store_true")
+    args = parser.parse_args()
+    database = MongoClient(MONGODB_URI)[MONGODB_DB_NAME]
+
+    for register in REGISTERS:
+        collection = database[register.collection]
+        shapes = collect_register_shapes(register)
+        existing = collection.index_information()
+        proposals = propose_indexes(
+            shapes,
+            existing_indexes={register.collection: existing},
+            name_prefixes={register.collection: register.index_prefix},
+        )
+        redundant = find_redundant_indexes(existing, [proposal.keys for proposal in proposals])
+        print(f"{register.collection}: shapes={len(shapes)} create={len(proposals)} redundant={len(redundant)}")
+        for proposal in proposals:
+            print(f"  create {proposal.name} {list(proposal.keys)} weight={proposal.weight} from={'; '.join(proposal.sources)}")
+        for index_name in redundant:
+            print(f"  redundant {index_name} {existing[index_name]['key']}")
+        if not args.apply:
+            continue
+
+        for proposal in proposals:
+            ensure_index(collection, list(proposal.keys), name=proposal.name)
+        index_keys = [keys_of_index(info) for info in collection.index_information().values()]
+        indexable = [shape for shape in shapes if shape.equality or shape.sort or shape.ranges]
+        served = [shape for shape in indexable if any(index_serves(keys, shape) for keys in index_keys)]
+        for shape in indexable:
+            if shape not in served:
+                print(f"  unserved {shape.source} (weight {shape.weight}, below the per-collection index budget)")
+        checks = verify_shapes(collection, served)
+        failed = [(shape, check) for shape, check in checks if not check.ok]
+        for shape, check in failed:
+            print(
+                f"  plan {shape.source}: indexes={list(check.index_names)} "
+                f"collscan={check.collection_scan} blocking_sort={check.blocking_sort}"
+            )
+        print(f"  verified {len(checks) - len(failed)}/{len(checks)} served shapes")
+        if not args.drop_redundant:
+            continue
+        if failed:
+            print("  skipping drops until every served shape uses an index scan without a blocking sort")
+            continue
+        for index_name in find_redundant_indexes(collection.index_information()):
+            collection.drop_index(index_name)
+            print(f"  dropped {index_name}")
+
+
+if __name__ == "__main__":
+    main()
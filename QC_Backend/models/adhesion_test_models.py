@@ -1,33 +1,69 @@
 import logging
-from pymongo import ASCENDING, DESCENDING, MongoClient
+from pymongo import ASCENDING, DESCENDING
 from typing import Optional, Dict, Any
-from constants import MONGODB_URI, MONGODB_DB_NAME
-from mongo_indexes import ensure_index
+from constants import MONGODB_DB_NAME
+from mongo_connection import get_mongo_client, register_startup_task
+from mongo_indexes import drop_index_if_exists, ensure_index
 from s3_service import S3Service
+from services.report_payload_store import report_payload_store
 
 logger = logging.getLogger(__name__)
 
-client = MongoClient(MONGODB_URI)
+client = get_mongo_client()
 db = client[MONGODB_DB_NAME]
 adhesion_test_collection = db["adhesion_test_reports"]
 
+@register_startup_task("adhesion_test_indexes")
 def ensure_adhesion_test_indexes() -> None:
     try:
-        ensure_index(adhesion_test_collection, [("updatedAt", DESCENDING)], name="adhesion_updated_at_desc_idx")
-        ensure_index(adhesion_test_collection, [("timestamp", DESCENDING)], name="adhesion_timestamp_desc_idx")
+        # Register/dashboard shapes in ESR order; see migrations/compound_index_plan.py.
+        ensure_index(
+            adhesion_test_collection,
+            [("timestamp", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)],
+            name="adhesion_timestamp_desc_id_desc_date_esr_idx",
+        )
+        ensure_index(
+            adhesion_test_collection,
+            [("workflowState", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)],
+            name="adhesion_workflow_state_timestamp_desc_id_desc_date_esr_idx",
+        )
+        ensure_index(
+            adhesion_test_collection,
+            [("updatedAt", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)],
+            name="adhesion_updated_at_desc_id_desc_date_esr_idx",
+        )
+        ensure_index(adhesion_test_collection, [("date", DESCENDING), ("_id", DESCENDING)], name="adhesion_date_desc_id_desc_esr_idx")
+        ensure_index(
+            adhesion_test_collection,
+            [("shift", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)],
+            name="adhesion_shift_timestamp_desc_id_desc_date_esr_idx",
+        )
+        ensure_index(
+            adhesion_test_collection,
+            [("shift", ASCENDING), ("lineNumber", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)],
+            name="adhesion_shift_line_number_timestamp_desc_id_desc_date_esr_idx",
+        )
+        ensure_index(
+            adhesion_test_collection,
+            [("workflowState", ASCENDING), ("updatedAt", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)],
+            name="adhesion_workflow_state_updated_at_desc_id_desc_date_esr_idx",
+        )
+        ensure_index(
+            adhesion_test_collection,
+            [("workflowState", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)],
+            name="adhesion_workflow_state_date_desc_id_desc_esr_idx",
+        )
         ensure_index(adhesion_test_collection, [("name", ASCENDING)], name="adhesion_name_idx")
-        ensure_index(adhesion_test_collection, [("workflowState", ASCENDING)], name="adhesion_workflow_state_idx")
         ensure_index(adhesion_test_collection, [("status", ASCENDING)], name="adhesion_status_idx")
-        ensure_index(adhesion_test_collection, [("date", DESCENDING)], name="adhesion_date_desc_idx")
-        ensure_index(adhesion_test_collection, [("shift", ASCENDING)], name="adhesion_shift_idx")
         ensure_index(adhesion_test_collection, [("lineNumber", ASCENDING)], name="adhesion_line_number_idx")
         ensure_index(adhesion_test_collection, [("productionOrderNo", ASCENDING)], name="adhesion_production_order_idx")
         ensure_index(adhesion_test_collection, [("createdByEmployeeId", ASCENDING)], name="adhesion_created_by_employee_id_idx")
+
+        for index_name in ("adhesion_updated_at_desc_idx", "adhesion_timestamp_desc_idx", "adhesion_timestamp_id_desc_idx", "adhesion_workflow_state_idx", "adhesion_date_desc_idx", "adhesion_shift_idx"):
+            drop_index_if_exists(adhesion_test_collection, index_name)
     except Exception as exc:
         logger.warning("failed_to_ensure_adhesion_test_indexes error=%s", exc, exc_info=True)
 
-ensure_adhesion_test_indexes()
-
 class AdhesionTestReport:
     def __init__(
         self,
@@ -68,11 +104,10 @@ class AdhesionTestReport:
         self.is_signed = is_signed
         self.signed_at = signed_at
         self.updated_at = updated_at
-        self.s3_service = S3Service()
 
     def get_data(self) -> Dict[str, Any]:
         try:
-            data = self.s3_service.download_json(self.s3_key)
+            data = report_payload_store.load(self.s3_key)
             return {
                 "form_data": data.get("form_data", {}),
                 "averages": data.get("averages", {})
@@ -87,14 +122,15 @@ class AdhesionTestReport:
                 "form_data": form_data,
                 "averages": averages
             }
-            return self.s3_service.uploadOrOverwriteJson(self.s3_key, data)
+            report_payload_store.save(self.s3_key, data)
+            return True
         except Exception as e:
             logger.exception("adhesion_test_s3_upload_failed key=%s", self.s3_key)
             return False
 
     def delete_data(self) -> bool:
         try:
-            self.s3_service.delete_json(self.s3_key)
+            report_payload_store.delete(self.s3_key)
             return True
         except Exception as e:
             logger.exception("adhesion_test_s3_delete_failed key=%s", self.s3_key)
@@ -129,13 +165,10 @@ class AdhesionTestReport:
 
     @staticmethod
     def create_from_data(name: str, timestamp: str, mongo_id: str, form_data: Dict[str, Any], averages: Dict[str, str]) -> 'AdhesionTestReport':
-        s3_service = S3Service()
-        s3_key = s3_service.generate_fixed_s3_key('adhesion', mongo_id)
+        s3_key = S3Service.generate_fixed_s3_key('adhesion', mongo_id)
         report = AdhesionTestReport(name=name, timestamp=timestamp, s3_key=s3_key)
         data = { "form_data": form_data, "averages": averages }
-        success = s3_service.uploadOrOverwriteJson(s3_key, data)
-        if not success:
-            raise Exception("Failed to upload adhesion test data to S3")
+        report_payload_store.save(s3_key, data)
         return report
 
     @staticmethod
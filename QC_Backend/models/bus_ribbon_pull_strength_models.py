@@ -3,10 +3,11 @@ import logging
 from typing import Any, Dict, List, Optional
 
 from bson import ObjectId
-from pymongo import ASCENDING, DESCENDING, MongoClient
+from pymongo import ASCENDING, DESCENDING
 
-from constants import MONGODB_URI, MONGODB_DB_NAME
-from mongo_indexes import ensure_index
+from constants import MONGODB_DB_NAME
+from mongo_connection import get_mongo_client, register_startup_task
+from mongo_indexes import drop_index_if_exists, ensure_index
 
 logger = logging.getLogger(__name__)
 
@@ -15,44 +16,48 @@ def normalize_line(line: str | None) -> str:
     return "FAB-II Line-II" if line == "FAB-II Line-II" else "FAB-II Line-I"
 
 
-client = MongoClient(MONGODB_URI)
+client = get_mongo_client()
 db = client[MONGODB_DB_NAME]
 bus_ribbon_pull_strength_entries_collection = db["bus_ribbon_pull_strength_daily_entries"]
 
-try:
-    ensure_index(
-        bus_ribbon_pull_strength_entries_collection,
-        [("date", ASCENDING), ("line", ASCENDING), ("shift", ASCENDING)],
-        unique=True,
-        name="bus_ribbon_date_line_shift_unique_idx",
-    )
-    ensure_index(
-        bus_ribbon_pull_strength_entries_collection,
-        [("year", ASCENDING), ("month", ASCENDING)],
-        name="bus_ribbon_year_month_idx",
-    )
-except Exception as exc:
-    logger.warning("failed_to_prepare_bus_ribbon_base_indexes error=%s", exc, exc_info=True)
-
 
+@register_startup_task("bus_ribbon_pull_strength_indexes")
 def ensure_bus_ribbon_pull_strength_indexes() -> None:
     try:
-        ensure_index(bus_ribbon_pull_strength_entries_collection, [("updatedAt", DESCENDING)], name="bus_ribbon_updated_at_desc_idx")
-        ensure_index(bus_ribbon_pull_strength_entries_collection, [("createdAt", DESCENDING)], name="bus_ribbon_created_at_desc_idx")
+        ensure_index(
+            bus_ribbon_pull_strength_entries_collection,
+            [("date", ASCENDING), ("line", ASCENDING), ("shift", ASCENDING)],
+            unique=True,
+            name="bus_ribbon_date_line_shift_unique_idx",
+        )
+        ensure_index(
+            bus_ribbon_pull_strength_entries_collection,
+            [("year", ASCENDING), ("month", ASCENDING)],
+            name="bus_ribbon_year_month_idx",
+        )
+    except Exception as exc:
+        logger.warning("failed_to_prepare_bus_ribbon_base_indexes error=%s", exc, exc_info=True)
+    try:
         ensure_index(bus_ribbon_pull_strength_entries_collection, [("workflowState", ASCENDING)], name="bus_ribbon_workflow_state_idx")
         ensure_index(bus_ribbon_pull_strength_entries_collection, [("status", ASCENDING)], name="bus_ribbon_status_idx")
-        ensure_index(bus_ribbon_pull_strength_entries_collection, [("date", DESCENDING)], name="bus_ribbon_date_desc_idx")
-        ensure_index(bus_ribbon_pull_strength_entries_collection, [("shift", ASCENDING)], name="bus_ribbon_shift_idx")
+        ensure_index(bus_ribbon_pull_strength_entries_collection, [("date", DESCENDING), ("_id", DESCENDING)], name="bus_ribbon_date_id_desc_idx")
+        # Register/dashboard shapes in ESR order; see migrations/compound_index_plan.py.
+        ensure_index(bus_ribbon_pull_strength_entries_collection, [("createdAt", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)], name="bus_ribbon_created_at_desc_id_desc_date_esr_idx")
+        ensure_index(bus_ribbon_pull_strength_entries_collection, [("updatedAt", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)], name="bus_ribbon_updated_at_desc_id_desc_date_esr_idx")
+        ensure_index(bus_ribbon_pull_strength_entries_collection, [("shift", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)], name="bus_ribbon_shift_created_at_desc_id_desc_date_esr_idx")
+        ensure_index(bus_ribbon_pull_strength_entries_collection, [("shift", ASCENDING), ("updatedAt", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)], name="bus_ribbon_shift_updated_at_desc_id_desc_date_esr_idx")
+        ensure_index(bus_ribbon_pull_strength_entries_collection, [("shift", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)], name="bus_ribbon_shift_date_desc_id_desc_esr_idx")
+        ensure_index(bus_ribbon_pull_strength_entries_collection, [("date", DESCENDING), ("shift", ASCENDING), ("line", ASCENDING)], name="bus_ribbon_date_desc_shift_line_esr_idx")
         ensure_index(bus_ribbon_pull_strength_entries_collection, [("line", ASCENDING)], name="bus_ribbon_line_idx")
         ensure_index(bus_ribbon_pull_strength_entries_collection, [("shiftDetails.poNumber", ASCENDING)], name="bus_ribbon_po_idx")
         ensure_index(bus_ribbon_pull_strength_entries_collection, [("createdByEmployeeId", ASCENDING)], name="bus_ribbon_created_by_employee_id_idx")
+
+        for index_name in ("bus_ribbon_created_at_desc_idx", "bus_ribbon_date_desc_idx", "bus_ribbon_shift_idx", "bus_ribbon_updated_at_desc_idx"):
+            drop_index_if_exists(bus_ribbon_pull_strength_entries_collection, index_name)
     except Exception as exc:
         logger.warning("failed_to_ensure_bus_ribbon_pull_strength_indexes error=%s", exc, exc_info=True)
 
 
-ensure_bus_ribbon_pull_strength_indexes()
-
-
 class BusRibbonPullStrengthDailyEntry:
     @staticmethod
     def create(entry_data: Dict[str, Any]) -> Optional[str]:
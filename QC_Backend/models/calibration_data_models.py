@@ -5,11 +5,12 @@ from datetime import datetime, time, timedelta
 from typing import Any, Dict, Iterable, List, Optional
 
 from openpyxl.utils.datetime import from_excel
-from pymongo import ASCENDING, MongoClient
+from pymongo import ASCENDING
 from pymongo.collection import Collection
 from pymongo.errors import OperationFailure, PyMongoError
 
-from constants import MONGODB_DB_NAME, MONGODB_URI
+from constants import MONGODB_DB_NAME
+from mongo_connection import get_mongo_client, register_startup_task
 from mongo_indexes import ensure_index
 
 
@@ -18,7 +19,7 @@ logger = logging.getLogger("calibration_data")
 CALIBRATION_DATA_COLLECTION_NAME = "calibration_data"
 CALIBRATION_TRACKING_COLLECTION_NAME = "calibration_extractor_tracking"
 
-client = MongoClient(MONGODB_URI)
+client = get_mongo_client()
 db = client[MONGODB_DB_NAME]
 calibration_data_collection: Collection = db[CALIBRATION_DATA_COLLECTION_NAME]
 calibration_tracking_collection: Collection = db[CALIBRATION_TRACKING_COLLECTION_NAME]
@@ -48,6 +49,7 @@ def utc_now() -> datetime:
     return datetime.utcnow()
 
 
+@register_startup_task("calibration_data_indexes")
 def ensure_calibration_indexes() -> None:
     try:
         ensure_index(
@@ -560,6 +562,3 @@ def load_calibration_file_tracking(file_paths: Iterable[str]) -> Dict[str, Dict[
     except PyMongoError as exc:
         logger.exception("calibration_tracking_load_failed error=%s", exc)
     return existing
-
-
-ensure_calibration_indexes()
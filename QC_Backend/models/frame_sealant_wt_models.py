@@ -1,54 +1,65 @@
 from bson import ObjectId
 import logging
-from pymongo import MongoClient, ASCENDING, DESCENDING
+from pymongo import ASCENDING, DESCENDING
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 from constants import MONGODB_URI, MONGODB_DB_NAME
+from mongo_connection import get_mongo_client, register_startup_task
 from mongo_indexes import drop_index_if_exists, ensure_index
 from line_status import normalize_lines
+from services.shift_line_stats_service import group_line_stats
 
 logger = logging.getLogger(__name__)
 
 def _normalize_line_group(line_group):
     return 'Line-II' if line_group == 'Line-II' else 'Line-I'
 
-client = MongoClient(MONGODB_URI)
+client = get_mongo_client()
 db = client[MONGODB_DB_NAME]
 frame_sealant_entries_collection = db["frame_sealant_daily_entries"]
-try:
-    drop_index_if_exists(frame_sealant_entries_collection, "date_1_shift_1")
-    ensure_index(
-        frame_sealant_entries_collection,
-        [("date", ASCENDING), ("lineGroup", ASCENDING), ("shift", ASCENDING)],
-        unique=True,
-        name="frame_sealant_date_line_group_shift_unique_idx",
-    )
-    ensure_index(frame_sealant_entries_collection, [("year", ASCENDING), ("month", ASCENDING)], name="frame_sealant_year_month_idx")
-except Exception as exc:
-    logger.warning("failed_to_prepare_frame_sealant_base_indexes error=%s", exc, exc_info=True)
 
+@register_startup_task("frame_sealant_wt_indexes")
 def ensure_frame_sealant_indexes() -> None:
     try:
-        ensure_index(frame_sealant_entries_collection, [("updatedAt", DESCENDING)], name="frame_sealant_updated_at_desc_idx")
-        ensure_index(frame_sealant_entries_collection, [("createdAt", DESCENDING)], name="frame_sealant_created_at_desc_idx")
+        drop_index_if_exists(frame_sealant_entries_collection, "date_1_shift_1")
+        ensure_index(
+            frame_sealant_entries_collection,
+            [("date", ASCENDING), ("lineGroup", ASCENDING), ("shift", ASCENDING)],
+            unique=True,
+            name="frame_sealant_date_line_group_shift_unique_idx",
+        )
+        ensure_index(frame_sealant_entries_collection, [("year", ASCENDING), ("month", ASCENDING)], name="frame_sealant_year_month_idx")
+    except Exception as exc:
+        logger.warning("failed_to_prepare_frame_sealant_base_indexes error=%s", exc, exc_info=True)
+    try:
         ensure_index(frame_sealant_entries_collection, [("workflowState", ASCENDING)], name="frame_sealant_workflow_state_idx")
         ensure_index(frame_sealant_entries_collection, [("status", ASCENDING)], name="frame_sealant_status_idx")
-        ensure_index(frame_sealant_entries_collection, [("date", DESCENDING)], name="frame_sealant_date_desc_idx")
-        ensure_index(frame_sealant_entries_collection, [("shift", ASCENDING)], name="frame_sealant_shift_idx")
+        ensure_index(frame_sealant_entries_collection, [("date", DESCENDING), ("_id", DESCENDING)], name="frame_sealant_date_id_desc_idx")
+        # Register/dashboard shapes in ESR order; see migrations/compound_index_plan.py.
+        ensure_index(frame_sealant_entries_collection, [("createdAt", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)], name="frame_sealant_created_at_desc_id_desc_date_esr_idx")
+        ensure_index(frame_sealant_entries_collection, [("updatedAt", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)], name="frame_sealant_updated_at_desc_id_desc_date_esr_idx")
+        ensure_index(frame_sealant_entries_collection, [("shift", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)], name="frame_sealant_shift_created_at_desc_id_desc_date_esr_idx")
+        ensure_index(frame_sealant_entries_collection, [("shift", ASCENDING), ("updatedAt", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)], name="frame_sealant_shift_updated_at_desc_id_desc_date_esr_idx")
+        ensure_index(frame_sealant_entries_collection, [("shift", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)], name="frame_sealant_shift_date_desc_id_desc_esr_idx")
+        ensure_index(frame_sealant_entries_collection, [("date", DESCENDING), ("shift", ASCENDING), ("lineGroup", ASCENDING)], name="frame_sealant_date_desc_shift_line_group_esr_idx")
         ensure_index(frame_sealant_entries_collection, [("lineGroup", ASCENDING)], name="frame_sealant_line_group_idx")
         ensure_index(frame_sealant_entries_collection, [("lines.1.po", ASCENDING)], name="frame_sealant_line_1_po_idx")
         ensure_index(frame_sealant_entries_collection, [("lines.2.po", ASCENDING)], name="frame_sealant_line_2_po_idx")
         ensure_index(frame_sealant_entries_collection, [("createdByEmployeeId", ASCENDING)], name="frame_sealant_created_by_employee_id_idx")
+
+        for index_name in ("frame_sealant_created_at_desc_idx", "frame_sealant_date_desc_idx", "frame_sealant_shift_idx", "frame_sealant_updated_at_desc_idx"):
+            drop_index_if_exists(frame_sealant_entries_collection, index_name)
     except Exception as exc:
         logger.warning("failed_to_ensure_frame_sealant_indexes error=%s", exc, exc_info=True)
 
 
-ensure_frame_sealant_indexes()
-
 class _InMemoryCursor:
     def __init__(self, items):
         self._items = items
 
+    def __iter__(self):
+        return iter(self._items)
+
     def sort(self, key, direction=1):
         reverse = direction == -1
         try:
@@ -57,6 +68,8 @@ class _InMemoryCursor:
             return self._items
 
 class _InMemoryCollection:
+    name = "frame_sealant_daily_entries"
+
     def __init__(self):
         self._store = {}
 
@@ -139,13 +152,17 @@ class _InMemoryCollection:
                 return v
         return None
 
-    def find(self, filt=None):
+    def find(self, filt=None, projection=None):
         filt = filt or {}
         results = []
         for v in self._store.values():
             match = True
             for k, val in filt.items():
-                if k == "date" and val:
+                if isinstance(val, dict):
+                    if ("$ne" in val and v.get(k) == val["$ne"]) or ("$in" in val and v.get(k) not in val["$in"]):
+                        match = False
+                        break
+                elif k == "date" and val:
                     if v.get("date") != val:
                         match = False
                         break
@@ -199,6 +216,15 @@ class _InMemoryCollection:
         class R: modified_count = count
         return R()
 
+    def aggregate(self, pipeline):
+        # Only the monthly line-stats pipeline runs here: its leading $match, then the shift/line totals.
+        return group_line_stats(self.find(pipeline[0]["$match"])._items)
+
+    def bulk_write(self, requests, ordered=True):
+        count = sum(self.update_one(request._filter, request._doc).matched_count for request in requests)
+        class R: modified_count = count
+        return R()
+
 try:
     if not MONGODB_URI or not MONGODB_DB_NAME:
         raise Exception("Missing MongoDB config")
@@ -6,6 +6,7 @@ from motor.motor_asyncio import AsyncIOMotorClient
 from pydantic import BaseModel, Field
 from constants import MONGODB_DB_NAME, MONGODB_URI
 from date_utils import IST_TIMEZONE, ensure_utc_datetime, serialize_datetime, to_ist_date_key, utc_now
+from services.sync_version_service import CollectionSyncTracker
 
 GOALS_COLLECTION_NAME = 'goals'
 GOAL_PLANNING_WINDOW_DAYS = 10
@@ -15,6 +16,7 @@ MILESTONE_COMPLETION_GRACE_DAYS = 10
 goal_client = AsyncIOMotorClient(MONGODB_URI, serverSelectionTimeoutMS=5000)
 goal_db = goal_client[MONGODB_DB_NAME]
 goals_collection = goal_db[GOALS_COLLECTION_NAME]
+goals_sync_tracker = CollectionSyncTracker(goals_collection, GOALS_COLLECTION_NAME)
 
 GoalStatus = Literal[
     '',
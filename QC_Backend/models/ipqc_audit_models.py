@@ -1,39 +1,82 @@
 import logging
-from pymongo import ASCENDING, DESCENDING, MongoClient
+from pymongo import ASCENDING, DESCENDING
 from typing import Optional, Dict, Any, Iterable
 from urllib.parse import unquote, urlparse
-from constants import MONGODB_URI, MONGODB_DB_NAME
-from mongo_indexes import ensure_index
+from constants import MONGODB_DB_NAME
+from mongo_connection import get_mongo_client, register_startup_task
+from mongo_indexes import drop_index_if_exists, ensure_index
 from s3_service import S3Service
+from services.report_payload_store import report_payload_store
 
 logger = logging.getLogger(__name__)
 
-client = MongoClient(MONGODB_URI)
+client = get_mongo_client()
 db = client[MONGODB_DB_NAME]
 ipqc_audit_collection = db["ipqc_audits"]
 
+@register_startup_task("ipqc_audit_indexes")
 def ensure_ipqc_audit_indexes() -> None:
     try:
-        ensure_index(ipqc_audit_collection, [("timestamp", DESCENDING)], name="ipqc_timestamp_desc_idx")
-        ensure_index(ipqc_audit_collection, [("updated_timestamp", DESCENDING)], name="ipqc_updated_timestamp_desc_idx")
+        # Register/dashboard shapes in ESR order; see migrations/compound_index_plan.py.
+        ensure_index(
+            ipqc_audit_collection,
+            [("timestamp", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)],
+            name="ipqc_timestamp_desc_id_desc_date_esr_idx",
+        )
+        ensure_index(
+            ipqc_audit_collection,
+            [("workflowState", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)],
+            name="ipqc_workflow_state_timestamp_desc_id_desc_date_esr_idx",
+        )
+        ensure_index(
+            ipqc_audit_collection,
+            [("updated_timestamp", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)],
+            name="ipqc_updated_timestamp_desc_id_desc_date_esr_idx",
+        )
+        ensure_index(ipqc_audit_collection, [("date", DESCENDING), ("_id", DESCENDING)], name="ipqc_date_desc_id_desc_esr_idx")
+        ensure_index(
+            ipqc_audit_collection,
+            [("shift", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)],
+            name="ipqc_shift_timestamp_desc_id_desc_date_esr_idx",
+        )
+        ensure_index(
+            ipqc_audit_collection,
+            [("shift", ASCENDING), ("lineNumber", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)],
+            name="ipqc_shift_line_number_timestamp_desc_id_desc_date_esr_idx",
+        )
+        ensure_index(
+            ipqc_audit_collection,
+            [("workflowState", ASCENDING), ("updated_timestamp", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)],
+            name="ipqc_workflow_state_updated_timestamp_desc_id_desc_date_esr_idx",
+        )
+        ensure_index(
+            ipqc_audit_collection,
+            [("workflowState", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)],
+            name="ipqc_workflow_state_date_desc_id_desc_esr_idx",
+        )
         ensure_index(ipqc_audit_collection, [("name", ASCENDING)], name="ipqc_name_idx")
+        # Also covers the Stringer report's per-slot source versions (count, max updated_timestamp).
         ensure_index(
             ipqc_audit_collection,
-            [("lineNumber", ASCENDING), ("date", ASCENDING), ("shift", ASCENDING)],
-            name="ipqc_line_date_shift_idx"
+            [("lineNumber", ASCENDING), ("date", ASCENDING), ("shift", ASCENDING), ("updated_timestamp", ASCENDING)],
+            name="ipqc_line_date_shift_updated_idx"
         )
         ensure_index(ipqc_audit_collection, [("status", ASCENDING)], name="ipqc_status_idx")
         ensure_index(ipqc_audit_collection, [("createdBy", ASCENDING)], name="ipqc_created_by_idx")
-        ensure_index(ipqc_audit_collection, [("workflowState", ASCENDING)], name="ipqc_workflow_state_idx")
         ensure_index(ipqc_audit_collection, [("createdByEmployeeId", ASCENDING)], name="ipqc_created_by_employee_id_idx")
-        ensure_index(ipqc_audit_collection, [("date", DESCENDING)], name="ipqc_date_desc_idx")
         ensure_index(ipqc_audit_collection, [("completionPercentage", DESCENDING)], name="ipqc_completion_percentage_desc_idx")
+        ensure_index(
+            ipqc_audit_collection,
+            [("completionBucket", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)],
+            name="ipqc_completion_bucket_timestamp_id_idx"
+        )
         ensure_index(ipqc_audit_collection, [("lockTimestamp", DESCENDING)], name="ipqc_lock_timestamp_desc_idx")
+
+        for index_name in ("ipqc_timestamp_desc_idx", "ipqc_timestamp_id_desc_idx", "ipqc_updated_timestamp_desc_idx", "ipqc_workflow_state_idx", "ipqc_date_desc_idx", "ipqc_line_date_shift_idx"):
+            drop_index_if_exists(ipqc_audit_collection, index_name)
     except Exception as exc:
         logger.warning("failed_to_ensure_ipqc_audit_indexes error=%s", exc, exc_info=True)
 
-ensure_ipqc_audit_indexes()
-
 DYNAMIC_LINE_PARAMETER_IDS = {
     "2-4", "2-5", "2-6",
     "3-7", "3-8", "3-9",
@@ -227,6 +270,14 @@ LEGACY_LINE_I_AUTO_BUSSING_SOLDERING_TIME_FALLBACKS = {
 AUTO_BUSSING_PATCH_SAMPLE_KEYS = ("sample_1", "sample_2")
 AUTO_BUSSING_PATCH_MEASUREMENT_FIELDS = ("length", "height", "width")
 IPQC_TOTAL_STAGE_COUNT = 31
+IPQC_COMPLETION_BUCKETS = {
+    "0-25": (0, 25),
+    "26-50": (26, 50),
+    "51-75": (51, 75),
+    "76-99": (76, 99),
+    "100": (100, 100),
+}
+IPQC_COMPLETION_FIELDS = ("completedStages", "totalStages", "completionPercentage", "completionBucket")
 COMPLETION_METADATA_KEYS = {
     "schemaVersion",
     "parameterId",
@@ -553,7 +604,17 @@ def get_stage_completion_status(stage: Dict[str, Any]) -> str:
         return "completed"
     return "in_progress"
 
-def calculate_ipqc_completion(data: Dict[str, Any]) -> Dict[str, int]:
+def get_ipqc_completion_bucket(completion_percentage: Any) -> str:
+    try:
+        percentage = int(completion_percentage or 0)
+    except (TypeError, ValueError):
+        percentage = 0
+    for bucket, (low, high) in IPQC_COMPLETION_BUCKETS.items():
+        if low <= percentage <= high:
+            return bucket
+    return "100" if percentage > 100 else "0-25"
+
+def calculate_ipqc_completion(data: Dict[str, Any]) -> Dict[str, Any]:
     stages = data.get("stages") if isinstance(data.get("stages"), list) else []
     total_stages = len(stages) or IPQC_TOTAL_STAGE_COUNT
     completed_stages = sum(1 for stage in stages if isinstance(stage, dict) and get_stage_completion_status(stage) == "completed")
@@ -563,6 +624,7 @@ def calculate_ipqc_completion(data: Dict[str, Any]) -> Dict[str, int]:
         "completedStages": completed_stages,
         "totalStages": total_stages,
         "completionPercentage": completion_percentage,
+        "completionBucket": get_ipqc_completion_bucket(completion_percentage),
     }
 
 def get_default_sample_group_line_mapping(line_number: str) -> Dict[str, str]:
@@ -947,25 +1009,29 @@ class IPQCAudit:
         self.name = name
         self.timestamp = timestamp
         self.s3_key = s3_key
-        self.s3_service = S3Service()
 
     def get_data(self) -> Dict[str, Any]:
         try:
-            return normalize_ipqc_audit_data(self.s3_service.download_json(self.s3_key))
+            return normalize_ipqc_audit_data(report_payload_store.load(self.s3_key))
         except Exception as e:
             logger.exception("ipqc_audit_s3_download_failed key=%s", self.s3_key)
             return {}
 
     def save_data(self, data: Dict[str, Any]) -> bool:
+        from services.ipqc_audit_autosave_service import ipqc_audit_autosave_cache
+        ipqc_audit_autosave_cache.discard(self.s3_key)
         try:
-            return self.s3_service.uploadOrOverwriteJson(self.s3_key, normalize_ipqc_audit_data(data))
+            report_payload_store.save(self.s3_key, normalize_ipqc_audit_data(data))
+            return True
         except Exception as e:
             logger.exception("ipqc_audit_s3_upload_failed key=%s", self.s3_key)
             return False
 
     def delete_data(self) -> bool:
+        from services.ipqc_audit_autosave_service import ipqc_audit_autosave_cache
+        ipqc_audit_autosave_cache.discard(self.s3_key)
         try:
-            self.s3_service.delete_json(self.s3_key)
+            report_payload_store.delete(self.s3_key)
             return True
         except Exception as e:
             logger.exception("ipqc_audit_s3_delete_failed key=%s", self.s3_key)
@@ -983,12 +1049,9 @@ class IPQCAudit:
 
     @staticmethod
     def create_from_data(name: str, timestamp: str, mongo_id: str, data: Dict[str, Any]) -> 'IPQCAudit':
-        s3_service = S3Service()
-        s3_key = s3_service.generate_fixed_s3_key('ipqc-audit', mongo_id)
+        s3_key = S3Service.generate_fixed_s3_key('ipqc-audit', mongo_id)
         audit = IPQCAudit(name=name, timestamp=timestamp, s3_key=s3_key)
-        success = s3_service.uploadOrOverwriteJson(s3_key, normalize_ipqc_audit_data(data))
-        if not success:
-            raise Exception("Failed to upload IPQC audit data to S3")
+        report_payload_store.save(s3_key, normalize_ipqc_audit_data(data))
         return audit
 
     @staticmethod
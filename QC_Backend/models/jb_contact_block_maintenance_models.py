@@ -3,9 +3,10 @@ import logging
 from typing import Any, Dict, List, Optional
 
 from bson import ObjectId
-from pymongo import ASCENDING, DESCENDING, MongoClient
+from pymongo import ASCENDING, DESCENDING
 
-from constants import MONGODB_DB_NAME, MONGODB_URI
+from constants import MONGODB_DB_NAME
+from mongo_connection import get_mongo_client, register_startup_task
 from mongo_indexes import drop_index_if_exists, ensure_index
 from report_context import apply_report_context, normalize_fab_line
 
@@ -16,18 +17,22 @@ def normalize_fab(fab: str | None) -> str:
     return normalize_fab_line(fab)
 
 
-client = MongoClient(MONGODB_URI)
+client = get_mongo_client()
 db = client[MONGODB_DB_NAME]
 jb_contact_block_entries_collection = db["jb_contact_block_maintenance_daily_entries"]
 
 
+@register_startup_task("jb_contact_block_maintenance_indexes")
 def ensure_jb_contact_block_indexes() -> None:
     try:
         for index_name in ("date_1_fab_1", "jb_contact_block_daily_context_idx"):
             drop_index_if_exists(jb_contact_block_entries_collection, index_name)
 
-        ensure_index(jb_contact_block_entries_collection, [("date", ASCENDING)], name="jb_contact_block_date_idx")
-        ensure_index(jb_contact_block_entries_collection, [("date", DESCENDING)], name="jb_contact_block_date_desc_idx")
+        ensure_index(jb_contact_block_entries_collection, [("date", DESCENDING), ("_id", DESCENDING)], name="jb_contact_block_date_id_desc_idx")
+        # Register/dashboard shapes in ESR order; see migrations/compound_index_plan.py.
+        ensure_index(jb_contact_block_entries_collection, [("createdAt", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)], name="jb_contact_block_created_at_desc_id_desc_date_esr_idx")
+        ensure_index(jb_contact_block_entries_collection, [("updatedAt", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)], name="jb_contact_block_updated_at_desc_id_desc_date_esr_idx")
+        ensure_index(jb_contact_block_entries_collection, [("date", DESCENDING), ("createdAt", ASCENDING), ("created_at", ASCENDING)], name="jb_contact_block_date_desc_created_at_created_at_esr_idx")
         ensure_index(
             jb_contact_block_entries_collection,
             [("reportDate", ASCENDING), ("fabLine", ASCENDING)],
@@ -36,19 +41,17 @@ def ensure_jb_contact_block_indexes() -> None:
             partialFilterExpression={"reportDate": {"$type": "string"}, "fabLine": {"$in": ["FAB-II Line-I", "FAB-II Line-II"]}},
         )
         ensure_index(jb_contact_block_entries_collection, [("year", ASCENDING), ("month", ASCENDING)], name="jb_contact_block_year_month_idx")
-        ensure_index(jb_contact_block_entries_collection, [("updatedAt", DESCENDING)], name="jb_contact_block_updated_at_desc_idx")
-        ensure_index(jb_contact_block_entries_collection, [("createdAt", DESCENDING)], name="jb_contact_block_created_at_desc_idx")
         ensure_index(jb_contact_block_entries_collection, [("workflowState", ASCENDING)], name="jb_contact_block_workflow_state_idx")
         ensure_index(jb_contact_block_entries_collection, [("status", ASCENDING)], name="jb_contact_block_status_idx")
         ensure_index(jb_contact_block_entries_collection, [("poSummary", ASCENDING)], name="jb_contact_block_po_summary_idx")
         ensure_index(jb_contact_block_entries_collection, [("createdByEmployeeId", ASCENDING)], name="jb_contact_block_created_by_employee_id_idx")
+
+        for index_name in ("jb_contact_block_created_at_desc_idx", "jb_contact_block_date_desc_idx", "jb_contact_block_date_idx", "jb_contact_block_updated_at_desc_idx"):
+            drop_index_if_exists(jb_contact_block_entries_collection, index_name)
     except Exception as exc:
         logger.warning("failed_to_ensure_jb_contact_block_indexes error=%s", exc, exc_info=True)
 
 
-ensure_jb_contact_block_indexes()
-
-
 class JBContactBlockMaintenanceDailyEntry:
     @staticmethod
     def _normalize_dates(entry_data: Dict[str, Any]) -> Dict[str, Any]:
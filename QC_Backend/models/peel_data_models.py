@@ -4,12 +4,14 @@ import re
 from datetime import datetime
 from typing import Any, Dict, Iterable, List, Optional
 
-from bson import ObjectId
-from pymongo import ASCENDING, MongoClient
+import numpy as np
+from bson import Binary, ObjectId
+from pymongo import ASCENDING
 from pymongo.collection import Collection
 from pymongo.errors import DuplicateKeyError, OperationFailure, PyMongoError
 
-from constants import MONGODB_DB_NAME, MONGODB_URI
+from constants import MONGODB_DB_NAME
+from mongo_connection import get_mongo_client
 from mongo_indexes import ensure_index
 
 logger = logging.getLogger(__name__)
@@ -19,17 +21,35 @@ PEEL_DATA_COLLECTION_NAME = "peel_data"
 PEEL_FILE_METADATA_COLLECTION_NAME = "peel_file_metadata"
 PEEL_PROCESSING_FILES_COLLECTION_NAME = "peel_processing_files"
 PEEL_EXTRACTION_STATUS_COLLECTION_NAME = "peel_extraction_status"
+PEEL_GRAPH_ROLLUP_COLLECTION_NAME = "peel_graph_daily_rollups"
 
 UNKNOWN_VALUE = "UNKNOWN"
 
-client = MongoClient(MONGODB_URI)
+client = get_mongo_client()
 db = client[MONGODB_DB_NAME]
 peel_data_collection: Collection = db[PEEL_DATA_COLLECTION_NAME]
 peel_file_metadata_collection: Collection = db[PEEL_FILE_METADATA_COLLECTION_NAME]
 peel_processing_files_collection: Collection = db[PEEL_PROCESSING_FILES_COLLECTION_NAME]
 peel_extraction_status_collection: Collection = db[PEEL_EXTRACTION_STATUS_COLLECTION_NAME]
+peel_graph_rollup_collection: Collection = db[PEEL_GRAPH_ROLLUP_COLLECTION_NAME]
 
 MEASUREMENT_KEY_PATTERN = re.compile(r"^(Front|Back)_(\d+)_(\d+)$", re.IGNORECASE)
+MEASUREMENT_ARRAYS_FIELD = "measurement_arrays"
+MEASUREMENT_SUMMARY_FIELD = "measurement_summary"
+MEASUREMENT_SIDES = ("front", "back")
+CELL_FACE_SIDES = {
+    "front": ("front",),
+    "back": ("back",),
+    "both": ("front", "back"),
+}
+DEFAULT_PAD_COUNT = 16
+DEFAULT_RIBBON_COUNT = 7
+# Little-endian float32, row-major pads x ribbons, NaN where a cell was not measured.
+MEASUREMENT_ARRAY_DTYPE = np.dtype("<f4")
+# float32 keeps ~7 significant digits. Rounding decoded values to 5 decimals restores
+# the float64 of any reading below 128 N with up to 5 decimals, so averages that land
+# on a half-cent round the same way as when computed from the flat keys.
+MEASUREMENT_DECODE_DECIMALS = 5
 LEGACY_COLLECTION_PATTERN = re.compile(r"^peel_[a-z]{3}_\d{4}$", re.IGNORECASE)
 
 
@@ -146,6 +166,137 @@ def build_sample_results(record: Dict[str, Any]) -> List[Dict[str, Any]]:
     return sample_results
 
 
+def _measurement_value(value: Any) -> Optional[float]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+def collect_measurement_cells(record: Dict[str, Any]) -> List[tuple[str, int, int, float]]:
+    """Numeric (side, pad, ribbon, value) cells from the flat keys, or from ``sample_results`` without them."""
+    cells: List[tuple[str, int, int, float]] = []
+    for key, value in record.items():
+        match = MEASUREMENT_KEY_PATTERN.match(str(key))
+        numeric_value = _measurement_value(value) if match else None
+        if numeric_value is not None:
+            side, position, ribbon = match.groups()
+            cells.append((side.lower(), int(position), int(ribbon), numeric_value))
+    if cells:
+        return cells
+
+    sample_results = record.get("sample_results")
+    for item in sample_results if isinstance(sample_results, list) else []:
+        if not isinstance(item, dict):
+            continue
+        side = str(item.get("side") or "").strip().lower()
+        numeric_value = _measurement_value(item.get("value"))
+        if side not in MEASUREMENT_SIDES or numeric_value is None:
+            continue
+        try:
+            cells.append((side, int(item.get("bus_pad_position")), int(item.get("ribbon")), numeric_value))
+        except (TypeError, ValueError):
+            continue
+    return cells
+
+
+def build_measurement_arrays(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Pack a record's measurements into one fixed-shape float32 grid per side."""
+    cells = [cell for cell in collect_measurement_cells(record) if cell[1] >= 1 and cell[2] >= 1]
+    pads = max([DEFAULT_PAD_COUNT, *(cell[1] for cell in cells)])
+    ribbons = max([DEFAULT_RIBBON_COUNT, *(cell[2] for cell in cells)])
+    grids = {side: np.full((pads, ribbons), np.nan, dtype=MEASUREMENT_ARRAY_DTYPE) for side in MEASUREMENT_SIDES}
+    for side, position, ribbon, value in cells:
+        grids[side][position - 1, ribbon - 1] = value
+    return {
+        "pads": pads,
+        "ribbons": ribbons,
+        **{side: Binary(grid.tobytes()) for side, grid in grids.items()},
+    }
+
+
+def decode_measurement_arrays(arrays: Any) -> Optional[Dict[str, np.ndarray]]:
+    if not isinstance(arrays, dict):
+        return None
+    try:
+        shape = (int(arrays["pads"]), int(arrays["ribbons"]))
+        return {
+            side: np.frombuffer(bytes(arrays[side]), dtype=MEASUREMENT_ARRAY_DTYPE)
+            .reshape(shape)
+            .astype(np.float64)
+            .round(MEASUREMENT_DECODE_DECIMALS)
+            for side in MEASUREMENT_SIDES
+        }
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _pad_averages(grids: np.ndarray) -> np.ndarray:
+    """Mean over the measured ribbons of every pad in ``records x pads x ribbons`` grids; NaN for empty pads."""
+    measured = ~np.isnan(grids)
+    sums = np.where(measured, grids, 0).sum(axis=-1)
+    with np.errstate(invalid="ignore"):
+        return sums / measured.sum(axis=-1)
+
+
+def measurement_statistics(front: np.ndarray, back: np.ndarray) -> Dict[str, Dict[str, np.ndarray]]:
+    """Per-record average, max and min of the pad averages for every cell face, NaN where undefined.
+
+    ``front`` and ``back`` are stacked ``records x pads x ribbons`` grids. Max and min are
+    averaged across sides for ``both`` and are NaN unless every requested side has values.
+    """
+    pads = {"front": _pad_averages(front), "back": _pad_averages(back)}
+    statistics: Dict[str, Dict[str, np.ndarray]] = {}
+    for cell_face, sides in CELL_FACE_SIDES.items():
+        values = np.concatenate([pads[side] for side in sides], axis=1)
+        measured = ~np.isnan(values)
+        with np.errstate(invalid="ignore"):
+            average = np.where(measured, values, 0).sum(axis=1) / measured.sum(axis=1)
+        statistics[cell_face] = {
+            "average": average,
+            "max": np.mean([np.fmax.reduce(pads[side], axis=1) for side in sides], axis=0),
+            "min": np.mean([np.fmin.reduce(pads[side], axis=1) for side in sides], axis=0),
+        }
+    return statistics
+
+
+def summarize_measurement_arrays(arrays_list: List[Any]) -> List[Optional[Dict[str, Dict[str, Optional[float]]]]]:
+    """Graph statistics for many records at once; records sharing a grid shape are computed together."""
+    grids = [decode_measurement_arrays(arrays) for arrays in arrays_list]
+    indices_by_shape: Dict[tuple, List[int]] = {}
+    for index, record_grids in enumerate(grids):
+        if record_grids is not None:
+            indices_by_shape.setdefault(record_grids["front"].shape, []).append(index)
+
+    summaries: List[Optional[Dict[str, Dict[str, Optional[float]]]]] = [None] * len(grids)
+    for indices in indices_by_shape.values():
+        statistics = measurement_statistics(
+            np.stack([grids[index]["front"] for index in indices]),
+            np.stack([grids[index]["back"] for index in indices]),
+        )
+        for row, index in enumerate(indices):
+            summaries[index] = {
+                cell_face: {name: None if np.isnan(values[row]) else float(values[row]) for name, values in face_statistics.items()}
+                for cell_face, face_statistics in statistics.items()
+            }
+    return summaries
+
+
+def fill_missing_measurement_summaries(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Summarize records stored before summaries existed; the graph rollup backfill persists them."""
+    missing_ids = [record["_id"] for record in records if "_id" in record and MEASUREMENT_SUMMARY_FIELD not in record]
+    if not missing_ids:
+        return records
+    documents = list(peel_data_collection.find({"_id": {"$in": missing_ids}}))
+    summaries = summarize_measurement_arrays(
+        [document.get(MEASUREMENT_ARRAYS_FIELD) or build_measurement_arrays(document) for document in documents]
+    )
+    summaries_by_id = {document["_id"]: summary for document, summary in zip(documents, summaries)}
+    for record in records:
+        if record.get("_id") in summaries_by_id:
+            record[MEASUREMENT_SUMMARY_FIELD] = summaries_by_id[record["_id"]]
+    return records
+
+
 def build_business_key(record: Dict[str, Any]) -> str:
     explicit_key = record.get("business_key")
     if explicit_key:
@@ -165,6 +316,18 @@ def build_business_key(record: Dict[str, Any]) -> str:
     return hashlib.sha1(source.encode("utf-8")).hexdigest()
 
 
+def resolve_stringer(record: Dict[str, Any]) -> Optional[int]:
+    """``Stringer``/``stringer`` as an int, falling back to the number in ``machine``."""
+    try:
+        if record.get("Stringer") not in (None, ""):
+            return int(record["Stringer"])
+        if record.get("stringer") not in (None, ""):
+            return int(record["stringer"])
+    except (TypeError, ValueError):
+        return None
+    return extract_stringer_unit(normalize_machine(record))[0]
+
+
 def normalize_peel_record(record: Dict[str, Any], *, now: Optional[datetime] = None) -> Dict[str, Any]:
     normalized = dict(record)
     now = now or utc_now()
@@ -184,15 +347,8 @@ def normalize_peel_record(record: Dict[str, Any], *, now: Optional[datetime] = N
     month_name = str(normalized.get("month_name") or f"{month} - {year}").strip()
     shift = normalize_shift(normalized.get("shift") or normalized.get("Shift"))
     machine = normalize_machine(normalized)
-    stringer, unit = extract_stringer_unit(machine)
-
-    try:
-        if normalized.get("Stringer") not in (None, ""):
-            stringer = int(normalized["Stringer"])
-        elif normalized.get("stringer") not in (None, ""):
-            stringer = int(normalized["stringer"])
-    except (TypeError, ValueError):
-        stringer = None
+    _, unit = extract_stringer_unit(machine)
+    stringer = resolve_stringer(normalized)
 
     if normalized.get("Unit") not in (None, ""):
         unit = str(normalized["Unit"]).upper()
@@ -206,6 +362,7 @@ def normalize_peel_record(record: Dict[str, Any], *, now: Optional[datetime] = N
     if isinstance(source_path, list):
         source_path = ";".join(str(item) for item in source_path)
 
+    measurement_arrays = build_measurement_arrays(normalized)
     normalized.update(
         {
             "year": year,
@@ -221,6 +378,8 @@ def normalize_peel_record(record: Dict[str, Any], *, now: Optional[datetime] = N
             "po_number": str(po_number).strip() if po_number not in (None, "") else None,
             "wp": str(wp).strip() if wp not in (None, "") else None,
             "sample_results": build_sample_results(normalized),
+            MEASUREMENT_ARRAYS_FIELD: measurement_arrays,
+            MEASUREMENT_SUMMARY_FIELD: summarize_measurement_arrays([measurement_arrays])[0],
             "updated_at": normalized.get("updated_at") or now,
             "last_extracted_at": normalized.get("last_extracted_at") or now,
             "Date": date_str,
@@ -264,7 +423,20 @@ def ensure_peel_indexes() -> None:
             name="peel_filter_idx",
         )
         ensure_index(peel_data_collection, [("date", ASCENDING), ("shift", ASCENDING)], name="peel_date_shift_idx")
+        ensure_index(peel_data_collection, [("date", ASCENDING), ("_id", ASCENDING)], name="peel_date_id_idx")
         ensure_index(peel_data_collection, [("module_type", ASCENDING)], name="peel_module_type_idx")
+        # Covers the per-day record count / latest update the graph compares against its rollups.
+        ensure_index(
+            peel_data_collection,
+            [
+                ("Stringer", ASCENDING),
+                ("year", ASCENDING),
+                ("month", ASCENDING),
+                ("date", ASCENDING),
+                ("updated_at", ASCENDING),
+            ],
+            name="peel_graph_source_idx",
+        )
         ensure_index(peel_data_collection, [("source_path", ASCENDING)], name="peel_source_path_idx")
         ensure_index(
             peel_file_metadata_collection,
@@ -286,6 +458,12 @@ def ensure_peel_indexes() -> None:
             unique=True,
             name="unique_peel_extraction_date_shift",
         )
+        ensure_index(
+            peel_graph_rollup_collection,
+            [("stringer", ASCENDING), ("year", ASCENDING), ("month", ASCENDING), ("date", ASCENDING)],
+            unique=True,
+            name="unique_peel_graph_rollup_day",
+        )
     except (OperationFailure, PyMongoError) as exc:
         logger.warning("failed_to_ensure_peel_indexes error=%s", exc, exc_info=True)
 
@@ -295,6 +473,9 @@ def serialize_peel_doc(doc: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]
         return None
 
     serialized = dict(doc)
+    # Analytics-only fields; the flat measurement keys carry the same values for API clients.
+    serialized.pop(MEASUREMENT_ARRAYS_FIELD, None)
+    serialized.pop(MEASUREMENT_SUMMARY_FIELD, None)
     if "_id" in serialized:
         serialized["_id"] = str(serialized["_id"])
 
@@ -310,7 +491,8 @@ def serialize_peel_docs(docs: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
     return [doc for doc in (serialize_peel_doc(item) for item in docs) if doc is not None]
 
 
-def upsert_extracted_peel_record(record: Dict[str, Any]) -> Dict[str, Any]:
+def upsert_extracted_peel_record(record: Dict[str, Any], *, refresh_rollups: bool = True) -> Dict[str, Any]:
+    """Upsert by business key; batch callers pass ``refresh_rollups=False`` and refresh each day once at the end."""
     ensure_peel_indexes()
     normalized = normalize_peel_record(record)
     business_key = normalized["business_key"]
@@ -335,11 +517,15 @@ def upsert_extracted_peel_record(record: Dict[str, Any]) -> Dict[str, Any]:
         }
         if response["inserted"] or response["updated"]:
             _reconcile_saved_record(stored)
+            if refresh_rollups:
+                refresh_graph_rollups_for(stored)
         return response
     except DuplicateKeyError:
         peel_data_collection.update_one({"business_key": business_key}, {"$set": set_doc})
         stored = peel_data_collection.find_one({"business_key": business_key})
         _reconcile_saved_record(stored)
+        if refresh_rollups:
+            refresh_graph_rollups_for(stored)
         return {"inserted": False, "updated": True, "record": stored}
 
 
@@ -355,6 +541,18 @@ def _reconcile_saved_record(record: Optional[Dict[str, Any]]) -> None:
         logger.exception("peel_audit_event_reconciliation_failed source_id=%s", record.get("_id"))
 
 
+def refresh_graph_rollups_for(*records: Optional[Dict[str, Any]]) -> None:
+    """Best-effort rollup refresh for the graph days these records belong to; stale days are rebuilt on read."""
+    try:
+        from services.peel_graph_service import refresh_graph_rollup_day
+        days = {(record.get("Stringer"), record.get("year"), record.get("month"), record.get("date")) for record in records if record}
+        for stringer, year, month, record_date in days:
+            if stringer is not None and record_date:
+                refresh_graph_rollup_day(stringer, year, month, record_date)
+    except Exception:
+        logger.exception("peel_graph_rollup_refresh_failed")
+
+
 def insert_manual_peel_record(record: Dict[str, Any]) -> Dict[str, Any]:
     ensure_peel_indexes()
     normalized = normalize_peel_record(record)
@@ -362,6 +560,7 @@ def insert_manual_peel_record(record: Dict[str, Any]) -> Dict[str, Any]:
     result = peel_data_collection.insert_one(normalized)
     normalized["_id"] = result.inserted_id
     _reconcile_saved_record(normalized)
+    refresh_graph_rollups_for(normalized)
     return normalized
 
 
@@ -384,6 +583,7 @@ def update_manual_peel_record(record_id: str, updates: Dict[str, Any]) -> Option
     peel_data_collection.update_one({"_id": ObjectId(record_id)}, {"$set": normalized})
     stored = peel_data_collection.find_one({"_id": ObjectId(record_id)})
     _reconcile_saved_record(stored)
+    refresh_graph_rollups_for(existing, stored)
     return stored
 
 
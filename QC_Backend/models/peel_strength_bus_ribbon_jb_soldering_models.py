@@ -3,10 +3,11 @@ import logging
 from typing import Any, Dict, List, Optional
 
 from bson import ObjectId
-from pymongo import ASCENDING, DESCENDING, MongoClient
+from pymongo import ASCENDING, DESCENDING
 
-from constants import MONGODB_DB_NAME, MONGODB_URI
-from mongo_indexes import ensure_index
+from constants import MONGODB_DB_NAME
+from mongo_connection import get_mongo_client, register_startup_task
+from mongo_indexes import drop_index_if_exists, ensure_index
 from line_status import normalize_lines
 
 logger = logging.getLogger(__name__)
@@ -16,47 +17,51 @@ def normalize_fab(fab: str | None) -> str:
     return "FAB-II Line-II" if fab == "FAB-II Line-II" else "FAB-II Line-I"
 
 
-client = MongoClient(MONGODB_URI)
+client = get_mongo_client()
 db = client[MONGODB_DB_NAME]
 peel_strength_bus_ribbon_jb_entries_collection = db["peel_strength_bus_ribbon_jb_daily_entries"]
 
-try:
-    ensure_index(
-        peel_strength_bus_ribbon_jb_entries_collection,
-        [("date", ASCENDING), ("fab", ASCENDING), ("shift", ASCENDING)],
-        unique=True,
-        name="peel_bus_jb_date_fab_shift_unique_idx",
-    )
-    ensure_index(
-        peel_strength_bus_ribbon_jb_entries_collection,
-        [("year", ASCENDING), ("month", ASCENDING)],
-        name="peel_bus_jb_year_month_idx",
-    )
-except Exception as exc:
-    logger.warning("failed_to_prepare_peel_bus_jb_base_indexes error=%s", exc, exc_info=True)
-
 
+@register_startup_task("peel_strength_bus_ribbon_jb_soldering_indexes")
 def ensure_peel_strength_bus_ribbon_jb_indexes() -> None:
     try:
-        ensure_index(peel_strength_bus_ribbon_jb_entries_collection, [("updatedAt", DESCENDING)], name="peel_bus_jb_updated_at_desc_idx")
-        ensure_index(peel_strength_bus_ribbon_jb_entries_collection, [("createdAt", DESCENDING)], name="peel_bus_jb_created_at_desc_idx")
+        ensure_index(
+            peel_strength_bus_ribbon_jb_entries_collection,
+            [("date", ASCENDING), ("fab", ASCENDING), ("shift", ASCENDING)],
+            unique=True,
+            name="peel_bus_jb_date_fab_shift_unique_idx",
+        )
+        ensure_index(
+            peel_strength_bus_ribbon_jb_entries_collection,
+            [("year", ASCENDING), ("month", ASCENDING)],
+            name="peel_bus_jb_year_month_idx",
+        )
+    except Exception as exc:
+        logger.warning("failed_to_prepare_peel_bus_jb_base_indexes error=%s", exc, exc_info=True)
+    try:
         ensure_index(peel_strength_bus_ribbon_jb_entries_collection, [("workflowState", ASCENDING)], name="peel_bus_jb_workflow_state_idx")
         ensure_index(peel_strength_bus_ribbon_jb_entries_collection, [("status", ASCENDING)], name="peel_bus_jb_status_idx")
-        ensure_index(peel_strength_bus_ribbon_jb_entries_collection, [("date", DESCENDING)], name="peel_bus_jb_date_desc_idx")
-        ensure_index(peel_strength_bus_ribbon_jb_entries_collection, [("shift", ASCENDING)], name="peel_bus_jb_shift_idx")
+        ensure_index(peel_strength_bus_ribbon_jb_entries_collection, [("date", DESCENDING), ("_id", DESCENDING)], name="peel_bus_jb_date_id_desc_idx")
+        # Register/dashboard shapes in ESR order; see migrations/compound_index_plan.py.
+        ensure_index(peel_strength_bus_ribbon_jb_entries_collection, [("createdAt", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)], name="peel_bus_jb_created_at_desc_id_desc_date_esr_idx")
+        ensure_index(peel_strength_bus_ribbon_jb_entries_collection, [("updatedAt", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)], name="peel_bus_jb_updated_at_desc_id_desc_date_esr_idx")
+        ensure_index(peel_strength_bus_ribbon_jb_entries_collection, [("shift", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)], name="peel_bus_jb_shift_created_at_desc_id_desc_date_esr_idx")
+        ensure_index(peel_strength_bus_ribbon_jb_entries_collection, [("shift", ASCENDING), ("updatedAt", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)], name="peel_bus_jb_shift_updated_at_desc_id_desc_date_esr_idx")
+        ensure_index(peel_strength_bus_ribbon_jb_entries_collection, [("shift", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)], name="peel_bus_jb_shift_date_desc_id_desc_esr_idx")
+        ensure_index(peel_strength_bus_ribbon_jb_entries_collection, [("date", DESCENDING), ("shift", ASCENDING), ("fab", ASCENDING)], name="peel_bus_jb_date_desc_shift_fab_esr_idx")
         ensure_index(peel_strength_bus_ribbon_jb_entries_collection, [("fab", ASCENDING)], name="peel_bus_jb_fab_idx")
         ensure_index(peel_strength_bus_ribbon_jb_entries_collection, [("lines.Line - 1.po", ASCENDING)], name="peel_bus_jb_line_1_po_idx")
         ensure_index(peel_strength_bus_ribbon_jb_entries_collection, [("lines.Line - 2.po", ASCENDING)], name="peel_bus_jb_line_2_po_idx")
         ensure_index(peel_strength_bus_ribbon_jb_entries_collection, [("lines.Line - 3.po", ASCENDING)], name="peel_bus_jb_line_3_po_idx")
         ensure_index(peel_strength_bus_ribbon_jb_entries_collection, [("lines.Line - 4.po", ASCENDING)], name="peel_bus_jb_line_4_po_idx")
         ensure_index(peel_strength_bus_ribbon_jb_entries_collection, [("createdByEmployeeId", ASCENDING)], name="peel_bus_jb_created_by_employee_id_idx")
+
+        for index_name in ("peel_bus_jb_created_at_desc_idx", "peel_bus_jb_date_desc_idx", "peel_bus_jb_shift_idx", "peel_bus_jb_updated_at_desc_idx"):
+            drop_index_if_exists(peel_strength_bus_ribbon_jb_entries_collection, index_name)
     except Exception as exc:
         logger.warning("failed_to_ensure_peel_strength_bus_ribbon_jb_indexes error=%s", exc, exc_info=True)
 
 
-ensure_peel_strength_bus_ribbon_jb_indexes()
-
-
 class PeelStrengthBusRibbonJBDailyEntry:
     @staticmethod
     def create(entry_data: Dict[str, Any]) -> Optional[str]:
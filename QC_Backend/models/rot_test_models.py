@@ -3,9 +3,10 @@ import logging
 from typing import Any, Dict, List, Optional
 
 from bson import ObjectId
-from pymongo import ASCENDING, DESCENDING, MongoClient
+from pymongo import ASCENDING, DESCENDING
 
 from constants import MONGODB_URI, MONGODB_DB_NAME
+from mongo_connection import get_mongo_client, register_startup_task
 from mongo_indexes import drop_index_if_exists, ensure_index
 from report_context import apply_report_context
 
@@ -14,32 +15,35 @@ logger = logging.getLogger(__name__)
 def _normalize_line_group(line_group):
     return 'Line-II' if str(line_group or '').endswith('Line-II') or str(line_group or '') == 'Line-II' else 'Line-I'
 
-client = MongoClient(MONGODB_URI)
+client = get_mongo_client()
 db = client[MONGODB_DB_NAME]
 rot_entries_collection = db["rot_daily_entries"]
 
 
+@register_startup_task("rot_test_indexes")
 def ensure_rot_indexes() -> None:
     try:
         for index_name in ("date_1", "date_1_lineGroup_1"):
             drop_index_if_exists(rot_entries_collection, index_name)
 
-        ensure_index(rot_entries_collection, [("date", ASCENDING)], name="rot_date_idx")
-        ensure_index(rot_entries_collection, [("date", DESCENDING)], name="rot_date_desc_idx")
+        ensure_index(rot_entries_collection, [("date", DESCENDING), ("_id", DESCENDING)], name="rot_date_id_desc_idx")
+        # Register/dashboard shapes in ESR order; see migrations/compound_index_plan.py.
+        ensure_index(rot_entries_collection, [("createdAt", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)], name="rot_created_at_desc_id_desc_date_esr_idx")
+        ensure_index(rot_entries_collection, [("updatedAt", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)], name="rot_updated_at_desc_id_desc_date_esr_idx")
+        ensure_index(rot_entries_collection, [("date", DESCENDING), ("createdAt", ASCENDING), ("created_at", ASCENDING)], name="rot_date_desc_created_at_created_at_esr_idx")
         ensure_index(rot_entries_collection, [("reportDate", ASCENDING), ("fabLine", ASCENDING)], name="rot_report_context_unique", unique=True, partialFilterExpression={"reportDate": {"$type": "string"}, "fabLine": {"$in": ["FAB-II Line-I", "FAB-II Line-II"]}})
         ensure_index(rot_entries_collection, [("year", ASCENDING), ("month", ASCENDING)], name="rot_year_month_idx")
-        ensure_index(rot_entries_collection, [("updatedAt", DESCENDING)], name="rot_updated_at_desc_idx")
-        ensure_index(rot_entries_collection, [("createdAt", DESCENDING)], name="rot_created_at_desc_idx")
         ensure_index(rot_entries_collection, [("workflowState", ASCENDING)], name="rot_workflow_state_idx")
         ensure_index(rot_entries_collection, [("status", ASCENDING)], name="rot_status_idx")
         ensure_index(rot_entries_collection, [("po", ASCENDING)], name="rot_po_idx")
         ensure_index(rot_entries_collection, [("createdByEmployeeId", ASCENDING)], name="rot_created_by_employee_id_idx")
+
+        for index_name in ("rot_created_at_desc_idx", "rot_date_desc_idx", "rot_date_idx", "rot_updated_at_desc_idx"):
+            drop_index_if_exists(rot_entries_collection, index_name)
     except Exception as exc:
         logger.warning("failed_to_ensure_rot_indexes error=%s", exc, exc_info=True)
 
 
-ensure_rot_indexes()
-
 class _InMemoryCursor:
     def __init__(self, items):
         self._items = list(items)
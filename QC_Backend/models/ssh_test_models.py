@@ -1,54 +1,65 @@
 from bson import ObjectId
 import logging
-from pymongo import MongoClient, ASCENDING, DESCENDING
+from pymongo import ASCENDING, DESCENDING
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 from constants import MONGODB_URI, MONGODB_DB_NAME
+from mongo_connection import get_mongo_client, register_startup_task
 from mongo_indexes import drop_index_if_exists, ensure_index
 from line_status import normalize_lines
+from services.shift_line_stats_service import group_line_stats
 
 logger = logging.getLogger(__name__)
 
 def _normalize_line_group(line_group):
     return 'Line-II' if line_group == 'Line-II' else 'Line-I'
 
-client = MongoClient(MONGODB_URI)
+client = get_mongo_client()
 db = client[MONGODB_DB_NAME]
 ssh_entries_collection = db["ssh_daily_entries"]
-# New index structure: date + shift combination (each document represents one shift with both lines)
-try:
-    drop_index_if_exists(ssh_entries_collection, "date_1_shift_1")
-    ensure_index(
-        ssh_entries_collection,
-        [("date", ASCENDING), ("lineGroup", ASCENDING), ("shift", ASCENDING)],
-        unique=True,
-        name="ssh_date_line_group_shift_unique_idx",
-    )
-    ensure_index(ssh_entries_collection, [("year", ASCENDING), ("month", ASCENDING)], name="ssh_year_month_idx")
-except Exception as exc:
-    logger.warning("failed_to_prepare_ssh_base_indexes error=%s", exc, exc_info=True)
 
+@register_startup_task("ssh_test_indexes")
 def ensure_ssh_indexes() -> None:
+    # New index structure: date + shift combination (each document represents one shift with both lines)
+    try:
+        drop_index_if_exists(ssh_entries_collection, "date_1_shift_1")
+        ensure_index(
+            ssh_entries_collection,
+            [("date", ASCENDING), ("lineGroup", ASCENDING), ("shift", ASCENDING)],
+            unique=True,
+            name="ssh_date_line_group_shift_unique_idx",
+        )
+        ensure_index(ssh_entries_collection, [("year", ASCENDING), ("month", ASCENDING)], name="ssh_year_month_idx")
+    except Exception as exc:
+        logger.warning("failed_to_prepare_ssh_base_indexes error=%s", exc, exc_info=True)
     try:
-        ensure_index(ssh_entries_collection, [("updatedAt", DESCENDING)], name="ssh_updated_at_desc_idx")
-        ensure_index(ssh_entries_collection, [("createdAt", DESCENDING)], name="ssh_created_at_desc_idx")
         ensure_index(ssh_entries_collection, [("workflowState", ASCENDING)], name="ssh_workflow_state_idx")
         ensure_index(ssh_entries_collection, [("status", ASCENDING)], name="ssh_status_idx")
-        ensure_index(ssh_entries_collection, [("date", DESCENDING)], name="ssh_date_desc_idx")
-        ensure_index(ssh_entries_collection, [("shift", ASCENDING)], name="ssh_shift_idx")
+        ensure_index(ssh_entries_collection, [("date", DESCENDING), ("_id", DESCENDING)], name="ssh_date_id_desc_idx")
+        # Register/dashboard shapes in ESR order; see migrations/compound_index_plan.py.
+        ensure_index(ssh_entries_collection, [("createdAt", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)], name="ssh_created_at_desc_id_desc_date_esr_idx")
+        ensure_index(ssh_entries_collection, [("updatedAt", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)], name="ssh_updated_at_desc_id_desc_date_esr_idx")
+        ensure_index(ssh_entries_collection, [("shift", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)], name="ssh_shift_created_at_desc_id_desc_date_esr_idx")
+        ensure_index(ssh_entries_collection, [("shift", ASCENDING), ("updatedAt", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)], name="ssh_shift_updated_at_desc_id_desc_date_esr_idx")
+        ensure_index(ssh_entries_collection, [("shift", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)], name="ssh_shift_date_desc_id_desc_esr_idx")
+        ensure_index(ssh_entries_collection, [("date", DESCENDING), ("shift", ASCENDING), ("lineGroup", ASCENDING)], name="ssh_date_desc_shift_line_group_esr_idx")
         ensure_index(ssh_entries_collection, [("lineGroup", ASCENDING)], name="ssh_line_group_idx")
         ensure_index(ssh_entries_collection, [("po", ASCENDING)], name="ssh_po_idx")
         ensure_index(ssh_entries_collection, [("createdByEmployeeId", ASCENDING)], name="ssh_created_by_employee_id_idx")
+
+        for index_name in ("ssh_created_at_desc_idx", "ssh_date_desc_idx", "ssh_shift_idx", "ssh_updated_at_desc_idx"):
+            drop_index_if_exists(ssh_entries_collection, index_name)
     except Exception as exc:
         logger.warning("failed_to_ensure_ssh_indexes error=%s", exc, exc_info=True)
 
 
-ensure_ssh_indexes()
-
 class _InMemoryCursor:
     def __init__(self, items):
         self._items = items
 
+    def __iter__(self):
+        return iter(self._items)
+
     def sort(self, key, direction=1):
         reverse = direction == -1
         try:
@@ -57,6 +68,8 @@ class _InMemoryCursor:
             return self._items
 
 class _InMemoryCollection:
+    name = "ssh_daily_entries"
+
     def __init__(self):
         self._store = {}
 
@@ -136,13 +149,17 @@ class _InMemoryCollection:
                 return v
         return None
 
-    def find(self, filt=None):
+    def find(self, filt=None, projection=None):
         filt = filt or {}
         results = []
         for v in self._store.values():
             match = True
             for k, val in filt.items():
-                if k == "date" and val:
+                if isinstance(val, dict):
+                    if ("$ne" in val and v.get(k) == val["$ne"]) or ("$in" in val and v.get(k) not in val["$in"]):
+                        match = False
+                        break
+                elif k == "date" and val:
                     if v.get("date") != val:
                         match = False
                         break
@@ -195,6 +212,15 @@ class _InMemoryCollection:
         class R: modified_count = count
         return R()
 
+    def aggregate(self, pipeline):
+        # Only the monthly line-stats pipeline runs here: its leading $match, then the shift/line totals.
+        return group_line_stats(self.find(pipeline[0]["$match"])._items)
+
+    def bulk_write(self, requests, ordered=True):
+        count = sum(self.update_one(request._filter, request._doc).matched_count for request in requests)
+        class R: modified_count = count
+        return R()
+
 try:
     if not MONGODB_URI or not MONGODB_DB_NAME:
         raise Exception("Missing MongoDB config")
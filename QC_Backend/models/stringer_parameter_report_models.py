@@ -2,19 +2,25 @@ from datetime import datetime, timezone
 import logging
 from typing import Any, Dict, Optional
 
-from pymongo import ASCENDING, MongoClient
+from pymongo import ASCENDING, ReturnDocument
 
-from constants import MONGODB_DB_NAME, MONGODB_URI
+from constants import MONGODB_DB_NAME
+from mongo_connection import get_mongo_client, register_startup_task
 from mongo_indexes import ensure_index
 
 logger = logging.getLogger(__name__)
 
 
-client = MongoClient(MONGODB_URI)
+client = get_mongo_client()
 db = client[MONGODB_DB_NAME]
 stringer_parameter_reports_collection = db["stringer_parameter_reports"]
 
+# Bumped whenever the stored row layout changes, so older documents are rebuilt
+# in full instead of being patched slot by slot. 2: per-slot sourceVersions.
+STRINGER_REPORT_SCHEMA_VERSION = 2
 
+
+@register_startup_task("stringer_parameter_report_indexes")
 def ensure_stringer_parameter_report_indexes() -> None:
     try:
         ensure_index(
@@ -32,9 +38,6 @@ def ensure_stringer_parameter_report_indexes() -> None:
         logger.warning("failed_to_ensure_stringer_parameter_report_indexes error=%s", exc, exc_info=True)
 
 
-ensure_stringer_parameter_report_indexes()
-
-
 def utc_timestamp() -> str:
     return datetime.now(timezone.utc).isoformat()
 
@@ -75,17 +78,49 @@ class StringerParameterReport:
             "auditSources": audit_sources,
             "updatedAt": now,
             "syncedAt": now,
+            "materializedSchema": STRINGER_REPORT_SCHEMA_VERSION,
             **(metadata or {}),
         }
-        stringer_parameter_reports_collection.update_one(
+        stored = stringer_parameter_reports_collection.find_one_and_update(
             {"year": year, "month": month, "line": line},
             {
                 "$set": update_data,
                 "$setOnInsert": {"createdAt": now},
+                "$inc": {"version": 1},
             },
             upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return stored or update_data
+
+    @staticmethod
+    def get_version(year: int, month: int, line: str) -> Optional[Dict[str, Any]]:
+        return stringer_parameter_reports_collection.find_one(
+            {"year": year, "month": month, "line": line},
+            {"version": 1, "materializedSchema": 1, "updatedAt": 1, "sourceVersions": 1},
+        )
+
+    @staticmethod
+    def apply_patch(
+        year: int,
+        month: int,
+        line: str,
+        expected_version: int,
+        set_fields: Dict[str, Any],
+        unset_fields: Optional[list] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Apply a partial update only if nobody else has written since ``expected_version``."""
+        update: Dict[str, Any] = {
+            "$set": {**set_fields, "updatedAt": utc_timestamp()},
+            "$inc": {"version": 1},
+        }
+        if unset_fields:
+            update["$unset"] = {field: "" for field in unset_fields}
+        return stringer_parameter_reports_collection.find_one_and_update(
+            {"year": year, "month": month, "line": line, "version": expected_version},
+            update,
+            return_document=ReturnDocument.AFTER,
         )
-        return StringerParameterReport.get(year, month, line) or update_data
 
     @staticmethod
     def save_manual_fields(
@@ -5,12 +5,14 @@ from motor.motor_asyncio import AsyncIOMotorClient
 from pydantic import BaseModel, Field
 from constants import MONGODB_URI, MONGODB_DB_NAME
 from date_utils import ensure_utc_datetime, serialize_datetime, utc_now
+from services.sync_version_service import CollectionSyncTracker
 
 TASKS_COLLECTION_NAME = 'tasks'
 
 task_client = AsyncIOMotorClient(MONGODB_URI, serverSelectionTimeoutMS=5000)
 task_db = task_client[MONGODB_DB_NAME]
 tasks_collection = task_db[TASKS_COLLECTION_NAME]
+tasks_sync_tracker = CollectionSyncTracker(tasks_collection, TASKS_COLLECTION_NAME)
 
 TaskPriority = Literal['Low', 'Medium', 'High']
 TaskStatus = Literal['To Do', 'Done']
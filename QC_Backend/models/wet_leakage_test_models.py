@@ -1,9 +1,10 @@
 from bson import ObjectId
 import logging
-from pymongo import MongoClient, ASCENDING, DESCENDING
+from pymongo import ASCENDING, DESCENDING
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 from constants import MONGODB_URI, MONGODB_DB_NAME
+from mongo_connection import get_mongo_client, register_startup_task
 from mongo_indexes import drop_index_if_exists, ensure_index
 from report_context import apply_report_context
 
@@ -12,32 +13,35 @@ logger = logging.getLogger(__name__)
 def _normalize_line_group(line_group):
     return 'Line-II' if str(line_group or '').endswith('Line-II') or str(line_group or '') == 'Line-II' else 'Line-I'
 
-client = MongoClient(MONGODB_URI)
+client = get_mongo_client()
 db = client[MONGODB_DB_NAME]
 wet_leakage_entries_collection = db["wet_leakage_daily_entries"]
 
 
+@register_startup_task("wet_leakage_test_indexes")
 def ensure_wet_leakage_indexes() -> None:
     try:
         for index_name in ("date_1", "date_1_lineGroup_1"):
             drop_index_if_exists(wet_leakage_entries_collection, index_name)
 
-        ensure_index(wet_leakage_entries_collection, [("date", ASCENDING)], name="wet_leakage_date_idx")
-        ensure_index(wet_leakage_entries_collection, [("date", DESCENDING)], name="wet_leakage_date_desc_idx")
+        ensure_index(wet_leakage_entries_collection, [("date", DESCENDING), ("_id", DESCENDING)], name="wet_leakage_date_id_desc_idx")
+        # Register/dashboard shapes in ESR order; see migrations/compound_index_plan.py.
+        ensure_index(wet_leakage_entries_collection, [("createdAt", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)], name="wet_leakage_created_at_desc_id_desc_date_esr_idx")
+        ensure_index(wet_leakage_entries_collection, [("updatedAt", DESCENDING), ("_id", DESCENDING), ("date", ASCENDING)], name="wet_leakage_updated_at_desc_id_desc_date_esr_idx")
+        ensure_index(wet_leakage_entries_collection, [("date", DESCENDING), ("createdAt", ASCENDING), ("created_at", ASCENDING)], name="wet_leakage_date_desc_created_at_created_at_esr_idx")
         ensure_index(wet_leakage_entries_collection, [("reportDate", ASCENDING), ("fabLine", ASCENDING)], name="wet_leakage_report_context_unique", unique=True, partialFilterExpression={"reportDate": {"$type": "string"}, "fabLine": {"$in": ["FAB-II Line-I", "FAB-II Line-II"]}})
         ensure_index(wet_leakage_entries_collection, [("year", ASCENDING), ("month", ASCENDING)], name="wet_leakage_year_month_idx")
-        ensure_index(wet_leakage_entries_collection, [("updatedAt", DESCENDING)], name="wet_leakage_updated_at_desc_idx")
-        ensure_index(wet_leakage_entries_collection, [("createdAt", DESCENDING)], name="wet_leakage_created_at_desc_idx")
         ensure_index(wet_leakage_entries_collection, [("workflowState", ASCENDING)], name="wet_leakage_workflow_state_idx")
         ensure_index(wet_leakage_entries_collection, [("status", ASCENDING)], name="wet_leakage_status_idx")
         ensure_index(wet_leakage_entries_collection, [("po", ASCENDING)], name="wet_leakage_po_idx")
         ensure_index(wet_leakage_entries_collection, [("createdByEmployeeId", ASCENDING)], name="wet_leakage_created_by_employee_id_idx")
+
+        for index_name in ("wet_leakage_created_at_desc_idx", "wet_leakage_date_desc_idx", "wet_leakage_date_idx", "wet_leakage_updated_at_desc_idx"):
+            drop_index_if_exists(wet_leakage_entries_collection, index_name)
     except Exception as exc:
         logger.warning("failed_to_ensure_wet_leakage_indexes error=%s", exc, exc_info=True)
 
 
-ensure_wet_leakage_indexes()
-
 class _InMemoryCursor:
     def __init__(self, items):
         self._items = list(items)
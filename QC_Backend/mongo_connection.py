@@ -0,0 +1,104 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable
+
+from pymongo import MongoClient
+
+from constants import MONGODB_URI
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STARTUP_WORKERS = 8
+
+_client: MongoClient | None = None
+_client_lock = threading.Lock()
+_startup_tasks: dict[str, Callable[[], None]] = {}
+
+
+def _read_int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def get_mongo_client() -> MongoClient:
+    """Process-wide client shared by the model modules.
+
+    Created with ``connect=False`` so importing a model never opens sockets or
+    starts monitor threads; the pool connects on the first real command.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = MongoClient(MONGODB_URI, connect=False)
+    return _client
+
+
+def register_startup_task(name: str) -> Callable[[Callable[[], None]], Callable[[], None]]:
+    """Decorator deferring one-off Mongo setup (index checks, seed rows) to app startup."""
+    def decorator(task: Callable[[], None]) -> Callable[[], None]:
+        _startup_tasks[name] = task
+        return task
+    return decorator
+
+
+def registered_startup_tasks() -> dict[str, Callable[[], None]]:
+    return dict(_startup_tasks)
+
+
+@dataclass(frozen=True)
+class StartupTaskResult:
+    name: str
+    seconds: float
+    error: str | None = None
+
+
+def _run_timed(name: str, task: Callable[[], None]) -> StartupTaskResult:
+    started = time.perf_counter()
+    try:
+        task()
+    except Exception as exc:
+        logger.exception("startup_task_failed name=%s", name)
+        return StartupTaskResult(name, time.perf_counter() - started, str(exc))
+    return StartupTaskResult(name, time.perf_counter() - started)
+
+
+def run_startup_tasks(
+    tasks: dict[str, Callable[[], None]] | None = None,
+    max_workers: int | None = None,
+) -> list[StartupTaskResult]:
+    """Run the registered setup tasks concurrently and log how long each took.
+
+    A failing task is logged and reported but never stops the others, matching
+    the old import-time behaviour where index errors were only warnings.
+    """
+    pending = registered_startup_tasks() if tasks is None else tasks
+    if not pending:
+        return []
+    workers = max(1, min(len(pending), max_workers or _read_int_env("STARTUP_TASK_WORKERS", DEFAULT_STARTUP_WORKERS)))
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="startup-task") as executor:
+        futures = [executor.submit(_run_timed, name, task) for name, task in pending.items()]
+        results = [future.result() for future in futures]
+    results.sort(key=lambda result: result.seconds, reverse=True)
+    for result in results:
+        logger.info(
+            "startup_task_timing name=%s seconds=%.3f status=%s",
+            result.name,
+            result.seconds,
+            "failed" if result.error else "ok",
+        )
+    logger.info(
+        "startup_tasks_completed tasks=%s failed=%s workers=%s seconds=%.3f",
+        len(results),
+        sum(1 for result in results if result.error),
+        workers,
+        time.perf_counter() - started,
+    )
+    return results
@@ -8,12 +8,14 @@ from services.dashboard_analytics_service import (
     resolve_dashboard_date_range as resolve_analytics_dashboard_date_range,
 )
 from services.creator_resolution_service import (
+    CREATOR_PROJECTION,
     apply_approval_signature_to_form_data,
     build_lock_owner_metadata,
     get_created_by_label,
     is_creator_match,
     require_operator_signature,
 )
+from services.keyset_pagination import InvalidCursorError, paginate_keyset
 from services.shift_entry_workflow_service import APPROVED_REPORT_DELETE_FORBIDDEN_MESSAGE
 from services.po_line_mapping_service import map_po_to_fab_line, require_mapped_po
 from users.user_db import users_collection
@@ -272,6 +274,35 @@ def get_bulk_status_label(report: dict) -> str:
     return WORKFLOW_STATE_LABELS.get(state, "Unavailable")
 
 
+# Everything the summary serializer, metadata backfill and creator label read; rows
+# serialized with include_data load the full document instead.
+REGISTER_SUMMARY_PROJECTION = {
+    **dict.fromkeys((
+        "name",
+        "timestamp",
+        "s3_key",
+        "workflowState",
+        "status",
+        "date",
+        "shift",
+        "lineNumber",
+        "productionOrderNo",
+        "submittedAt",
+        "submittedBy",
+        "approvedAt",
+        "approvedBy",
+        "returnedAt",
+        "returnedBy",
+        "returnComments",
+        "isSigned",
+        "signedAt",
+        "updatedAt",
+        *LOCK_FIELDS,
+    ), 1),
+    **CREATOR_PROJECTION,
+}
+
+
 def serialize_adhesion_report(report: dict, include_data: bool = False) -> dict:
     adhesion_report = AdhesionTestReport.from_dict(report)
     report_data = adhesion_report.to_dict(include_data=include_data)
@@ -470,6 +501,8 @@ async def get_all_adhesion_test_reports(
     summary: bool = Query(False, description="Return paginated summary data"),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; send it empty to start cursor pagination"),
+    include_total: bool = Query(True, description="Include a bounded total count with cursor pages"),
     search: Optional[str] = Query(None),
     sort: str = Query("newest-created"),
     workflow_state: Optional[str] = Query(None),
@@ -502,11 +535,27 @@ async def get_all_adhesion_test_reports(
         query = combine_queries(build_access_query(user), build_search_query(search), field_query)
         sort_field, sort_direction = SORT_OPTIONS.get(sort, SORT_OPTIONS["newest-created"])
 
+        if cursor is not None:
+            keyset_page = paginate_keyset(
+                adhesion_test_collection,
+                query,
+                sort_field,
+                sort_direction,
+                page_size,
+                cursor=cursor or None,
+                include_total=include_total,
+                projection=None if include_data and not summary else REGISTER_SUMMARY_PROJECTION,
+            )
+            return keyset_page.to_response(
+                lambda item: serialize_adhesion_report(item, include_data=include_data and not summary and can_view_report(item, user)),
+                page_size,
+            )
+
         if summary:
             total = adhesion_test_collection.count_documents(query)
             reports = list(
                 adhesion_test_collection
-                .find(query)
+                .find(query, REGISTER_SUMMARY_PROJECTION)
                 .sort(sort_field, sort_direction)
                 .skip((page - 1) * page_size)
                 .limit(page_size)
@@ -518,7 +567,8 @@ async def get_all_adhesion_test_reports(
                 "page_size": page_size,
             }
 
-        reports = list(adhesion_test_collection.find(query).sort(sort_field, sort_direction))
+        projection = None if include_data else REGISTER_SUMMARY_PROJECTION
+        reports = list(adhesion_test_collection.find(query, projection).sort(sort_field, sort_direction))
         return [
             serialize_adhesion_report(
                 report,
@@ -528,6 +578,8 @@ async def get_all_adhesion_test_reports(
         ]
     except HTTPException:
         raise
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch reports: {str(e)}")
 
@@ -558,6 +610,7 @@ async def get_adhesion_test_dashboard(
             state_fields=("workflowState", "status"),
             serialize_item=serialize_dashboard_report,
             item_sort=[("date", -1), ("timestamp", -1)],
+            item_projection=REGISTER_SUMMARY_PROJECTION,
         )
     except HTTPException:
         raise
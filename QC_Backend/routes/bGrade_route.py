@@ -1,10 +1,13 @@
 ﻿import logging
-from fastapi import APIRouter, HTTPException, Query
-from pymongo import MongoClient
+from fastapi import APIRouter, Header, HTTPException, Query
 from datetime import datetime, time
+from typing import Optional
 import pandas as pd
 import numpy as np
-from constants import MONGODB_URI, MONGODB_DB_NAME
+from constants import MONGODB_DB_NAME
+from mongo_connection import get_mongo_client
+from services.bson_json_response import BSONJSONResponse
+from services.conditional_response import build_validators
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +17,7 @@ class BMongoDBManager:
     def __init__(self, db_name=None):
         if db_name is None:
             db_name = MONGODB_DB_NAME
-        self.client = MongoClient(MONGODB_URI)
+        self.client = get_mongo_client()
         self.db = self.client[db_name]
     
     def convert_to_mongo_compatible(self, obj):
@@ -115,6 +118,29 @@ async def get_bgrade_collections():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching collections: {str(e)}")
 
+# Declared before /data/{collection_name}, which would otherwise capture "date-range" as a collection name.
+@bgrade_router.get("/data/date-range")
+async def get_bgrade_data_by_date_range(
+    start_date: str = Query(..., description="Start date (YYYY-MM-DD)"),
+    end_date: str = Query(..., description="End date (YYYY-MM-DD)"),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None)
+):
+    try:
+        data = mongo_manager.get_data_by_date_range(start_date, end_date)
+        validators = build_validators(data, "bgrade-date-range")
+        if validators.matches(if_none_match, if_modified_since):
+            return validators.not_modified_response()
+        return BSONJSONResponse({
+            "success": True,
+            "start_date": start_date,
+            "end_date": end_date,
+            "data": data,
+            "count": len(data)
+        }, headers=validators.headers)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching data: {str(e)}")
+
 @bgrade_router.get("/data/{collection_name}")
 async def get_bgrade_collection_data(
     collection_name: str,
@@ -134,23 +160,6 @@ async def get_bgrade_collection_data(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching data: {str(e)}")
 
-@bgrade_router.get("/data/date-range")
-async def get_bgrade_data_by_date_range(
-    start_date: str = Query(..., description="Start date (YYYY-MM-DD)"),
-    end_date: str = Query(..., description="End date (YYYY-MM-DD)")
-):
-    try:
-        data = mongo_manager.get_data_by_date_range(start_date, end_date)
-        return {
-            "success": True,
-            "start_date": start_date,
-            "end_date": end_date,
-            "data": data,
-            "count": len(data)
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching data: {str(e)}")
-
 @bgrade_router.get("/health")
 async def bgrade_health_check():
     try:
@@ -0,0 +1,62 @@
+import asyncio
+import json
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from services.change_feed_service import CHANGE_FEED_CHANNELS, change_feed_hub, format_sse
+
+logger = logging.getLogger(__name__)
+
+change_feed_router = APIRouter(prefix="/api/changes", tags=["Change Feed"])
+
+HEARTBEAT_SECONDS = 15
+# Tells EventSource how long to wait before reconnecting after a dropped stream.
+RECONNECT_DELAY_MS = 5000
+
+
+def parse_channels(channels: Optional[str]) -> list[str]:
+    requested = [channel.strip() for channel in (channels or "").split(",") if channel.strip()]
+    unknown = sorted(set(requested) - CHANGE_FEED_CHANNELS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown change feed channel: {', '.join(unknown)}")
+    return requested or sorted(CHANGE_FEED_CHANNELS)
+
+
+async def stream_changes(request: Request, channels: list[str]):
+    subscription = change_feed_hub.subscribe(channels)
+    try:
+        yield f"retry: {RECONNECT_DELAY_MS}\n\n"
+        yield format_sse("ready", json.dumps({"channels": sorted(subscription.channels), "mode": change_feed_hub.mode}))
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield format_sse("change", json.dumps(event.to_dict()), event.revision)
+    finally:
+        change_feed_hub.unsubscribe(subscription)
+
+
+@change_feed_router.get("/stream")
+async def stream_change_feed(request: Request, channels: Optional[str] = Query(None, description="Comma-separated: tasks, goals, reports")):
+    """Server-sent events for task, goal and report changes.
+
+    Each ``change`` event names the channel, collection, operation and document id;
+    clients refetch what they display. A ``resync`` operation means events were
+    dropped and the client should reload the whole channel.
+    """
+    requested_channels = parse_channels(channels)
+    return StreamingResponse(
+        stream_changes(request, requested_channels),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@change_feed_router.get("/status")
+async def get_change_feed_status():
+    return {"mode": change_feed_hub.mode, "subscribers": change_feed_hub.subscriber_count}
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Header, HTTPException, status
+from fastapi import APIRouter, Header, HTTPException, Query, Response, status
+from fastapi.responses import JSONResponse
 from pymongo import ReturnDocument
 from pymongo.errors import DuplicateKeyError, PyMongoError
 from mongo_indexes import ensure_index_async
@@ -11,6 +12,7 @@ from models.goal_model import (
     GoalResponse,
     GoalUpdate,
     goals_collection,
+    goals_sync_tracker,
     is_goal_decision_window_open,
     is_milestone_completion_window_open,
     is_milestone_detail_edit_window_open,
@@ -20,10 +22,20 @@ from models.goal_model import (
     parse_goal_id,
     serialize_goal,
 )
-from date_utils import utc_now
+from date_utils import to_ist_date_key, utc_now
+from services.sync_version_service import (
+    InvalidSyncCursorError,
+    SyncCursor,
+    build_delta_response,
+    build_etag,
+    etag_matches,
+    parse_sync_cursor,
+)
 
 goal_router = APIRouter(prefix='/api/goals', tags=['Goals'])
 
+GOALS_ETAG_NAME = 'goals'
+
 AUTHORIZED_GOAL_DECISION_USERS = {
     '4000061': 'Sanjit Basu',
     '4007553': 'Himesh Bhattacharjee',
@@ -194,14 +206,68 @@ def is_carry_forward_copy_untouched(source_goal: dict, target_goal: dict | None)
     )
 
 
-@goal_router.get('', response_model=list[GoalResponse])
-async def get_goals() -> list[dict]:
-    documents = await goals_collection.find().sort('createdAt', -1).to_list(length=None)
+async def attach_carry_forward_undo_flags(documents: list[dict]) -> None:
     documents_by_id = {str(document['_id']): document for document in documents}
+    missing_target_ids = [
+        target_object_id
+        for target_object_id in (
+            parse_goal_id(str(document.get('carryForwardTargetGoalId') or '')) for document in documents
+        )
+        if target_object_id is not None and str(target_object_id) not in documents_by_id
+    ]
+    if missing_target_ids:
+        async for target_goal in goals_collection.find({'_id': {'$in': missing_target_ids}}):
+            documents_by_id.setdefault(str(target_goal['_id']), target_goal)
     for document in documents:
         target_goal = documents_by_id.get(str(document.get('carryForwardTargetGoalId') or ''))
         document['carryForwardUndoAvailable'] = is_carry_forward_copy_untouched(document, target_goal)
-    return [serialize_goal(document) for document in documents]
+
+
+async def load_changed_goals(since_version: int) -> tuple[list[dict], list[str]]:
+    delta = await goals_sync_tracker.changes_since(since_version, sort=[('createdAt', -1)])
+    changed_ids = {str(document['_id']) for document in delta.changed}
+    # A source goal's undo availability depends on its carry-forward target.
+    affected_target_ids = sorted(changed_ids | set(delta.deleted))
+    if affected_target_ids:
+        async for source_goal in goals_collection.find({'carryForwardTargetGoalId': {'$in': affected_target_ids}}):
+            if str(source_goal['_id']) not in changed_ids:
+                delta.changed.append(source_goal)
+                changed_ids.add(str(source_goal['_id']))
+    await attach_carry_forward_undo_flags(delta.changed)
+    return delta.changed, delta.deleted
+
+
+@goal_router.get('', response_model=list[GoalResponse])
+async def get_goals(
+    response: Response,
+    since: str | None = Query(default=None, description='Cursor from a previous response (empty to start); returns only changed and deleted goals'),
+    if_none_match: str | None = Header(default=None),
+):
+    # Goal status and quarter lifecycle depend on the IST date, so cached copies expire daily.
+    scope = to_ist_date_key(utc_now())
+    await goals_sync_tracker.ensure_indexes()
+    cursor = SyncCursor(await goals_sync_tracker.current_version(), scope)
+    headers = {'ETag': build_etag(GOALS_ETAG_NAME, cursor.version, scope), 'Cache-Control': 'no-cache'}
+    if etag_matches(if_none_match, headers['ETag']):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if since:
+        try:
+            previous_cursor = parse_sync_cursor(since)
+        except InvalidSyncCursorError as error:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error)) from error
+        if previous_cursor.scope == scope and previous_cursor.version <= cursor.version:
+            changed, deleted = await load_changed_goals(previous_cursor.version)
+            items = [serialize_goal(document) for document in changed]
+            return JSONResponse(build_delta_response(cursor, items, deleted, reset=False), headers=headers)
+
+    documents = await goals_collection.find().sort('createdAt', -1).to_list(length=None)
+    await attach_carry_forward_undo_flags(documents)
+    goals = [serialize_goal(document) for document in documents]
+    if since is not None:
+        return JSONResponse(build_delta_response(cursor, goals, [], reset=True), headers=headers)
+    response.headers.update(headers)
+    return goals
 
 
 @goal_router.post('', response_model=GoalResponse, status_code=status.HTTP_201_CREATED)
@@ -212,6 +278,7 @@ async def create_goal(goal: GoalCreate) -> dict:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error)) from error
 
     result = await goals_collection.insert_one(goal_document)
+    await goals_sync_tracker.mark_changed(result.inserted_id)
     created_goal = await goals_collection.find_one({'_id': result.inserted_id})
 
     if not created_goal:
@@ -292,6 +359,7 @@ async def update_goal(goal_id: str, goal: GoalUpdate) -> dict:
             detail='Failed to load updated goal',
         )
 
+    await goals_sync_tracker.mark_changed(object_id)
     return serialize_goal(updated_goal)
 
 
@@ -356,7 +424,9 @@ async def drop_goal(
         return_document=ReturnDocument.AFTER,
     )
 
-    if not dropped_goal:
+    if dropped_goal:
+        await goals_sync_tracker.mark_changed(object_id)
+    else:
         dropped_goal = await goals_collection.find_one({'_id': object_id})
 
     return serialize_goal(dropped_goal)
@@ -400,7 +470,9 @@ async def revive_goal(
         return_document=ReturnDocument.AFTER,
     )
 
-    if not revived_goal:
+    if revived_goal:
+        await goals_sync_tracker.mark_changed(object_id)
+    else:
         revived_goal = await goals_collection.find_one({'_id': object_id})
 
     return serialize_goal(revived_goal)
@@ -518,6 +590,7 @@ async def carry_forward_goal(
                 '$unset': {'carryForwardReservedAt': ''},
             },
         )
+        await goals_sync_tracker.mark_changed(object_id)
         return serialize_goal(existing_carry_forward)
     except PyMongoError as error:
         await goals_collection.update_one(
@@ -533,6 +606,7 @@ async def carry_forward_goal(
                 },
             },
         )
+        await goals_sync_tracker.mark_changed(object_id)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail='Failed to carry forward goal',
@@ -549,6 +623,7 @@ async def carry_forward_goal(
             },
         },
     )
+    await goals_sync_tracker.mark_changed(object_id, result.inserted_id)
     created_goal = await goals_collection.find_one({'_id': result.inserted_id})
 
     if not created_goal:
@@ -633,6 +708,8 @@ async def undo_carry_forward_goal(
             detail='Carry forward could not be undone',
         )
 
+    await goals_sync_tracker.mark_deleted(target_object_id)
+    await goals_sync_tracker.mark_changed(object_id)
     restored_source['carryForwardUndoAvailable'] = False
     return serialize_goal(restored_source)
 
@@ -705,5 +782,7 @@ async def delete_goal(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail='Goal deletion could not update its source goal',
             )
+        await goals_sync_tracker.mark_changed(source_object_id)
 
+    await goals_sync_tracker.mark_deleted(object_id)
     return {'message': 'Goal deleted successfully'}
@@ -1,3 +1,4 @@
+import copy
 from datetime import datetime, timedelta, timezone
 import logging
 import re
@@ -6,28 +7,42 @@ from typing import Optional
 from bson import ObjectId
 from fastapi import APIRouter, Header, HTTPException, Query, status
 
-from models.calibration_data_models import apply_calibration_autofill_to_audit_data
+from models.calibration_data_models import apply_calibration_autofill_to_audit_data, get_calibration_docs_for_audit
 from models.ipqc_audit_models import (
     IPQCAudit,
+    IPQC_COMPLETION_BUCKETS,
+    IPQC_COMPLETION_FIELDS,
     IPQC_TOTAL_STAGE_COUNT,
     build_ipqc_audit_metadata,
     calculate_ipqc_completion,
+    get_ipqc_completion_bucket,
     ipqc_audit_collection,
     normalize_ipqc_audit_data,
 )
+from services.bson_json_response import BSONJSONResponse
+from services.conditional_response import ResponseValidators, build_validators
 from services.dashboard_analytics_service import (
     build_dashboard_response,
     ensure_missing_completion_metadata,
     resolve_dashboard_date_range as resolve_analytics_dashboard_date_range,
 )
 from services.creator_resolution_service import (
+    CREATOR_PROJECTION,
     apply_approval_signature_to_signatures,
     build_lock_owner_metadata,
     get_created_by_label,
     is_creator_match,
     require_operator_signature,
 )
+from services.ipqc_audit_autosave_service import (
+    apply_ipqc_audit_delta,
+    build_data_version_filter,
+    get_audit_data_version,
+    ipqc_audit_autosave_cache,
+)
+from services.keyset_pagination import InvalidCursorError, paginate_keyset
 from services.shift_entry_workflow_service import APPROVED_REPORT_DELETE_FORBIDDEN_MESSAGE
+from services.stringer_parameter_report_service import stringer_report_materializer
 from users.user_db import users_collection
 
 logger = logging.getLogger(__name__)
@@ -174,6 +189,34 @@ def get_active_lock_info(audit: dict) -> dict | None:
     }
 
 
+def queue_stringer_report_refresh(*audits: dict | None) -> None:
+    # Pass the audit as it was before and after the write so a moved date/shift clears its old slot.
+    stringer_report_materializer.enqueue_audits(*audits)
+
+
+def claim_audit_data_version(audit_object_id: ObjectId, existing_audit: dict, metadata: dict) -> None:
+    """Write the next version's metadata only while the audit is still at the version it was read at."""
+    result = ipqc_audit_collection.update_one(
+        {"_id": audit_object_id, **build_data_version_filter(get_audit_data_version(existing_audit))},
+        {"$set": metadata},
+    )
+    if result.matched_count == 0:
+        latest = ipqc_audit_collection.find_one({"_id": audit_object_id}, {"dataVersion": 1}) or {}
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": "Checksheet was changed elsewhere", "dataVersion": get_audit_data_version(latest)},
+        )
+
+
+def release_audit_data_version(audit_object_id: ObjectId, existing_audit: dict, metadata: dict) -> None:
+    """Put back the metadata of a claimed version whose S3 write failed."""
+    rollback = {"$set": {key: existing_audit[key] for key in metadata if key in existing_audit}}
+    unset_fields = {key: "" for key in metadata if key not in existing_audit}
+    if unset_fields:
+        rollback["$unset"] = unset_fields
+    ipqc_audit_collection.update_one({"_id": audit_object_id, "dataVersion": metadata["dataVersion"]}, rollback)
+
+
 def clear_expired_lock(audit: dict) -> None:
     if audit.get("lockTimestamp") and not is_lock_active(audit):
         ipqc_audit_collection.update_one(
@@ -274,6 +317,16 @@ def apply_ipqc_approval_signature(audit: dict, user: dict) -> None:
         raise HTTPException(status_code=500, detail="Failed to save approval signature")
 
 
+def read_stored_completion(audit: dict) -> dict:
+    completion_percentage = audit.get("completionPercentage", 0)
+    return {
+        "completedStages": audit.get("completedStages", 0),
+        "totalStages": audit.get("totalStages", IPQC_TOTAL_STAGE_COUNT),
+        "completionPercentage": completion_percentage,
+        "completionBucket": audit.get("completionBucket") or get_ipqc_completion_bucket(completion_percentage),
+    }
+
+
 def ensure_completion_metadata(audit: dict, audit_data: dict | None = None) -> dict:
     if audit_data is not None:
         try:
@@ -293,11 +346,14 @@ def ensure_completion_metadata(audit: dict, audit_data: dict | None = None) -> d
         for key in ("completedStages", "totalStages", "completionPercentage")
     )
     if has_completion_metadata:
-        return {
-            "completedStages": audit.get("completedStages", 0),
-            "totalStages": audit.get("totalStages", IPQC_TOTAL_STAGE_COUNT),
-            "completionPercentage": audit.get("completionPercentage", 0),
-        }
+        completion = read_stored_completion(audit)
+        if audit.get("completionBucket") != completion["completionBucket"]:
+            ipqc_audit_collection.update_one(
+                {"_id": audit["_id"]},
+                {"$set": {"completionBucket": completion["completionBucket"]}},
+            )
+            audit["completionBucket"] = completion["completionBucket"]
+        return completion
 
     try:
         data = audit_data or IPQCAudit.from_dict(audit).get_data()
@@ -310,11 +366,7 @@ def ensure_completion_metadata(audit: dict, audit_data: dict | None = None) -> d
         return completion
     except Exception as exc:
         logger.warning("ipqc_completion_calculation_failed audit_id=%s error=%s", audit.get("_id"), exc, exc_info=True)
-        return {
-            "completedStages": audit.get("completedStages", 0),
-            "totalStages": audit.get("totalStages", IPQC_TOTAL_STAGE_COUNT),
-            "completionPercentage": audit.get("completionPercentage", 0),
-        }
+        return read_stored_completion(audit)
 
 
 def get_display_status(audit: dict, completion: dict | None = None) -> str:
@@ -322,6 +374,37 @@ def get_display_status(audit: dict, completion: dict | None = None) -> str:
     return normalize_workflow_state(audit)
 
 
+# Everything the summary serializer, completion metadata and creator label read;
+# rows serialized with include_data load the full audit instead.
+REGISTER_SUMMARY_PROJECTION = {
+    **dict.fromkeys((
+        "name",
+        "timestamp",
+        "updated_timestamp",
+        "dataVersion",
+        "s3_key",
+        "lineNumber",
+        "date",
+        "shift",
+        "productionOrderNo",
+        "moduleType",
+        "workflowState",
+        *IPQC_COMPLETION_FIELDS,
+        "submittedAt",
+        "submittedBy",
+        "approvedAt",
+        "approvedBy",
+        "returnedAt",
+        "returnedBy",
+        "returnComments",
+        "isSigned",
+        "signedAt",
+        *LOCK_FIELDS,
+    ), 1),
+    **CREATOR_PROJECTION,
+}
+
+
 def serialize_ipqc_audit(audit: dict, include_data: bool = False) -> dict:
     data = {}
     metadata = {}
@@ -345,6 +428,7 @@ def serialize_ipqc_audit(audit: dict, include_data: bool = False) -> dict:
         "name": audit["name"],
         "timestamp": audit["timestamp"],
         "updated_timestamp": audit.get("updated_timestamp", audit["timestamp"]),
+        "dataVersion": get_audit_data_version(audit),
         "s3_key": audit["s3_key"],
         "lineNumber": audit.get("lineNumber", metadata.get("lineNumber", "")),
         "date": audit.get("date", metadata.get("date", "")),
@@ -378,6 +462,22 @@ def serialize_ipqc_audit(audit: dict, include_data: bool = False) -> dict:
     }
 
 
+def build_ipqc_audit_validators(audit: dict) -> ResponseValidators:
+    """Validators checked before the S3 payload is loaded, so a 304 skips the download entirely.
+
+    Not every write path stamps ``updated_timestamp`` (locks, completion backfill),
+    so the audit document is hashed whole. The calibration records autofilled
+    into the payload and the time-based lock expiry are part of the body too.
+    """
+    calibration_docs = get_calibration_docs_for_audit(audit.get("date"), audit.get("shift"), audit.get("lineNumber"))
+    return build_validators(
+        [audit, *calibration_docs.values()],
+        "ipqc-audit",
+        hash_documents=True,
+        variant=(is_lock_active(audit),),
+    )
+
+
 def build_search_query(search: Optional[str]) -> dict:
     if not search:
         return {}
@@ -463,30 +563,10 @@ def build_field_filter_query(
     return filters
 
 
-def completion_range_bounds(completion_range: Optional[str]) -> tuple[int, int] | None:
-    ranges = {
-        "0-25": (0, 25),
-        "26-50": (26, 50),
-        "51-75": (51, 75),
-        "76-99": (76, 99),
-        "100": (100, 100),
-    }
-    return ranges.get(completion_range or "")
-
-
-def audit_matches_post_filters(
-    audit: dict,
-    status_filter: Optional[str] = None,
-    completion_range: Optional[str] = None,
-) -> bool:
-    completion = ensure_completion_metadata(audit)
-    bounds = completion_range_bounds(completion_range)
-    if bounds:
-        low, high = bounds
-        percentage = completion.get("completionPercentage", 0)
-        return low <= percentage <= high
-
-    return True
+def build_completion_range_query(completion_range: Optional[str]) -> dict:
+    if completion_range not in IPQC_COMPLETION_BUCKETS:
+        return {}
+    return {"completionBucket": completion_range}
 
 
 def validate_audit_payload(audit_data: dict) -> None:
@@ -587,6 +667,8 @@ async def get_all_ipqc_audits(
     summary: bool = Query(False, description="Return paginated summary data"),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; send it empty to start cursor pagination"),
+    include_total: bool = Query(True, description="Include a bounded total count with cursor pages"),
     search: Optional[str] = Query(None),
     sort: str = Query("newest-created"),
     workflow_state: Optional[str] = Query(None),
@@ -616,28 +698,39 @@ async def get_all_ipqc_audits(
             exclude_workflow_state=exclude_workflow_state,
             status_filter=status_filter,
         )
-        query = combine_queries(build_access_query(user), build_search_query(search), field_query)
+        query = combine_queries(
+            build_access_query(user),
+            build_search_query(search),
+            field_query,
+            build_completion_range_query(completion_range),
+        )
         sort_field, sort_direction = SORT_OPTIONS.get(sort, SORT_OPTIONS["newest-created"])
-        requires_post_filter = bool(completion_range)
+
+        if cursor is not None:
+            keyset_page = paginate_keyset(
+                ipqc_audit_collection,
+                query,
+                sort_field,
+                sort_direction,
+                page_size,
+                cursor=cursor or None,
+                include_total=include_total,
+                projection=None if include_data and not summary else REGISTER_SUMMARY_PROJECTION,
+            )
+            return keyset_page.to_response(
+                lambda item: serialize_ipqc_audit(item, include_data=include_data and not summary and can_view_audit(item, user)),
+                page_size,
+            )
 
         if summary:
-            if requires_post_filter:
-                matching_audits = [
-                    audit
-                    for audit in ipqc_audit_collection.find(query).sort(sort_field, sort_direction)
-                    if audit_matches_post_filters(audit, status_filter, completion_range)
-                ]
-                total = len(matching_audits)
-                audits = matching_audits[(page - 1) * page_size:page * page_size]
-            else:
-                total = ipqc_audit_collection.count_documents(query)
-                audits = list(
-                    ipqc_audit_collection
-                    .find(query)
-                    .sort(sort_field, sort_direction)
-                    .skip((page - 1) * page_size)
-                    .limit(page_size)
-                )
+            total = ipqc_audit_collection.count_documents(query)
+            audits = list(
+                ipqc_audit_collection
+                .find(query, REGISTER_SUMMARY_PROJECTION)
+                .sort(sort_field, sort_direction)
+                .skip((page - 1) * page_size)
+                .limit(page_size)
+            )
             return {
                 "items": [serialize_ipqc_audit(audit, include_data=False) for audit in audits],
                 "total": total,
@@ -645,20 +738,19 @@ async def get_all_ipqc_audits(
                 "page_size": page_size,
             }
 
-        audits = [
-            audit
-            for audit in ipqc_audit_collection.find(query).sort(sort_field, sort_direction)
-            if not requires_post_filter or audit_matches_post_filters(audit, status_filter, completion_range)
-        ]
-        return [
+        projection = None if include_data else REGISTER_SUMMARY_PROJECTION
+        audits = ipqc_audit_collection.find(query, projection).sort(sort_field, sort_direction)
+        return BSONJSONResponse([
             serialize_ipqc_audit(
                 audit,
                 include_data=include_data and can_view_audit(audit, user),
             )
             for audit in audits
-        ]
+        ])
     except HTTPException:
         raise
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch audits: {str(e)}")
 
@@ -720,6 +812,7 @@ async def get_ipqc_audit_dashboard(
             collection=ipqc_audit_collection,
             query=query,
             ensure_completion=ensure_completion_metadata,
+            completion_fields=IPQC_COMPLETION_FIELDS,
         )
 
         def serialize_dashboard_audit(audit: dict) -> dict:
@@ -736,6 +829,7 @@ async def get_ipqc_audit_dashboard(
             state_fields=("workflowState",),
             serialize_item=serialize_dashboard_audit,
             item_sort=[("date", -1), ("timestamp", -1)],
+            item_projection=REGISTER_SUMMARY_PROJECTION,
         )
     except HTTPException:
         raise
@@ -761,7 +855,12 @@ async def check_audit_name_exists(
 
 
 @ipqc_audit_router.get("/{audit_id}")
-async def get_ipqc_audit(audit_id: str, x_employee_id: str | None = Header(default=None)):
+async def get_ipqc_audit(
+    audit_id: str,
+    x_employee_id: str | None = Header(default=None),
+    if_none_match: str | None = Header(default=None),
+    if_modified_since: str | None = Header(default=None),
+):
     try:
         user = get_ipqc_current_user(x_employee_id)
         if not ObjectId.is_valid(audit_id):
@@ -773,7 +872,10 @@ async def get_ipqc_audit(audit_id: str, x_employee_id: str | None = Header(defau
         if not can_view_audit(audit, user):
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not authorized to open this checksheet")
 
-        return serialize_ipqc_audit(audit, include_data=True)
+        validators = build_ipqc_audit_validators(audit)
+        if validators.matches(if_none_match, if_modified_since):
+            return validators.not_modified_response()
+        return BSONJSONResponse(serialize_ipqc_audit(audit, include_data=True), headers=validators.headers)
     except HTTPException:
         raise
     except Exception as e:
@@ -830,6 +932,7 @@ async def create_ipqc_audit(
         )
 
         created_audit = ipqc_audit_collection.find_one({"_id": result.inserted_id})
+        queue_stringer_report_refresh(created_audit)
         return serialize_ipqc_audit(created_audit, include_data=True)
     except HTTPException:
         raise
@@ -861,6 +964,18 @@ async def update_ipqc_audit(
         updated_name = (audit_data.get("name") or existing_audit["name"]).strip()
         ensure_unique_audit_name(updated_name, audit_object_id)
 
+        current_version = get_audit_data_version(existing_audit)
+        if audit_data.get("baseVersion") is not None:
+            try:
+                base_version = int(audit_data["baseVersion"])
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=400, detail="baseVersion must be a number")
+            if base_version != current_version:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail={"message": "Checksheet was changed elsewhere", "dataVersion": current_version},
+                )
+
         existing_ipqc_audit = IPQCAudit.from_dict(existing_audit)
         existing_data = existing_ipqc_audit.get_data()
         merged_data = {**existing_data, **audit_data.get("data", {})}
@@ -881,11 +996,15 @@ async def update_ipqc_audit(
             timestamp=existing_audit["timestamp"],
             s3_key=existing_audit["s3_key"],
         )
+        metadata["dataVersion"] = normalized_data["dataVersion"] = current_version + 1
+        # Claimed like an autosave, so a concurrent autosave or full save gets a 409 instead of overwriting S3.
+        claim_audit_data_version(audit_object_id, existing_audit, metadata)
         if not ipqc_audit.save_data(data=normalized_data):
+            release_audit_data_version(audit_object_id, existing_audit, metadata)
             raise HTTPException(status_code=500, detail="Failed to save audit data to S3")
 
-        ipqc_audit_collection.update_one({"_id": audit_object_id}, {"$set": metadata})
         updated_audit = ipqc_audit_collection.find_one({"_id": audit_object_id})
+        queue_stringer_report_refresh(existing_audit, updated_audit)
         return serialize_ipqc_audit(updated_audit, include_data=True)
     except HTTPException:
         raise
@@ -893,6 +1012,100 @@ async def update_ipqc_audit(
         raise HTTPException(status_code=500, detail=f"Failed to update audit: {str(e)}")
 
 
+@ipqc_audit_router.patch("/{audit_id}/autosave")
+async def autosave_ipqc_audit(
+    audit_id: str,
+    delta: dict,
+    x_employee_id: str | None = Header(default=None),
+    x_lock_session_id: str | None = Header(default=None),
+):
+    """Apply an autosave delta against ``baseVersion`` and return only the new version and completion.
+
+    The delta is applied to the cached copy of the payload and written through
+    to S3 before the response; if that write fails the Mongo metadata claimed
+    for the new version is put back.
+    """
+    try:
+        user = get_ipqc_current_user(x_employee_id)
+        if not ObjectId.is_valid(audit_id):
+            raise HTTPException(status_code=400, detail="Invalid audit ID")
+
+        audit_object_id = ObjectId(audit_id)
+        existing_audit = ipqc_audit_collection.find_one({"_id": audit_object_id})
+        if not existing_audit:
+            raise HTTPException(status_code=404, detail="Audit not found")
+        if not can_edit_audit(existing_audit, user):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not authorized to modify this checksheet")
+        require_edit_lock_if_operator(existing_audit, user, x_lock_session_id)
+
+        current_version = get_audit_data_version(existing_audit)
+        try:
+            base_version = int(delta.get("baseVersion"))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="baseVersion is required")
+        if base_version != current_version:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail={"message": "Checksheet was changed elsewhere", "dataVersion": current_version},
+            )
+
+        updated_name = (delta.get("name") or existing_audit["name"]).strip()
+        if updated_name != existing_audit["name"]:
+            ensure_unique_audit_name(updated_name, audit_object_id)
+
+        ipqc_audit = IPQCAudit.from_dict(existing_audit)
+        working_copy = ipqc_audit_autosave_cache.checkout(ipqc_audit.s3_key, current_version, ipqc_audit.get_data)
+        if get_audit_data_version(working_copy.data) != current_version:
+            # Another worker claimed this version and its S3 write has not landed yet; the client resends the full payload.
+            ipqc_audit_autosave_cache.discard(ipqc_audit.s3_key)
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail={"message": "Checksheet payload is not yet available", "dataVersion": current_version},
+            )
+        with working_copy.lock:
+            audit_data = copy.deepcopy(working_copy.data)
+            try:
+                apply_ipqc_audit_delta(audit_data, delta)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+            metadata, normalized_data = build_metadata_update(
+                {"name": updated_name, "timestamp": existing_audit["timestamp"], "data": audit_data},
+                existing_audit,
+                user,
+            )
+            next_version = current_version + 1
+            metadata["dataVersion"] = next_version
+            try:
+                claim_audit_data_version(audit_object_id, existing_audit, metadata)
+            except HTTPException:
+                ipqc_audit_autosave_cache.discard(ipqc_audit.s3_key)
+                raise
+            normalized_data["dataVersion"] = next_version
+            try:
+                ipqc_audit_autosave_cache.commit(working_copy, normalized_data, next_version)
+            except Exception:
+                release_audit_data_version(audit_object_id, existing_audit, metadata)
+                raise HTTPException(status_code=500, detail="Failed to save audit data to S3")
+            # Only queued once S3 holds this version: the materializer reads the payload from S3, not the working copy.
+            queue_stringer_report_refresh(existing_audit, {**existing_audit, **metadata})
+
+        return {
+            "id": audit_id,
+            "dataVersion": next_version,
+            "updated_timestamp": metadata["updated_timestamp"],
+            "completedStages": metadata.get("completedStages"),
+            "totalStages": metadata.get("totalStages"),
+            "completionPercentage": metadata.get("completionPercentage"),
+            "completionBucket": metadata.get("completionBucket"),
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("ipqc_audit_autosave_failed audit_id=%s", audit_id)
+        raise HTTPException(status_code=500, detail=f"Failed to autosave audit: {str(e)}")
+
+
 @ipqc_audit_router.post("/{audit_id}/submit")
 async def submit_ipqc_audit(
     audit_id: str,
@@ -939,6 +1152,7 @@ async def submit_ipqc_audit(
                 timestamp=existing_audit["timestamp"],
                 s3_key=existing_audit["s3_key"],
             )
+            metadata["dataVersion"] = normalized_data["dataVersion"] = get_audit_data_version(existing_audit) + 1
             if not ipqc_audit.save_data(data=normalized_data):
                 raise HTTPException(status_code=500, detail="Failed to save audit data to S3")
         else:
@@ -977,6 +1191,7 @@ async def submit_ipqc_audit(
             {"$set": update_data, "$unset": {field: "" for field in LOCK_FIELDS}},
         )
         submitted_audit = ipqc_audit_collection.find_one({"_id": audit_object_id})
+        queue_stringer_report_refresh(existing_audit, submitted_audit)
         return serialize_ipqc_audit(submitted_audit, include_data=True)
     except HTTPException:
         raise
@@ -1027,6 +1242,7 @@ async def return_ipqc_audit(audit_id: str, request_data: dict, x_employee_id: st
             },
         )
         returned_audit = ipqc_audit_collection.find_one({"_id": audit_object_id})
+        queue_stringer_report_refresh(existing_audit, returned_audit)
         return serialize_ipqc_audit(returned_audit, include_data=False)
     except HTTPException:
         raise
@@ -1084,6 +1300,7 @@ async def bulk_approve_ipqc_audits(request_data: dict, x_employee_id: str | None
                 if update_result.matched_count != 1:
                     add_bulk_failure(result, audit_id, "Update Failed")
                     continue
+                queue_stringer_report_refresh(existing_audit, {**existing_audit, "workflowState": "approved", "updated_timestamp": now})
                 approved_count += 1
             except Exception as item_error:
                 add_bulk_failure(result, audit_id, str(item_error))
@@ -1158,6 +1375,7 @@ async def bulk_delete_ipqc_audits(request_data: dict, x_employee_id: str | None
                 if delete_result.deleted_count != 1:
                     add_bulk_failure(result, audit_id, "Delete Failed")
                     continue
+                queue_stringer_report_refresh(existing_audit)
                 deleted_count += 1
             except Exception as item_error:
                 add_bulk_failure(result, audit_id, str(item_error))
@@ -1206,6 +1424,7 @@ async def approve_ipqc_audit(audit_id: str, x_employee_id: str | None = Header(d
             },
         )
         approved_audit = ipqc_audit_collection.find_one({"_id": audit_object_id})
+        queue_stringer_report_refresh(existing_audit, approved_audit)
         return serialize_ipqc_audit(approved_audit, include_data=False)
     except HTTPException:
         raise
@@ -1327,6 +1546,7 @@ async def delete_ipqc_audit(audit_id: str, x_employee_id: str | None = Header(de
         ipqc_audit.delete_data()
         result = ipqc_audit_collection.delete_one({"_id": audit_object_id})
         if result.deleted_count == 1:
+            queue_stringer_report_refresh(existing_audit)
             return {"message": "Audit deleted successfully from both MongoDB and S3"}
         raise HTTPException(status_code=500, detail="Failed to delete audit from MongoDB")
     except HTTPException:
@@ -2,12 +2,13 @@ import calendar
 from datetime import datetime
 import logging
 import re
+from functools import partial
 from typing import List, Optional
 
 from bson import ObjectId
 from pymongo.errors import DuplicateKeyError
 from fastapi import APIRouter, Header, HTTPException, Query, status
-from fastapi.responses import StreamingResponse
+from services.export_streaming import build_export_response
 from report_context import apply_report_context
 
 from generators.JBContactBlockMaintenanceReportGenerator import generate_jb_contact_block_maintenance_report
@@ -17,23 +18,18 @@ from models.jb_contact_block_maintenance_models import (
     normalize_fab,
 )
 from services.creator_resolution_service import (
-    build_lock_owner_metadata,
     get_created_by_label as resolve_created_by_label,
 )
-from services.dashboard_analytics_service import (
-    build_dashboard_response,
-    resolve_dashboard_date_range as resolve_analytics_dashboard_date_range,
-)
 from services.shift_entry_workflow_service import (
     APPROVED_REPORT_DELETE_FORBIDDEN_MESSAGE,
     EDITABLE_OPERATOR_STATES,
     LOCK_FIELDS,
-    WORKFLOW_STATES,
+    ShiftEntryModule,
     add_bulk_failure,
     add_bulk_skip,
-    build_access_query,
     build_created_metadata,
     build_draft_lock_metadata,
+    bulk_delete_shift_entries,
     can_approve_entry,
     can_create_entry,
     can_delete_entry,
@@ -42,13 +38,16 @@ from services.shift_entry_workflow_service import (
     can_return_entry,
     can_submit_entry,
     can_view_entry,
-    combine_queries,
     create_bulk_result,
+    delete_shift_entry,
     get_bulk_status_label,
     get_current_user,
-    is_operator,
+    get_shift_entry,
+    get_shift_entry_dashboard,
+    get_shift_entry_register,
     is_reviewer_like,
     normalize_workflow_state,
+    return_shift_entry,
     utc_timestamp,
 )
 
@@ -66,6 +65,8 @@ FAB_LINES = {
     "FAB-II Line-II": ("Line - 3", "Line - 4"),
 }
 LINE_LABELS = ("Line - 1", "Line - 2", "Line - 3", "Line - 4")
+# Per-row checker audit trails are only read when a row is re-signed.
+REGISTER_SUMMARY_PROJECTION = {f"lines.{line_label}.checkerAudit": 0 for line_label in LINE_LABELS}
 NUMERIC_FIELDS = ("sortValuePositive", "sortValueNegative", "springTension")
 TEXT_FIELDS = ("po", "jbNo")
 NUMERIC_ONLY_RE = re.compile(r"^[+-]?(?:\d+(?:\.\d*)?|\.\d+)$")
@@ -499,21 +500,6 @@ def build_search_query(search: Optional[str]) -> dict:
     }
 
 
-def build_status_query(status_filter: Optional[str]) -> dict:
-    if status_filter not in WORKFLOW_STATES:
-        return {}
-    if status_filter == "submitted":
-        return {
-            "$or": [
-                {"workflowState": "submitted"},
-                {"workflowState": {"$exists": False}},
-                {"workflowState": None},
-                {"status": "submitted"},
-            ]
-        }
-    return {"workflowState": status_filter}
-
-
 def build_entry_filter_query(*, date_from: Optional[str] = None, date_to: Optional[str] = None) -> dict:
     filters: dict = {}
     if date_from or date_to:
@@ -538,38 +524,36 @@ def get_export_form_data(entries: List[dict], fallback: dict | None = None) -> d
     return form_data
 
 
+JB_CONTACT_BLOCK_ENTRY_MODULE = ShiftEntryModule(
+    label="JB Contact Block",
+    model=JBContactBlockMaintenanceDailyEntry,
+    collection=jb_contact_block_entries_collection,
+    serialize_entry=serialize_entry,
+    serialize_summary=serialize_entry_summary,
+    build_search_query=build_search_query,
+    build_filter_query=build_entry_filter_query,
+    sort_options=SORT_OPTIONS,
+    dashboard_item_sort=(("date", -1), ("createdAt", 1), ("created_at", 1)),
+    dashboard_daily_group_field="date",
+    register_projection=REGISTER_SUMMARY_PROJECTION,
+    update_with_existing_entry=True,
+)
+
+
 @jb_contact_block_maintenance_router.get("/dashboard")
 async def get_jb_contact_block_dashboard(
     view: str = Query("daily", pattern="^(daily|weekly|monthly)$"),
     x_employee_id: str | None = Header(default=None),
 ):
-    try:
-        user = get_current_user(x_employee_id)
-        date_from, date_to = resolve_analytics_dashboard_date_range(view)
-        query = combine_queries(
-            build_access_query(user),
-            build_entry_filter_query(date_from=date_from, date_to=date_to),
-        )
-        return build_dashboard_response(
-            collection=jb_contact_block_entries_collection,
-            query=query,
-            view=view,
-            total_key="totalEntries",
-            state_fields=("workflowState", "status"),
-            serialize_item=lambda entry: serialize_entry_summary(entry, user),
-            item_sort=[("date", -1), ("createdAt", 1), ("created_at", 1)],
-            daily_group_field="date",
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch JB Contact Block dashboard: {str(e)}")
+    return get_shift_entry_dashboard(JB_CONTACT_BLOCK_ENTRY_MODULE, partial(get_current_user, x_employee_id), view)
 
 
 @jb_contact_block_maintenance_router.get("/entries/register")
 async def get_entry_register(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; send it empty to start cursor pagination"),
+    include_total: bool = Query(True, description="Include a bounded total count with cursor pages"),
     search: Optional[str] = Query(None),
     sort: str = Query("date-newest"),
     date_from: Optional[str] = Query(None),
@@ -577,51 +561,24 @@ async def get_entry_register(
     status_filter: Optional[str] = Query(None, alias="status"),
     x_employee_id: str | None = Header(default=None),
 ):
-    try:
-        user = get_current_user(x_employee_id)
-        query = combine_queries(
-            build_access_query(user),
-            build_search_query(search),
-            build_entry_filter_query(date_from=date_from, date_to=date_to),
-            build_status_query(status_filter),
-        )
-        sort_field, sort_direction = SORT_OPTIONS.get(sort, SORT_OPTIONS["date-newest"])
-        total = jb_contact_block_entries_collection.count_documents(query)
-        entries = list(
-            jb_contact_block_entries_collection
-            .find(query)
-            .sort(sort_field, sort_direction)
-            .skip((page - 1) * page_size)
-            .limit(page_size)
-        )
-        return {
-            "items": [serialize_entry_summary(entry, user) for entry in entries],
-            "total": total,
-            "page": page,
-            "page_size": page_size,
-        }
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch entry register: {str(e)}")
+    return get_shift_entry_register(
+        JB_CONTACT_BLOCK_ENTRY_MODULE,
+        partial(get_current_user, x_employee_id),
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+        include_total=include_total,
+        search=search,
+        sort=sort,
+        status_filter=status_filter,
+        date_from=date_from,
+        date_to=date_to,
+    )
 
 
 @jb_contact_block_maintenance_router.get("/entries/by-id/{entry_id}")
 async def get_entry_by_id(entry_id: str, x_employee_id: str | None = Header(default=None)):
-    try:
-        user = get_current_user(x_employee_id)
-        if not ObjectId.is_valid(entry_id):
-            raise HTTPException(status_code=400, detail="Invalid entry ID")
-        entry = JBContactBlockMaintenanceDailyEntry.get_by_id(entry_id)
-        if not entry:
-            raise HTTPException(status_code=404, detail="Entry not found")
-        if not can_view_entry(entry, user):
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not authorized to open this entry")
-        return serialize_entry(entry, user, include_permissions=True)
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch entry: {str(e)}")
+    return get_shift_entry(JB_CONTACT_BLOCK_ENTRY_MODULE, partial(get_current_user, x_employee_id), entry_id)
 
 
 @jb_contact_block_maintenance_router.get("/entries/by-date/{date}")
@@ -889,70 +846,12 @@ async def verify_entry(entry_id: str, x_employee_id: str | None = Header(default
 
 @jb_contact_block_maintenance_router.post("/entries/{entry_id}/return")
 async def return_entry(entry_id: str, request_data: dict, x_employee_id: str | None = Header(default=None)):
-    try:
-        user = get_current_user(x_employee_id)
-        if not ObjectId.is_valid(entry_id):
-            raise HTTPException(status_code=400, detail="Invalid entry ID")
-        existing_entry = JBContactBlockMaintenanceDailyEntry.get_by_id(entry_id)
-        if not existing_entry:
-            raise HTTPException(status_code=404, detail="Entry not found")
-        if not can_return_entry(existing_entry, user):
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only submitted entries can be returned")
-
-        return_comments = (request_data.get("returnComments") or "").strip()
-        if not return_comments:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Return comments are required")
-
-        now = utc_timestamp()
-        lock_owner = build_lock_owner_metadata(existing_entry)
-        updated = JBContactBlockMaintenanceDailyEntry.update_by_id(
-            entry_id,
-            {
-                **existing_entry,
-                "status": "returned",
-                "workflowState": "returned",
-                "returnedAt": now,
-                "returnedBy": user["name"],
-                "returnComments": return_comments,
-                "lockedBy": lock_owner.get("lockedBy") or "Operator",
-                "lockedByUserId": lock_owner.get("lockedByUserId"),
-                "lockedByEmployeeId": lock_owner.get("lockedByEmployeeId"),
-                "lockTimestamp": now,
-                "lockSessionId": None,
-                "updatedAt": now,
-                "updated_at": now,
-            },
-        )
-        if not updated:
-            raise HTTPException(status_code=500, detail="Failed to return entry")
-        returned_entry = JBContactBlockMaintenanceDailyEntry.get_by_id(entry_id)
-        return serialize_entry(returned_entry, user, include_permissions=True)
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to return entry: {str(e)}")
+    return return_shift_entry(JB_CONTACT_BLOCK_ENTRY_MODULE, partial(get_current_user, x_employee_id), entry_id, request_data)
 
 
 @jb_contact_block_maintenance_router.delete("/entries/by-id/{entry_id}")
 async def delete_entry_by_id(entry_id: str, x_employee_id: str | None = Header(default=None)):
-    try:
-        user = get_current_user(x_employee_id)
-        if not ObjectId.is_valid(entry_id):
-            raise HTTPException(status_code=400, detail="Invalid entry ID")
-        entry = JBContactBlockMaintenanceDailyEntry.get_by_id(entry_id)
-        if not entry:
-            raise HTTPException(status_code=404, detail="Entry not found")
-        if normalize_workflow_state(entry) == "approved":
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=APPROVED_REPORT_DELETE_FORBIDDEN_MESSAGE)
-        if not can_delete_entry(entry, user):
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not authorized to delete this entry")
-        if not JBContactBlockMaintenanceDailyEntry.delete_by_id(entry_id):
-            raise HTTPException(status_code=404, detail="Entry not found")
-        return {"success": True, "message": "Entry deleted successfully"}
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to delete entry: {str(e)}")
+    return delete_shift_entry(JB_CONTACT_BLOCK_ENTRY_MODULE, partial(get_current_user, x_employee_id), entry_id)
 
 
 @jb_contact_block_maintenance_router.post("/bulk/verify")
@@ -1028,55 +927,7 @@ async def bulk_approve_entries(request_data: dict, x_employee_id: str | None = H
 
 @jb_contact_block_maintenance_router.post("/bulk/delete")
 async def bulk_delete_entries(request_data: dict, x_employee_id: str | None = Header(default=None)):
-    try:
-        user = get_current_user(x_employee_id)
-        if not (is_operator(user) or is_reviewer_like(user)):
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not authorized to delete entries")
-
-        entry_ids = request_data.get("entryIds") or request_data.get("entry_ids") or request_data.get("reportIds")
-        if not isinstance(entry_ids, list) or not entry_ids:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="entryIds must be a non-empty list")
-
-        result = create_bulk_result(len(entry_ids))
-        deleted_count = 0
-
-        for raw_entry_id in entry_ids:
-            item_id = str(raw_entry_id or "").strip()
-            if not ObjectId.is_valid(item_id):
-                continue
-            existing_entry = JBContactBlockMaintenanceDailyEntry.get_by_id(item_id)
-            if existing_entry and normalize_workflow_state(existing_entry) == "approved":
-                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=APPROVED_REPORT_DELETE_FORBIDDEN_MESSAGE)
-
-        for raw_entry_id in entry_ids:
-            item_id = str(raw_entry_id or "").strip()
-            if not ObjectId.is_valid(item_id):
-                add_bulk_failure(result, item_id, "Invalid ID")
-                continue
-            try:
-                existing_entry = JBContactBlockMaintenanceDailyEntry.get_by_id(item_id)
-                if not existing_entry:
-                    add_bulk_failure(result, item_id, "Not Found")
-                    continue
-                if not can_delete_entry(existing_entry, user):
-                    add_bulk_skip(result, get_bulk_status_label(existing_entry))
-                    continue
-                if not JBContactBlockMaintenanceDailyEntry.delete_by_id(item_id):
-                    add_bulk_failure(result, item_id, "Delete Failed")
-                    continue
-                deleted_count += 1
-            except Exception as item_error:
-                add_bulk_failure(result, item_id, str(item_error))
-
-        result["deleted"] = deleted_count
-        result["processed"] = deleted_count
-        result["skippedCount"] = sum(result["skipped"].values())
-        result["failedCount"] = len(result["failed"])
-        return result
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to bulk delete entries: {str(e)}")
+    return bulk_delete_shift_entries(JB_CONTACT_BLOCK_ENTRY_MODULE, partial(get_current_user, x_employee_id), request_data)
 
 
 @jb_contact_block_maintenance_router.post("/signatures")
@@ -1192,11 +1043,7 @@ async def export_monthly_excel(payload: dict, x_employee_id: str | None = Header
         report_payload["name"] = name
 
         output, filename = generate_jb_contact_block_maintenance_report(report_payload)
-        return StreamingResponse(
-            output,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
-        )
+        return build_export_response(output, filename)
     except HTTPException:
         raise
     except Exception as e:
@@ -1,33 +1,28 @@
 import re
 import logging
+from functools import partial
 from typing import Optional
 
 from bson import ObjectId
 from fastapi import APIRouter, Header, HTTPException, Query, status
-from fastapi.responses import StreamingResponse
+from services.export_streaming import build_export_response
 from line_status import is_line_off, normalize_line, with_default_line_statuses
 from models.jb_sealant_wt_models import JBSealantDailyEntry, jb_sealant_entries_collection
 from datetime import datetime
-import calendar
 from generators.JBSealantWeightReportGenerator import generate_jb_sealant_report
-from services.dashboard_analytics_service import (
-    build_dashboard_response,
-    resolve_dashboard_date_range as resolve_analytics_dashboard_date_range,
-)
 from services.creator_resolution_service import (
-    build_lock_owner_metadata,
     get_created_by_label as resolve_created_by_label,
     require_operator_signature,
 )
 from services.shift_entry_workflow_service import (
     APPROVED_REPORT_DELETE_FORBIDDEN_MESSAGE,
     LOCK_FIELDS,
-    WORKFLOW_STATES,
-    add_bulk_failure,
-    add_bulk_skip,
-    build_access_query,
+    ShiftEntryModule,
+    approve_shift_entry,
     build_created_metadata,
     build_draft_lock_metadata,
+    bulk_approve_shift_entries,
+    bulk_delete_shift_entries,
     can_approve_entry,
     can_create_entry,
     can_delete_entry,
@@ -36,15 +31,20 @@ from services.shift_entry_workflow_service import (
     can_return_entry,
     can_submit_entry,
     can_view_entry,
-    combine_queries,
-    create_bulk_result,
-    get_bulk_status_label,
+    delete_shift_entry,
     get_current_user,
-    is_operator,
-    is_reviewer_like,
+    get_shift_entry,
+    get_shift_entry_dashboard,
+    get_shift_entry_register,
     normalize_workflow_state,
+    return_shift_entry,
     utc_timestamp,
 )
+from services.shift_line_stats_service import (
+    aggregate_monthly_line_stats,
+    attach_line_stats,
+    build_default_monthly_line_stats,
+)
 from services.shift_prepared_by_service import trusted_signature_update
 
 logger = logging.getLogger(__name__)
@@ -53,6 +53,15 @@ jb_sealant_router = APIRouter(prefix="/api/jb-sealant-weight-reports", tags=["JB
 
 SHIFT_OPTIONS = {"A", "B", "C"}
 LINE_GROUP_OPTIONS = {"Line-I", "Line-II"}
+REGISTER_SUMMARY_PROJECTION = {
+    "lines.1.positiveJB": 0,
+    "lines.1.middleJB": 0,
+    "lines.1.negativeJB": 0,
+    "lines.2.positiveJB": 0,
+    "lines.2.middleJB": 0,
+    "lines.2.negativeJB": 0,
+}
+
 SORT_OPTIONS = {
     "newest-created": ("createdAt", -1),
     "oldest-created": ("createdAt", 1),
@@ -194,55 +203,13 @@ def _get_line_validity(line: dict):
 
     return {"pass": pass_count > 0 and fail_count == 0, "fail": fail_count > 0, "any": any_input}
 
-def _build_default_monthly_stats(year: int, month: int):
-    days_in_month = calendar.monthrange(year, month)[1]
-    total_possible_entries = days_in_month * 3 * 2
-    return {
-        "totalDays": days_in_month,
-        "totalPossibleEntries": total_possible_entries,
-        "filledEntries": 0,
-        "completionRate": 0,
-        "passCount": 0,
-        "failCount": 0,
-        "shiftStats": {
-            "A": {"filled": 0, "pass": 0, "fail": 0, "lines": {"1": 0, "2": 0}},
-            "B": {"filled": 0, "pass": 0, "fail": 0, "lines": {"1": 0, "2": 0}},
-            "C": {"filled": 0, "pass": 0, "fail": 0, "lines": {"1": 0, "2": 0}}
-        }
-    }
-
-def _build_monthly_stats(year: int, month: int):
-    entries = JBSealantDailyEntry.get_month_entries(year, month)
-    stats = _build_default_monthly_stats(year, month)
-
-    for entry in entries:
-        shift = entry.get("shift")
-        lines = entry.get("lines", {})
-
-        if shift not in stats["shiftStats"]:
-            continue
-
-        for line_number in ("1", "2"):
-            line = lines.get(line_number, {}) or {}
-            if not _has_any_line_input(line):
-                continue
-
-            stats["filledEntries"] += 1
-            stats["shiftStats"][shift]["filled"] += 1
-            stats["shiftStats"][shift]["lines"][line_number] += 1
-
-            validity = _get_line_validity(line)
-            if validity["pass"]:
-                stats["passCount"] += 1
-                stats["shiftStats"][shift]["pass"] += 1
-            elif validity["fail"]:
-                stats["failCount"] += 1
-                stats["shiftStats"][shift]["fail"] += 1
-
-    if stats["totalPossibleEntries"] > 0:
-        stats["completionRate"] = round((stats["filledEntries"] / stats["totalPossibleEntries"]) * 100)
-
-    return stats
+def get_line_outcome(line: dict) -> str | None:
+    if not _has_any_line_input(line):
+        return None
+    validity = _get_line_validity(line)
+    if validity["pass"]:
+        return "pass"
+    return "fail" if validity["fail"] else ""
 
 def serialize_doc(doc):
     """Helper function to convert MongoDB document to JSON-serializable format"""
@@ -419,7 +386,7 @@ def build_entry_update_data(
         update_data.update(build_created_metadata(user, now))
         update_data.update(build_draft_lock_metadata(user, now))
         update_data["created_at"] = now
-    return update_data
+    return attach_line_stats(update_data, get_line_outcome)
 
 def build_search_query(search: Optional[str]) -> dict:
     if not search:
@@ -453,20 +420,6 @@ def build_search_query(search: Optional[str]) -> dict:
         ]
     }
 
-def build_status_query(status_filter: Optional[str]) -> dict:
-    if status_filter not in WORKFLOW_STATES:
-        return {}
-    if status_filter == "submitted":
-        return {
-            "$or": [
-                {"workflowState": "submitted"},
-                {"workflowState": {"$exists": False}},
-                {"workflowState": None},
-                {"status": "submitted"},
-            ]
-        }
-    return {"workflowState": status_filter}
-
 def build_entry_filter_query(
     *,
     date_from: Optional[str] = None,
@@ -499,37 +452,31 @@ def serialize_entry_summary(entry: dict, user: dict | None = None) -> dict:
     serialized["createdByLabel"] = get_created_by_label(entry)
     return serialized
 
+JB_SEALANT_ENTRY_MODULE = ShiftEntryModule(
+    label="JB sealant",
+    model=JBSealantDailyEntry,
+    collection=jb_sealant_entries_collection,
+    serialize_entry=serialize_entry,
+    serialize_summary=serialize_entry_summary,
+    build_search_query=build_search_query,
+    build_filter_query=build_entry_filter_query,
+    sort_options=SORT_OPTIONS,
+    register_projection=REGISTER_SUMMARY_PROJECTION,
+)
+
 @jb_sealant_router.get("/dashboard")
 async def get_jb_sealant_dashboard(
     view: str = Query("daily", pattern="^(daily|weekly|monthly)$"),
     x_employee_id: str | None = Header(default=None),
 ):
-    try:
-        user = get_current_user(x_employee_id)
-        date_from, date_to = resolve_analytics_dashboard_date_range(view)
-        query = combine_queries(
-            build_access_query(user),
-            build_entry_filter_query(date_from=date_from, date_to=date_to),
-        )
-
-        return build_dashboard_response(
-            collection=jb_sealant_entries_collection,
-            query=query,
-            view=view,
-            total_key="totalEntries",
-            state_fields=("workflowState", "status"),
-            serialize_item=lambda entry: serialize_entry_summary(entry, user),
-            item_sort=[("date", -1), ("shift", 1), ("lineGroup", 1)],
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch JB sealant dashboard: {str(e)}")
+    return get_shift_entry_dashboard(JB_SEALANT_ENTRY_MODULE, partial(get_current_user, x_employee_id), view)
 
 @jb_sealant_router.get("/entries/register")
 async def get_entry_register(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; send it empty to start cursor pagination"),
+    include_total: bool = Query(True, description="Include a bounded total count with cursor pages"),
     search: Optional[str] = Query(None),
     sort: str = Query("date-newest"),
     date_from: Optional[str] = Query(None),
@@ -539,58 +486,25 @@ async def get_entry_register(
     status_filter: Optional[str] = Query(None, alias="status"),
     x_employee_id: str | None = Header(default=None),
 ):
-    try:
-        user = get_current_user(x_employee_id)
-        query = combine_queries(
-            build_access_query(user),
-            build_search_query(search),
-            build_entry_filter_query(date_from=date_from, date_to=date_to, shift=shift, line=line),
-            build_status_query(status_filter),
-        )
-        sort_field, sort_direction = SORT_OPTIONS.get(sort, SORT_OPTIONS["date-newest"])
-        total = jb_sealant_entries_collection.count_documents(query)
-        entries = list(
-            jb_sealant_entries_collection
-            .find(query, {
-                "lines.1.positiveJB": 0,
-                "lines.1.middleJB": 0,
-                "lines.1.negativeJB": 0,
-                "lines.2.positiveJB": 0,
-                "lines.2.middleJB": 0,
-                "lines.2.negativeJB": 0,
-            })
-            .sort(sort_field, sort_direction)
-            .skip((page - 1) * page_size)
-            .limit(page_size)
-        )
-        return {
-            "items": [serialize_entry_summary(entry, user) for entry in entries],
-            "total": total,
-            "page": page,
-            "page_size": page_size,
-        }
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch entry register: {str(e)}")
+    return get_shift_entry_register(
+        JB_SEALANT_ENTRY_MODULE,
+        partial(get_current_user, x_employee_id),
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+        include_total=include_total,
+        search=search,
+        sort=sort,
+        status_filter=status_filter,
+        date_from=date_from,
+        date_to=date_to,
+        shift=shift,
+        line=line,
+    )
 
 @jb_sealant_router.get("/entries/by-id/{entry_id}")
 async def get_entry_by_id(entry_id: str, x_employee_id: str | None = Header(default=None)):
-    try:
-        user = get_current_user(x_employee_id)
-        if not ObjectId.is_valid(entry_id):
-            raise HTTPException(status_code=400, detail="Invalid entry ID")
-
-        entry = JBSealantDailyEntry.get_by_id(entry_id)
-        if not entry:
-            raise HTTPException(status_code=404, detail="Entry not found")
-        if not can_view_entry(entry, user):
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not authorized to open this entry")
-        return serialize_entry(entry, user, include_permissions=True)
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch entry: {str(e)}")
+    return get_shift_entry(JB_SEALANT_ENTRY_MODULE, partial(get_current_user, x_employee_id), entry_id)
 
 @jb_sealant_router.get("/entries/monthly")
 async def get_monthly_entries(
@@ -694,119 +608,12 @@ async def get_monthly_stats(
     try:
         return {
             "success": True,
-            "data": _build_monthly_stats(year, month)
-        }
-        days_in_month = calendar.monthrange(year, month)[1]
-        
-        # Get all entries for the month
-        entries = JBSealantDailyEntry.get_month_entries(year, month)
-        
-        # Calculate stats based on lines
-        total_possible_entries = days_in_month * 3 * 2  # 3 shifts * 2 lines per day
-        filled_entries = 0
-        pass_count = 0
-        fail_count = 0
-        
-        # Initialize shift stats with lines
-        shift_stats = {
-            "A": {"filled": 0, "pass": 0, "fail": 0, "lines": {"1": 0, "2": 0}},
-            "B": {"filled": 0, "pass": 0, "fail": 0, "lines": {"1": 0, "2": 0}},
-            "C": {"filled": 0, "pass": 0, "fail": 0, "lines": {"1": 0, "2": 0}}
-        }
-        
-        for entry in entries:
-            shift = entry.get("shift")
-            lines = entry.get("lines", {})
-            
-            if shift in shift_stats:
-                # Process line 1 - check all three JB positions
-                line1 = lines.get("1", {})
-                if is_line_off(line1):
-                    line1 = {}
-                positions = [
-                    line1.get("positiveJB", {}).get("netSealantWeight"),
-                    line1.get("middleJB", {}).get("netSealantWeight"),
-                    line1.get("negativeJB", {}).get("netSealantWeight")
-                ]
-                
-                for net_weight in positions:
-                    if net_weight:
-                        filled_entries += 1
-                        shift_stats[shift]["filled"] += 1
-                        shift_stats[shift]["lines"]["1"] += 1
-                        
-                        try:
-                            weight = float(net_weight)
-                            if JB_PASS_MIN <= weight <= JB_PASS_MAX:
-                                pass_count += 1
-                                shift_stats[shift]["pass"] += 1
-                            else:
-                                fail_count += 1
-                                shift_stats[shift]["fail"] += 1
-                        except (ValueError, TypeError):
-                            fail_count += 1
-                            shift_stats[shift]["fail"] += 1
-                
-                # Process line 2 - check all three JB positions
-                line2 = lines.get("2", {})
-                if is_line_off(line2):
-                    line2 = {}
-                positions = [
-                    line2.get("positiveJB", {}).get("netSealantWeight"),
-                    line2.get("middleJB", {}).get("netSealantWeight"),
-                    line2.get("negativeJB", {}).get("netSealantWeight")
-                ]
-                
-                for net_weight in positions:
-                    if net_weight:
-                        filled_entries += 1
-                        shift_stats[shift]["filled"] += 1
-                        shift_stats[shift]["lines"]["2"] += 1
-                        
-                        try:
-                            weight = float(net_weight)
-                            if JB_PASS_MIN <= weight <= JB_PASS_MAX:
-                                pass_count += 1
-                                shift_stats[shift]["pass"] += 1
-                            else:
-                                fail_count += 1
-                                shift_stats[shift]["fail"] += 1
-                        except (ValueError, TypeError):
-                            fail_count += 1
-                            shift_stats[shift]["fail"] += 1
-        
-        completion_rate = round((filled_entries / total_possible_entries) * 100) if total_possible_entries > 0 else 0
-        
-        return {
-            "success": True,
-            "data": {
-                "totalDays": days_in_month,
-                "totalPossibleEntries": total_possible_entries,
-                "filledEntries": filled_entries,
-                "completionRate": completion_rate,
-                "passCount": pass_count,
-                "failCount": fail_count,
-                "shiftStats": shift_stats
-            }
+            "data": aggregate_monthly_line_stats(jb_sealant_entries_collection, year, month, get_line_outcome)
         }
     except Exception as e:
-        days_in_month = calendar.monthrange(year, month)[1]
-        total_possible_entries = days_in_month * 3 * 2
         return {
             "success": False,
-            "data": {
-                "totalDays": days_in_month,
-                "totalPossibleEntries": total_possible_entries,
-                "filledEntries": 0,
-                "completionRate": 0,
-                "passCount": 0,
-                "failCount": 0,
-                "shiftStats": {
-                    "A": {"filled": 0, "pass": 0, "fail": 0, "lines": {"1": 0, "2": 0}},
-                    "B": {"filled": 0, "pass": 0, "fail": 0, "lines": {"1": 0, "2": 0}},
-                    "C": {"filled": 0, "pass": 0, "fail": 0, "lines": {"1": 0, "2": 0}}
-                }
-            },
+            "data": build_default_monthly_line_stats(year, month),
             "error": str(e)
         }
 
@@ -986,207 +793,19 @@ async def submit_entry(entry_id: str, entry: dict | None = None, x_employee_id:
 
 @jb_sealant_router.post("/entries/{entry_id}/approve")
 async def approve_entry(entry_id: str, x_employee_id: str | None = Header(default=None)):
-    try:
-        user = get_current_user(x_employee_id)
-        if not ObjectId.is_valid(entry_id):
-            raise HTTPException(status_code=400, detail="Invalid entry ID")
-
-        existing_entry = JBSealantDailyEntry.get_by_id(entry_id)
-        if not existing_entry:
-            raise HTTPException(status_code=404, detail="Entry not found")
-        if not can_approve_entry(existing_entry, user):
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only submitted entries can be approved")
-
-        now = utc_timestamp()
-        signatures = existing_entry.get("signatures") or {"preparedBy": "", "verifiedBy": ""}
-        signatures["verifiedBy"] = user["name"]
-        updated = JBSealantDailyEntry.update_by_id(
-            entry_id,
-            {
-                "status": "approved",
-                "workflowState": "approved",
-                "signatures": signatures,
-                "approvedAt": now,
-                "approvedBy": user["name"],
-                "updatedAt": now,
-                "updated_at": now,
-            },
-            {field: "" for field in LOCK_FIELDS},
-        )
-        if not updated:
-            raise HTTPException(status_code=500, detail="Failed to approve entry")
-
-        approved_entry = JBSealantDailyEntry.get_by_id(entry_id)
-        return serialize_entry(approved_entry, user, include_permissions=True)
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to approve entry: {str(e)}")
+    return approve_shift_entry(JB_SEALANT_ENTRY_MODULE, partial(get_current_user, x_employee_id), entry_id)
 
 @jb_sealant_router.post("/entries/{entry_id}/return")
 async def return_entry(entry_id: str, request_data: dict, x_employee_id: str | None = Header(default=None)):
-    try:
-        user = get_current_user(x_employee_id)
-        if not ObjectId.is_valid(entry_id):
-            raise HTTPException(status_code=400, detail="Invalid entry ID")
-
-        existing_entry = JBSealantDailyEntry.get_by_id(entry_id)
-        if not existing_entry:
-            raise HTTPException(status_code=404, detail="Entry not found")
-        if not can_return_entry(existing_entry, user):
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only submitted entries can be returned")
-
-        return_comments = (request_data.get("returnComments") or "").strip()
-        if not return_comments:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Return comments are required")
-
-        now = utc_timestamp()
-        lock_owner = build_lock_owner_metadata(existing_entry)
-        updated = JBSealantDailyEntry.update_by_id(
-            entry_id,
-            {
-                "status": "returned",
-                "workflowState": "returned",
-                "returnedAt": now,
-                "returnedBy": user["name"],
-                "returnComments": return_comments,
-                "lockedBy": lock_owner.get("lockedBy") or "Operator",
-                "lockedByUserId": lock_owner.get("lockedByUserId"),
-                "lockedByEmployeeId": lock_owner.get("lockedByEmployeeId"),
-                "lockTimestamp": now,
-                "lockSessionId": None,
-                "updatedAt": now,
-                "updated_at": now,
-            },
-        )
-        if not updated:
-            raise HTTPException(status_code=500, detail="Failed to return entry")
-
-        returned_entry = JBSealantDailyEntry.get_by_id(entry_id)
-        return serialize_entry(returned_entry, user, include_permissions=True)
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to return entry: {str(e)}")
+    return return_shift_entry(JB_SEALANT_ENTRY_MODULE, partial(get_current_user, x_employee_id), entry_id, request_data)
 
 @jb_sealant_router.post("/bulk/approve")
 async def bulk_approve_entries(request_data: dict, x_employee_id: str | None = Header(default=None)):
-    try:
-        user = get_current_user(x_employee_id)
-        if not is_reviewer_like(user):
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only supervisors or managers can approve entries")
-
-        entry_ids = request_data.get("entryIds") or request_data.get("entry_ids") or request_data.get("reportIds")
-        if not isinstance(entry_ids, list) or not entry_ids:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="entryIds must be a non-empty list")
-
-        result = create_bulk_result(len(entry_ids))
-        approved_count = 0
-        now = utc_timestamp()
-        for raw_entry_id in entry_ids:
-            entry_id = str(raw_entry_id or "").strip()
-            if not ObjectId.is_valid(entry_id):
-                add_bulk_failure(result, entry_id, "Invalid ID")
-                continue
-            try:
-                existing_entry = JBSealantDailyEntry.get_by_id(entry_id)
-                if not existing_entry:
-                    add_bulk_failure(result, entry_id, "Not Found")
-                    continue
-                if not can_approve_entry(existing_entry, user):
-                    add_bulk_skip(result, get_bulk_status_label(existing_entry))
-                    continue
-                signatures = existing_entry.get("signatures") or {"preparedBy": "", "verifiedBy": ""}
-                signatures["verifiedBy"] = user["name"]
-                updated = JBSealantDailyEntry.update_by_id(
-                    entry_id,
-                    {
-                        "status": "approved",
-                        "workflowState": "approved",
-                        "signatures": signatures,
-                        "approvedAt": now,
-                        "approvedBy": user["name"],
-                        "updatedAt": now,
-                        "updated_at": now,
-                    },
-                    {field: "" for field in LOCK_FIELDS},
-                )
-                if not updated:
-                    add_bulk_failure(result, entry_id, "Update Failed")
-                    continue
-                approved_count += 1
-            except Exception as item_error:
-                add_bulk_failure(result, entry_id, str(item_error))
-
-        result["approved"] = approved_count
-        result["processed"] = approved_count
-        result["skippedCount"] = sum(result["skipped"].values())
-        result["failedCount"] = len(result["failed"])
-        return result
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to bulk approve entries: {str(e)}")
+    return bulk_approve_shift_entries(JB_SEALANT_ENTRY_MODULE, partial(get_current_user, x_employee_id), request_data)
 
 @jb_sealant_router.post("/bulk/delete")
 async def bulk_delete_entries(request_data: dict, x_employee_id: str | None = Header(default=None)):
-    try:
-        user = get_current_user(x_employee_id)
-        if not (is_operator(user) or is_reviewer_like(user)):
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not authorized to delete entries")
-
-        entry_ids = request_data.get("entryIds") or request_data.get("entry_ids") or request_data.get("reportIds")
-        if not isinstance(entry_ids, list) or not entry_ids:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="entryIds must be a non-empty list")
-
-        result = create_bulk_result(len(entry_ids))
-        deleted_count = 0
-
-        for raw_entry_id in entry_ids:
-            entry_id = str(raw_entry_id or "").strip()
-            if not ObjectId.is_valid(entry_id):
-                continue
-            existing_entry = JBSealantDailyEntry.get_by_id(entry_id)
-            if existing_entry and normalize_workflow_state(existing_entry) == "approved":
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail=APPROVED_REPORT_DELETE_FORBIDDEN_MESSAGE,
-                )
-
-        for raw_entry_id in entry_ids:
-            entry_id = str(raw_entry_id or "").strip()
-            if not ObjectId.is_valid(entry_id):
-                add_bulk_failure(result, entry_id, "Invalid ID")
-                continue
-            try:
-                existing_entry = JBSealantDailyEntry.get_by_id(entry_id)
-                if not existing_entry:
-                    add_bulk_failure(result, entry_id, "Not Found")
-                    continue
-                if normalize_workflow_state(existing_entry) == "approved":
-                    raise HTTPException(
-                        status_code=status.HTTP_403_FORBIDDEN,
-                        detail=APPROVED_REPORT_DELETE_FORBIDDEN_MESSAGE,
-                    )
-                if not can_delete_entry(existing_entry, user):
-                    add_bulk_skip(result, get_bulk_status_label(existing_entry))
-                    continue
-                if not JBSealantDailyEntry.delete_by_id(entry_id):
-                    add_bulk_failure(result, entry_id, "Delete Failed")
-                    continue
-                deleted_count += 1
-            except Exception as item_error:
-                add_bulk_failure(result, entry_id, str(item_error))
-
-        result["deleted"] = deleted_count
-        result["processed"] = deleted_count
-        result["skippedCount"] = sum(result["skipped"].values())
-        result["failedCount"] = len(result["failed"])
-        return result
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to bulk delete entries: {str(e)}")
+    return bulk_delete_shift_entries(JB_SEALANT_ENTRY_MODULE, partial(get_current_user, x_employee_id), request_data)
 
 @jb_sealant_router.post("/signatures")
 async def update_signatures(payload: dict, x_employee_id: str | None = Header(default=None)):
@@ -1261,29 +880,7 @@ async def update_signatures(payload: dict, x_employee_id: str | None = Header(de
 
 @jb_sealant_router.delete("/entries/by-id/{entry_id}")
 async def delete_entry_by_id(entry_id: str, x_employee_id: str | None = Header(default=None)):
-    try:
-        user = get_current_user(x_employee_id)
-        if not ObjectId.is_valid(entry_id):
-            raise HTTPException(status_code=400, detail="Invalid entry ID")
-
-        entry = JBSealantDailyEntry.get_by_id(entry_id)
-        if not entry:
-            raise HTTPException(status_code=404, detail="Entry not found")
-        if normalize_workflow_state(entry) == "approved":
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=APPROVED_REPORT_DELETE_FORBIDDEN_MESSAGE,
-            )
-        if not can_delete_entry(entry, user):
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not authorized to delete this entry")
-        deleted = JBSealantDailyEntry.delete_by_id(entry_id)
-        if not deleted:
-            raise HTTPException(status_code=404, detail="Entry not found")
-        return {"success": True, "message": "Entry deleted successfully"}
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to delete entry: {str(e)}")
+    return delete_shift_entry(JB_SEALANT_ENTRY_MODULE, partial(get_current_user, x_employee_id), entry_id)
 
 @jb_sealant_router.delete("/entries/{date}/{line_group}/{shift}")
 async def delete_entry_by_line_group(date: str, line_group: str, shift: str, x_employee_id: str | None = Header(default=None)):
@@ -1370,11 +967,7 @@ async def export_monthly_excel_post(payload: dict, x_employee_id: str | None = H
 
         output, filename = generate_jb_sealant_report(payload)
         
-        return StreamingResponse(
-            output,
-            media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
-        )
+        return build_export_response(output, filename)
         
     except HTTPException:
         raise
@@ -0,0 +1,26 @@
+import os
+import secrets
+
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import Response
+
+from services.request_metrics_service import PROMETHEUS_CONTENT_TYPE, request_metrics
+
+metrics_router = APIRouter(tags=["Metrics"])
+
+
+def require_metrics_token(authorization: str | None) -> None:
+    """When METRICS_TOKEN is set, scrapers must send it as a bearer token."""
+    expected_token = os.getenv("METRICS_TOKEN")
+    if not expected_token:
+        return
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.strip(), expected_token):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Metrics token is required")
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+async def get_metrics(authorization: str | None = Header(default=None)):
+    """Per-route latency, response size and Mongo/S3/openpyxl time in the Prometheus text format."""
+    require_metrics_token(authorization)
+    return Response(content=request_metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -3,21 +3,27 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 from bson import ObjectId
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Header, HTTPException, Query
 from pymongo import ASCENDING, DESCENDING
 from pymongo.errors import DuplicateKeyError, PyMongoError
 
 from constants import MONGODB_DB_NAME
 from models.peel_data_models import (
+    MEASUREMENT_ARRAYS_FIELD,
+    MEASUREMENT_SUMMARY_FIELD,
     PEEL_DATA_COLLECTION_NAME,
     ensure_peel_indexes,
     insert_manual_peel_record,
     month_number_from_abbreviation,
     peel_data_collection,
+    refresh_graph_rollups_for,
     serialize_peel_doc,
-    serialize_peel_docs,
     update_manual_peel_record,
 )
+from services.bson_json_response import BSONJSONResponse
+from services.conditional_response import build_validators
+from services.keyset_pagination import InvalidCursorError, paginate_keyset
+from services.peel_graph_service import graph_source_versions, load_graph_points
 
 peel_router = APIRouter(prefix="/api/peel", tags=["Peel Test Data"], responses={404: {"description": "Not found"}})
 
@@ -36,6 +42,10 @@ SORT_FIELDS = {
 }
 
 ALLOWED_SHIFTS = {"A", "B", "C"}
+# Part of the graph ETag; bump it when the response shape changes so cached graphs are refetched.
+PEEL_GRAPH_ETAG_NAME = "peel-graph-v1"
+# Raw records are returned as stored minus the analytics-only measurement arrays and summary.
+PEEL_RECORD_PROJECTION = {MEASUREMENT_ARRAYS_FIELD: 0, MEASUREMENT_SUMMARY_FIELD: 0}
 AUDIT_PEEL_POSITION_COUNT = 16
 AUDIT_PEEL_RIBBON_COUNT = 7
 AUDIT_PEEL_SIDES = ("Front", "Back")
@@ -231,6 +241,8 @@ def _list_peel_records(
     page_size: int,
     sort_by: str,
     sort_order: str,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
 ) -> Dict[str, Any]:
     ensure_peel_indexes()
     query = _build_query(
@@ -248,9 +260,39 @@ def _list_peel_records(
     direction = ASCENDING if sort_order.lower() == "asc" else DESCENDING
     skip = (page - 1) * page_size
 
+    if cursor is not None:
+        keyset_page = paginate_keyset(
+            peel_data_collection,
+            query,
+            sort_field,
+            direction,
+            page_size,
+            cursor=cursor or None,
+            include_total=include_total,
+            projection=PEEL_RECORD_PROJECTION,
+        )
+        data = keyset_page.items
+        pagination = {
+            "page_size": page_size,
+            "next_cursor": keyset_page.next_cursor,
+            "has_more": keyset_page.next_cursor is not None,
+        }
+        if keyset_page.total is not None:
+            pagination["total"] = keyset_page.total
+            pagination["total_is_estimate"] = keyset_page.total_is_estimate
+        return {
+            "status": "success",
+            "collection": PEEL_DATA_COLLECTION_NAME,
+            "filters": query,
+            "pagination": pagination,
+            "sort": {"sort_by": sort_field, "sort_order": "asc" if direction == ASCENDING else "desc"},
+            "count": len(data),
+            "data": data,
+        }
+
     total = peel_data_collection.count_documents(query)
-    cursor = peel_data_collection.find(query).sort(sort_field, direction).skip(skip).limit(page_size)
-    data = serialize_peel_docs(cursor)
+    cursor = peel_data_collection.find(query, PEEL_RECORD_PROJECTION).sort(sort_field, direction).skip(skip).limit(page_size)
+    data = list(cursor)
     return {
         "status": "success",
         "collection": PEEL_DATA_COLLECTION_NAME,
@@ -367,11 +409,13 @@ async def get_peel_records(
     search: Optional[str] = Query(None),
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; send it empty to start cursor pagination"),
+    include_total: bool = Query(True, description="Include a bounded total count with cursor pages"),
     sort_by: str = Query("date"),
     sort_order: str = Query("desc", regex="^(asc|desc)$"),
 ):
     try:
-        return _list_peel_records(
+        return BSONJSONResponse(_list_peel_records(
             year=year,
             month=month,
             date=date,
@@ -385,9 +429,13 @@ async def get_peel_records(
             page_size=page_size,
             sort_by=sort_by,
             sort_order=sort_order,
-        )
+            cursor=cursor,
+            include_total=include_total,
+        ))
     except HTTPException:
         raise
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Error fetching peel data: {str(exc)}")
 
@@ -411,8 +459,8 @@ async def get_peel_data_compat(
         if unit:
             query["Unit"] = {"$regex": f"^{re.escape(unit.strip())}$", "$options": "i"}
 
-        results = serialize_peel_docs(peel_data_collection.find(query).sort("date", ASCENDING))
-        return {"status": "success", "filters": query, "count": len(results), "data": results}
+        results = list(peel_data_collection.find(query, PEEL_RECORD_PROJECTION).sort("date", ASCENDING))
+        return BSONJSONResponse({"status": "success", "filters": query, "count": len(results), "data": results})
     except HTTPException:
         raise
     except Exception as exc:
@@ -427,14 +475,14 @@ async def get_data_by_date_and_shift(date: str, shift: str):
             "date": _date_key(date),
             "shift": {"$regex": f"^{re.escape(normalized_shift or '')}$", "$options": "i"},
         }
-        results = serialize_peel_docs(peel_data_collection.find(query).sort([("Stringer", ASCENDING), ("Unit", ASCENDING)]))
-        return {
+        results = list(peel_data_collection.find(query, PEEL_RECORD_PROJECTION).sort([("Stringer", ASCENDING), ("Unit", ASCENDING)]))
+        return BSONJSONResponse({
             "status": "success",
             "date": _date_key(date),
             "shift": normalized_shift,
             "count": len(results),
             "data": results,
-        }
+        })
     except HTTPException:
         raise
     except Exception as exc:
@@ -494,6 +542,8 @@ async def get_graph_data(
     year: int = Query(..., description="Four-digit year"),
     stringer: int = Query(..., description="Stringer number"),
     cell_face: str = Query(..., description="Cell face: 'front', 'back', or 'both'"),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
 ):
     try:
         normalized_month = _normalize_month_filter(month)
@@ -506,19 +556,15 @@ async def get_graph_data(
         if cell_face not in {"front", "back", "both"}:
             raise HTTPException(status_code=400, detail="Cell face must be 'front', 'back', or 'both'")
 
-        query_filter: Dict[str, Any] = {
-            "year": year,
-            "month": normalized_month,
-            "$or": [
-                {"Stringer": stringer},
-                {"stringer": stringer},
-                {"machine": {"$regex": f"STRINGER\\s*-?\\s*{stringer}(\\D|$)", "$options": "i"}},
-            ],
-        }
-        results = list(peel_data_collection.find(query_filter, {"_id": 0}))
+        # Per-day count/latest-update of the month's records; cheap, and it decides both the
+        # ETag and which daily rollups are still current.
+        versions = graph_source_versions(stringer, year, normalized_month)
+        validators = build_validators(versions, PEEL_GRAPH_ETAG_NAME, hash_documents=True, variant=(cell_face,))
+        if validators.matches(if_none_match, if_modified_since):
+            return validators.not_modified_response()
 
-        if not results:
-            return {
+        if not versions:
+            return BSONJSONResponse({
                 "status": "success",
                 "message": f"No data available for stringer {stringer} in {normalized_month} {year}",
                 "month": normalized_month.lower(),
@@ -526,80 +572,10 @@ async def get_graph_data(
                 "stringer": stringer,
                 "cell_face": cell_face,
                 "data": [],
-            }
-
-        date_data: Dict[str, list] = {}
-        for record in results:
-            record_date = record.get("date") or record.get("Date")
-            if record_date not in date_data:
-                date_data[record_date] = []
-            date_data[record_date].append(record)
-
-        graph_data = []
-        for record_date, records in sorted(date_data.items()):
-            daily_averages = []
-            max_values = []
-            min_values = []
-
-            for record in records:
-                row_averages = []
-                front_row_averages = []
-                back_row_averages = []
-
-                if cell_face in {"front", "both"}:
-                    front_positions: Dict[int, list] = {}
-                    for key, value in record.items():
-                        if not str(key).lower().startswith("front_") or not isinstance(value, (int, float)):
-                            continue
-                        parts = str(key).split("_")
-                        if len(parts) >= 3 and parts[1].isdigit():
-                            front_positions.setdefault(int(parts[1]), []).append(value)
-                    for values in front_positions.values():
-                        if values:
-                            row_avg = sum(values) / len(values)
-                            front_row_averages.append(row_avg)
-                            row_averages.append(row_avg)
-
-                if cell_face in {"back", "both"}:
-                    back_positions: Dict[int, list] = {}
-                    for key, value in record.items():
-                        if not str(key).lower().startswith("back_") or not isinstance(value, (int, float)):
-                            continue
-                        parts = str(key).split("_")
-                        if len(parts) >= 3 and parts[1].isdigit():
-                            back_positions.setdefault(int(parts[1]), []).append(value)
-                    for values in back_positions.values():
-                        if values:
-                            row_avg = sum(values) / len(values)
-                            back_row_averages.append(row_avg)
-                            row_averages.append(row_avg)
-
-                if not row_averages:
-                    continue
-
-                daily_averages.append(sum(row_averages) / len(row_averages))
-                if cell_face == "both" and front_row_averages and back_row_averages:
-                    max_values.append((max(front_row_averages) + max(back_row_averages)) / 2)
-                    min_values.append((min(front_row_averages) + min(back_row_averages)) / 2)
-                elif cell_face == "front" and front_row_averages:
-                    max_values.append(max(front_row_averages))
-                    min_values.append(min(front_row_averages))
-                elif cell_face == "back" and back_row_averages:
-                    max_values.append(max(back_row_averages))
-                    min_values.append(min(back_row_averages))
-
-            graph_data.append(
-                {
-                    "date": record_date,
-                    "average_value": round(sum(daily_averages) / len(daily_averages), 2) if daily_averages else None,
-                    "max_value": round(max(max_values), 2) if max_values else None,
-                    "min_value": round(min(min_values), 2) if min_values else None,
-                    "record_count": len(records),
-                    "unit_count": len(set(record.get("Unit") or record.get("unit") or "" for record in records)),
-                }
-            )
+            }, headers=validators.headers)
 
-        return {
+        graph_data = load_graph_points(stringer, year, normalized_month, cell_face, versions)
+        return BSONJSONResponse({
             "status": "success",
             "month": normalized_month.lower(),
             "year": year,
@@ -607,7 +583,7 @@ async def get_graph_data(
             "cell_face": cell_face,
             "total_days": len(graph_data),
             "data": graph_data,
-        }
+        }, headers=validators.headers)
     except HTTPException:
         raise
     except Exception as exc:
@@ -669,9 +645,13 @@ async def delete_peel_record(record_id: str):
     try:
         if not ObjectId.is_valid(record_id):
             raise HTTPException(status_code=400, detail="Invalid peel record ID")
-        result = peel_data_collection.delete_one({"_id": ObjectId(record_id)})
-        if result.deleted_count == 0:
+        deleted = peel_data_collection.find_one_and_delete(
+            {"_id": ObjectId(record_id)},
+            projection={"Stringer": 1, "year": 1, "month": 1, "date": 1},
+        )
+        if deleted is None:
             raise HTTPException(status_code=404, detail="Peel record not found")
+        refresh_graph_rollups_for(deleted)
         return {"status": "success", "message": "Peel record deleted"}
     except HTTPException:
         raise
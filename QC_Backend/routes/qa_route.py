@@ -1,10 +1,10 @@
-from fastapi import HTTPException, Query, APIRouter
+from fastapi import HTTPException, Header, Query, APIRouter
 from pymongo import MongoClient
 from datetime import datetime
-import json
-from bson import json_util
 from typing import Optional
 from constants import MONGODB_URI, MONGODB_DB_NAME
+from services.bson_json_response import ExtendedJSONResponse
+from services.conditional_response import build_validators
 
 qa_router = APIRouter(prefix="/api/qa", tags=["Quality Analysis"])
 
@@ -17,9 +17,6 @@ def get_qa_database():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database connection failed: {str(e)}")
 
-def serialize_doc(doc):
-    return json.loads(json_util.dumps(doc))
-
 @qa_router.get("/")
 async def qa_root():
     return {
@@ -42,7 +39,9 @@ async def get_line_data(
     inspection_type: str,
     date_from: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
     date_to: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
-    limit: Optional[int] = Query(None, description="Limit number of records")
+    limit: Optional[int] = Query(None, description="Limit number of records"),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None)
 ):
     try:
         db = get_qa_database()
@@ -69,13 +68,16 @@ async def get_line_data(
         cursor = collection.find(query).sort("Date", 1)
         if limit:
             cursor = cursor.limit(limit)
-        data = [serialize_doc(doc) for doc in cursor]
-        return {
+        data = list(cursor)
+        validators = build_validators(data, collection_name, version_fields=("import_timestamp",))
+        if validators.matches(if_none_match, if_modified_since):
+            return validators.not_modified_response()
+        return ExtendedJSONResponse({
             "line_number": line_number,
             "inspection_type": inspection_type,
             "total_records": len(data),
             "data": data
-        }
+        }, headers=validators.headers)
     except HTTPException:
         raise
     except Exception as e:
@@ -87,7 +89,9 @@ async def get_combined_data(
     line_number: Optional[int] = Query(None, description="Filter by specific line"),
     date_from: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
     date_to: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
-    limit: Optional[int] = Query(None, description="Limit number of records")
+    limit: Optional[int] = Query(None, description="Limit number of records"),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None)
 ):
     try:
         db = get_qa_database()
@@ -115,13 +119,16 @@ async def get_combined_data(
         cursor = collection.find(query).sort("Date", 1)
         if limit:
             cursor = cursor.limit(limit)
-        data = [serialize_doc(doc) for doc in cursor]
-        return {
+        data = list(cursor)
+        validators = build_validators(data, collection_name, version_fields=("import_timestamp",))
+        if validators.matches(if_none_match, if_modified_since):
+            return validators.not_modified_response()
+        return ExtendedJSONResponse({
             "inspection_type": inspection_type,
             "line_filter": line_number,
             "total_records": len(data),
             "data": data
-        }
+        }, headers=validators.headers)
     except HTTPException:
         raise
     except Exception as e:
@@ -138,7 +145,7 @@ async def get_line_summary(line_number: int, inspection_type: str):
         summary = collection.find_one({})
         if not summary:
             return {}
-        return serialize_doc(summary)
+        return ExtendedJSONResponse(summary)
     except HTTPException:
         raise
     except Exception as e:
@@ -155,7 +162,7 @@ async def get_combined_summary(inspection_type: str):
         summary = collection.find_one({})
         if not summary:
             return {}
-        return serialize_doc(summary)
+        return ExtendedJSONResponse(summary)
     except HTTPException:
         raise
     except Exception as e:
@@ -0,0 +1,66 @@
+import logging
+
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+
+from routes.adhesion_route import get_adhesion_current_user, require_adhesion_export_access
+from routes.gel_route import get_gel_current_user, require_gel_export_access
+from routes.ipqc_audit_route import get_ipqc_current_user, require_ipqc_export_access
+from routes.peel_test_route import get_peel_current_user, require_peel_export_access
+from services.export_streaming import build_export_response
+from services.report_export_service import build_batch_export, find_batch_reports, normalize_batch_format
+
+logger = logging.getLogger(__name__)
+
+report_export_router = APIRouter(prefix="/api/report-exports", tags=["Report Exports"])
+
+EXPORT_ACCESS = {
+    "gel": (get_gel_current_user, require_gel_export_access),
+    "adhesion": (get_adhesion_current_user, require_adhesion_export_access),
+    "peel": (get_peel_current_user, require_peel_export_access),
+    "ipqc-audit": (get_ipqc_current_user, require_ipqc_export_access),
+}
+
+
+def authorize_batch_reports(selections, employee_id):
+    """Keep the reports the caller may export.
+
+    Explicitly requested reports fail the whole batch when they are not
+    exportable, like the single-report endpoints; reports matched by a filter
+    are skipped instead.
+    """
+    users = {}
+    authorized = []
+    for selection in selections:
+        get_current_user, require_export_access = EXPORT_ACCESS[selection.report_type]
+        if selection.report_type not in users:
+            users[selection.report_type] = get_current_user(employee_id)
+        try:
+            require_export_access(selection.document, users[selection.report_type])
+        except HTTPException:
+            if selection.explicit:
+                raise
+            continue
+        authorized.append(selection)
+    return authorized
+
+
+@report_export_router.post("/batch")
+async def export_report_batch(request: dict, x_employee_id: str | None = Header(default=None)):
+    """Export gel, adhesion, peel and IPQC audit reports as one ZIP or one multi-sheet workbook."""
+    try:
+        export_format = normalize_batch_format(request.get("format"))
+        selections = await run_in_threadpool(find_batch_reports, request)
+        selections = await run_in_threadpool(authorize_batch_reports, selections, x_employee_id)
+        if not selections:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No exportable reports matched the request")
+
+        output, filename, media_type = await run_in_threadpool(build_batch_export, selections, export_format)
+        return build_export_response(output, filename, media_type)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.exception("batch_report_export_failed")
+        raise HTTPException(status_code=500, detail=f"Failed to export reports: {str(e)}")
@@ -0,0 +1,175 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import logging
+from typing import Any, Callable, Optional
+
+from bson import ObjectId
+from fastapi import APIRouter, Header, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+
+from routes import adhesion_route, gel_route, ipqc_audit_route, peel_test_route
+from services.ipqc_audit_autosave_service import get_audit_data_version, ipqc_audit_autosave_cache
+from services.report_payload_store import report_payload_store
+
+logger = logging.getLogger(__name__)
+
+report_payload_router = APIRouter(prefix="/api/report-payloads", tags=["Report Payload Versions"])
+
+
+@dataclass(frozen=True)
+class PayloadReportType:
+    collection: Any
+    get_current_user: Callable[[str | None], dict]
+    can_view: Callable[[dict, dict], bool]
+    can_edit: Callable[[dict, dict], bool]
+    # (report, payload, user) -> (Mongo summary fields, payload to store), as a full save would derive them.
+    build_restore_update: Callable[[dict, dict, dict], tuple[dict, dict]]
+
+
+def form_report_restore_builder(build_metadata_update: Callable[..., dict]) -> Callable[[dict, dict, dict], tuple[dict, dict]]:
+    def build_restore_update(report: dict, payload: dict, user: dict) -> tuple[dict, dict]:
+        form_data = payload.get("form_data") if isinstance(payload.get("form_data"), dict) else {}
+        report_data = {"name": report.get("name"), "timestamp": report.get("timestamp"), "formData": form_data}
+        return build_metadata_update(report_data, report, user), payload
+    return build_restore_update
+
+
+def build_ipqc_audit_restore_update(report: dict, payload: dict, user: dict) -> tuple[dict, dict]:
+    metadata, normalized_data = ipqc_audit_route.build_metadata_update(
+        {"name": report["name"], "timestamp": report["timestamp"], "data": payload},
+        report,
+        user,
+    )
+    # The payload carries its dataVersion too; autosave compares the two.
+    metadata["dataVersion"] = normalized_data["dataVersion"] = get_audit_data_version(report) + 1
+    return metadata, normalized_data
+
+
+PAYLOAD_REPORT_TYPES = {
+    "gel": PayloadReportType(
+        collection=gel_route.gel_test_collection,
+        get_current_user=gel_route.get_gel_current_user,
+        can_view=gel_route.can_view_report,
+        can_edit=gel_route.can_edit_report,
+        build_restore_update=form_report_restore_builder(gel_route.build_metadata_update),
+    ),
+    "adhesion": PayloadReportType(
+        collection=adhesion_route.adhesion_test_collection,
+        get_current_user=adhesion_route.get_adhesion_current_user,
+        can_view=adhesion_route.can_view_report,
+        can_edit=adhesion_route.can_edit_report,
+        build_restore_update=form_report_restore_builder(adhesion_route.build_metadata_update),
+    ),
+    "peel": PayloadReportType(
+        collection=peel_test_route.peel_test_collection,
+        get_current_user=peel_test_route.get_peel_current_user,
+        can_view=peel_test_route.can_view_report,
+        can_edit=peel_test_route.can_edit_report,
+        build_restore_update=form_report_restore_builder(peel_test_route.build_metadata_update),
+    ),
+    "ipqc-audit": PayloadReportType(
+        collection=ipqc_audit_route.ipqc_audit_collection,
+        get_current_user=ipqc_audit_route.get_ipqc_current_user,
+        can_view=ipqc_audit_route.can_view_audit,
+        can_edit=ipqc_audit_route.can_edit_audit,
+        build_restore_update=build_ipqc_audit_restore_update,
+    ),
+}
+
+
+def utc_timestamp() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def load_report_for_payload(report_type: str, report_id: str, employee_id: str | None, edit: bool = False) -> tuple[PayloadReportType, dict, dict]:
+    config = PAYLOAD_REPORT_TYPES.get(report_type)
+    if config is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown report type: {report_type}")
+    user = config.get_current_user(employee_id)
+    if not ObjectId.is_valid(report_id):
+        raise HTTPException(status_code=400, detail="Invalid report ID")
+    report = config.collection.find_one({"_id": ObjectId(report_id)})
+    if not report or not report.get("s3_key"):
+        raise HTTPException(status_code=404, detail="Report not found")
+    allowed = config.can_edit(report, user) if edit else config.can_view(report, user)
+    if not allowed:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not authorized to access this report")
+    return config, report, user
+
+
+def restore_report_payload(config: PayloadReportType, report: dict, version: int, user: dict) -> dict:
+    """Store an earlier payload as the latest version and re-derive the report's summary fields from it."""
+    s3_key = report["s3_key"]
+    if config is PAYLOAD_REPORT_TYPES["ipqc-audit"]:
+        ipqc_audit_autosave_cache.discard(s3_key)
+    metadata, payload = config.build_restore_update(report, report_payload_store.load_version(s3_key, version), user)
+    restored = report_payload_store.save(s3_key, payload, restored_from=version)
+
+    now = utc_timestamp()
+    update = {**metadata, "updated_timestamp": now, "updatedAt": now}
+    config.collection.update_one({"_id": report["_id"]}, {"$set": update})
+    if config is PAYLOAD_REPORT_TYPES["ipqc-audit"]:
+        ipqc_audit_route.queue_stringer_report_refresh(report, {**report, **update})
+    return restored.to_dict()
+
+
+@report_payload_router.get("/{report_type}/{report_id}/versions")
+async def list_report_payload_versions(report_type: str, report_id: str, x_employee_id: str | None = Header(default=None)):
+    try:
+        _, report, _ = load_report_for_payload(report_type, report_id, x_employee_id)
+        versions = await run_in_threadpool(report_payload_store.list_versions, report["s3_key"])
+        return {
+            "latest": versions[-1].version if versions else None,
+            "versions": [entry.to_dict() for entry in reversed(versions)],
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("report_payload_versions_failed report_type=%s report_id=%s", report_type, report_id)
+        raise HTTPException(status_code=500, detail=f"Failed to list report versions: {str(e)}")
+
+
+@report_payload_router.get("/{report_type}/{report_id}/versions/diff")
+async def diff_report_payload_versions(
+    report_type: str,
+    report_id: str,
+    from_version: int = Query(..., alias="from", ge=1),
+    to_version: Optional[int] = Query(None, alias="to", ge=1),
+    x_employee_id: str | None = Header(default=None),
+):
+    """Compare a stored version with another version, or with the latest when ``to`` is omitted."""
+    try:
+        _, report, _ = load_report_for_payload(report_type, report_id, x_employee_id)
+        changes = await run_in_threadpool(report_payload_store.diff, report["s3_key"], from_version, to_version)
+        return {"from": from_version, "to": to_version, "changes": changes}
+    except HTTPException:
+        raise
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]) if e.args else "Version not found")
+    except Exception as e:
+        logger.exception("report_payload_diff_failed report_type=%s report_id=%s", report_type, report_id)
+        raise HTTPException(status_code=500, detail=f"Failed to diff report versions: {str(e)}")
+
+
+@report_payload_router.post("/{report_type}/{report_id}/versions/{version}/restore")
+async def restore_report_payload_version(
+    report_type: str,
+    report_id: str,
+    version: int,
+    x_employee_id: str | None = Header(default=None),
+    x_lock_session_id: str | None = Header(default=None),
+):
+    """Make an earlier payload version current again; the restore is itself recorded as a new version."""
+    try:
+        config, report, user = load_report_for_payload(report_type, report_id, x_employee_id, edit=True)
+        if report_type == "ipqc-audit":
+            ipqc_audit_route.require_edit_lock_if_operator(report, user, x_lock_session_id)
+        restored = await run_in_threadpool(restore_report_payload, config, report, version, user)
+        return {"message": f"Restored version {version}", "version": restored}
+    except HTTPException:
+        raise
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]) if e.args else "Version not found")
+    except Exception as e:
+        logger.exception("report_payload_restore_failed report_type=%s report_id=%s version=%s", report_type, report_id, version)
+        raise HTTPException(status_code=500, detail=f"Failed to restore report version: {str(e)}")
@@ -0,0 +1,34 @@
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+
+from services.shift_compliance_service import build_compliance_matrix
+from services.shift_entry_workflow_service import get_current_user, is_operator, is_reviewer_like
+
+logger = logging.getLogger(__name__)
+
+shift_compliance_router = APIRouter(prefix="/api/shift-compliance", tags=["Shift Compliance"])
+
+
+@shift_compliance_router.get("/matrix")
+async def get_compliance_matrix(
+    date_from: Optional[str] = Query(None),
+    date_to: Optional[str] = Query(None),
+    modules: Optional[str] = Query(None),
+    x_employee_id: str | None = Header(default=None),
+):
+    """Date x shift x line x module completion and workflow state for the daily checksheets."""
+    try:
+        user = get_current_user(x_employee_id)
+        if not (is_operator(user) or is_reviewer_like(user)):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not authorized to view shift compliance")
+        return await run_in_threadpool(build_compliance_matrix, date_from, date_to, modules)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.exception("shift_compliance_matrix_failed")
+        raise HTTPException(status_code=500, detail=f"Failed to build shift compliance matrix: {str(e)}")
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Header, HTTPException, Query, status
-from fastapi.responses import StreamingResponse
+from services.export_streaming import build_export_response
 
 from generators.StringerParameterReportGenerator import generate_stringer_parameter_report
 from routes.ipqc_audit_route import get_ipqc_current_user
 from services.stringer_parameter_report_service import (
     MANUAL_FIELDS,
+    get_month_report,
+    get_month_report_version,
     normalize_report_line,
     synchronize_month_report,
     update_manual_fields,
@@ -56,15 +58,20 @@ async def get_monthly_stringer_parameter_report(
     month: int = Query(..., ge=1, le=12),
     line: str = Query(...),
     refresh: bool = Query(False),
+    known_version: int | None = Query(None, alias="knownVersion"),
     x_employee_id: str | None = Header(default=None),
 ):
     try:
         require_report_access(x_employee_id)
         validate_period(year, month)
-        report = synchronize_month_report(
+        normalized_line = normalize_report_line(line)
+        if known_version is not None and not refresh:
+            if get_month_report_version(year, month, normalized_line) == known_version:
+                return {"success": True, "unchanged": True, "version": known_version}
+        report = get_month_report(
             year,
             month,
-            normalize_report_line(line),
+            normalized_line,
             force_refresh=refresh,
         )
         return {"success": True, "data": report}
@@ -148,13 +155,9 @@ async def export_stringer_parameter_report(
         require_report_access(x_employee_id)
         year, month = parse_period_payload(payload)
         line = normalize_report_line(payload.get("line"))
-        report = synchronize_month_report(year, month, line)
+        report = get_month_report(year, month, line)
         output, filename = generate_stringer_parameter_report(report)
-        return StreamingResponse(
-            output,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
-        )
+        return build_export_response(output, filename)
     except HTTPException:
         raise
     except Exception as exc:
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Header, HTTPException, status
+from fastapi import APIRouter, Header, HTTPException, Query, Response, status
+from fastapi.responses import JSONResponse
 from models.task_model import (
     TaskCreate,
     TaskResponse,
@@ -8,11 +9,22 @@ from models.task_model import (
     parse_task_id,
     serialize_task,
     tasks_collection,
+    tasks_sync_tracker,
+)
+from services.sync_version_service import (
+    InvalidSyncCursorError,
+    SyncCursor,
+    build_delta_response,
+    build_etag,
+    etag_matches,
+    parse_sync_cursor,
 )
 from users.user_db import users_collection
 
 task_router = APIRouter(prefix='/api/tasks', tags=['Tasks'])
 
+TASKS_ETAG_NAME = 'tasks'
+
 VISIBILITY_ROLES = {'Manager', 'Supervisor'}
 BLOCKED_VISIBILITY_EMPLOYEE_ID = '4000061'
 BLOCKED_VISIBILITY_EMPLOYEE_NAME = 'Sanjit Basu'
@@ -42,17 +54,49 @@ def can_manage_task_visibility(
 
     return role in VISIBILITY_ROLES
 
+def is_task_visible(document: dict, can_see_hidden: bool) -> bool:
+    return can_see_hidden or document.get('visibleInMeeting', True) is not False
+
 @task_router.get('', response_model=list[TaskResponse])
 async def get_tasks(
+    response: Response,
+    since: str | None = Query(default=None, description='Cursor from a previous response (empty to start); returns only changed and deleted tasks'),
+    if_none_match: str | None = Header(default=None),
     x_employee_id: str | None = Header(default=None),
     x_employee_name: str | None = Header(default=None),
     x_user_role: str | None = Header(default=None),
-) -> list[dict]:
-    query = {} if can_manage_task_visibility(x_employee_id, x_employee_name, x_user_role) else {
+):
+    can_see_hidden = can_manage_task_visibility(x_employee_id, x_employee_name, x_user_role)
+    query = {} if can_see_hidden else {
         'visibleInMeeting': {'$ne': False},
     }
+    scope = 'all' if can_see_hidden else 'meeting'
+    await tasks_sync_tracker.ensure_indexes()
+    # The version is read before any documents so a concurrent write can only make the response newer than its ETag.
+    cursor = SyncCursor(await tasks_sync_tracker.current_version(), scope)
+    headers = {'ETag': build_etag(TASKS_ETAG_NAME, cursor.version, scope), 'Cache-Control': 'no-cache'}
+    if etag_matches(if_none_match, headers['ETag']):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if since:
+        try:
+            previous_cursor = parse_sync_cursor(since)
+        except InvalidSyncCursorError as error:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error)) from error
+        if previous_cursor.scope == scope and previous_cursor.version <= cursor.version:
+            delta = await tasks_sync_tracker.changes_since(previous_cursor.version)
+            items = [serialize_task(document) for document in delta.changed if is_task_visible(document, can_see_hidden)]
+            deleted = delta.deleted + [
+                str(document['_id']) for document in delta.changed if not is_task_visible(document, can_see_hidden)
+            ]
+            return JSONResponse(build_delta_response(cursor, items, sorted(deleted), reset=False), headers=headers)
+
     documents = await tasks_collection.find(query).sort('createdAt', -1).to_list(length=None)
-    return [serialize_task(document) for document in documents]
+    tasks = [serialize_task(document) for document in documents]
+    if since is not None:
+        return JSONResponse(build_delta_response(cursor, tasks, [], reset=True), headers=headers)
+    response.headers.update(headers)
+    return tasks
 
 @task_router.post('', response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
 async def create_task(
@@ -75,6 +119,7 @@ async def create_task(
             detail='You are not authorized to create hidden meeting tasks',
         )
     result = await tasks_collection.insert_one(task_document)
+    await tasks_sync_tracker.mark_changed(result.inserted_id)
     created_task = await tasks_collection.find_one({'_id': result.inserted_id})
     if not created_task:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail='Failed to create task')
@@ -111,6 +156,7 @@ async def update_task(
             detail='You are not authorized to change task meeting visibility',
         )
     await tasks_collection.update_one({'_id': object_id}, {'$set': task_document})
+    await tasks_sync_tracker.mark_changed(object_id)
     updated_task = await tasks_collection.find_one({'_id': object_id})
     if not updated_task:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail='Failed to load updated task')
@@ -140,6 +186,7 @@ async def update_task_visibility(
     )
     if result.matched_count == 0:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Task not found')
+    await tasks_sync_tracker.mark_changed(object_id)
 
     updated_task = await tasks_collection.find_one({'_id': object_id})
     if not updated_task:
@@ -154,6 +201,7 @@ async def delete_task(task_id: str) -> dict:
     result = await tasks_collection.delete_one({'_id': object_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Task not found')
+    await tasks_sync_tracker.mark_deleted(object_id)
     return {
         'message': 'Task deleted successfully',
         'id': task_id,
@@ -1,16 +1,15 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Header
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response
 from datetime import datetime
 from bson import ObjectId
 import logging
 import os
-import io
-import base64
 from urllib.parse import unquote, urlparse
 from models.user_models import (
     UserCreate, UserResponse, LoginRequest, LoginResponse,
     PasswordChangeRequest, SignatureUpdateRequest, UserUpdate
 )
+from services.signature_image_cache import SIGNATURE_IMAGE_CACHE_CONTROL, etag_matches, signature_image_cache
 from users.user_db import users_collection, generate_password
 
 logger = logging.getLogger(__name__)
@@ -274,6 +273,7 @@ async def upload_signature(
         from s3_service import S3Service
         s3_service = S3Service()
         s3_service.upload_image(s3_key, contents, signature.content_type)
+        signature_image_cache.invalidate(s3_key)
         
         # Update user record with S3 key
         update_result = users_collection.update_one(
@@ -308,6 +308,7 @@ async def remove_signature(employeeId: str):
             from s3_service import S3Service
             s3_service = S3Service()
             s3_service.delete_image(user["signature"])
+            signature_image_cache.invalidate(user["signature"])
         
         # Update user record
         users_collection.update_one(
@@ -321,25 +322,22 @@ async def remove_signature(employeeId: str):
         raise HTTPException(status_code=500, detail=f"Error removing signature: {str(e)}")
 
 @user_router.get("/signature-image")
-async def get_signature_image(source: str):
+async def get_signature_image(source: str, if_none_match: str | None = Header(default=None)):
     signature_key = extract_signature_key(source)
     if not signature_key:
         raise HTTPException(status_code=400, detail="Invalid signature image reference")
 
     try:
-        from s3_service import S3Service
-        s3_service = S3Service()
-        response = s3_service.s3_client.get_object(
-            Bucket=s3_service.bucket_name,
-            Key=signature_key
-        )
-        image_bytes = response["Body"].read()
-        content_type = response.get("ContentType") or "image/png"
-        return StreamingResponse(io.BytesIO(image_bytes), media_type=content_type)
+        image = signature_image_cache.get(signature_key)
     except Exception:
         logger.exception("signature_image_load_failed key=%s", signature_key)
         raise HTTPException(status_code=404, detail="Signature image not found")
 
+    headers = {"ETag": f'"{image.etag}"', "Cache-Control": SIGNATURE_IMAGE_CACHE_CONTROL}
+    if etag_matches(if_none_match, image.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=image.data, media_type=image.content_type, headers=headers)
+
 @user_router.get("/signature/{employeeId}")
 async def get_signature(employeeId: str):
     user = users_collection.find_one({"employeeId": employeeId})
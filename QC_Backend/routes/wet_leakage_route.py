@@ -1,34 +1,29 @@
 import calendar
 import re
 from datetime import datetime
+from functools import partial
 from typing import List, Optional
 
 from bson import ObjectId
 from pymongo.errors import DuplicateKeyError
 from fastapi import APIRouter, Header, HTTPException, Query, status
-from fastapi.responses import StreamingResponse
+from services.export_streaming import build_export_response
 from report_context import apply_report_context
 
 from models.wet_leakage_test_models import WetLeakageDailyEntry, wet_leakage_entries_collection
 from services.creator_resolution_service import (
-    build_lock_owner_metadata,
     get_created_by_label as resolve_created_by_label,
     has_operator_signature,
 )
-from services.dashboard_analytics_service import (
-    build_dashboard_response,
-    resolve_dashboard_date_range as resolve_analytics_dashboard_date_range,
-)
 from services.shift_entry_workflow_service import (
-    APPROVED_REPORT_DELETE_FORBIDDEN_MESSAGE,
     EDITABLE_OPERATOR_STATES,
     LOCK_FIELDS,
-    WORKFLOW_STATES,
-    add_bulk_failure,
-    add_bulk_skip,
-    build_access_query,
+    ShiftEntryModule,
+    approve_shift_entry,
     build_created_metadata,
     build_draft_lock_metadata,
+    bulk_approve_shift_entries,
+    bulk_delete_shift_entries,
     can_approve_entry,
     can_create_entry,
     can_delete_entry,
@@ -37,13 +32,13 @@ from services.shift_entry_workflow_service import (
     can_return_entry,
     can_submit_entry,
     can_view_entry,
-    combine_queries,
-    create_bulk_result,
-    get_bulk_status_label,
+    delete_shift_entry,
     get_current_user,
-    is_operator,
-    is_reviewer_like,
+    get_shift_entry,
+    get_shift_entry_dashboard,
+    get_shift_entry_register,
     normalize_workflow_state,
+    return_shift_entry,
     utc_timestamp,
 )
 
@@ -328,14 +323,6 @@ def build_search_query(search: Optional[str]) -> dict:
     }
 
 
-def build_status_query(status_filter: Optional[str]) -> dict:
-    if status_filter not in WORKFLOW_STATES:
-        return {}
-    if status_filter == "submitted":
-        return {"$or": [{"workflowState": "submitted"}, {"workflowState": {"$exists": False}}, {"workflowState": None}, {"status": "submitted"}]}
-    return {"workflowState": status_filter}
-
-
 def build_entry_filter_query(*, date_from: Optional[str] = None, date_to: Optional[str] = None) -> dict:
     filters: dict = {}
     if date_from or date_to:
@@ -366,32 +353,35 @@ def _legacy_line_i_filter(date_key):
     return {"date": date_key, "lineGroup": {"$exists": False}}
 
 
+WET_LEAKAGE_ENTRY_MODULE = ShiftEntryModule(
+    label="Wet Leakage",
+    model=WetLeakageDailyEntry,
+    collection=wet_leakage_entries_collection,
+    serialize_entry=serialize_entry,
+    serialize_summary=serialize_entry_summary,
+    build_search_query=build_search_query,
+    build_filter_query=build_entry_filter_query,
+    sort_options=SORT_OPTIONS,
+    dashboard_item_sort=(("date", -1), ("createdAt", 1), ("created_at", 1)),
+    dashboard_daily_group_field="date",
+    approval_signature="approvedBy",
+    default_signatures={},
+    approval_fields=lambda entry, user, now: {"approvedBySignature": user["name"]},
+    update_with_existing_entry=True,
+)
+
+
 @wet_leakage_router.get("/dashboard")
 async def get_wet_leakage_dashboard(view: str = Query("daily", pattern="^(daily|weekly|monthly)$"), x_employee_id: str | None = Header(default=None)):
-    try:
-        user = get_current_user(x_employee_id)
-        date_from, date_to = resolve_analytics_dashboard_date_range(view)
-        query = combine_queries(build_access_query(user), build_entry_filter_query(date_from=date_from, date_to=date_to))
-        return build_dashboard_response(
-            collection=wet_leakage_entries_collection,
-            query=query,
-            view=view,
-            total_key="totalEntries",
-            state_fields=("workflowState", "status"),
-            serialize_item=lambda entry: serialize_entry_summary(entry, user),
-            item_sort=[("date", -1), ("createdAt", 1), ("created_at", 1)],
-            daily_group_field="date",
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch Wet Leakage dashboard: {str(e)}")
+    return get_shift_entry_dashboard(WET_LEAKAGE_ENTRY_MODULE, partial(get_current_user, x_employee_id), view)
 
 
 @wet_leakage_router.get("/entries/register")
 async def get_entry_register(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; send it empty to start cursor pagination"),
+    include_total: bool = Query(True, description="Include a bounded total count with cursor pages"),
     search: Optional[str] = Query(None),
     sort: str = Query("date-newest"),
     date_from: Optional[str] = Query(None),
@@ -399,35 +389,24 @@ async def get_entry_register(
     status_filter: Optional[str] = Query(None, alias="status"),
     x_employee_id: str | None = Header(default=None),
 ):
-    try:
-        user = get_current_user(x_employee_id)
-        query = combine_queries(build_access_query(user), build_search_query(search), build_entry_filter_query(date_from=date_from, date_to=date_to), build_status_query(status_filter))
-        sort_field, sort_direction = SORT_OPTIONS.get(sort, SORT_OPTIONS["date-newest"])
-        total = wet_leakage_entries_collection.count_documents(query)
-        entries = list(wet_leakage_entries_collection.find(query).sort(sort_field, sort_direction).skip((page - 1) * page_size).limit(page_size))
-        return {"items": [serialize_entry_summary(entry, user) for entry in entries], "total": total, "page": page, "page_size": page_size}
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch entry register: {str(e)}")
+    return get_shift_entry_register(
+        WET_LEAKAGE_ENTRY_MODULE,
+        partial(get_current_user, x_employee_id),
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+        include_total=include_total,
+        search=search,
+        sort=sort,
+        status_filter=status_filter,
+        date_from=date_from,
+        date_to=date_to,
+    )
 
 
 @wet_leakage_router.get("/entries/by-id/{entry_id}")
 async def get_entry_by_id(entry_id: str, x_employee_id: str | None = Header(default=None)):
-    try:
-        user = get_current_user(x_employee_id)
-        if not ObjectId.is_valid(entry_id):
-            raise HTTPException(status_code=400, detail="Invalid entry ID")
-        entry = WetLeakageDailyEntry.get_by_id(entry_id)
-        if not entry:
-            raise HTTPException(status_code=404, detail="Entry not found")
-        if not can_view_entry(entry, user):
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not authorized to open this entry")
-        return serialize_entry(entry, user, include_permissions=True)
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch entry: {str(e)}")
+    return get_shift_entry(WET_LEAKAGE_ENTRY_MODULE, partial(get_current_user, x_employee_id), entry_id)
 
 
 @wet_leakage_router.get("/entries/by-date/{date}")
@@ -576,167 +555,27 @@ async def submit_entry(entry_id: str, entry: dict | None = None, x_employee_id:
 
 @wet_leakage_router.post("/entries/{entry_id}/approve")
 async def approve_entry(entry_id: str, x_employee_id: str | None = Header(default=None)):
-    try:
-        user = get_current_user(x_employee_id)
-        if not ObjectId.is_valid(entry_id):
-            raise HTTPException(status_code=400, detail="Invalid entry ID")
-        existing_entry = WetLeakageDailyEntry.get_by_id(entry_id)
-        if not existing_entry:
-            raise HTTPException(status_code=404, detail="Entry not found")
-        if not can_approve_entry(existing_entry, user):
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only submitted entries can be approved")
-        now = utc_timestamp()
-        signatures = existing_entry.get("signatures") if isinstance(existing_entry.get("signatures"), dict) else {}
-        signatures["approvedBy"] = user["name"]
-        updated = WetLeakageDailyEntry.update_by_id(entry_id, {**existing_entry, "status": "approved", "workflowState": "approved", "signatures": signatures, "approvedBySignature": user["name"], "approvedAt": now, "approvedBy": user["name"], "updatedAt": now, "updated_at": now}, {field: "" for field in LOCK_FIELDS})
-        if not updated:
-            raise HTTPException(status_code=500, detail="Failed to approve entry")
-        return serialize_entry(WetLeakageDailyEntry.get_by_id(entry_id), user, include_permissions=True)
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to approve entry: {str(e)}")
+    return approve_shift_entry(WET_LEAKAGE_ENTRY_MODULE, partial(get_current_user, x_employee_id), entry_id)
 
 
 @wet_leakage_router.post("/entries/{entry_id}/return")
 async def return_entry(entry_id: str, request_data: dict, x_employee_id: str | None = Header(default=None)):
-    try:
-        user = get_current_user(x_employee_id)
-        if not ObjectId.is_valid(entry_id):
-            raise HTTPException(status_code=400, detail="Invalid entry ID")
-        existing_entry = WetLeakageDailyEntry.get_by_id(entry_id)
-        if not existing_entry:
-            raise HTTPException(status_code=404, detail="Entry not found")
-        if not can_return_entry(existing_entry, user):
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only submitted entries can be returned")
-        return_comments = (request_data.get("returnComments") or "").strip()
-        if not return_comments:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Return comments are required")
-        now = utc_timestamp()
-        lock_owner = build_lock_owner_metadata(existing_entry)
-        updated = WetLeakageDailyEntry.update_by_id(entry_id, {**existing_entry, "status": "returned", "workflowState": "returned", "returnedAt": now, "returnedBy": user["name"], "returnComments": return_comments, "lockedBy": lock_owner.get("lockedBy") or "Operator", "lockedByUserId": lock_owner.get("lockedByUserId"), "lockedByEmployeeId": lock_owner.get("lockedByEmployeeId"), "lockTimestamp": now, "lockSessionId": None, "updatedAt": now, "updated_at": now})
-        if not updated:
-            raise HTTPException(status_code=500, detail="Failed to return entry")
-        return serialize_entry(WetLeakageDailyEntry.get_by_id(entry_id), user, include_permissions=True)
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to return entry: {str(e)}")
+    return return_shift_entry(WET_LEAKAGE_ENTRY_MODULE, partial(get_current_user, x_employee_id), entry_id, request_data)
 
 
 @wet_leakage_router.delete("/entries/by-id/{entry_id}")
 async def delete_entry_by_id(entry_id: str, x_employee_id: str | None = Header(default=None)):
-    try:
-        user = get_current_user(x_employee_id)
-        if not ObjectId.is_valid(entry_id):
-            raise HTTPException(status_code=400, detail="Invalid entry ID")
-        entry = WetLeakageDailyEntry.get_by_id(entry_id)
-        if not entry:
-            raise HTTPException(status_code=404, detail="Entry not found")
-        if normalize_workflow_state(entry) == "approved":
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=APPROVED_REPORT_DELETE_FORBIDDEN_MESSAGE)
-        if not can_delete_entry(entry, user):
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not authorized to delete this entry")
-        if not WetLeakageDailyEntry.delete_by_id(entry_id):
-            raise HTTPException(status_code=404, detail="Entry not found")
-        return {"success": True, "message": "Entry deleted successfully"}
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to delete entry: {str(e)}")
+    return delete_shift_entry(WET_LEAKAGE_ENTRY_MODULE, partial(get_current_user, x_employee_id), entry_id)
 
 
 @wet_leakage_router.post("/bulk/approve")
 async def bulk_approve_entries(request_data: dict, x_employee_id: str | None = Header(default=None)):
-    try:
-        user = get_current_user(x_employee_id)
-        if not is_reviewer_like(user):
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only supervisors or managers can approve entries")
-        entry_ids = request_data.get("entryIds") or request_data.get("entry_ids") or request_data.get("reportIds")
-        if not isinstance(entry_ids, list) or not entry_ids:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="entryIds must be a non-empty list")
-        result = create_bulk_result(len(entry_ids))
-        approved_count = 0
-        now = utc_timestamp()
-        for raw_entry_id in entry_ids:
-            item_id = str(raw_entry_id or "").strip()
-            if not ObjectId.is_valid(item_id):
-                add_bulk_failure(result, item_id, "Invalid ID")
-                continue
-            try:
-                existing_entry = WetLeakageDailyEntry.get_by_id(item_id)
-                if not existing_entry:
-                    add_bulk_failure(result, item_id, "Not Found")
-                    continue
-                if not can_approve_entry(existing_entry, user):
-                    add_bulk_skip(result, get_bulk_status_label(existing_entry))
-                    continue
-                signatures = existing_entry.get("signatures") if isinstance(existing_entry.get("signatures"), dict) else {}
-                signatures["approvedBy"] = user["name"]
-                updated = WetLeakageDailyEntry.update_by_id(item_id, {**existing_entry, "status": "approved", "workflowState": "approved", "signatures": signatures, "approvedBySignature": user["name"], "approvedAt": now, "approvedBy": user["name"], "updatedAt": now, "updated_at": now}, {field: "" for field in LOCK_FIELDS})
-                if not updated:
-                    add_bulk_failure(result, item_id, "Update Failed")
-                    continue
-                approved_count += 1
-            except Exception as item_error:
-                add_bulk_failure(result, item_id, str(item_error))
-        result["approved"] = approved_count
-        result["processed"] = approved_count
-        result["skippedCount"] = sum(result["skipped"].values())
-        result["failedCount"] = len(result["failed"])
-        return result
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to bulk approve entries: {str(e)}")
+    return bulk_approve_shift_entries(WET_LEAKAGE_ENTRY_MODULE, partial(get_current_user, x_employee_id), request_data)
 
 
 @wet_leakage_router.post("/bulk/delete")
 async def bulk_delete_entries(request_data: dict, x_employee_id: str | None = Header(default=None)):
-    try:
-        user = get_current_user(x_employee_id)
-        if not (is_operator(user) or is_reviewer_like(user)):
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not authorized to delete entries")
-        entry_ids = request_data.get("entryIds") or request_data.get("entry_ids") or request_data.get("reportIds")
-        if not isinstance(entry_ids, list) or not entry_ids:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="entryIds must be a non-empty list")
-        result = create_bulk_result(len(entry_ids))
-        deleted_count = 0
-        for raw_entry_id in entry_ids:
-            item_id = str(raw_entry_id or "").strip()
-            if not ObjectId.is_valid(item_id):
-                continue
-            existing_entry = WetLeakageDailyEntry.get_by_id(item_id)
-            if existing_entry and normalize_workflow_state(existing_entry) == "approved":
-                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=APPROVED_REPORT_DELETE_FORBIDDEN_MESSAGE)
-        for raw_entry_id in entry_ids:
-            item_id = str(raw_entry_id or "").strip()
-            if not ObjectId.is_valid(item_id):
-                add_bulk_failure(result, item_id, "Invalid ID")
-                continue
-            try:
-                existing_entry = WetLeakageDailyEntry.get_by_id(item_id)
-                if not existing_entry:
-                    add_bulk_failure(result, item_id, "Not Found")
-                    continue
-                if not can_delete_entry(existing_entry, user):
-                    add_bulk_skip(result, get_bulk_status_label(existing_entry))
-                    continue
-                if not WetLeakageDailyEntry.delete_by_id(item_id):
-                    add_bulk_failure(result, item_id, "Delete Failed")
-                    continue
-                deleted_count += 1
-            except Exception as item_error:
-                add_bulk_failure(result, item_id, str(item_error))
-        result["deleted"] = deleted_count
-        result["processed"] = deleted_count
-        result["skippedCount"] = sum(result["skipped"].values())
-        result["failedCount"] = len(result["failed"])
-        return result
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to bulk delete entries: {str(e)}")
+    return bulk_delete_shift_entries(WET_LEAKAGE_ENTRY_MODULE, partial(get_current_user, x_employee_id), request_data)
 
 
 @wet_leakage_router.delete("/entries/{date}/{line_group}")
@@ -778,11 +617,7 @@ async def export_monthly_excel(
         entries = list(wet_leakage_entries_collection.find({"year": year, "month": month}).sort("date", 1))
         report_data = {"form_data": get_export_form_data(entries), "entries": serialize_docs(entries), "name": filename}
         output, out_filename = generate_wet_leakage_report(report_data)
-        return StreamingResponse(
-            output,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={"Content-Disposition": f'attachment; filename="{out_filename}"'},
-        )
+        return build_export_response(output, out_filename)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate Excel: {str(e)}")
 
@@ -839,11 +674,7 @@ async def export_monthly_excel_post(payload: dict, x_employee_id: str | None = H
         safe_entries = [serialize_doc(entry) for entry in authorized_entries]
         report_data = {"form_data": form_data, "entries": safe_entries, "name": name}
         output, out_filename = generate_wet_leakage_report(report_data)
-        return StreamingResponse(
-            output,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={"Content-Disposition": f'attachment; filename="{out_filename}"'},
-        )
+        return build_export_response(output, out_filename)
     except HTTPException:
         raise
     except Exception as e:
@@ -4,6 +4,7 @@ import logging
 from typing import Dict, Any
 from botocore.exceptions import ClientError
 from aws_config import AWSConfig
+from services.request_metrics_service import instrument_s3_client
 
 logger = logging.getLogger(__name__)
 
@@ -16,12 +17,13 @@ class S3Service:
             aws_secret_access_key=AWSConfig.AWS_SECRET_ACCESS_KEY,
             region_name=AWSConfig.AWS_REGION
         )
+        instrument_s3_client(self.s3_client)
         self.bucket_name = AWSConfig.S3_BUCKET_NAME
 
     def uploadOrOverwriteJson(self, s3Key: str, data: Dict[str, Any]) -> bool:
         """Upload or overwrite JSON data in S3 using exact s3Key"""
         try:
-            json_data = json.dumps(data, ensure_ascii=False, indent=2)
+            json_data = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
             self.s3_client.put_object(
                 Bucket=self.bucket_name,
                 Key=s3Key,
@@ -61,7 +63,7 @@ class S3Service:
     def upload_json(self, folder: str, filename: str, data: Dict[str, Any]) -> str:
         try:
             s3_key = f"{AWSConfig.S3_BASE_PATH}/{folder}/{filename}"
-            json_data = json.dumps(data, ensure_ascii=False, indent=2)
+            json_data = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
             self.s3_client.put_object(
                 Bucket=self.bucket_name,
                 Key=s3_key,
@@ -0,0 +1,89 @@
+"""JSON responses that encode Mongo documents directly.
+
+Routes that return large lists of raw documents hand them to one of these
+response classes instead of converting every document in Python first
+(``json.loads(json_util.dumps(doc))``, ``str(doc["_id"])``) and then letting
+FastAPI walk the result again with ``jsonable_encoder``. orjson does the
+encoding in one pass and only calls back into Python for BSON types.
+"""
+
+import base64
+import json
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable
+
+from bson import ObjectId, json_util
+from bson.decimal128 import Decimal128
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only where orjson is not installed
+    orjson = None
+    logger.warning("orjson_unavailable falling_back=json")
+
+
+def _plain_default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode("ascii")
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal128):
+        return float(value.to_decimal())
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if hasattr(value, "tolist"):
+        # numpy scalars and arrays when orjson is not doing the encoding.
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _extended_default(value: Any) -> Any:
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return json_util.default(value, json_options=json_util.RELAXED_JSON_OPTIONS)
+
+
+def dumps_bson(content: Any, *, extended: bool = False) -> bytes:
+    """Encode ``content`` to compact UTF-8 JSON.
+
+    By default ObjectIds become strings and datetimes ISO strings, matching the
+    hand-written ``serialize_*`` helpers. ``extended=True`` keeps the relaxed
+    Extended JSON that ``bson.json_util.dumps`` produces (``{"$oid": ...}``,
+    ``{"$date": ...}``) for routes whose clients already read that shape.
+    """
+    default: Callable[[Any], Any] = _extended_default if extended else _plain_default
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if extended:
+            option |= orjson.OPT_PASSTHROUGH_DATETIME
+        return orjson.dumps(content, default=default, option=option)
+    return json.dumps(
+        content,
+        default=default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class BSONJSONResponse(JSONResponse):
+    """Return raw Mongo documents; ObjectIds and datetimes are encoded as strings."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_bson(content)
+
+
+class ExtendedJSONResponse(JSONResponse):
+    """Return raw Mongo documents as relaxed Extended JSON, like ``json_util.dumps``."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_bson(content, extended=True)
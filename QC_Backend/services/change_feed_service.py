@@ -0,0 +1,278 @@
+import asyncio
+import itertools
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterable
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure, PyMongoError
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL_SECONDS = 5
+DEFAULT_SUBSCRIBER_QUEUE_SIZE = 256
+DEFAULT_RETRY_DELAY_SECONDS = 5
+CHANGE_STREAM_UNSUPPORTED_CODES = {40573}
+CHANGE_STREAM_OPERATIONS = {"insert", "update", "replace", "delete"}
+
+
+def _read_int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def utc_timestamp() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+@dataclass(frozen=True)
+class WatchedCollection:
+    channel: str
+    collection_name: str
+    # Indexed stamp bumped on every write; the polling fallback only reads documents past it.
+    version_field: str
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    channel: str
+    collection: str
+    operation: str
+    documentId: str | None
+    revision: int
+    occurredAt: str
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class ChangeSubscription:
+    channels: frozenset[str]
+    queue: asyncio.Queue
+    id: int = field(default=0)
+
+
+WATCHED_COLLECTIONS = (
+    WatchedCollection("tasks", "tasks", "syncVersion"),
+    WatchedCollection("goals", "goals", "syncVersion"),
+    WatchedCollection("reports", "ipqc_audits", "updated_timestamp"),
+    WatchedCollection("reports", "gel_test_reports", "updatedAt"),
+    WatchedCollection("reports", "adhesion_test_reports", "updatedAt"),
+    WatchedCollection("reports", "peel_test_reports", "updatedAt"),
+)
+CHANGE_FEED_CHANNELS = frozenset(spec.channel for spec in WATCHED_COLLECTIONS)
+
+
+def is_change_stream_unsupported(exc: OperationFailure) -> bool:
+    message = str(exc).lower()
+    return exc.code in CHANGE_STREAM_UNSUPPORTED_CODES or "replica set" in message
+
+
+def format_sse(event: str, data: str, event_id: str | int | None = None) -> str:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.extend(f"data: {line}" for line in data.splitlines() or [""])
+    return "\n".join(lines) + "\n\n"
+
+
+class ChangeFeedHub:
+    """Fan out task, goal and report changes to server-sent-event subscribers.
+
+    Each watched collection is read by a single background task per process
+    no matter how many screens are subscribed: a Mongo change stream when
+    the deployment is a replica set, otherwise a poll every
+    ``poll_interval_seconds`` for documents whose version field moved past
+    the last one seen. A collection is watched only while some subscriber
+    listens on its channel. Events only carry ids, so clients refetch
+    through the regular endpoints and keep their existing access rules.
+    """
+
+    def __init__(
+        self,
+        database_factory: Callable[[], Any] | None = None,
+        collections: Iterable[WatchedCollection] = WATCHED_COLLECTIONS,
+        poll_interval_seconds: float = DEFAULT_POLL_INTERVAL_SECONDS,
+        queue_size: int = DEFAULT_SUBSCRIBER_QUEUE_SIZE,
+        retry_delay_seconds: float = DEFAULT_RETRY_DELAY_SECONDS,
+        clock: Callable[[], str] = utc_timestamp,
+    ):
+        self._database_factory = database_factory
+        self._collections = tuple(collections)
+        self._poll_interval_seconds = max(0.1, poll_interval_seconds)
+        self._queue_size = max(1, queue_size)
+        self._retry_delay_seconds = max(0.1, retry_delay_seconds)
+        self._clock = clock
+        self._subscribers: dict[int, ChangeSubscription] = {}
+        self._subscriber_ids = itertools.count(1)
+        self._revision = 0
+        self._watchers: dict[str, asyncio.Task] = {}
+        self._modes: dict[str, str] = {}
+
+    @property
+    def mode(self) -> str:
+        modes = set(self._modes.values())
+        if not modes:
+            return "idle"
+        if modes == {"change-stream"}:
+            return "change-stream"
+        return "polling" if "polling" in modes else "starting"
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def _get_database(self):
+        if self._database_factory is None:
+            from models.task_model import task_db
+            self._database_factory = lambda: task_db
+        return self._database_factory()
+
+    def subscribe(self, channels: Iterable[str]) -> ChangeSubscription:
+        subscription = ChangeSubscription(
+            channels=frozenset(channels) & CHANGE_FEED_CHANNELS or CHANGE_FEED_CHANNELS,
+            queue=asyncio.Queue(maxsize=self._queue_size),
+            id=next(self._subscriber_ids),
+        )
+        self._subscribers[subscription.id] = subscription
+        self._sync_watchers()
+        return subscription
+
+    def unsubscribe(self, subscription: ChangeSubscription) -> None:
+        self._subscribers.pop(subscription.id, None)
+        self._sync_watchers()
+
+    def publish(self, channel: str, collection: str, operation: str, document_id: Any = None) -> ChangeEvent:
+        self._revision += 1
+        event = ChangeEvent(
+            channel=channel,
+            collection=collection,
+            operation=operation,
+            documentId=str(document_id) if document_id is not None else None,
+            revision=self._revision,
+            occurredAt=self._clock(),
+        )
+        for subscription in list(self._subscribers.values()):
+            if channel not in subscription.channels:
+                continue
+            if subscription.queue.full():
+                # A slow screen gets a single resync instead of an unbounded backlog.
+                while not subscription.queue.empty():
+                    subscription.queue.get_nowait()
+                subscription.queue.put_nowait(ChangeEvent(channel, collection, "resync", None, event.revision, event.occurredAt))
+                continue
+            subscription.queue.put_nowait(event)
+        return event
+
+    def _sync_watchers(self) -> None:
+        """Run a watcher for every collection whose channel has a subscriber, and only those."""
+        channels = {channel for subscription in self._subscribers.values() for channel in subscription.channels}
+        for spec in self._collections:
+            task = self._watchers.get(spec.collection_name)
+            if spec.channel not in channels:
+                if task is not None:
+                    task.cancel()
+                    del self._watchers[spec.collection_name]
+                    self._modes.pop(spec.collection_name, None)
+            elif task is None or task.done():
+                self._modes[spec.collection_name] = "starting"
+                self._watchers[spec.collection_name] = asyncio.create_task(self._watch(spec))
+
+    def _stop_watchers(self) -> None:
+        for task in self._watchers.values():
+            task.cancel()
+        self._watchers.clear()
+        self._modes.clear()
+
+    async def _watch(self, spec: WatchedCollection) -> None:
+        collection = self._get_database()[spec.collection_name]
+        resume_token = None
+        while True:
+            try:
+                async with collection.watch(resume_after=resume_token) as stream:
+                    self._modes[spec.collection_name] = "change-stream"
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        operation = change.get("operationType")
+                        if operation in CHANGE_STREAM_OPERATIONS:
+                            self.publish(spec.channel, spec.collection_name, operation, (change.get("documentKey") or {}).get("_id"))
+                        elif operation == "invalidate":
+                            resume_token = None
+                            self.publish(spec.channel, spec.collection_name, "resync")
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as exc:
+                if is_change_stream_unsupported(exc):
+                    logger.info("change_feed_polling_fallback collection=%s", spec.collection_name)
+                    await self._poll(spec, collection)
+                    return
+                logger.warning("change_feed_stream_failed collection=%s error=%s", spec.collection_name, exc, exc_info=True)
+                resume_token = None
+            except PyMongoError as exc:
+                logger.warning("change_feed_stream_interrupted collection=%s error=%s", spec.collection_name, exc)
+            await asyncio.sleep(self._retry_delay_seconds)
+
+    async def _poll(self, spec: WatchedCollection, collection) -> None:
+        """Publish documents stamped at or after the newest stamp seen so far.
+
+        ``$gte`` re-reads the documents sharing the newest stamp so a write that
+        lands with the same stamp after a poll is not missed; the ones already
+        published are skipped. Deletes leave no stamp behind, so a drop in the
+        document count is published as a resync for the channel.
+        """
+        self._modes[spec.collection_name] = "polling"
+        field_name = spec.version_field
+        projection = {field_name: 1}
+        latest_stamp = None
+        published_at_latest: set[str] = set()
+        document_count = None
+        started = False
+        while True:
+            try:
+                if not started:
+                    newest = await collection.find_one({field_name: {"$ne": None}}, projection, sort=[(field_name, DESCENDING)])
+                    latest_stamp = (newest or {}).get(field_name)
+                    published_at_latest = {str(newest["_id"])} if newest else set()
+                    document_count = await collection.estimated_document_count()
+                    started = True
+                else:
+                    query = {field_name: {"$gte": latest_stamp} if latest_stamp is not None else {"$ne": None}}
+                    async for document in collection.find(query, projection, sort=[(field_name, ASCENDING)]):
+                        document_id, stamp = str(document["_id"]), document.get(field_name)
+                        if stamp == latest_stamp and document_id in published_at_latest:
+                            continue
+                        if stamp != latest_stamp:
+                            latest_stamp, published_at_latest = stamp, set()
+                        published_at_latest.add(document_id)
+                        self.publish(spec.channel, spec.collection_name, "update", document_id)
+                    current_count = await collection.estimated_document_count()
+                    if current_count < document_count:
+                        self.publish(spec.channel, spec.collection_name, "resync")
+                    document_count = current_count
+            except asyncio.CancelledError:
+                raise
+            except PyMongoError as exc:
+                logger.warning("change_feed_poll_failed collection=%s error=%s", spec.collection_name, exc)
+            await asyncio.sleep(self._poll_interval_seconds)
+
+    async def shutdown(self) -> None:
+        tasks = list(self._watchers.values())
+        self._stop_watchers()
+        self._subscribers.clear()
+        for task in tasks:
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+
+change_feed_hub = ChangeFeedHub(
+    poll_interval_seconds=_read_int_env("CHANGE_FEED_POLL_INTERVAL_SECONDS", DEFAULT_POLL_INTERVAL_SECONDS),
+    queue_size=_read_int_env("CHANGE_FEED_QUEUE_SIZE", DEFAULT_SUBSCRIBER_QUEUE_SIZE),
+)
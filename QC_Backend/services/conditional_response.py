@@ -0,0 +1,89 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Iterable
+
+from fastapi import Response, status
+
+from services.bson_json_response import dumps_bson
+from services.sync_version_service import etag_matches
+
+
+VERSION_FIELDS = ("updatedAt", "updated_timestamp", "updated_at")
+CACHE_CONTROL = "private, no-cache"
+
+
+@dataclass(frozen=True)
+class ResponseValidators:
+    etag: str
+    last_modified: datetime | None = None
+
+    @property
+    def headers(self) -> dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": CACHE_CONTROL}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+    def matches(self, if_none_match: str | None, if_modified_since: str | None = None) -> bool:
+        """Evaluate the request preconditions; If-None-Match wins when both are sent."""
+        if if_none_match:
+            return etag_matches(if_none_match, self.etag)
+        if if_modified_since and self.last_modified is not None:
+            since = parse_http_date(if_modified_since)
+            return since is not None and self.last_modified <= since
+        return False
+
+    def not_modified_response(self) -> Response:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=self.headers)
+
+
+def parse_http_date(value: str) -> datetime | None:
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def document_version(document: dict, version_fields: Iterable[str] = VERSION_FIELDS) -> Any:
+    for field in version_fields:
+        value = document.get(field)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def build_validators(
+    documents: Iterable[dict],
+    name: str,
+    *,
+    version_fields: Iterable[str] = VERSION_FIELDS,
+    hash_documents: bool = False,
+    variant: Iterable[Any] = (),
+) -> ResponseValidators:
+    """Derive an ETag from the documents a response is built from.
+
+    A document with a version stamp contributes its ``_id`` and stamp, so the
+    ETag changes when any row is edited, added or removed. A document without
+    one is hashed whole. ``hash_documents`` hashes every document for
+    collections where some writes skip the stamp. ``variant`` covers anything
+    else the body depends on, such as the response format or a time-based lock
+    state. No Last-Modified is derived: removing a row leaves the newest stamp
+    where it was, so an If-Modified-Since check would answer 304 for a list
+    that has lost rows.
+    """
+    version_fields = tuple(version_fields)
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(dumps_bson([name, *variant]))
+    document_count = 0
+    for document in documents:
+        document_count += 1
+        version = document_version(document, version_fields)
+        if hash_documents or version is None:
+            digest.update(dumps_bson(document))
+        else:
+            digest.update(dumps_bson([document.get("_id"), version]))
+    digest.update(str(document_count).encode("ascii"))
+    return ResponseValidators(etag=f'W/"{name}-{digest.hexdigest()}"')
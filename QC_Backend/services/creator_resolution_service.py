@@ -45,6 +45,24 @@ IGNORED_SIGNATURE_TOKENS = (
     "returned",
 )
 
+SIGNATURE_CONTAINER_FIELDS = ("formData", "form_data", "data")
+
+
+def build_creator_projection() -> dict[str, int]:
+    """Mongo projection of every stored field ``resolve_creator`` can read.
+
+    Summary projections merge this in so a register row resolves the same
+    creator label as the full document without pulling nested payloads.
+    """
+    signature_paths = (*CREATOR_SIGNATURE_FIELDS, "signatures")
+    paths = [*CREATOR_NAME_FIELDS, "createdByUserId", *signature_paths]
+    for container in SIGNATURE_CONTAINER_FIELDS:
+        paths.extend(f"{container}.{field}" for field in signature_paths)
+    return dict.fromkeys(paths, 1)
+
+
+CREATOR_PROJECTION = build_creator_projection()
+
 
 @dataclass(frozen=True)
 class CreatorResolution:
@@ -117,7 +135,7 @@ def resolve_stored_creator(record: Mapping[str, Any] | None) -> CreatorResolutio
 def iter_signature_sources(record: Mapping[str, Any] | None, payloads: Iterable[Mapping[str, Any] | None] = ()) -> Iterable[Mapping[str, Any]]:
     if isinstance(record, Mapping):
         yield record
-        for key in ("formData", "form_data", "data"):
+        for key in SIGNATURE_CONTAINER_FIELDS:
             nested = record.get(key)
             if isinstance(nested, Mapping):
                 yield nested
@@ -126,7 +144,7 @@ def iter_signature_sources(record: Mapping[str, Any] | None, payloads: Iterable[
         if not isinstance(payload, Mapping):
             continue
         yield payload
-        for key in ("formData", "form_data", "data"):
+        for key in SIGNATURE_CONTAINER_FIELDS:
             nested = payload.get(key)
             if isinstance(nested, Mapping):
                 yield nested
@@ -169,6 +169,7 @@ def build_dashboard_response(
     item_sort: Sequence[tuple[str, int]] | None = None,
     item_limit: int = 500,
     daily_group_field: str = "shift",
+    item_projection: Mapping[str, Any] | None = None,
 ) -> dict:
     date_from, date_to = resolve_dashboard_date_range(view)
     start_date = date.fromisoformat(date_from)
@@ -224,7 +225,7 @@ def build_dashboard_response(
     if view == "daily" and serialize_item:
         raw_items = list(
             collection
-            .find(dict(query))
+            .find(dict(query), dict(item_projection) if item_projection is not None else None)
             .sort(list(item_sort or [("date", -1), ("timestamp", -1)]))
             .limit(item_limit + 1)
         )
@@ -243,6 +244,21 @@ def build_dashboard_response(
     }
 
 
+def build_slot_state_pipeline(
+    *,
+    query: Mapping[str, Any],
+    slot_expressions: Mapping[str, Any],
+    state_fields: Sequence[str] = ("workflowState",),
+    total_key: str = "entries",
+) -> list[dict]:
+    """Workflow-state counts per slot, e.g. per date, shift and line."""
+    return [
+        {"$match": dict(query)},
+        {"$project": {"_workflowState": _workflow_state_expression(state_fields), **slot_expressions}},
+        {"$group": _group_spec({key: f"${key}" for key in slot_expressions}, total_key, False)},
+    ]
+
+
 def ensure_missing_completion_metadata(
     *,
     collection: Any,
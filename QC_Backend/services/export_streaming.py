@@ -0,0 +1,66 @@
+import os
+import tempfile
+
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+DEFAULT_EXPORT_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def _read_int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+EXPORT_SPOOL_MAX_BYTES = max(0, _read_int_env("EXPORT_SPOOL_MAX_BYTES", DEFAULT_EXPORT_SPOOL_MAX_BYTES))
+
+
+def new_export_buffer():
+    """Return a buffer that stays in memory up to EXPORT_SPOOL_MAX_BYTES and then spills to disk."""
+    return tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_BYTES, mode="w+b")
+
+
+def save_workbook_to_spool(workbook):
+    output = new_export_buffer()
+    workbook.save(output)
+    output.seek(0)
+    return output
+
+
+def get_export_size(output) -> int:
+    position = output.tell()
+    output.seek(0, os.SEEK_END)
+    size = output.tell()
+    output.seek(position)
+    return size
+
+
+def iter_export_chunks(output, chunk_size: int = EXPORT_CHUNK_SIZE):
+    """Yield fixed-size chunks so a response never holds more than one chunk per request."""
+    try:
+        while True:
+            chunk = output.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        output.close()
+
+
+def build_export_response(output, filename: str, media_type: str = XLSX_MEDIA_TYPE) -> StreamingResponse:
+    """Stream an export buffer back in chunks and release it once the response is sent."""
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Content-Length": str(get_export_size(output) - output.tell()),
+    }
+    return StreamingResponse(
+        iter_export_chunks(output),
+        media_type=media_type,
+        headers=headers,
+        background=BackgroundTask(output.close),
+    )
@@ -0,0 +1,360 @@
+"""Derive compound indexes from the query shapes the routes actually issue.
+
+Shapes are reduced to equality fields, sort keys and range fields, and each
+shape gets an index in ESR order (Equality, Sort, Range) so the planner can
+match the equality prefix, walk the sort in index order and bound the range
+without an in-memory SORT stage.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Mapping, Sequence
+
+from pymongo import ASCENDING, DESCENDING
+
+IndexKey = tuple[tuple[str, int], ...]
+
+RANGE_OPERATORS = {"$gt", "$gte", "$lt", "$lte", "$ne", "$nin", "$in", "$exists"}
+INDEX_OPTIONS_THAT_PREVENT_DROP = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds", "collation")
+DEFAULT_MAX_COMPOUND_INDEXES = 8
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    """The index-relevant part of one find/aggregate issued against ``collection``."""
+
+    collection: str
+    equality: tuple[str, ...] = ()
+    sort: IndexKey = ()
+    ranges: tuple[str, ...] = ()
+    source: str = ""
+    weight: int = 1
+    sample_filter: Mapping[str, Any] = field(default_factory=dict, compare=False, hash=False)
+
+
+@dataclass
+class IndexProposal:
+    collection: str
+    keys: IndexKey
+    name: str
+    weight: int = 0
+    sources: list[str] = field(default_factory=list)
+
+
+def _is_operator_document(value: Any) -> bool:
+    return isinstance(value, Mapping) and bool(value) and all(str(key).startswith("$") for key in value)
+
+
+def _classify(query: Mapping[str, Any], equality: dict[str, None], ranges: dict[str, None]) -> None:
+    for key, value in query.items():
+        if key == "$and":
+            for clause in value:
+                _classify(clause, equality, ranges)
+            continue
+        if key.startswith("$"):
+            # $or / $nor / $expr branches (e.g. case-insensitive search) are not index-bounded here.
+            continue
+        if not _is_operator_document(value):
+            equality[key] = None
+            continue
+        operators = set(value)
+        if "$eq" in operators or ("$in" in operators and len(value["$in"]) == 1):
+            equality[key] = None
+        elif operators & RANGE_OPERATORS:
+            ranges[key] = None
+        # $regex with $options "i" cannot use index bounds; it is filtered after the scan.
+
+
+def extract_query_shape(
+    collection: str,
+    query: Mapping[str, Any] | None,
+    sort: Sequence[tuple[str, int]] | None = None,
+    *,
+    source: str = "",
+    weight: int = 1,
+) -> QueryShape:
+    equality: dict[str, None] = {}
+    ranges: dict[str, None] = {}
+    _classify(query or {}, equality, ranges)
+    sort_keys = tuple((name, int(direction)) for name, direction in (sort or ()) if name not in equality)
+    sort_fields = {name for name, _ in sort_keys}
+    return QueryShape(
+        collection=collection,
+        equality=tuple(equality),
+        sort=sort_keys,
+        ranges=tuple(name for name in ranges if name not in equality and name not in sort_fields),
+        source=source,
+        weight=weight,
+        sample_filter=dict(query or {}),
+    )
+
+
+def _equality_rank(shapes: Iterable[QueryShape]) -> dict[str, tuple[int, str]]:
+    totals: dict[str, int] = defaultdict(int)
+    for shape in shapes:
+        for name in shape.equality:
+            totals[name] += shape.weight
+    # Most frequently pinned fields first, so related shapes share an index prefix.
+    return {name: (-total, name) for name, total in totals.items()}
+
+
+def esr_index_keys(shape: QueryShape, equality_rank: Mapping[str, tuple[int, str]] | None = None) -> IndexKey:
+    rank = equality_rank or {}
+    equality = sorted(shape.equality, key=lambda name: rank.get(name, (0, name)))
+    keys: list[tuple[str, int]] = [(name, ASCENDING) for name in equality]
+    keys.extend(shape.sort)
+    keys.extend((name, ASCENDING) for name in shape.ranges)
+    return tuple(keys)
+
+
+def _reversed_keys(keys: IndexKey) -> IndexKey:
+    return tuple((name, -direction) for name, direction in keys)
+
+
+def keys_of_index(index_info: Mapping[str, Any]) -> IndexKey:
+    return tuple((name, int(direction)) for name, direction in index_info.get("key", []))
+
+
+def index_serves(index_keys: IndexKey, shape: QueryShape) -> bool:
+    """True when the index matches every equality, walks the sort and holds every range field of ``shape``.
+
+    Equality fields may appear in any order or direction within the prefix,
+    the sort section must match as a whole (forwards or backwards) and range
+    fields only need to be somewhere after it, where they are filtered on
+    index keys before any document is fetched. Without a sort, a range field
+    has to come straight after the equality prefix so it bounds the scan.
+    """
+    equality_end = len(shape.equality)
+    sort_end = equality_end + len(shape.sort)
+    if len(index_keys) < sort_end + (1 if shape.ranges and not shape.sort else 0):
+        return False
+    sort_section = index_keys[equality_end:sort_end]
+    if shape.ranges and not shape.sort and index_keys[sort_end][0] not in shape.ranges:
+        return False
+    return (
+        {name for name, _ in index_keys[:equality_end]} == set(shape.equality)
+        and (sort_section == shape.sort or sort_section == _reversed_keys(shape.sort))
+        and set(shape.ranges) <= {name for name, _ in index_keys[sort_end:]}
+    )
+
+
+def _is_key_prefix(index_keys: IndexKey, keys: IndexKey) -> bool:
+    prefix = index_keys[:len(keys)]
+    return len(index_keys) > len(keys) and (prefix == keys or prefix == _reversed_keys(keys))
+
+
+def _field_token(name: str) -> str:
+    token = re.sub(r"(?<!^)(?=[A-Z])", "_", name.lstrip("_")).replace(".", "_").lower()
+    return token or "id"
+
+
+def proposal_name(prefix: str, keys: IndexKey) -> str:
+    parts = [_field_token(name) + ("_desc" if direction == DESCENDING else "") for name, direction in keys]
+    return f"{prefix}_{'_'.join(parts)}_esr_idx"
+
+
+def propose_indexes(
+    shapes: Iterable[QueryShape],
+    *,
+    existing_indexes: Mapping[str, Mapping[str, Mapping[str, Any]]] | None = None,
+    name_prefixes: Mapping[str, str] | None = None,
+    max_compound_indexes: int = DEFAULT_MAX_COMPOUND_INDEXES,
+) -> list[IndexProposal]:
+    """Greedy ESR index plan: the heaviest shapes not served by an existing index get one.
+
+    ``existing_indexes`` maps collection name to ``index_information()`` output.
+    A proposal whose keys prefix a longer proposal is folded into it, and at most
+    ``max_compound_indexes`` compound indexes per collection serve the shapes.
+    """
+    by_collection: dict[str, list[QueryShape]] = defaultdict(list)
+    for shape in shapes:
+        by_collection[shape.collection].append(shape)
+
+    proposals: list[IndexProposal] = []
+    for collection, collection_shapes in by_collection.items():
+        rank = _equality_rank(collection_shapes)
+        prefix = (name_prefixes or {}).get(collection, collection)
+        existing_keys = [keys_of_index(info) for info in ((existing_indexes or {}).get(collection) or {}).values()]
+
+        weights: dict[IndexKey, int] = defaultdict(int)
+        shapes_by_keys: dict[IndexKey, list[QueryShape]] = defaultdict(list)
+        for shape in collection_shapes:
+            keys = esr_index_keys(shape, rank)
+            if keys and not any(index_serves(existing, shape) for existing in existing_keys):
+                weights[keys] += shape.weight
+                shapes_by_keys[keys].append(shape)
+
+        # Existing compound indexes that already serve a shape count against the budget,
+        # so re-running the plan after --apply proposes nothing new.
+        serving = [
+            keys for keys in existing_keys
+            if len(keys) > 1
+            and any(index_serves(keys, shape) for shape in collection_shapes)
+            and not any(_is_key_prefix(other, keys) for other in existing_keys)
+        ]
+        chosen: list[IndexKey] = []
+        for keys in sorted(weights, key=lambda item: (-weights[item], -len(item), item)):
+            if any(index_serves(other, shape) for other in chosen for shape in shapes_by_keys[keys]):
+                continue
+            remaining = [other for other in chosen if not _is_key_prefix(keys, other)]
+            compound = [other for other in [*remaining, *serving] if len(other) > 1 and not _is_key_prefix(keys, other)]
+            if len(keys) == 1 or len(compound) < max_compound_indexes:
+                chosen = [*remaining, keys]
+
+        collection_proposals = {keys: IndexProposal(collection, keys, proposal_name(prefix, keys)) for keys in chosen}
+        for keys, grouped_shapes in shapes_by_keys.items():
+            for shape in grouped_shapes:
+                host = next((collection_proposals[other] for other in chosen if index_serves(other, shape)), None)
+                if host is None:
+                    continue
+                host.weight += shape.weight
+                if shape.source and shape.source not in host.sources:
+                    host.sources.append(shape.source)
+        proposals.extend(sorted(collection_proposals.values(), key=lambda item: (-item.weight, item.name)))
+    return proposals
+
+
+def find_redundant_indexes(
+    index_information: Mapping[str, Mapping[str, Any]],
+    planned_keys: Iterable[IndexKey] = (),
+) -> list[str]:
+    """Plain indexes whose keys prefix another (existing or planned) index, e.g. ``date`` under ``date, _id``.
+
+    Unique, sparse, partial, TTL and collated indexes change behaviour and are never reported.
+    """
+    all_keys = [keys_of_index(info) for info in index_information.values()]
+    all_keys.extend(planned_keys)
+    redundant = []
+    for index_name, info in index_information.items():
+        keys = keys_of_index(info)
+        if index_name == "_id_" or not keys:
+            continue
+        if any(info.get(option) for option in INDEX_OPTIONS_THAT_PREVENT_DROP):
+            continue
+        if any(_is_key_prefix(other, keys) for other in all_keys):
+            redundant.append(index_name)
+    return sorted(redundant)
+
+
+@dataclass(frozen=True)
+class PlanCheck:
+    index_names: tuple[str, ...]
+    collection_scan: bool
+    blocking_sort: bool
+
+    @property
+    def ok(self) -> bool:
+        return bool(self.index_names) and not self.collection_scan and not self.blocking_sort
+
+
+def _walk_plan(node: Any, stages: list[Mapping[str, Any]]) -> None:
+    if isinstance(node, Mapping):
+        if "stage" in node:
+            stages.append(node)
+        for value in node.values():
+            _walk_plan(value, stages)
+    elif isinstance(node, list):
+        for value in node:
+            _walk_plan(value, stages)
+
+
+def check_winning_plan(explain: Mapping[str, Any]) -> PlanCheck:
+    """Summarise a find/aggregate ``explain`` (classic or SBE) into the stages we care about."""
+    planners = []
+    _collect_query_planners(explain, planners)
+    stages: list[Mapping[str, Any]] = []
+    for planner in planners:
+        _walk_plan(planner.get("winningPlan"), stages)
+    names = tuple(dict.fromkeys(str(stage["indexName"]) for stage in stages if stage.get("indexName")))
+    return PlanCheck(
+        index_names=names,
+        collection_scan=any(stage.get("stage") == "COLLSCAN" for stage in stages),
+        blocking_sort=any(stage.get("stage") in {"SORT", "SORT_KEY_GENERATOR"} for stage in stages),
+    )
+
+
+def _collect_query_planners(node: Any, planners: list[Mapping[str, Any]]) -> None:
+    if isinstance(node, Mapping):
+        planner = node.get("queryPlanner")
+        if isinstance(planner, Mapping):
+            planners.append(planner)
+        for key, value in node.items():
+            if key != "queryPlanner":
+                _collect_query_planners(value, planners)
+    elif isinstance(node, list):
+        for value in node:
+            _collect_query_planners(value, planners)
+
+
+class ShapeRecordingCursor:
+    def __init__(self, recorder: "ShapeRecordingCollection", query: Mapping[str, Any]):
+        self._recorder = recorder
+        self._query = query
+        self._recorded = False
+
+    def sort(self, key_or_list: Any, direction: int | None = None) -> "ShapeRecordingCursor":
+        sort = [(key_or_list, direction or ASCENDING)] if isinstance(key_or_list, str) else list(key_or_list)
+        self._record(sort)
+        return self
+
+    def skip(self, _count: int) -> "ShapeRecordingCursor":
+        return self
+
+    def limit(self, _count: int) -> "ShapeRecordingCursor":
+        return self
+
+    def _record(self, sort: Sequence[tuple[str, int]] | None) -> None:
+        if not self._recorded:
+            self._recorded = True
+            self._recorder.record(self._query, sort)
+
+    def __iter__(self):
+        self._record(None)
+        return iter(())
+
+
+class ShapeRecordingCollection:
+    """Stands in for a pymongo collection and records the shapes a builder issues.
+
+    Lets the advisor drive the real query builders (``build_dashboard_response``,
+    keyset pagination, ...) without a database.
+    """
+
+    def __init__(self, name: str, *, source: str = "", weight: int = 1):
+        self.name = name
+        self.source = source
+        self.weight = weight
+        self.shapes: list[QueryShape] = []
+
+    def record(self, query: Mapping[str, Any] | None, sort: Sequence[tuple[str, int]] | None) -> None:
+        self.shapes.append(extract_query_shape(self.name, query, sort, source=self.source, weight=self.weight))
+
+    def find(self, query: Mapping[str, Any] | None = None, *args: Any, **kwargs: Any) -> ShapeRecordingCursor:
+        return ShapeRecordingCursor(self, query or {})
+
+    def find_one(self, query: Mapping[str, Any] | None = None, *args: Any, **kwargs: Any) -> None:
+        self.record(query or {}, kwargs.get("sort"))
+        return None
+
+    def count_documents(self, query: Mapping[str, Any], *args: Any, **kwargs: Any) -> int:
+        self.record(query, None)
+        return 0
+
+    def estimated_document_count(self, *args: Any, **kwargs: Any) -> int:
+        return 0
+
+    def aggregate(self, pipeline: Sequence[Mapping[str, Any]], *args: Any, **kwargs: Any) -> list:
+        match: Mapping[str, Any] = {}
+        sort: list[tuple[str, int]] | None = None
+        for stage in pipeline:
+            if "$match" in stage and not match and sort is None:
+                match = stage["$match"]
+            elif "$sort" in stage and sort is None:
+                sort = list(stage["$sort"].items())
+            else:
+                break
+        self.record(match, sort)
+        return []
@@ -0,0 +1,154 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKING_COPIES = 64
+OBSERVATION_DELTA_FIELDS = ("value", "sampleReadings", "selectedLine", "lineMapping")
+
+
+def _read_int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def get_audit_data_version(audit: dict) -> int:
+    try:
+        return int(audit.get("dataVersion") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def build_data_version_filter(version: int) -> dict:
+    """Match audits still at ``version``; audits saved before versioning count as version 0."""
+    if version == 0:
+        return {"$or": [{"dataVersion": 0}, {"dataVersion": {"$exists": False}}, {"dataVersion": None}]}
+    return {"dataVersion": version}
+
+
+def find_observation_slot(data: dict, stage_id: Any, parameter_id: Any) -> list:
+    for stage in data.get("stages") or []:
+        if not isinstance(stage, dict) or str(stage.get("id")) != str(stage_id):
+            continue
+        for parameter in stage.get("parameters") or []:
+            if isinstance(parameter, dict) and str(parameter.get("id")) == str(parameter_id):
+                if not isinstance(parameter.get("observations"), list):
+                    parameter["observations"] = []
+                return parameter["observations"]
+    raise ValueError(f"Unknown stage/parameter in autosave delta: {stage_id}/{parameter_id}")
+
+
+def apply_ipqc_audit_delta(data: dict, delta: dict) -> int:
+    """Apply top-level field and per-observation changes to audit data in place.
+
+    ``fields`` replaces top-level keys such as ``date`` or ``signatures``.
+    ``observations`` upserts observations addressed by stage id, parameter id
+    and time slot; only the keys sent are replaced. Returns the number of
+    changes applied.
+    """
+    fields = delta.get("fields") or {}
+    observations = delta.get("observations") or []
+    if not isinstance(fields, dict) or not isinstance(observations, list):
+        raise ValueError("fields must be an object and observations must be a list")
+    if "stages" in fields:
+        raise ValueError("Stage data must be sent as observation deltas")
+
+    for key, value in fields.items():
+        data[key] = value
+
+    for change in observations:
+        if not isinstance(change, dict) or "timeSlot" not in change:
+            raise ValueError("Each observation delta needs stageId, parameterId and timeSlot")
+        slot = find_observation_slot(data, change.get("stageId"), change.get("parameterId"))
+        observation = next(
+            (item for item in slot if isinstance(item, dict) and item.get("timeSlot") == change["timeSlot"]),
+            None,
+        )
+        if observation is None:
+            observation = {"timeSlot": change["timeSlot"], "value": ""}
+            slot.append(observation)
+        for key in OBSERVATION_DELTA_FIELDS:
+            if key in change:
+                observation[key] = change[key]
+
+    return len(fields) + len(observations)
+
+
+@dataclass
+class AuditWorkingCopy:
+    s3_key: str
+    data: dict
+    version: int
+    lock: threading.RLock = field(default_factory=threading.RLock)
+
+
+class IPQCAuditAutosaveCache:
+    """In-process copies of recently autosaved IPQC audit payloads.
+
+    Every autosave is written through to S3 before it is acknowledged, so a
+    restart or redeploy loses nothing; the copy only spares downloading the
+    payload again for the next delta. A copy is reused only while its version
+    matches the audit's Mongo ``dataVersion``, so copies left behind on other
+    workers are reloaded instead of trusted.
+    """
+
+    def __init__(
+        self,
+        save_payload: Callable[[str, dict], Any] | None = None,
+        max_entries: int = DEFAULT_MAX_WORKING_COPIES,
+    ):
+        self._save_payload = save_payload
+        self._max_entries = max(1, max_entries)
+        self._copies: OrderedDict[str, AuditWorkingCopy] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _save(self, s3_key: str, data: dict) -> None:
+        if self._save_payload is not None:
+            self._save_payload(s3_key, data)
+            return
+        from services.report_payload_store import report_payload_store
+        report_payload_store.save(s3_key, data)
+
+    def checkout(self, s3_key: str, version: int, load_data: Callable[[], dict]) -> AuditWorkingCopy:
+        """Return the copy at ``version``, reloading it when another writer moved on."""
+        with self._lock:
+            working_copy = self._copies.get(s3_key)
+            if working_copy is not None and working_copy.version == version:
+                self._copies.move_to_end(s3_key)
+                return working_copy
+
+        working_copy = AuditWorkingCopy(s3_key=s3_key, data=load_data(), version=version)
+        with self._lock:
+            self._copies[s3_key] = working_copy
+            self._copies.move_to_end(s3_key)
+            while len(self._copies) > self._max_entries:
+                self._copies.popitem(last=False)
+        return working_copy
+
+    def commit(self, working_copy: AuditWorkingCopy, data: dict, version: int) -> None:
+        """Write ``data`` to S3, then make it the copy's contents; the copy is dropped if the write fails."""
+        with working_copy.lock:
+            try:
+                self._save(working_copy.s3_key, data)
+            except Exception:
+                logger.exception("ipqc_audit_autosave_write_failed key=%s version=%s", working_copy.s3_key, version)
+                self.discard(working_copy.s3_key)
+                raise
+            working_copy.data = data
+            working_copy.version = version
+
+    def discard(self, s3_key: str) -> None:
+        with self._lock:
+            self._copies.pop(s3_key, None)
+
+
+ipqc_audit_autosave_cache = IPQCAuditAutosaveCache(
+    max_entries=_read_int_env("IPQC_AUTOSAVE_MAX_WORKING_COPIES", DEFAULT_MAX_WORKING_COPIES),
+)
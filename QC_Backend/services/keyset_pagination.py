@@ -0,0 +1,156 @@
+import base64
+import binascii
+import os
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from bson import json_util
+from pymongo import ASCENDING
+
+
+DEFAULT_TOTAL_COUNT_LIMIT = 10000
+CURSOR_VERSION = 1
+
+
+def _read_int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+KEYSET_TOTAL_COUNT_LIMIT = _read_int_env("KEYSET_TOTAL_COUNT_LIMIT", DEFAULT_TOTAL_COUNT_LIMIT)
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class KeysetPage:
+    items: list[dict]
+    next_cursor: str | None
+    total: int | None = None
+    total_is_estimate: bool = False
+
+    def to_response(self, serialize: Callable[[dict], Any], page_size: int) -> dict:
+        response = {
+            "items": [serialize(item) for item in self.items],
+            "page_size": page_size,
+            "next_cursor": self.next_cursor,
+            "has_more": self.next_cursor is not None,
+        }
+        if self.total is not None:
+            response["total"] = self.total
+            response["total_is_estimate"] = self.total_is_estimate
+        return response
+
+
+def encode_cursor(sort_field: str, sort_direction: int, document: dict) -> str:
+    """Build an opaque continuation token from the last document of a page."""
+    payload = {
+        "v": CURSOR_VERSION,
+        "f": sort_field,
+        "d": sort_direction,
+        "k": document.get(sort_field),
+        "id": document["_id"],
+    }
+    raw = json_util.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, sort_field: str, sort_direction: int) -> tuple[Any, Any]:
+    """Return ``(sort_value, _id)`` from a token, rejecting tokens issued for another sort."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json_util.loads(raw.decode("utf-8"))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as exc:
+        raise InvalidCursorError("Invalid pagination cursor") from exc
+    if not isinstance(payload, dict) or payload.get("v") != CURSOR_VERSION or "id" not in payload:
+        raise InvalidCursorError("Invalid pagination cursor")
+    if payload.get("f") != sort_field or payload.get("d") != sort_direction:
+        raise InvalidCursorError("Pagination cursor does not match the requested sort")
+    return payload.get("k"), payload["id"]
+
+
+def build_keyset_query(sort_field: str, sort_direction: int, last_value: Any, last_id: Any) -> dict:
+    """Match documents strictly after ``(last_value, last_id)`` in ``(sort_field, _id)`` order.
+
+    MongoDB sorts null and missing values first, so descending pages end with
+    them and ascending pages start with them.
+    """
+    id_operator = "$gt" if sort_direction == ASCENDING else "$lt"
+    same_value_later_id = {sort_field: last_value, "_id": {id_operator: last_id}}
+    if last_value is None:
+        if sort_direction == ASCENDING:
+            return {"$or": [same_value_later_id, {sort_field: {"$ne": None}}]}
+        return same_value_later_id
+
+    value_operator = "$gt" if sort_direction == ASCENDING else "$lt"
+    clauses = [{sort_field: {value_operator: last_value}}, same_value_later_id]
+    if sort_direction != ASCENDING:
+        clauses.append({sort_field: None})
+    return {"$or": clauses}
+
+
+def count_with_limit(collection, query: dict, limit: int = KEYSET_TOTAL_COUNT_LIMIT) -> tuple[int, bool]:
+    """Count matches up to ``limit``; an unfiltered count uses collection metadata."""
+    if not query:
+        return collection.estimated_document_count(), True
+    total = collection.count_documents(query, limit=limit) if limit else collection.count_documents(query)
+    return total, bool(limit) and total >= limit
+
+
+def combine_with_keyset(query: dict, keyset_query: dict | None) -> dict:
+    if not keyset_query:
+        return query
+    if not query:
+        return keyset_query
+    return {"$and": [query, keyset_query]}
+
+
+def paginate_keyset(
+    collection,
+    query: dict,
+    sort_field: str,
+    sort_direction: int,
+    page_size: int,
+    cursor: str | None = None,
+    include_total: bool = False,
+    post_filter: Callable[[dict], bool] | None = None,
+    projection: dict | None = None,
+) -> KeysetPage:
+    """Fetch one page ordered by ``(sort_field, _id)`` starting after ``cursor``.
+
+    Each page is a bounded index range scan instead of a skip over every
+    earlier document. ``post_filter`` drops documents that cannot be
+    expressed as a query; the page is topped up in further batches.
+    """
+    keyset_query = build_keyset_query(sort_field, sort_direction, *decode_cursor(cursor, sort_field, sort_direction)) if cursor else None
+    sort = [(sort_field, sort_direction), ("_id", sort_direction)]
+    if projection and any(projection.values()) and sort_field not in projection:
+        # Inclusion projections still need the sort key to build the next cursor.
+        projection = {**projection, sort_field: 1}
+    items: list[dict] = []
+
+    while True:
+        batch_query = combine_with_keyset(query, keyset_query)
+        find_args = (batch_query, projection) if projection is not None else (batch_query,)
+        batch = list(collection.find(*find_args).sort(sort).limit(page_size + 1))
+        for document in batch:
+            if post_filter is None or post_filter(document):
+                items.append(document)
+                if len(items) > page_size:
+                    break
+        if len(items) > page_size or len(batch) <= page_size:
+            break
+        keyset_query = build_keyset_query(sort_field, sort_direction, batch[-1].get(sort_field), batch[-1]["_id"])
+
+    has_more = len(items) > page_size
+    items = items[:page_size]
+    next_cursor = encode_cursor(sort_field, sort_direction, items[-1]) if has_more and items else None
+    total = None
+    total_is_estimate = False
+    if include_total and post_filter is None:
+        total, total_is_estimate = count_with_limit(collection, query)
+    return KeysetPage(items=items, next_cursor=next_cursor, total=total, total_is_estimate=total_is_estimate)
@@ -20,6 +20,7 @@ from models.ipqc_audit_models import (
 )
 from models.peel_data_models import peel_data_collection
 from mongo_indexes import ensure_index
+from services.ipqc_audit_autosave_service import build_data_version_filter, get_audit_data_version
 
 logger = logging.getLogger(__name__)
 
@@ -233,6 +234,18 @@ def _source_records(date: str, shift: str, source_record_id: str | None = None)
     return list(peel_data_collection.find(query))
 
 
+def _release_claimed_fields(audit_id: Any, audit: Dict[str, Any], fields: Dict[str, Any]) -> None:
+    """Put back the fields of a claimed version whose S3 write failed."""
+    rollback: Dict[str, Any] = {}
+    previous = {key: audit[key] for key in fields if key in audit}
+    missing = {key: "" for key in fields if key not in audit}
+    if previous:
+        rollback["$set"] = previous
+    if missing:
+        rollback["$unset"] = missing
+    ipqc_audit_collection.update_one({"_id": audit_id, "dataVersion": fields["dataVersion"]}, rollback)
+
+
 def reconcile_audit(audit: Dict[str, Any], *, source_record_id: str | None = None, migrate_legacy: bool = False) -> Dict[str, int]:
     audit_id = audit["_id"]
     now = utc_now()
@@ -253,6 +266,10 @@ def reconcile_audit(audit: Dict[str, Any], *, source_record_id: str | None = Non
     try:
         report = IPQCAudit.from_dict(leased)
         data = report.get_data()
+        current_version = get_audit_data_version(leased)
+        if get_audit_data_version(data) != current_version:
+            # An editor's claimed version has not reached S3 yet; reconcile on top of it next pass.
+            return {"updated": 0, "busy": 1}
         date = _date(data.get("date") or leased.get("date"))
         shift = _shift(data.get("shift") or leased.get("shift"))
         records = _source_records(date, shift, source_record_id)
@@ -262,9 +279,25 @@ def reconcile_audit(audit: Dict[str, Any], *, source_record_id: str | None = Non
         fingerprint = hashlib.sha256(json.dumps(events, sort_keys=True, default=str).encode()).hexdigest()
         if peel_reconciliation_audit_collection.find_one({"eventKey": f"{audit_id}:{fingerprint}"}):
             return {"updated": 0, "busy": 0}
+        # Bumped like an editor's save, so a client still holding the old version gets a 409
+        # instead of autosaving over the reconciled values.
+        data["dataVersion"] = current_version + 1
+        claimed_fields = {
+            **calculate_ipqc_completion(data),
+            "dataVersion": data["dataVersion"],
+            "peelLastReconciledAt": now,
+            "peelLastReconciliationEvent": f"{audit_id}:{fingerprint}",
+            "reportCacheInvalidatedAt": now,
+        }
+        claimed = ipqc_audit_collection.update_one(
+            {"_id": audit_id, "peelReconciliationLease.token": lease_token, **build_data_version_filter(current_version)},
+            {"$set": claimed_fields},
+        )
+        if claimed.matched_count == 0:
+            return {"updated": 0, "busy": 1}
         if not report.save_data(data):
+            _release_claimed_fields(audit_id, leased, claimed_fields)
             raise RuntimeError(f"Unable to persist reconciled audit {audit_id}")
-        completion = calculate_ipqc_completion(data)
         event_doc = {
             "eventKey": f"{audit_id}:{fingerprint}",
             "auditId": str(audit_id),
@@ -275,10 +308,6 @@ def reconcile_audit(audit: Dict[str, Any], *, source_record_id: str | None = Non
             "changes": events,
         }
         peel_reconciliation_audit_collection.update_one({"eventKey": event_doc["eventKey"]}, {"$setOnInsert": event_doc}, upsert=True)
-        ipqc_audit_collection.update_one(
-            {"_id": audit_id, "peelReconciliationLease.token": lease_token},
-            {"$set": {**completion, "peelLastReconciledAt": now, "peelLastReconciliationEvent": event_doc["eventKey"], "reportCacheInvalidatedAt": now}},
-        )
         return {"updated": 1, "busy": 0}
     finally:
         ipqc_audit_collection.update_one({"_id": audit_id, "peelReconciliationLease.token": lease_token}, {"$unset": {"peelReconciliationLease": ""}})
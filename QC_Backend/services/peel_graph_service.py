@@ -0,0 +1,203 @@
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from pymongo import ReplaceOne
+from pymongo.errors import PyMongoError
+
+from models.peel_data_models import (
+    CELL_FACE_SIDES,
+    MEASUREMENT_SUMMARY_FIELD,
+    fill_missing_measurement_summaries,
+    peel_data_collection,
+    peel_graph_rollup_collection,
+    summarize_measurement_arrays,
+    utc_now,
+)
+
+logger = logging.getLogger(__name__)
+
+
+GRAPH_VALUE_FIELDS = ("average_value", "max_value", "min_value")
+ROLLUP_KEY_FIELDS = ("stringer", "year", "month", "date")
+# Everything a rollup rebuild reads per record: the ingest-time summary, not the measurements.
+PEEL_GRAPH_PROJECTION = {
+    "date": 1,
+    "Date": 1,
+    "Unit": 1,
+    "unit": 1,
+    MEASUREMENT_SUMMARY_FIELD: 1,
+}
+
+
+def record_statistics(arrays: Any, cell_face: str) -> tuple[Optional[float], Optional[float], Optional[float]]:
+    """Average of the pad averages, plus max/min of them (averaged across sides for ``both``).
+
+    Max and min are only reported when every requested side has measurements.
+    """
+    summary = summarize_measurement_arrays([arrays])[0]
+    if summary is None:
+        return None, None, None
+    statistics = summary[cell_face]
+    return statistics["average"], statistics["max"], statistics["min"]
+
+
+def _rounded(value: float) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 2)
+
+
+def build_graph_points(records: Iterable[Dict[str, Any]], cell_face: str) -> List[Dict[str, Any]]:
+    """Daily average, max and min of the per-record summaries, accumulated per day with NumPy."""
+    records = list(records)
+    if not records:
+        return []
+
+    day_codes: Dict[str, int] = {}
+    codes = np.array([day_codes.setdefault(record.get("date") or record.get("Date"), len(day_codes)) for record in records])
+    statistics = np.array(
+        [
+            [((record.get(MEASUREMENT_SUMMARY_FIELD) or {}).get(cell_face) or {}).get(name) for name in ("average", "max", "min")]
+            for record in records
+        ],
+        dtype=np.float64,
+    )
+    averages, maxima, minima = statistics.T
+    day_count = len(day_codes)
+
+    measured = ~np.isnan(averages)
+    average_sums = np.bincount(codes[measured], weights=averages[measured], minlength=day_count)
+    average_counts = np.bincount(codes[measured], minlength=day_count)
+    day_maxima = np.full(day_count, np.nan)
+    np.fmax.at(day_maxima, codes, maxima)
+    day_minima = np.full(day_count, np.nan)
+    np.fmin.at(day_minima, codes, minima)
+    record_counts = np.bincount(codes, minlength=day_count)
+    units: List[set] = [set() for _ in range(day_count)]
+    for code, record in zip(codes.tolist(), records):
+        units[code].add(record.get("Unit") or record.get("unit") or "")
+
+    return [
+        {
+            "date": record_date,
+            "average_value": _rounded(average_sums[code] / average_counts[code]) if average_counts[code] else None,
+            "max_value": _rounded(day_maxima[code]),
+            "min_value": _rounded(day_minima[code]),
+            "record_count": int(record_counts[code]),
+            "unit_count": len(units[code]),
+        }
+        for record_date, code in sorted(day_codes.items())
+    ]
+
+
+def graph_source_versions(stringer: int, year: int, month: str, record_date: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Record count and latest ``updated_at`` per day, answered from ``peel_graph_source_idx``."""
+    match: Dict[str, Any] = {"Stringer": stringer, "year": year, "month": month}
+    if record_date:
+        match["date"] = record_date
+    return list(
+        peel_data_collection.aggregate(
+            [
+                {"$match": match},
+                {"$group": {"_id": "$date", "record_count": {"$sum": 1}, "updated_at": {"$max": "$updated_at"}}},
+                {"$sort": {"_id": 1}},
+            ]
+        )
+    )
+
+
+def _rollup_is_current(rollup: Optional[Dict[str, Any]], version: Dict[str, Any]) -> bool:
+    return (
+        rollup is not None
+        and rollup.get("source_record_count") == version["record_count"]
+        and rollup.get("source_updated_at") == version["updated_at"]
+    )
+
+
+def rebuild_graph_rollups(stringer: int, year: int, month: str, versions: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Recompute and store the rollups of the given days from their records' summaries.
+
+    Rollups are stamped with the versions read *before* the records, so a write racing
+    the rebuild leaves the day looking stale and it is rebuilt on the next read.
+    """
+    records = fill_missing_measurement_summaries(
+        list(
+            peel_data_collection.find(
+                {"Stringer": stringer, "year": year, "month": month, "date": {"$in": [version["_id"] for version in versions]}},
+                PEEL_GRAPH_PROJECTION,
+            )
+        )
+    )
+    points_by_face = {
+        cell_face: {point["date"]: point for point in build_graph_points(records, cell_face)}
+        for cell_face in CELL_FACE_SIDES
+    }
+
+    now = utc_now()
+    rollups: Dict[str, Dict[str, Any]] = {}
+    for version in versions:
+        record_date = version["_id"]
+        point = points_by_face["front"].get(record_date)
+        if point is None:
+            continue
+        rollups[record_date] = {
+            "stringer": stringer,
+            "year": year,
+            "month": month,
+            "date": record_date,
+            "faces": {
+                cell_face: {field: points[record_date][field] for field in GRAPH_VALUE_FIELDS}
+                for cell_face, points in points_by_face.items()
+            },
+            "record_count": point["record_count"],
+            "unit_count": point["unit_count"],
+            "source_record_count": version["record_count"],
+            "source_updated_at": version["updated_at"],
+            "updated_at": now,
+        }
+
+    if rollups:
+        try:
+            peel_graph_rollup_collection.bulk_write(
+                [
+                    ReplaceOne({field: rollup[field] for field in ROLLUP_KEY_FIELDS}, rollup, upsert=True)
+                    for rollup in rollups.values()
+                ],
+                ordered=False,
+            )
+        except PyMongoError as exc:
+            logger.warning("peel_graph_rollup_store_failed stringer=%s year=%s month=%s error=%s", stringer, year, month, exc)
+    return rollups
+
+
+def refresh_graph_rollup_day(stringer: int, year: int, month: str, record_date: str) -> None:
+    versions = graph_source_versions(stringer, year, month, record_date)
+    if versions:
+        rebuild_graph_rollups(stringer, year, month, versions)
+    else:
+        peel_graph_rollup_collection.delete_one({"stringer": stringer, "year": year, "month": month, "date": record_date})
+
+
+def load_graph_points(stringer: int, year: int, month: str, cell_face: str, versions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Graph points from the daily rollups, rebuilding only the days whose records changed since."""
+    rollups = {
+        rollup["date"]: rollup
+        for rollup in peel_graph_rollup_collection.find({"stringer": stringer, "year": year, "month": month})
+    }
+    stale = [version for version in versions if not _rollup_is_current(rollups.get(version["_id"]), version)]
+    if stale:
+        rollups.update(rebuild_graph_rollups(stringer, year, month, stale))
+
+    points = []
+    for version in versions:
+        rollup = rollups.get(version["_id"])
+        if rollup is None:
+            continue
+        points.append(
+            {
+                "date": rollup["date"],
+                **{field: rollup["faces"][cell_face][field] for field in GRAPH_VALUE_FIELDS},
+                "record_count": rollup["record_count"],
+                "unit_count": rollup["unit_count"],
+            }
+        )
+    return points
@@ -0,0 +1,359 @@
+"""Development profiler for Mongo access per request.
+
+Enabled with ``QUERY_PROFILER_ENABLED=true``. Every command issued while a
+request (or a ``query_profiler.capture`` block) is active is recorded by a
+pymongo ``CommandListener`` and checked when the request ends for:
+
+- a command count above the route's query budget,
+- the same query shape repeated ``QUERY_PROFILER_N_PLUS_ONE`` times or more,
+- commands slower than ``QUERY_PROFILER_SLOW_MS``,
+- collection scans, found by explaining a sample of read shapes once each.
+
+Findings are logged and kept on ``query_profiler`` so a benchmark or test run
+can fail through ``query_profiler.check_budgets()``.
+"""
+import json
+import logging
+import os
+import random
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from pymongo import monitoring
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUERY_BUDGET = 25
+DEFAULT_N_PLUS_ONE_THRESHOLD = 5
+DEFAULT_SLOW_COMMAND_MS = 100
+DEFAULT_EXPLAIN_SAMPLE_RATE = 0.2
+MAX_EXPLAINS_PER_REQUEST = 3
+# Handshake, auth and cursor bookkeeping say nothing about the route's access pattern.
+IGNORED_COMMANDS = {
+    "explain", "hello", "isMaster", "ismaster", "ping", "buildInfo", "saslStart", "saslContinue",
+    "endSessions", "killCursors", "getLastError",
+}
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct"}
+# The part of each command whose structure identifies a query shape.
+SHAPE_FIELDS = {
+    "find": "filter",
+    "count": "query",
+    "distinct": "query",
+    "findAndModify": "query",
+    "aggregate": "pipeline",
+    "update": "updates",
+    "delete": "deletes",
+}
+# Session and routing fields pymongo adds that explain rejects.
+EXPLAIN_STRIPPED_FIELDS = {"lsid", "txnNumber", "$clusterTime", "$db", "$readPreference", "readConcern", "writeConcern"}
+
+
+def _read_int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _read_float_env(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def parse_route_budgets(value: str | None) -> dict[str, int]:
+    """Parse ``"GET /api/ipqc-audits/=6;PATCH /api/ipqc-audits/{audit_id}/autosave=4"``."""
+    budgets = {}
+    for item in (value or "").split(";"):
+        label, separator, budget = item.rpartition("=")
+        if not separator or not label.strip():
+            continue
+        try:
+            budgets[label.strip()] = int(budget)
+        except ValueError:
+            logger.warning("query_profiler_invalid_route_budget item=%s", item)
+    return budgets
+
+
+@dataclass(frozen=True)
+class QueryProfilerSettings:
+    enabled: bool = False
+    default_budget: int = DEFAULT_QUERY_BUDGET
+    route_budgets: dict[str, int] = field(default_factory=dict)
+    n_plus_one_threshold: int = DEFAULT_N_PLUS_ONE_THRESHOLD
+    slow_command_ms: int = DEFAULT_SLOW_COMMAND_MS
+    explain_sample_rate: float = DEFAULT_EXPLAIN_SAMPLE_RATE
+
+    @classmethod
+    def from_env(cls) -> "QueryProfilerSettings":
+        return cls(
+            enabled=os.getenv("QUERY_PROFILER_ENABLED", "false").lower() in {"1", "true", "yes"},
+            default_budget=_read_int_env("QUERY_PROFILER_BUDGET", DEFAULT_QUERY_BUDGET),
+            route_budgets=parse_route_budgets(os.getenv("QUERY_PROFILER_ROUTE_BUDGETS")),
+            n_plus_one_threshold=_read_int_env("QUERY_PROFILER_N_PLUS_ONE", DEFAULT_N_PLUS_ONE_THRESHOLD),
+            slow_command_ms=_read_int_env("QUERY_PROFILER_SLOW_MS", DEFAULT_SLOW_COMMAND_MS),
+            explain_sample_rate=_read_float_env("QUERY_PROFILER_EXPLAIN_SAMPLE_RATE", DEFAULT_EXPLAIN_SAMPLE_RATE),
+        )
+
+    def budget_for(self, label: str) -> int:
+        return self.route_budgets.get(label, self.default_budget)
+
+
+def shape_of(value: Any) -> Any:
+    """Replace literal values with placeholders so queries differing only in values compare equal."""
+    if isinstance(value, dict):
+        return {key: shape_of(item) for key, item in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        return [shape_of(value[0])] if value else []
+    return "?"
+
+
+def command_shape(command_name: str, command: dict) -> str:
+    collection = command.get(command_name)
+    shape_source = command.get(SHAPE_FIELDS.get(command_name, ""))
+    if command_name in {"update", "delete"} and isinstance(shape_source, list) and shape_source:
+        shape_source = shape_source[0].get("q")
+    return f"{command_name} {collection} {json.dumps(shape_of(shape_source), sort_keys=True)}"
+
+
+def find_collection_scans(explain_result: Any) -> bool:
+    """Whether any winning plan in an explain result (find or aggregate) reads the whole collection."""
+    def has_collscan(plan: Any) -> bool:
+        if isinstance(plan, dict):
+            return plan.get("stage") == "COLLSCAN" or any(has_collscan(item) for item in plan.values())
+        if isinstance(plan, list):
+            return any(has_collscan(item) for item in plan)
+        return False
+
+    if isinstance(explain_result, dict):
+        if "winningPlan" in explain_result and has_collscan(explain_result["winningPlan"]):
+            return True
+        return any(find_collection_scans(item) for item in explain_result.values())
+    if isinstance(explain_result, list):
+        return any(find_collection_scans(item) for item in explain_result)
+    return False
+
+
+@dataclass
+class ProfiledCommand:
+    shape: str
+    command_name: str
+    database: str
+    command: dict
+    duration_ms: float
+
+
+@dataclass
+class QueryFinding:
+    kind: str
+    label: str
+    detail: str
+    occurrences: int = 1
+
+    def describe(self) -> str:
+        return f"{self.kind} {self.label}: {self.detail} (x{self.occurrences})"
+
+
+@dataclass
+class QueryProfile:
+    label: str
+    commands: list[ProfiledCommand] = field(default_factory=list)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def add(self, command: ProfiledCommand) -> None:
+        with self.lock:
+            self.commands.append(command)
+
+    def shape_counts(self) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for command in self.commands:
+            if command.command_name != "getMore":
+                counts[command.shape] = counts.get(command.shape, 0) + 1
+        return counts
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+_current_profile: ContextVar[QueryProfile | None] = ContextVar("query_profile", default=None)
+
+
+class QueryProfiler(monitoring.CommandListener):
+    def __init__(
+        self,
+        settings: QueryProfilerSettings | None = None,
+        explain_client_factory: Callable[[], Any] | None = None,
+        rng: random.Random | None = None,
+    ):
+        self.settings = settings or QueryProfilerSettings.from_env()
+        self._explain_client_factory = explain_client_factory
+        self._explain_client = None
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self._pending: dict[tuple, tuple[QueryProfile, str, dict]] = {}
+        self._explained_shapes: dict[str, bool] = {}
+        self.findings: dict[tuple[str, str, str], QueryFinding] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        profile = _current_profile.get()
+        if profile is None or event.command_name in IGNORED_COMMANDS:
+            return
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (profile, event.database_name, dict(event.command))
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finish(event)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finish(event)
+
+    def _finish(self, event) -> None:
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        profile, database, command = pending
+        profile.add(ProfiledCommand(
+            shape=command_shape(event.command_name, command),
+            command_name=event.command_name,
+            database=database,
+            command=command,
+            duration_ms=event.duration_micros / 1000,
+        ))
+
+    @contextmanager
+    def capture(self, label: str):
+        """Profile the Mongo commands issued inside the block and evaluate them on exit."""
+        profile = QueryProfile(label)
+        token = _current_profile.set(profile)
+        try:
+            yield profile
+        finally:
+            _current_profile.reset(token)
+        self.evaluate(profile)
+
+    def record_finding(self, kind: str, label: str, detail: str) -> None:
+        key = (kind, label, detail)
+        with self._lock:
+            finding = self.findings.get(key)
+            if finding:
+                finding.occurrences += 1
+                return
+            self.findings[key] = QueryFinding(kind, label, detail)
+        logger.warning("query_profiler_%s route=%s %s", kind, label, detail)
+
+    def evaluate(self, profile: QueryProfile) -> None:
+        settings = self.settings
+        budget = settings.budget_for(profile.label)
+        if len(profile.commands) > budget:
+            self.record_finding("budget", profile.label, f"{len(profile.commands)} commands > budget {budget}")
+        for shape, count in profile.shape_counts().items():
+            if count >= settings.n_plus_one_threshold:
+                self.record_finding("n_plus_one", profile.label, f"{shape} repeated {count} times")
+        for command in profile.commands:
+            if command.duration_ms >= settings.slow_command_ms:
+                self.record_finding("slow", profile.label, f"{command.shape} took {command.duration_ms:.0f}ms")
+        self._sample_collection_scans(profile)
+
+    def _sample_collection_scans(self, profile: QueryProfile) -> None:
+        if self.settings.explain_sample_rate <= 0:
+            return
+        explained = 0
+        for command in profile.commands:
+            if explained >= MAX_EXPLAINS_PER_REQUEST:
+                break
+            if command.command_name not in EXPLAINABLE_COMMANDS:
+                continue
+            with self._lock:
+                already_explained = command.shape in self._explained_shapes
+            if already_explained or self._rng.random() >= self.settings.explain_sample_rate:
+                continue
+            explained += 1
+            scanned = self.explain_scans_collection(command)
+            with self._lock:
+                self._explained_shapes[command.shape] = scanned
+            if scanned:
+                self.record_finding("collection_scan", profile.label, command.shape)
+
+    def explain_scans_collection(self, command: ProfiledCommand) -> bool:
+        explained_command = {key: value for key, value in command.command.items() if key not in EXPLAIN_STRIPPED_FIELDS}
+        try:
+            result = self._get_explain_client()[command.database].command(
+                {"explain": explained_command, "verbosity": "queryPlanner"}
+            )
+        except Exception as exc:
+            logger.debug("query_profiler_explain_failed shape=%s error=%s", command.shape, exc)
+            return False
+        return find_collection_scans(result)
+
+    def _get_explain_client(self):
+        if self._explain_client is None:
+            if self._explain_client_factory is None:
+                from pymongo import MongoClient
+                self._explain_client_factory = lambda: MongoClient(os.getenv("MONGODB_URI"))
+            self._explain_client = self._explain_client_factory()
+        return self._explain_client
+
+    def budget_violations(self) -> list[QueryFinding]:
+        with self._lock:
+            return [finding for finding in self.findings.values() if finding.kind == "budget"]
+
+    def check_budgets(self) -> None:
+        violations = self.budget_violations()
+        if violations:
+            raise QueryBudgetExceeded("; ".join(finding.describe() for finding in violations))
+
+    def reset(self) -> None:
+        with self._lock:
+            self.findings.clear()
+
+
+query_profiler = QueryProfiler()
+_query_profiler_installed = False
+
+
+def install_query_profiler() -> bool:
+    """Register the profiler when enabled; only clients created afterwards report to it."""
+    global _query_profiler_installed
+    if not query_profiler.settings.enabled:
+        return False
+    if not _query_profiler_installed:
+        monitoring.register(query_profiler)
+        _query_profiler_installed = True
+    return True
+
+
+class QueryProfilerMiddleware:
+    """Profiles each HTTP request under its ``METHOD /route/{template}`` label.
+
+    Evaluation (including explain sampling) runs after the response was sent,
+    on a worker thread.
+    """
+
+    def __init__(self, app, profiler: QueryProfiler = query_profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        from fastapi.concurrency import run_in_threadpool
+
+        profile = QueryProfile(scope["method"])
+        token = _current_profile.set(profile)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_profile.reset(token)
+            route = getattr(scope.get("route"), "path", None)
+            if route:
+                profile.label = f"{scope['method']} {route}"
+                await run_in_threadpool(self.profiler.evaluate, profile)
@@ -0,0 +1,345 @@
+import logging
+import os
+import posixpath
+import shutil
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable
+
+from bson import ObjectId
+from fastapi import HTTPException, status
+from openpyxl import Workbook, load_workbook
+
+from generators.AdhesionReportGenerator import generate_adhesion_report
+from generators.AuditReportGenerator import generate_audit_report
+from generators.GelReportGenerator import generate_gel_report
+from generators.PeelReportGenerator import generate_peel_report
+from generators.excel_workbook_merge import copy_sheet_into_workbook
+from services.export_streaming import EXPORT_CHUNK_SIZE, XLSX_MEDIA_TYPE, new_export_buffer
+from services.po_line_mapping_service import map_po_to_fab_line
+from services.request_metrics_service import submit_in_request_context
+
+
+logger = logging.getLogger(__name__)
+
+ZIP_MEDIA_TYPE = "application/zip"
+BATCH_EXPORT_FORMATS = {"zip", "workbook"}
+DEFAULT_BATCH_EXPORT_WORKERS = 4
+DEFAULT_BATCH_EXPORT_MAX_REPORTS = 400
+
+
+def _read_int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+BATCH_EXPORT_WORKERS = max(1, _read_int_env("BATCH_EXPORT_WORKERS", DEFAULT_BATCH_EXPORT_WORKERS))
+BATCH_EXPORT_MAX_REPORTS = max(1, _read_int_env("BATCH_EXPORT_MAX_REPORTS", DEFAULT_BATCH_EXPORT_MAX_REPORTS))
+
+
+def get_gel_collection():
+    from models.gel_test_models import gel_test_collection
+    return gel_test_collection
+
+
+def get_adhesion_collection():
+    from models.adhesion_test_models import adhesion_test_collection
+    return adhesion_test_collection
+
+
+def get_peel_collection():
+    from models.peel_test_models import peel_test_collection
+    return peel_test_collection
+
+
+def get_ipqc_audit_collection():
+    from models.ipqc_audit_models import ipqc_audit_collection
+    return ipqc_audit_collection
+
+
+def build_gel_report_data(report: dict) -> dict:
+    from models.gel_test_models import GelTestReport
+
+    gel_data = GelTestReport.from_dict(report).to_dict(include_data=True)
+    report_data = {
+        "form_data": gel_data.get("form_data", {}),
+        "averages": gel_data.get("averages", {}),
+        "name": report["name"],
+    }
+    mapping = map_po_to_fab_line(report.get("productionOrderNo") or report_data["form_data"].get("gel_editable_1"))
+    report_data["form_data"]["productionOrderNo"] = mapping.production_order
+    report_data["form_data"]["lineNumber"] = mapping.line
+    return report_data
+
+
+def build_adhesion_report_data(report: dict) -> dict:
+    from models.adhesion_test_models import AdhesionTestReport
+
+    adhesion_data = AdhesionTestReport.from_dict(report).to_dict(include_data=True)
+    report_data = {
+        "form_data": adhesion_data.get("form_data", {}),
+        "averages": adhesion_data.get("averages", {}),
+        "name": report["name"],
+    }
+    mapping = map_po_to_fab_line(report.get("productionOrderNo") or report_data["form_data"].get("adhesion_editable_1"))
+    report_data["form_data"]["productionOrderNo"] = mapping.production_order
+    report_data["form_data"]["lineNumber"] = mapping.line
+    return report_data
+
+
+def build_peel_report_data(report: dict) -> dict:
+    from models.peel_test_models import PeelTestReport
+
+    peel_data = PeelTestReport.from_dict(report).to_dict(include_data=True)
+    return {
+        "form_data": peel_data.get("form_data", {}),
+        "row_data": peel_data.get("row_data", []),
+        "averages": peel_data.get("averages", {}),
+        "name": report["name"],
+        "line": report.get("line"),
+    }
+
+
+def build_audit_report_data(audit: dict) -> dict:
+    from models.ipqc_audit_models import IPQCAudit
+
+    audit_data = IPQCAudit.from_dict(audit).to_dict(include_data=True)
+    report_data = audit_data.get("data", {}).copy()
+    report_data["name"] = audit["name"]
+    return report_data
+
+
+@dataclass(frozen=True)
+class BatchReportType:
+    name: str
+    folder: str
+    get_collection: Callable[[], Any]
+    build_report_data: Callable[[dict], dict]
+    generate_report: Callable[[dict], tuple[Any, str]]
+    line_fields: tuple[str, ...] = ("lineNumber",)
+
+
+BATCH_REPORT_TYPES = {
+    "gel": BatchReportType("gel", "Gel", get_gel_collection, build_gel_report_data, generate_gel_report),
+    "adhesion": BatchReportType(
+        "adhesion", "Adhesion", get_adhesion_collection, build_adhesion_report_data, generate_adhesion_report
+    ),
+    "peel": BatchReportType(
+        "peel", "Peel", get_peel_collection, build_peel_report_data, generate_peel_report, ("line", "lineNumber")
+    ),
+    "ipqc-audit": BatchReportType(
+        "ipqc-audit", "IPQC_Audit", get_ipqc_audit_collection, build_audit_report_data, generate_audit_report
+    ),
+}
+
+
+@dataclass(frozen=True)
+class BatchReportSelection:
+    report_type: str
+    document: dict
+    explicit: bool
+
+
+@dataclass(frozen=True)
+class GeneratedReport:
+    report_type: str
+    filename: str
+    output: Any
+
+
+def get_batch_report_type(name: Any) -> BatchReportType:
+    report_type = BATCH_REPORT_TYPES.get(str(name or "").strip().lower())
+    if report_type is None:
+        raise ValueError(f"Unsupported report type: {name}. Expected one of {', '.join(BATCH_REPORT_TYPES)}")
+    return report_type
+
+
+def normalize_batch_format(value: Any) -> str:
+    export_format = str(value or "zip").strip().lower()
+    if export_format not in BATCH_EXPORT_FORMATS:
+        raise ValueError("format must be either 'zip' or 'workbook'")
+    return export_format
+
+
+def build_batch_filter_query(report_type: BatchReportType, report_filter: dict) -> dict:
+    query = {}
+    date_range = {}
+    if report_filter.get("date_from"):
+        date_range["$gte"] = str(report_filter["date_from"])
+    if report_filter.get("date_to"):
+        date_range["$lte"] = str(report_filter["date_to"])
+    if date_range:
+        query["date"] = date_range
+    line = report_filter.get("line")
+    if line:
+        line_clauses = [{field: line} for field in report_type.line_fields]
+        if len(line_clauses) == 1:
+            query.update(line_clauses[0])
+        else:
+            query["$or"] = line_clauses
+    if not query:
+        raise ValueError("filter requires date_from, date_to or line")
+    return query
+
+
+def find_batch_reports(request: dict) -> list[BatchReportSelection]:
+    """Resolve explicit report ids and/or a date/line filter into Mongo documents.
+
+    Explicit ids are fetched with one ``$in`` query per report type and must
+    all exist; filtered reports are returned in date order.
+    """
+    requested_reports = request.get("reports") or []
+    report_filter = request.get("filter") or {}
+    if not isinstance(requested_reports, list) or not isinstance(report_filter, dict):
+        raise ValueError("reports must be a list and filter must be an object")
+    if not requested_reports and not report_filter:
+        raise ValueError("Provide reports or a filter to export")
+
+    requested_ids = {}
+    ordered_requests = []
+    for item in requested_reports:
+        if not isinstance(item, dict):
+            raise ValueError("Each report must be an object with type and id")
+        report_type = get_batch_report_type(item.get("type"))
+        report_id = str(item.get("id") or "")
+        if not ObjectId.is_valid(report_id):
+            raise ValueError(f"Invalid report ID: {report_id}")
+        requested_ids.setdefault(report_type.name, []).append(ObjectId(report_id))
+        ordered_requests.append((report_type.name, ObjectId(report_id)))
+
+    documents = {}
+    for type_name, object_ids in requested_ids.items():
+        collection = BATCH_REPORT_TYPES[type_name].get_collection()
+        for document in collection.find({"_id": {"$in": object_ids}}):
+            documents[(type_name, document["_id"])] = document
+
+    selections = []
+    seen = set()
+    for key in ordered_requests:
+        if key in seen:
+            continue
+        seen.add(key)
+        document = documents.get(key)
+        if document is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Report not found: {key[0]} {key[1]}")
+        selections.append(BatchReportSelection(key[0], document, explicit=True))
+
+    if report_filter:
+        type_names = report_filter.get("types") or list(BATCH_REPORT_TYPES)
+        if not isinstance(type_names, list):
+            raise ValueError("filter.types must be a list")
+        for type_name in type_names:
+            report_type = get_batch_report_type(type_name)
+            cursor = report_type.get_collection().find(
+                build_batch_filter_query(report_type, report_filter)
+            ).sort([("date", 1), ("_id", 1)]).limit(BATCH_EXPORT_MAX_REPORTS + 1)
+            for document in cursor:
+                key = (report_type.name, document["_id"])
+                if key not in seen:
+                    seen.add(key)
+                    selections.append(BatchReportSelection(report_type.name, document, explicit=False))
+
+    if len(selections) > BATCH_EXPORT_MAX_REPORTS:
+        raise ValueError(f"A batch export can include at most {BATCH_EXPORT_MAX_REPORTS} reports")
+    return selections
+
+
+def generate_batch_report(selection: BatchReportSelection) -> GeneratedReport:
+    report_type = BATCH_REPORT_TYPES[selection.report_type]
+    report_data = report_type.build_report_data(selection.document)
+    output, filename = report_type.generate_report(report_data)
+    return GeneratedReport(report_type.name, filename, output)
+
+
+def generate_batch_reports(selections: list[BatchReportSelection]) -> list[GeneratedReport]:
+    """Generate workbooks in a thread pool, keeping the requested order.
+
+    Payload downloads from S3 overlap across workers, and each generator keeps
+    its template bytes cached so a batch loads every template only once.
+    Generated workbooks are spooled, so large batches spill to disk instead
+    of accumulating in memory.
+    """
+    if not selections:
+        return []
+    executor = ThreadPoolExecutor(max_workers=min(BATCH_EXPORT_WORKERS, len(selections)))
+    futures = [submit_in_request_context(executor, generate_batch_report, selection) for selection in selections]
+    try:
+        return [future.result() for future in futures]
+    except Exception:
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
+        close_generated_reports([
+            future.result()
+            for future in futures
+            if not future.cancelled() and future.exception() is None
+        ])
+        raise
+    finally:
+        executor.shutdown(wait=True)
+
+
+def close_generated_reports(reports: list[GeneratedReport]) -> None:
+    for report in reports:
+        report.output.close()
+
+
+def build_unique_archive_name(filename: str, used_names: set[str]) -> str:
+    stem, extension = posixpath.splitext(filename)
+    candidate = filename
+    suffix_number = 2
+    while candidate.casefold() in used_names:
+        candidate = f"{stem} ({suffix_number}){extension}"
+        suffix_number += 1
+    used_names.add(candidate.casefold())
+    return candidate
+
+
+def write_batch_zip(reports: list[GeneratedReport], output) -> None:
+    used_names = set()
+    # Workbooks are already deflated, so entries are stored as-is.
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_STORED) as archive:
+        for report in reports:
+            folder = BATCH_REPORT_TYPES[report.report_type].folder
+            archive_name = build_unique_archive_name(posixpath.join(folder, report.filename), used_names)
+            report.output.seek(0)
+            with archive.open(archive_name, "w", force_zip64=True) as entry:
+                shutil.copyfileobj(report.output, entry, EXPORT_CHUNK_SIZE)
+
+
+def write_batch_workbook(reports: list[GeneratedReport], output) -> None:
+    combined = Workbook()
+    combined.remove(combined.active)
+    for report in reports:
+        report.output.seek(0)
+        source_workbook = load_workbook(report.output)
+        stem = posixpath.splitext(report.filename)[0]
+        for source_sheet in source_workbook.worksheets:
+            title = stem if len(source_workbook.worksheets) == 1 else f"{stem} {source_sheet.title}"
+            copy_sheet_into_workbook(source_sheet, combined, title)
+    combined.save(output)
+
+
+def build_batch_export(selections: list[BatchReportSelection], export_format: str):
+    reports = generate_batch_reports(selections)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output = new_export_buffer()
+    try:
+        if export_format == "workbook":
+            write_batch_workbook(reports, output)
+            filename, media_type = f"Report_Export_{timestamp}.xlsx", XLSX_MEDIA_TYPE
+        else:
+            write_batch_zip(reports, output)
+            filename, media_type = f"Report_Export_{timestamp}.zip", ZIP_MEDIA_TYPE
+    except Exception:
+        output.close()
+        raise
+    finally:
+        close_generated_reports(reports)
+    output.seek(0)
+    logger.info("batch_report_export_built reports=%s format=%s", len(reports), export_format)
+    return output, filename, media_type
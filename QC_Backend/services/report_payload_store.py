@@ -0,0 +1,346 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from botocore.exceptions import ClientError
+
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_SCHEMA_VERSION = 1
+DEFAULT_MAX_VERSIONS = 50
+DEFAULT_CACHE_ENTRIES = 64
+KEY_LOCK_STRIPES = 64
+MANIFEST_WRITE_ATTEMPTS = 5
+SUPPORTED_ENCODINGS = {"gzip": ".json.gz", "zstd": ".json.zst", "identity": ".json"}
+
+
+def _read_int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def resolve_payload_encoding(requested: str | None) -> str:
+    """Pick the configured payload encoding, falling back to gzip when zstandard is not installed."""
+    encoding = (requested or "gzip").strip().lower()
+    if encoding in {"none", "json"}:
+        encoding = "identity"
+    if encoding not in SUPPORTED_ENCODINGS:
+        logger.warning("report_payload_encoding_unknown encoding=%s", encoding)
+        return "gzip"
+    if encoding == "zstd":
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            logger.warning("report_payload_zstd_unavailable falling_back=gzip")
+            return "gzip"
+    return encoding
+
+
+def serialize_payload(data: dict) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode_payload(raw: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        return gzip.compress(raw, mtime=0)
+    if encoding == "zstd":
+        import zstandard
+        return zstandard.ZstdCompressor().compress(raw)
+    return raw
+
+
+def decode_payload(body: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "zstd":
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(body)
+    return body
+
+
+def is_missing_key_error(exc: ClientError) -> bool:
+    error_code = str(exc.response.get("Error", {}).get("Code") or "")
+    return error_code in {"NoSuchKey", "404", "NotFound"}
+
+
+def is_write_conflict_error(exc: ClientError) -> bool:
+    error_code = str(exc.response.get("Error", {}).get("Code") or "")
+    return error_code in {"PreconditionFailed", "412", "ConditionalRequestConflict", "409"}
+
+
+def utc_timestamp() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def diff_payloads(old: Any, new: Any, path: str = "") -> list[dict]:
+    """List leaf-level changes between two payloads as ``add``/``remove``/``replace`` operations.
+
+    Paths use ``/`` separators with list indexes, e.g. ``stages/3/parameters/0/observations/1/value``.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes = []
+        for key in old.keys() | new.keys():
+            child_path = f"{path}/{key}" if path else str(key)
+            if key not in new:
+                changes.append({"op": "remove", "path": child_path, "old": old[key]})
+            elif key not in old:
+                changes.append({"op": "add", "path": child_path, "new": new[key]})
+            else:
+                changes.extend(diff_payloads(old[key], new[key], child_path))
+        return sorted(changes, key=lambda change: change["path"]) if not path else changes
+    if isinstance(old, list) and isinstance(new, list):
+        changes = []
+        for index in range(max(len(old), len(new))):
+            child_path = f"{path}/{index}" if path else str(index)
+            if index >= len(new):
+                changes.append({"op": "remove", "path": child_path, "old": old[index]})
+            elif index >= len(old):
+                changes.append({"op": "add", "path": child_path, "new": new[index]})
+            else:
+                changes.extend(diff_payloads(old[index], new[index], child_path))
+        return changes
+    if old != new:
+        return [{"op": "replace", "path": path, "old": old, "new": new}]
+    return []
+
+
+@dataclass(frozen=True)
+class PayloadVersion:
+    version: int
+    sha256: str
+    key: str
+    encoding: str
+    size: int
+    storedSize: int
+    savedAt: str
+    restoredFrom: int | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PayloadVersion":
+        return cls(**{field_name: data.get(field_name) for field_name in cls.__dataclass_fields__})
+
+    def to_dict(self) -> dict:
+        return {key: value for key, value in asdict(self).items() if value is not None}
+
+
+class ReportPayloadStore:
+    """Versioned, compressed storage for report payloads in S3.
+
+    A report payload key such as ``reports/gel/<id>.json`` becomes a prefix:
+    ``reports/gel/<id>/manifest.json`` points at the latest version and keeps
+    a short history, and every version is stored once under
+    ``reports/gel/<id>/versions/<sha256>.json.gz``. Saving unchanged data is a
+    no-op, version objects are immutable so decoded bodies are cached in
+    process, and reports written before versioning are still read from the
+    original key until their next save.
+
+    The manifest is written with an S3 conditional put against the ETag it
+    was read with, and a save that loses the race to another worker re-reads
+    the manifest and tries again. Saves within one process are also
+    serialized per key through a fixed set of striped locks.
+    """
+
+    def __init__(
+        self,
+        s3_service_factory: Callable[[], Any] | None = None,
+        encoding: str | None = None,
+        max_versions: int = DEFAULT_MAX_VERSIONS,
+        cache_entries: int = DEFAULT_CACHE_ENTRIES,
+        clock: Callable[[], str] = utc_timestamp,
+    ):
+        self._s3_service_factory = s3_service_factory
+        self._s3_service = None
+        self._encoding = encoding
+        self._max_versions = max(1, max_versions)
+        self._cache_entries = max(0, cache_entries)
+        self._clock = clock
+        self._bodies: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = tuple(threading.Lock() for _ in range(KEY_LOCK_STRIPES))
+
+    @property
+    def encoding(self) -> str:
+        if self._encoding is None:
+            self._encoding = resolve_payload_encoding(os.getenv("REPORT_PAYLOAD_ENCODING"))
+        return self._encoding
+
+    def _get_s3_service(self):
+        if self._s3_service is None:
+            if self._s3_service_factory is None:
+                from s3_service import S3Service
+                self._s3_service_factory = S3Service
+            self._s3_service = self._s3_service_factory()
+        return self._s3_service
+
+    def _key_lock(self, s3_key: str) -> threading.Lock:
+        return self._key_locks[zlib.crc32(s3_key.encode("utf-8")) % len(self._key_locks)]
+
+    @staticmethod
+    def payload_prefix(s3_key: str) -> str:
+        return s3_key[:-len(".json")] if s3_key.endswith(".json") else s3_key
+
+    def manifest_key(self, s3_key: str) -> str:
+        return f"{self.payload_prefix(s3_key)}/manifest.json"
+
+    def version_key(self, s3_key: str, sha256: str, encoding: str) -> str:
+        return f"{self.payload_prefix(s3_key)}/versions/{sha256}{SUPPORTED_ENCODINGS[encoding]}"
+
+    def _get_object_with_etag(self, key: str) -> tuple[bytes | None, str | None]:
+        s3_service = self._get_s3_service()
+        try:
+            response = s3_service.s3_client.get_object(Bucket=s3_service.bucket_name, Key=key)
+        except ClientError as exc:
+            if is_missing_key_error(exc):
+                return None, None
+            raise
+        return response["Body"].read(), response.get("ETag")
+
+    def _get_object(self, key: str) -> bytes | None:
+        return self._get_object_with_etag(key)[0]
+
+    def _put_object(self, key: str, body: bytes, encoding: str | None = None, **conditions: str) -> None:
+        s3_service = self._get_s3_service()
+        request = {"Bucket": s3_service.bucket_name, "Key": key, "Body": body, "ContentType": "application/json", **conditions}
+        if encoding and encoding != "identity":
+            request["ContentEncoding"] = encoding
+        s3_service.s3_client.put_object(**request)
+
+    def _delete_object(self, key: str) -> None:
+        s3_service = self._get_s3_service()
+        s3_service.s3_client.delete_object(Bucket=s3_service.bucket_name, Key=key)
+
+    def read_manifest(self, s3_key: str) -> dict | None:
+        body = self._get_object(self.manifest_key(s3_key))
+        return json.loads(body) if body is not None else None
+
+    def list_versions(self, s3_key: str) -> list[PayloadVersion]:
+        manifest = self.read_manifest(s3_key) or {}
+        return [PayloadVersion.from_dict(entry) for entry in manifest.get("versions", [])]
+
+    def _read_version_body(self, entry: PayloadVersion) -> bytes:
+        with self._lock:
+            body = self._bodies.get(entry.key)
+            if body is not None:
+                self._bodies.move_to_end(entry.key)
+                return body
+        stored = self._get_object(entry.key)
+        if stored is None:
+            raise FileNotFoundError(f"Payload version {entry.version} is missing at {entry.key}")
+        body = decode_payload(stored, entry.encoding)
+        if self._cache_entries:
+            with self._lock:
+                self._bodies[entry.key] = body
+                while len(self._bodies) > self._cache_entries:
+                    self._bodies.popitem(last=False)
+        return body
+
+    def load(self, s3_key: str) -> dict:
+        manifest = self.read_manifest(s3_key)
+        if manifest and manifest.get("versions"):
+            return json.loads(self._read_version_body(PayloadVersion.from_dict(manifest["versions"][-1])))
+        body = self._get_object(s3_key)
+        if body is None:
+            raise FileNotFoundError(f"No payload stored at {s3_key}")
+        return json.loads(body.decode("utf-8"))
+
+    def load_version(self, s3_key: str, version: int) -> dict:
+        entry = self.get_version(s3_key, version)
+        return json.loads(self._read_version_body(entry))
+
+    def get_version(self, s3_key: str, version: int) -> PayloadVersion:
+        for entry in self.list_versions(s3_key):
+            if entry.version == version:
+                return entry
+        raise KeyError(f"Payload version {version} not found")
+
+    def save(self, s3_key: str, data: dict, restored_from: int | None = None) -> PayloadVersion:
+        raw = serialize_payload(data)
+        sha256 = hashlib.sha256(raw).hexdigest()
+        with self._key_lock(s3_key):
+            for attempt in range(1, MANIFEST_WRITE_ATTEMPTS):
+                try:
+                    return self._save_once(s3_key, raw, sha256, restored_from)
+                except ClientError as exc:
+                    if not is_write_conflict_error(exc):
+                        raise
+                    logger.info("report_payload_manifest_conflict key=%s attempt=%s", s3_key, attempt)
+            return self._save_once(s3_key, raw, sha256, restored_from)
+
+    def _save_once(self, s3_key: str, raw: bytes, sha256: str, restored_from: int | None) -> PayloadVersion:
+        manifest_body, etag = self._get_object_with_etag(self.manifest_key(s3_key))
+        manifest = json.loads(manifest_body) if manifest_body is not None else {"schemaVersion": MANIFEST_SCHEMA_VERSION, "versions": []}
+        versions = [PayloadVersion.from_dict(entry) for entry in manifest.get("versions", [])]
+        if versions and versions[-1].sha256 == sha256 and restored_from is None:
+            return versions[-1]
+
+        existing = next((entry for entry in versions if entry.sha256 == sha256), None)
+        if existing is not None:
+            key, encoding, stored_size = existing.key, existing.encoding, existing.storedSize
+        else:
+            encoding = self.encoding
+            key = self.version_key(s3_key, sha256, encoding)
+            body = encode_payload(raw, encoding)
+            self._put_object(key, body, encoding)
+            stored_size = len(body)
+
+        entry = PayloadVersion(
+            version=(versions[-1].version + 1) if versions else 1,
+            sha256=sha256,
+            key=key,
+            encoding=encoding,
+            size=len(raw),
+            storedSize=stored_size,
+            savedAt=self._clock(),
+            restoredFrom=restored_from,
+        )
+        versions.append(entry)
+        pruned, versions = versions[:-self._max_versions], versions[-self._max_versions:]
+        manifest = {
+            "schemaVersion": MANIFEST_SCHEMA_VERSION,
+            "latest": entry.version,
+            "versions": [item.to_dict() for item in versions],
+        }
+        conditions = {"IfNoneMatch": "*"} if manifest_body is None else {"IfMatch": etag} if etag else {}
+        self._put_object(self.manifest_key(s3_key), serialize_payload(manifest), **conditions)
+
+        retained_keys = {item.key for item in versions}
+        for stale_key in {item.key for item in pruned} - retained_keys:
+            try:
+                self._delete_object(stale_key)
+            except ClientError:
+                logger.warning("report_payload_prune_failed key=%s", stale_key, exc_info=True)
+        logger.debug("report_payload_saved key=%s version=%s size=%s stored=%s", s3_key, entry.version, entry.size, entry.storedSize)
+        return entry
+
+    def restore(self, s3_key: str, version: int) -> PayloadVersion:
+        """Make an earlier version the latest again; history is kept, nothing is re-uploaded."""
+        return self.save(s3_key, self.load_version(s3_key, version), restored_from=version)
+
+    def diff(self, s3_key: str, from_version: int, to_version: int | None = None) -> list[dict]:
+        old = self.load_version(s3_key, from_version)
+        new = self.load_version(s3_key, to_version) if to_version is not None else self.load(s3_key)
+        return diff_payloads(old, new)
+
+    def delete(self, s3_key: str) -> None:
+        with self._key_lock(s3_key):
+            for entry in self.list_versions(s3_key):
+                self._delete_object(entry.key)
+            self._delete_object(self.manifest_key(s3_key))
+            self._delete_object(s3_key)
+
+
+report_payload_store = ReportPayloadStore(
+    max_versions=_read_int_env("REPORT_PAYLOAD_MAX_VERSIONS", DEFAULT_MAX_VERSIONS),
+    cache_entries=_read_int_env("REPORT_PAYLOAD_CACHE_ENTRIES", DEFAULT_CACHE_ENTRIES),
+)
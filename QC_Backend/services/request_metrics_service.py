@@ -0,0 +1,304 @@
+import contextvars
+import functools
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from pymongo import monitoring
+
+
+logger = logging.getLogger(__name__)
+
+MONGO_BACKEND = "mongo"
+S3_BACKEND = "s3"
+OPENPYXL_BACKEND = "openpyxl"
+UNMATCHED_ROUTE = "unmatched"
+REQUEST_DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@dataclass
+class RequestTimings:
+    """Backend time spent while serving one request, shared with its worker threads."""
+
+    durations: dict[str, float] = field(default_factory=lambda: defaultdict(float))
+    counts: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def add(self, backend: str, duration: float) -> None:
+        with self.lock:
+            self.durations[backend] += duration
+            self.counts[backend] += 1
+
+    def snapshot(self) -> dict[str, tuple[int, float]]:
+        with self.lock:
+            return {backend: (self.counts[backend], self.durations[backend]) for backend in self.durations}
+
+
+@dataclass
+class DurationHistogram:
+    bucket_counts: list[int]
+    count: int = 0
+    total: float = 0.0
+
+
+_current_timings: contextvars.ContextVar[RequestTimings | None] = contextvars.ContextVar("request_timings", default=None)
+
+
+class RequestMetricsRegistry:
+    """Process-wide counters rendered in the Prometheus text format."""
+
+    def __init__(self, buckets: tuple[float, ...] = REQUEST_DURATION_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._requests: dict[tuple[str, str, str], int] = defaultdict(int)
+        self._request_seconds: dict[tuple[str, str], DurationHistogram] = {}
+        self._response_bytes: dict[tuple[str, str], int] = defaultdict(int)
+        self._request_backend_seconds: dict[tuple[str, str, str], float] = defaultdict(float)
+        self._backend_calls: dict[tuple[str, str], int] = defaultdict(int)
+        self._backend_seconds: dict[tuple[str, str], float] = defaultdict(float)
+
+    def observe_backend(self, backend: str, operation: str, duration: float) -> None:
+        with self._lock:
+            self._backend_calls[(backend, operation)] += 1
+            self._backend_seconds[(backend, operation)] += duration
+
+    def observe_request(
+        self,
+        method: str,
+        route: str,
+        status_code: int,
+        duration: float,
+        response_bytes: int,
+        backend_timings: dict[str, tuple[int, float]],
+    ) -> None:
+        with self._lock:
+            self._requests[(method, route, str(status_code))] += 1
+            histogram = self._request_seconds.setdefault((method, route), DurationHistogram([0] * len(self.buckets)))
+            for index, bound in enumerate(self.buckets):
+                if duration <= bound:
+                    histogram.bucket_counts[index] += 1
+            histogram.count += 1
+            histogram.total += duration
+            self._response_bytes[(method, route)] += response_bytes
+            for backend, (_, backend_duration) in backend_timings.items():
+                self._request_backend_seconds[(method, route, backend)] += backend_duration
+
+    def reset(self) -> None:
+        with self._lock:
+            for series in (
+                self._requests,
+                self._request_seconds,
+                self._response_bytes,
+                self._request_backend_seconds,
+                self._backend_calls,
+                self._backend_seconds,
+            ):
+                series.clear()
+
+    def render(self) -> str:
+        with self._lock:
+            lines = [
+                "# HELP qc_http_requests_total Requests served, by route template and status.",
+                "# TYPE qc_http_requests_total counter",
+            ]
+            for (method, route, status_code), count in sorted(self._requests.items()):
+                lines.append(f"qc_http_requests_total{format_labels(method=method, route=route, status=status_code)} {count}")
+
+            lines += [
+                "# HELP qc_http_request_duration_seconds Request latency until the response body was sent.",
+                "# TYPE qc_http_request_duration_seconds histogram",
+            ]
+            for (method, route), histogram in sorted(self._request_seconds.items()):
+                for bound, bucket_count in zip(self.buckets, histogram.bucket_counts):
+                    lines.append(f"qc_http_request_duration_seconds_bucket{format_labels(method=method, route=route, le=format_value(bound))} {bucket_count}")
+                lines.append(f"qc_http_request_duration_seconds_bucket{format_labels(method=method, route=route, le='+Inf')} {histogram.count}")
+                lines.append(f"qc_http_request_duration_seconds_sum{format_labels(method=method, route=route)} {format_value(histogram.total)}")
+                lines.append(f"qc_http_request_duration_seconds_count{format_labels(method=method, route=route)} {histogram.count}")
+
+            lines += [
+                "# HELP qc_http_response_bytes_total Response body bytes sent.",
+                "# TYPE qc_http_response_bytes_total counter",
+            ]
+            for (method, route), size in sorted(self._response_bytes.items()):
+                lines.append(f"qc_http_response_bytes_total{format_labels(method=method, route=route)} {size}")
+
+            lines += [
+                "# HELP qc_http_request_backend_seconds_total Time requests spent waiting on each backend.",
+                "# TYPE qc_http_request_backend_seconds_total counter",
+            ]
+            for (method, route, backend), total in sorted(self._request_backend_seconds.items()):
+                lines.append(f"qc_http_request_backend_seconds_total{format_labels(method=method, route=route, backend=backend)} {format_value(total)}")
+
+            lines += [
+                "# HELP qc_backend_calls_total Mongo commands, S3 API calls and workbook builds.",
+                "# TYPE qc_backend_calls_total counter",
+            ]
+            for (backend, operation), count in sorted(self._backend_calls.items()):
+                lines.append(f"qc_backend_calls_total{format_labels(backend=backend, operation=operation)} {count}")
+
+            lines += [
+                "# HELP qc_backend_duration_seconds_total Time spent in each backend operation.",
+                "# TYPE qc_backend_duration_seconds_total counter",
+            ]
+            for (backend, operation), total in sorted(self._backend_seconds.items()):
+                lines.append(f"qc_backend_duration_seconds_total{format_labels(backend=backend, operation=operation)} {format_value(total)}")
+        return "\n".join(lines) + "\n"
+
+
+request_metrics = RequestMetricsRegistry()
+
+
+def format_value(value: float) -> str:
+    return repr(float(value))
+
+
+def escape_label_value(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(**labels: Any) -> str:
+    return "{" + ",".join(f'{name}="{escape_label_value(value)}"' for name, value in labels.items()) + "}"
+
+
+def record_backend_call(backend: str, operation: str, duration: float) -> None:
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.add(backend, duration)
+    request_metrics.observe_backend(backend, operation, duration)
+
+
+@contextmanager
+def track_backend(backend: str, operation: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_backend_call(backend, operation, time.perf_counter() - started)
+
+
+def timed_backend(backend: str, operation: str | None = None) -> Callable:
+    """Decorator billing a function's wall time to ``backend`` (e.g. workbook generation)."""
+    def decorator(function: Callable) -> Callable:
+        label = operation or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with track_backend(backend, label):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def submit_in_request_context(executor, function: Callable, *args: Any):
+    """Submit to a thread pool so backend time spent by the worker is billed to the current request."""
+    return executor.submit(contextvars.copy_context().run, function, *args)
+
+
+class MongoCommandTimer(monitoring.CommandListener):
+    """Bills each Mongo command round trip to the request that issued it.
+
+    pymongo notifies listeners on the thread that ran the command, so the
+    request's context variable is visible here.
+    """
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        record_backend_call(MONGO_BACKEND, event.command_name, event.duration_micros / 1_000_000)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        record_backend_call(MONGO_BACKEND, event.command_name, event.duration_micros / 1_000_000)
+
+
+_mongo_command_timer: MongoCommandTimer | None = None
+
+
+def install_mongo_command_timer() -> MongoCommandTimer:
+    """Register the command timer globally; only clients created afterwards report to it."""
+    global _mongo_command_timer
+    if _mongo_command_timer is None:
+        _mongo_command_timer = MongoCommandTimer()
+        monitoring.register(_mongo_command_timer)
+    return _mongo_command_timer
+
+
+def _start_s3_call(context: dict, **kwargs) -> None:
+    context["request_metrics_started"] = time.perf_counter()
+
+
+def _finish_s3_call(model, context: dict, **kwargs) -> None:
+    started = context.pop("request_metrics_started", None)
+    if started is not None:
+        record_backend_call(S3_BACKEND, model.name, time.perf_counter() - started)
+
+
+def instrument_s3_client(s3_client) -> None:
+    """Time every S3 API call (GetObject, PutObject, ...) made through a boto3 client."""
+    s3_client.meta.events.register("before-call.s3", _start_s3_call)
+    s3_client.meta.events.register("after-call.s3", _finish_s3_call)
+
+
+def format_server_timing(timings: dict[str, tuple[int, float]], total: float) -> str:
+    entries = [
+        f'{backend};desc="{count} calls";dur={duration * 1000:.1f}'
+        for backend, (count, duration) in sorted(timings.items())
+    ]
+    entries.append(f"app;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+class RequestMetricsMiddleware:
+    """Times each HTTP request, broken down by backend.
+
+    Adds a ``Server-Timing`` header covering the work done before the response
+    started, and records latency, response size and backend time per route
+    template once the body has been sent.
+    """
+
+    def __init__(self, app, registry: RequestMetricsRegistry = request_metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        started = time.perf_counter()
+        status_code = 500
+        response_bytes = 0
+
+        async def send_with_metrics(message):
+            nonlocal status_code, response_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                header = format_server_timing(timings.snapshot(), time.perf_counter() - started)
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header.encode("latin-1"))]}
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            _current_timings.reset(token)
+            route = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+            try:
+                self.registry.observe_request(
+                    scope["method"],
+                    route,
+                    status_code,
+                    time.perf_counter() - started,
+                    response_bytes,
+                    timings.snapshot(),
+                )
+            except Exception:
+                logger.exception("request_metrics_record_failed route=%s", route)
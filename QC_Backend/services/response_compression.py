@@ -0,0 +1,123 @@
+import gzip
+import logging
+import os
+
+from starlette.datastructures import Headers, MutableHeaders
+
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - exercised only where brotli is not installed
+    brotli = None
+    logger.warning("response_brotli_unavailable falling_back=gzip")
+
+DEFAULT_MINIMUM_SIZE = 1024
+GZIP_LEVEL = 6
+# Quality 4-5 is where brotli beats gzip -6 on JSON at a similar CPU cost; 11 is for static assets.
+BROTLI_QUALITY = 5
+COMPRESSIBLE_CONTENT_TYPES = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+
+
+def _read_int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def parse_accept_encoding(value: str | None) -> dict[str, float]:
+    accepted: dict[str, float] = {}
+    for item in (value or "").split(","):
+        coding, _, parameters = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        name, _, raw_quality = parameters.strip().partition("=")
+        if name.strip().lower() == "q":
+            try:
+                quality = float(raw_quality)
+            except ValueError:
+                quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def choose_encoding(accept_encoding: str | None, brotli_available: bool | None = None) -> str | None:
+    """Pick ``br`` or ``gzip`` from an Accept-Encoding header, or None to send the body as is."""
+    if brotli_available is None:
+        brotli_available = brotli is not None
+    accepted = parse_accept_encoding(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    candidates = ("br", "gzip") if brotli_available else ("gzip",)
+    for coding in candidates:
+        if accepted.get(coding, wildcard) > 0:
+            return coding
+    return None
+
+
+def is_compressible(headers: Headers, body: bytes, minimum_size: int) -> bool:
+    if len(body) < minimum_size or "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "").lower()
+    return content_type.startswith(COMPRESSIBLE_CONTENT_TYPES)
+
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+class CompressionMiddleware:
+    """Compresses JSON and text responses with brotli or gzip above a size threshold.
+
+    Only single-message bodies are compressed, which covers every JSON route.
+    Streamed responses (the xlsx exports) are already zip containers and pass
+    through untouched, as do small bodies and ``304`` responses.
+    """
+
+    def __init__(self, app, minimum_size: int | None = None):
+        self.app = app
+        self.minimum_size = minimum_size if minimum_size is not None else _read_int_env(
+            "RESPONSE_COMPRESSION_MIN_BYTES", DEFAULT_MINIMUM_SIZE
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        pending_start = None
+
+        async def send_compressed(message):
+            nonlocal pending_start
+            if message["type"] == "http.response.start":
+                pending_start = message
+                return
+            if message["type"] != "http.response.body" or pending_start is None:
+                await send(message)
+                return
+
+            start, pending_start = pending_start, None
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=list(start.get("headers", [])))
+            if message.get("more_body", False) or not is_compressible(headers, body, self.minimum_size):
+                await send(start)
+                await send(message)
+                return
+
+            compressed = compress_body(body, encoding)
+            headers["content-encoding"] = encoding
+            headers["content-length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send({**start, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,201 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, timedelta
+from importlib import import_module
+from typing import Any, Callable, Sequence
+
+from report_context import FAB_LINE_I, FAB_LINES, normalize_fab_line
+from services.dashboard_analytics_service import STATUS_COUNT_KEYS, build_slot_state_pipeline
+from services.request_metrics_service import submit_in_request_context
+
+
+logger = logging.getLogger(__name__)
+
+SHIFTS = ("A", "B", "C")
+MAX_MATRIX_DAYS = 31
+DEFAULT_COMPLIANCE_WORKERS = 6
+# A slot holding several entries shows its least advanced state.
+CELL_STATE_PRECEDENCE = ("returned", "draft", "submitted", "approved")
+MISSING_STATE = "missing"
+UNAVAILABLE_STATE = "unavailable"
+
+
+def _read_int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+COMPLIANCE_WORKERS = max(1, _read_int_env("SHIFT_COMPLIANCE_WORKERS", DEFAULT_COMPLIANCE_WORKERS))
+
+
+def _lazy_collection(module_path: str, name: str) -> Callable[[], Any]:
+    def get_collection():
+        return getattr(import_module(module_path), name)
+    return get_collection
+
+
+@dataclass(frozen=True)
+class ComplianceModule:
+    key: str
+    label: str
+    get_collection: Callable[[], Any]
+    line_fields: tuple[str, ...]
+    per_shift: bool = True
+    state_fields: tuple[str, ...] = ("workflowState", "status")
+    # Line assumed for entries saved before the module recorded one.
+    default_line: str | None = None
+
+    def slot_expressions(self) -> dict:
+        line_expression: Any = None
+        for field in reversed(self.line_fields):
+            line_expression = {"$ifNull": [f"${field}", line_expression]}
+        expressions = {
+            "date": {"$substrCP": [{"$toString": {"$ifNull": ["$date", ""]}}, 0, 10]},
+            "line": line_expression,
+        }
+        if self.per_shift:
+            expressions["shift"] = "$shift"
+        return expressions
+
+    def normalize_line(self, value: Any) -> str | None:
+        if value in (None, ""):
+            return self.default_line
+        return normalize_fab_line(value, allow_legacy=True)
+
+
+COMPLIANCE_MODULES = (
+    ComplianceModule("ssh", "SSH", _lazy_collection("models.ssh_test_models", "ssh_entries_collection"), ("lineGroup",), default_line=FAB_LINE_I),
+    ComplianceModule("potting-ratio", "Potting Ratio", _lazy_collection("models.potting_ratio_models", "potting_entries_collection"), ("lineGroup",), default_line=FAB_LINE_I),
+    ComplianceModule("jb-sealant", "JB Sealant Weight", _lazy_collection("models.jb_sealant_wt_models", "jb_sealant_entries_collection"), ("lineGroup",), default_line=FAB_LINE_I),
+    ComplianceModule("frame-sealant", "Frame Sealant Weight", _lazy_collection("models.frame_sealant_wt_models", "frame_sealant_entries_collection"), ("lineGroup",), default_line=FAB_LINE_I),
+    ComplianceModule("bus-ribbon-pull-strength", "Bus Ribbon Pull Strength", _lazy_collection("models.bus_ribbon_pull_strength_models", "bus_ribbon_pull_strength_entries_collection"), ("line",)),
+    ComplianceModule("peel-strength", "Peel Strength", _lazy_collection("models.peel_strength_bus_ribbon_jb_soldering_models", "peel_strength_bus_ribbon_jb_entries_collection"), ("fab",)),
+    ComplianceModule("ipqc-audit", "IPQC Audit", _lazy_collection("models.ipqc_audit_models", "ipqc_audit_collection"), ("lineNumber",), state_fields=("workflowState",)),
+    ComplianceModule("wet-leakage", "Wet Leakage", _lazy_collection("models.wet_leakage_test_models", "wet_leakage_entries_collection"), ("fabLine", "lineGroup"), per_shift=False, default_line=FAB_LINE_I),
+    ComplianceModule("rot", "Robustness of Termination", _lazy_collection("models.rot_test_models", "rot_entries_collection"), ("fabLine", "lineGroup"), per_shift=False, default_line=FAB_LINE_I),
+    ComplianceModule("jb-contact-block", "JB Contact Block Maintenance", _lazy_collection("models.jb_contact_block_maintenance_models", "jb_contact_block_entries_collection"), ("fabLine", "fab"), per_shift=False),
+)
+COMPLIANCE_MODULES_BY_KEY = {module.key: module for module in COMPLIANCE_MODULES}
+
+
+def resolve_matrix_dates(date_from: str | None, date_to: str | None) -> list[date]:
+    end = date.fromisoformat(date_to) if date_to else date.today()
+    start = date.fromisoformat(date_from) if date_from else end
+    if start > end:
+        raise ValueError("date_from must not be after date_to")
+    if (end - start).days >= MAX_MATRIX_DAYS:
+        raise ValueError(f"The compliance matrix covers at most {MAX_MATRIX_DAYS} days")
+    return [end - timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+
+def resolve_matrix_modules(module_keys: str | None) -> list[ComplianceModule]:
+    keys = [key.strip() for key in (module_keys or "").split(",") if key.strip()]
+    if not keys:
+        return list(COMPLIANCE_MODULES)
+    unknown = [key for key in keys if key not in COMPLIANCE_MODULES_BY_KEY]
+    if unknown:
+        raise ValueError(f"Unknown compliance modules: {', '.join(unknown)}")
+    return [module for module in COMPLIANCE_MODULES if module.key in keys]
+
+
+def fetch_module_slots(module: ComplianceModule, first_day: date, last_day: date) -> list[dict]:
+    query = {"date": {"$gte": first_day.isoformat(), "$lt": (last_day + timedelta(days=1)).isoformat()}}
+    pipeline = build_slot_state_pipeline(
+        query=query,
+        slot_expressions=module.slot_expressions(),
+        state_fields=module.state_fields,
+    )
+    return list(module.get_collection().aggregate(pipeline))
+
+
+def summarize_cell(group: dict) -> dict:
+    state = next((state for state in CELL_STATE_PRECEDENCE if group.get(state)), "submitted")
+    return {"state": state, "entries": int(group.get("entries") or 0)}
+
+
+def index_module_slots(module: ComplianceModule, groups: Sequence[dict]) -> dict[tuple, dict]:
+    counts: dict[tuple, dict] = {}
+    for group in groups:
+        slot = group.get("_id") or {}
+        line = module.normalize_line(slot.get("line"))
+        shift = slot.get("shift") if module.per_shift else None
+        if line is None or (module.per_shift and shift not in SHIFTS):
+            continue
+        # Legacy spellings of one line ("Line-I", "FAB-II Line-I") land in the same slot.
+        slot_counts = counts.setdefault((slot.get("date"), shift, line), {"entries": 0, **{state: 0 for state in STATUS_COUNT_KEYS}})
+        for field in slot_counts:
+            slot_counts[field] += int(group.get(field) or 0)
+    return {key: summarize_cell(slot_counts) for key, slot_counts in counts.items()}
+
+
+def _fetch_all_module_slots(modules: Sequence[ComplianceModule], first_day: date, last_day: date) -> tuple[dict, dict]:
+    slots_by_module: dict[str, dict] = {}
+    errors: dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=min(COMPLIANCE_WORKERS, len(modules))) as executor:
+        futures = {module.key: submit_in_request_context(executor, fetch_module_slots, module, first_day, last_day) for module in modules}
+        for module in modules:
+            try:
+                slots_by_module[module.key] = index_module_slots(module, futures[module.key].result())
+            except Exception as exc:
+                logger.warning("shift_compliance_module_failed module=%s error=%s", module.key, exc)
+                errors[module.key] = str(exc)
+    return slots_by_module, errors
+
+
+def build_compliance_matrix(date_from: str | None = None, date_to: str | None = None, module_keys: str | None = None) -> dict:
+    """Completion and workflow state per date, shift, FAB line and checksheet.
+
+    Each module is one grouped aggregation over its date range, run in
+    parallel, so the whole matrix costs one round trip per collection.
+    Shift-wise modules fill the A/B/C rows; daily modules fill the row whose
+    ``shift`` is ``None``.
+    """
+    days = resolve_matrix_dates(date_from, date_to)
+    modules = resolve_matrix_modules(module_keys)
+    slots_by_module, errors = _fetch_all_module_slots(modules, days[-1], days[0])
+
+    summary = {
+        module.key: {"expected": 0, "filled": 0, "missing": 0, **{state: 0 for state in STATUS_COUNT_KEYS}}
+        for module in modules
+    }
+    shift_slots: list[str | None] = [*SHIFTS] if any(module.per_shift for module in modules) else []
+    if any(not module.per_shift for module in modules):
+        shift_slots.append(None)
+
+    rows = []
+    for day in days:
+        for shift in shift_slots:
+            for line in FAB_LINES:
+                cells = {}
+                for module in modules:
+                    if module.per_shift != (shift is not None):
+                        continue
+                    module_summary = summary[module.key]
+                    module_summary["expected"] += 1
+                    if module.key in errors:
+                        cells[module.key] = {"state": UNAVAILABLE_STATE, "entries": 0}
+                        continue
+                    cell = slots_by_module[module.key].get((day.isoformat(), shift, line))
+                    if cell is None:
+                        module_summary["missing"] += 1
+                        cells[module.key] = {"state": MISSING_STATE, "entries": 0}
+                        continue
+                    module_summary["filled"] += 1
+                    module_summary[cell["state"]] += 1
+                    cells[module.key] = {"state": cell["state"], "entries": cell["entries"]}
+                rows.append({"date": day.isoformat(), "shift": shift, "line": line, "cells": cells})
+
+    return {
+        "dateFrom": days[-1].isoformat(),
+        "dateTo": days[0].isoformat(),
+        "shifts": list(SHIFTS),
+        "lines": list(FAB_LINES),
+        "modules": [{"key": module.key, "label": module.label, "perShift": module.per_shift} for module in modules],
+        "rows": rows,
+        "summary": summary,
+        "errors": errors,
+    }
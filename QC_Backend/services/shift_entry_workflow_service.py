@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Callable, Sequence
 
+from bson import ObjectId
 from fastapi import HTTPException, status
 
-from services.creator_resolution_service import is_creator_match
+from services.creator_resolution_service import build_lock_owner_metadata, is_creator_match
+from services.dashboard_analytics_service import (
+    build_dashboard_response,
+    resolve_dashboard_date_range,
+)
+from services.keyset_pagination import InvalidCursorError, paginate_keyset
 from users.user_db import users_collection
 
 
@@ -177,3 +184,342 @@ def get_bulk_status_label(entry: dict) -> str:
     if state == "approved":
         return "Already Approved"
     return WORKFLOW_STATE_LABELS.get(state, "Unavailable")
+
+
+def build_status_query(status_filter: str | None) -> dict:
+    if status_filter not in WORKFLOW_STATES:
+        return {}
+    if status_filter == "submitted":
+        return {
+            "$or": [
+                {"workflowState": "submitted"},
+                {"workflowState": {"$exists": False}},
+                {"workflowState": None},
+                {"status": "submitted"},
+            ]
+        }
+    return {"workflowState": status_filter}
+
+
+def read_bulk_entry_ids(request_data: dict) -> list:
+    entry_ids = request_data.get("entryIds") or request_data.get("entry_ids") or request_data.get("reportIds")
+    if not isinstance(entry_ids, list) or not entry_ids:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="entryIds must be a non-empty list")
+    return entry_ids
+
+
+def finish_bulk_result(result: dict, key: str, count: int) -> dict:
+    result[key] = count
+    result["processed"] = count
+    result["skippedCount"] = sum(result["skipped"].values())
+    result["failedCount"] = len(result["failed"])
+    return result
+
+
+@dataclass(frozen=True)
+class ShiftEntryModule:
+    """Declarative description of one daily shift-entry checksheet.
+
+    The routers keep their own URL tables and payload handling; the shared
+    dashboard, register, review and delete endpoints run through the
+    functions below so paging, batching and projections live in one place.
+    ``model`` is the checksheet's ``*DailyEntry`` class. The shared functions
+    take a ``load_user`` callable and resolve the user inside their error
+    handling, like the handlers they replaced.
+    """
+
+    label: str
+    model: Any
+    collection: Any
+    serialize_entry: Callable[..., dict]
+    serialize_summary: Callable[[dict, dict | None], dict]
+    build_search_query: Callable[[str | None], dict]
+    build_filter_query: Callable[..., dict]
+    sort_options: dict
+    default_sort: str = "date-newest"
+    # Fields the register and dashboard rows never render, e.g. sign-off audit trails.
+    register_projection: dict | None = None
+    dashboard_item_sort: Sequence[tuple[str, int]] = (("date", -1), ("shift", 1), ("lineGroup", 1))
+    dashboard_daily_group_field: str = "shift"
+    approval_signature: str = "verifiedBy"
+    # Signatures assumed when an entry has none; ``None`` means a blank preparedBy plus the approval slot.
+    default_signatures: dict | None = None
+    # Hooks returning extra fields for the approve/return updates, e.g. sign-off history.
+    approval_fields: Callable[[dict, dict, str], dict] | None = None
+    return_fields: Callable[[dict, dict, str], dict] | None = None
+    # Returns a reason when an entry must be kept even though its workflow state allows deletion.
+    delete_guard: Callable[[dict], str | None] | None = None
+    # Models whose update_by_id rebuilds derived fields from the whole document.
+    update_with_existing_entry: bool = False
+
+    def update_entry(self, entry_id: str, existing_entry: dict, update_data: dict, unset_data: dict | None = None) -> bool:
+        if self.update_with_existing_entry:
+            update_data = {**existing_entry, **update_data}
+        if unset_data is None:
+            return self.model.update_by_id(entry_id, update_data)
+        return self.model.update_by_id(entry_id, update_data, unset_data)
+
+    def find_entries(self, entry_ids: Sequence[str]) -> dict[str, dict]:
+        object_ids = [ObjectId(entry_id) for entry_id in entry_ids if ObjectId.is_valid(entry_id)]
+        if not object_ids:
+            return {}
+        return {str(entry["_id"]): entry for entry in self.collection.find({"_id": {"$in": object_ids}})}
+
+
+def _require_entry(module: ShiftEntryModule, entry_id: str) -> dict:
+    if not ObjectId.is_valid(entry_id):
+        raise HTTPException(status_code=400, detail="Invalid entry ID")
+    entry = module.model.get_by_id(entry_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="Entry not found")
+    return entry
+
+
+def _run_entry_operation(failure_message: str, load_user: Callable[[], dict], operation: Callable[[dict], Any]) -> Any:
+    try:
+        return operation(load_user())
+    except HTTPException:
+        raise
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"{failure_message}: {str(exc)}")
+
+
+def get_shift_entry_dashboard(module: ShiftEntryModule, load_user: Callable[[], dict], view: str) -> dict:
+    def load(user: dict) -> dict:
+        date_from, date_to = resolve_dashboard_date_range(view)
+        return build_dashboard_response(
+            collection=module.collection,
+            query=combine_queries(
+                build_access_query(user),
+                module.build_filter_query(date_from=date_from, date_to=date_to),
+            ),
+            view=view,
+            total_key="totalEntries",
+            state_fields=("workflowState", "status"),
+            serialize_item=lambda entry: module.serialize_summary(entry, user),
+            item_sort=list(module.dashboard_item_sort),
+            daily_group_field=module.dashboard_daily_group_field,
+            item_projection=module.register_projection,
+        )
+
+    return _run_entry_operation(f"Failed to fetch {module.label} dashboard", load_user, load)
+
+
+def get_shift_entry_register(
+    module: ShiftEntryModule,
+    load_user: Callable[[], dict],
+    *,
+    page: int,
+    page_size: int,
+    cursor: str | None,
+    include_total: bool,
+    search: str | None,
+    sort: str,
+    status_filter: str | None,
+    **filters: Any,
+) -> dict:
+    def load(user: dict) -> dict:
+        query = combine_queries(
+            build_access_query(user),
+            module.build_search_query(search),
+            module.build_filter_query(**filters),
+            build_status_query(status_filter),
+        )
+        sort_field, sort_direction = module.sort_options.get(sort, module.sort_options[module.default_sort])
+        if cursor is not None:
+            keyset_page = paginate_keyset(
+                module.collection,
+                query,
+                sort_field,
+                sort_direction,
+                page_size,
+                cursor=cursor or None,
+                include_total=include_total,
+                projection=module.register_projection,
+            )
+            return keyset_page.to_response(lambda item: module.serialize_summary(item, user), page_size)
+
+        total = module.collection.count_documents(query)
+        entries = list(
+            module.collection
+            .find(query, module.register_projection)
+            .sort(sort_field, sort_direction)
+            .skip((page - 1) * page_size)
+            .limit(page_size)
+        )
+        return {
+            "items": [module.serialize_summary(entry, user) for entry in entries],
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+        }
+
+    return _run_entry_operation("Failed to fetch entry register", load_user, load)
+
+
+def get_shift_entry(module: ShiftEntryModule, load_user: Callable[[], dict], entry_id: str) -> dict:
+    def load(user: dict) -> dict:
+        entry = _require_entry(module, entry_id)
+        if not can_view_entry(entry, user):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not authorized to open this entry")
+        return module.serialize_entry(entry, user, include_permissions=True)
+
+    return _run_entry_operation("Failed to fetch entry", load_user, load)
+
+
+def build_approval_update(module: ShiftEntryModule, entry: dict, user: dict, now: str) -> dict:
+    signatures = entry.get("signatures")
+    if not isinstance(signatures, dict) or not signatures:
+        signatures = module.default_signatures if module.default_signatures is not None else {"preparedBy": "", module.approval_signature: ""}
+    signatures = dict(signatures)
+    signatures[module.approval_signature] = user["name"]
+    return {
+        "status": "approved",
+        "workflowState": "approved",
+        "signatures": signatures,
+        "approvedAt": now,
+        "approvedBy": user["name"],
+        **(module.approval_fields(entry, user, now) if module.approval_fields else {}),
+        "updatedAt": now,
+        "updated_at": now,
+    }
+
+
+def build_return_update(module: ShiftEntryModule, entry: dict, user: dict, return_comments: str, now: str) -> dict:
+    lock_owner = build_lock_owner_metadata(entry)
+    return {
+        "status": "returned",
+        "workflowState": "returned",
+        "returnedAt": now,
+        "returnedBy": user["name"],
+        "returnComments": return_comments,
+        **(module.return_fields(entry, user, now) if module.return_fields else {}),
+        "lockedBy": lock_owner.get("lockedBy") or "Operator",
+        "lockedByUserId": lock_owner.get("lockedByUserId"),
+        "lockedByEmployeeId": lock_owner.get("lockedByEmployeeId"),
+        "lockTimestamp": now,
+        "lockSessionId": None,
+        "updatedAt": now,
+        "updated_at": now,
+    }
+
+
+def approve_shift_entry(module: ShiftEntryModule, load_user: Callable[[], dict], entry_id: str) -> dict:
+    def approve(user: dict) -> dict:
+        entry = _require_entry(module, entry_id)
+        if not can_approve_entry(entry, user):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only submitted entries can be approved")
+        update_data = build_approval_update(module, entry, user, utc_timestamp())
+        if not module.update_entry(entry_id, entry, update_data, {field: "" for field in LOCK_FIELDS}):
+            raise HTTPException(status_code=500, detail="Failed to approve entry")
+        return module.serialize_entry(module.model.get_by_id(entry_id), user, include_permissions=True)
+
+    return _run_entry_operation("Failed to approve entry", load_user, approve)
+
+
+def return_shift_entry(module: ShiftEntryModule, load_user: Callable[[], dict], entry_id: str, request_data: dict) -> dict:
+    def return_entry(user: dict) -> dict:
+        entry = _require_entry(module, entry_id)
+        if not can_return_entry(entry, user):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only submitted entries can be returned")
+        return_comments = (request_data.get("returnComments") or "").strip()
+        if not return_comments:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Return comments are required")
+        update_data = build_return_update(module, entry, user, return_comments, utc_timestamp())
+        if not module.update_entry(entry_id, entry, update_data):
+            raise HTTPException(status_code=500, detail="Failed to return entry")
+        return module.serialize_entry(module.model.get_by_id(entry_id), user, include_permissions=True)
+
+    return _run_entry_operation("Failed to return entry", load_user, return_entry)
+
+
+def _ensure_deletable(module: ShiftEntryModule, entry: dict) -> None:
+    if normalize_workflow_state(entry) == "approved":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=APPROVED_REPORT_DELETE_FORBIDDEN_MESSAGE)
+    reason = module.delete_guard(entry) if module.delete_guard else None
+    if reason:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=reason)
+
+
+def delete_shift_entry(module: ShiftEntryModule, load_user: Callable[[], dict], entry_id: str) -> dict:
+    def delete(user: dict) -> dict:
+        entry = _require_entry(module, entry_id)
+        _ensure_deletable(module, entry)
+        if not can_delete_entry(entry, user):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not authorized to delete this entry")
+        if not module.model.delete_by_id(entry_id):
+            raise HTTPException(status_code=404, detail="Entry not found")
+        return {"success": True, "message": "Entry deleted successfully"}
+
+    return _run_entry_operation("Failed to delete entry", load_user, delete)
+
+
+def bulk_approve_shift_entries(module: ShiftEntryModule, load_user: Callable[[], dict], request_data: dict) -> dict:
+    def approve_all(user: dict) -> dict:
+        if not is_reviewer_like(user):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only supervisors or managers can approve entries")
+        entry_ids = [str(raw_entry_id or "").strip() for raw_entry_id in read_bulk_entry_ids(request_data)]
+        result = create_bulk_result(len(entry_ids))
+        # One $in read for the whole selection instead of a lookup per entry.
+        entries = module.find_entries(entry_ids)
+        approved_count = 0
+        now = utc_timestamp()
+        for entry_id in entry_ids:
+            if not ObjectId.is_valid(entry_id):
+                add_bulk_failure(result, entry_id, "Invalid ID")
+                continue
+            try:
+                entry = entries.get(entry_id)
+                if not entry:
+                    add_bulk_failure(result, entry_id, "Not Found")
+                    continue
+                if not can_approve_entry(entry, user):
+                    add_bulk_skip(result, get_bulk_status_label(entry))
+                    continue
+                update_data = build_approval_update(module, entry, user, now)
+                if not module.update_entry(entry_id, entry, update_data, {field: "" for field in LOCK_FIELDS}):
+                    add_bulk_failure(result, entry_id, "Update Failed")
+                    continue
+                approved_count += 1
+            except Exception as item_error:
+                add_bulk_failure(result, entry_id, str(item_error))
+        return finish_bulk_result(result, "approved", approved_count)
+
+    return _run_entry_operation("Failed to bulk approve entries", load_user, approve_all)
+
+
+def bulk_delete_shift_entries(module: ShiftEntryModule, load_user: Callable[[], dict], request_data: dict) -> dict:
+    def delete_all(user: dict) -> dict:
+        if not (is_operator(user) or is_reviewer_like(user)):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not authorized to delete entries")
+        entry_ids = [str(raw_entry_id or "").strip() for raw_entry_id in read_bulk_entry_ids(request_data)]
+        result = create_bulk_result(len(entry_ids))
+        entries = module.find_entries(entry_ids)
+        # Reject the whole request before deleting anything if it names a retained entry.
+        for entry in entries.values():
+            _ensure_deletable(module, entry)
+
+        deleted_count = 0
+        for entry_id in entry_ids:
+            if not ObjectId.is_valid(entry_id):
+                add_bulk_failure(result, entry_id, "Invalid ID")
+                continue
+            try:
+                entry = entries.get(entry_id)
+                if not entry:
+                    add_bulk_failure(result, entry_id, "Not Found")
+                    continue
+                if not can_delete_entry(entry, user):
+                    add_bulk_skip(result, get_bulk_status_label(entry))
+                    continue
+                if not module.model.delete_by_id(entry_id):
+                    add_bulk_failure(result, entry_id, "Delete Failed")
+                    continue
+                deleted_count += 1
+            except Exception as item_error:
+                add_bulk_failure(result, entry_id, str(item_error))
+        return finish_bulk_result(result, "deleted", deleted_count)
+
+    return _run_entry_operation("Failed to bulk delete entries", load_user, delete_all)
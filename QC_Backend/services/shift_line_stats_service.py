@@ -0,0 +1,144 @@
+import calendar
+import logging
+from typing import Any, Callable, Iterable
+
+from pymongo import UpdateOne
+
+
+logger = logging.getLogger(__name__)
+
+LINE_STATS_FIELD = "lineStats"
+LINE_STATS_VERSION_FIELD = "lineStatsVersion"
+# Bump when a module's pass/fail rule changes so stored flags are recomputed.
+LINE_STATS_VERSION = 1
+SHIFT_KEYS = ("A", "B", "C")
+LINE_KEYS = ("1", "2")
+LINE_STATS_REFRESH_BATCH_SIZE = 200
+
+# Returns None for an empty line, otherwise "pass", "fail" or "" when the
+# line is filled but its result cannot be judged yet.
+LineOutcome = Callable[[dict], str | None]
+
+
+def build_line_stats(lines: dict | None, evaluate_line: LineOutcome, line_keys: Iterable[str] = LINE_KEYS) -> list[dict]:
+    stats = []
+    for line_key in line_keys:
+        outcome = evaluate_line((lines or {}).get(line_key) or {})
+        stats.append({
+            "line": line_key,
+            "filled": int(outcome is not None),
+            "pass": int(outcome == "pass"),
+            "fail": int(outcome == "fail"),
+        })
+    return stats
+
+
+def attach_line_stats(update_data: dict, evaluate_line: LineOutcome) -> dict:
+    """Store the per-line flags next to ``lines`` whenever an entry is saved."""
+    if "lines" in update_data:
+        update_data[LINE_STATS_FIELD] = build_line_stats(update_data["lines"], evaluate_line)
+        update_data[LINE_STATS_VERSION_FIELD] = LINE_STATS_VERSION
+    return update_data
+
+
+def build_default_monthly_line_stats(year: int, month: int) -> dict:
+    days_in_month = calendar.monthrange(year, month)[1]
+    return {
+        "totalDays": days_in_month,
+        "totalPossibleEntries": days_in_month * len(SHIFT_KEYS) * len(LINE_KEYS),
+        "filledEntries": 0,
+        "completionRate": 0,
+        "passCount": 0,
+        "failCount": 0,
+        "shiftStats": {
+            shift: {"filled": 0, "pass": 0, "fail": 0, "lines": {line_key: 0 for line_key in LINE_KEYS}}
+            for shift in SHIFT_KEYS
+        },
+    }
+
+
+def build_stale_line_stats_query(year: int | None = None, month: int | None = None) -> dict:
+    """Entries saved before flags were stored, or under an older rule version."""
+    query: dict = {LINE_STATS_VERSION_FIELD: {"$ne": LINE_STATS_VERSION}}
+    if year is not None:
+        query["year"] = year
+    if month is not None:
+        query["month"] = month
+    return query
+
+
+def build_monthly_line_stats_pipeline(year: int, month: int) -> list[dict]:
+    return [
+        {"$match": {"year": year, "month": month, "shift": {"$in": list(SHIFT_KEYS)}, LINE_STATS_VERSION_FIELD: LINE_STATS_VERSION}},
+        {"$unwind": f"${LINE_STATS_FIELD}"},
+        {"$match": {f"{LINE_STATS_FIELD}.line": {"$in": list(LINE_KEYS)}}},
+        {
+            "$group": {
+                "_id": {"shift": "$shift", "line": f"${LINE_STATS_FIELD}.line"},
+                "filled": {"$sum": f"${LINE_STATS_FIELD}.filled"},
+                "pass": {"$sum": f"${LINE_STATS_FIELD}.pass"},
+                "fail": {"$sum": f"${LINE_STATS_FIELD}.fail"},
+            }
+        },
+    ]
+
+
+def group_line_stats(entries: Iterable[dict]) -> list[dict]:
+    """The ``$group`` stage of the monthly pipeline, run in Python over entries' stored flags."""
+    groups: dict[tuple, dict] = {}
+    for entry in entries:
+        for line_stats in entry.get(LINE_STATS_FIELD) or []:
+            key = (entry.get("shift"), line_stats.get("line"))
+            group = groups.setdefault(key, {"_id": {"shift": key[0], "line": key[1]}, "filled": 0, "pass": 0, "fail": 0})
+            for name in ("filled", "pass", "fail"):
+                group[name] += line_stats.get(name) or 0
+    return list(groups.values())
+
+
+def fold_monthly_line_stats(year: int, month: int, groups: Iterable[dict]) -> dict:
+    stats = build_default_monthly_line_stats(year, month)
+    for group in groups:
+        shift_stats = stats["shiftStats"].get(group["_id"].get("shift"))
+        line_key = group["_id"].get("line")
+        if shift_stats is None or line_key not in shift_stats["lines"]:
+            continue
+        shift_stats["lines"][line_key] += group["filled"]
+        for key, total_key in (("filled", "filledEntries"), ("pass", "passCount"), ("fail", "failCount")):
+            shift_stats[key] += group[key]
+            stats[total_key] += group[key]
+
+    if stats["totalPossibleEntries"] > 0:
+        stats["completionRate"] = round((stats["filledEntries"] / stats["totalPossibleEntries"]) * 100)
+    return stats
+
+
+def refresh_stale_line_stats(collection: Any, evaluate_line: LineOutcome, batch_size: int = LINE_STATS_REFRESH_BATCH_SIZE) -> int:
+    """Store flags for every stale entry; run from ``migrations.backfill_shift_line_stats``."""
+    updates: list[UpdateOne] = []
+    refreshed = 0
+    for entry in collection.find(build_stale_line_stats_query(), {"lines": 1}):
+        update_data = attach_line_stats({"lines": entry.get("lines") or {}}, evaluate_line)
+        update_data.pop("lines")
+        updates.append(UpdateOne({"_id": entry["_id"]}, {"$set": update_data}))
+        if len(updates) >= batch_size:
+            refreshed += collection.bulk_write(updates, ordered=False).modified_count
+            updates = []
+    if updates:
+        refreshed += collection.bulk_write(updates, ordered=False).modified_count
+    if refreshed:
+        logger.info("shift_line_stats_refreshed collection=%s count=%s", collection.name, refreshed)
+    return refreshed
+
+
+def aggregate_monthly_line_stats(collection: Any, year: int, month: int, evaluate_line: LineOutcome) -> dict:
+    """Monthly ``shiftStats`` for two-line shift checksheets, summed in Mongo from the stored flags.
+
+    Entries whose flags are missing or stale are evaluated in memory for this
+    response only; reads never write them back.
+    """
+    stale_entries = [
+        {**entry, **attach_line_stats({"lines": entry.get("lines") or {}}, evaluate_line)}
+        for entry in collection.find(build_stale_line_stats_query(year, month), {"shift": 1, "lines": 1})
+    ]
+    groups = list(collection.aggregate(build_monthly_line_stats_pipeline(year, month))) + group_line_stats(stale_entries)
+    return fold_monthly_line_stats(year, month, groups)
@@ -0,0 +1,184 @@
+import hashlib
+import io
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from botocore.exceptions import ClientError
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 128
+DEFAULT_REVALIDATE_SECONDS = 5 * 60
+DEFAULT_THUMBNAIL_SCALE = 2
+SIGNATURE_IMAGE_CACHE_CONTROL = "private, no-cache"
+
+
+def _read_int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+@dataclass(frozen=True)
+class SignatureImage:
+    key: str
+    data: bytes
+    content_type: str
+    etag: str
+
+
+def is_not_modified_error(exc: ClientError) -> bool:
+    error_code = str(exc.response.get("Error", {}).get("Code") or "")
+    status_code = exc.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+    return status_code == 304 or error_code in {"304", "NotModified"}
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Evaluate an If-None-Match header against a quoted or bare ETag."""
+    if not if_none_match:
+        return False
+    bare_etag = etag.strip('"')
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate.strip('"') == bare_etag:
+            return True
+    return False
+
+
+def render_signature_thumbnail(image_bytes: bytes, width: int, height: int) -> bytes:
+    """Decode a signature once and resize it to the exact box it is drawn into."""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(image_bytes)) as source:
+        mode = "RGBA" if source.mode in {"RGBA", "LA", "P"} else "RGB"
+        resized = source.convert(mode).resize((width, height), Image.LANCZOS)
+    output = io.BytesIO()
+    resized.save(output, format="PNG", optimize=True)
+    return output.getvalue()
+
+
+class SignatureImageCache:
+    """Process-wide LRU of signature images keyed by S3 key and revalidated by ETag.
+
+    Entries younger than ``revalidate_seconds`` are served from memory. Older
+    entries are revalidated with a conditional S3 GET, so an unchanged image
+    costs a 304 instead of a full download and a re-uploaded image is picked
+    up on the next revalidation. Thumbnails are keyed by the image ETag, so a
+    new upload never reuses a stale rendering.
+    """
+
+    def __init__(
+        self,
+        s3_service_factory: Callable[[], Any] | None = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        revalidate_seconds: int = DEFAULT_REVALIDATE_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._s3_service_factory = s3_service_factory
+        self._s3_service = None
+        self._max_entries = max(1, max_entries)
+        self._revalidate_seconds = max(0, revalidate_seconds)
+        self._clock = clock
+        self._images: OrderedDict[str, tuple[SignatureImage, float]] = OrderedDict()
+        self._thumbnails: OrderedDict[tuple[str, str, int, int], bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_s3_service(self):
+        if self._s3_service is None:
+            if self._s3_service_factory is None:
+                from s3_service import S3Service
+                self._s3_service_factory = S3Service
+            self._s3_service = self._s3_service_factory()
+        return self._s3_service
+
+    def _fetch(self, key: str, cached: SignatureImage | None) -> SignatureImage:
+        s3_service = self._get_s3_service()
+        request = {"Bucket": s3_service.bucket_name, "Key": key}
+        if cached is not None:
+            request["IfNoneMatch"] = f'"{cached.etag}"'
+        try:
+            response = s3_service.s3_client.get_object(**request)
+        except ClientError as exc:
+            if cached is not None and is_not_modified_error(exc):
+                return cached
+            raise
+
+        data = response["Body"].read()
+        etag = str(response.get("ETag") or "").strip('"') or hashlib.md5(data).hexdigest()
+        return SignatureImage(
+            key=key,
+            data=data,
+            content_type=response.get("ContentType") or "image/png",
+            etag=etag,
+        )
+
+    def get(self, key: str) -> SignatureImage:
+        now = self._clock()
+        with self._lock:
+            cached_entry = self._images.get(key)
+            if cached_entry is not None:
+                cached_image, checked_at = cached_entry
+                if now - checked_at < self._revalidate_seconds:
+                    self._images.move_to_end(key)
+                    return cached_image
+        cached_image = cached_entry[0] if cached_entry else None
+
+        image = self._fetch(key, cached_image)
+        with self._lock:
+            self._images[key] = (image, self._clock())
+            self._images.move_to_end(key)
+            while len(self._images) > self._max_entries:
+                evicted_key, _ = self._images.popitem(last=False)
+                self._drop_thumbnails(evicted_key)
+            if cached_image is not None and cached_image.etag != image.etag:
+                self._drop_thumbnails(key)
+        return image
+
+    def get_thumbnail(self, key: str, width: int, height: int, scale: int = DEFAULT_THUMBNAIL_SCALE) -> bytes:
+        image = self.get(key)
+        pixel_width, pixel_height = width * max(1, scale), height * max(1, scale)
+        thumbnail_key = (key, image.etag, pixel_width, pixel_height)
+        with self._lock:
+            thumbnail = self._thumbnails.get(thumbnail_key)
+            if thumbnail is not None:
+                self._thumbnails.move_to_end(thumbnail_key)
+                return thumbnail
+
+        thumbnail = render_signature_thumbnail(image.data, pixel_width, pixel_height)
+        with self._lock:
+            self._thumbnails[thumbnail_key] = thumbnail
+            while len(self._thumbnails) > self._max_entries:
+                self._thumbnails.popitem(last=False)
+        return thumbnail
+
+    def _drop_thumbnails(self, key: str) -> None:
+        for thumbnail_key in [item for item in self._thumbnails if item[0] == key]:
+            del self._thumbnails[thumbnail_key]
+
+    def invalidate(self, key: str | None) -> None:
+        if not key:
+            return
+        with self._lock:
+            self._images.pop(key, None)
+            self._drop_thumbnails(key)
+        logger.debug("signature_image_cache_invalidated key=%s", key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._images.clear()
+            self._thumbnails.clear()
+
+
+signature_image_cache = SignatureImageCache(
+    max_entries=_read_int_env("SIGNATURE_IMAGE_CACHE_SIZE", DEFAULT_MAX_ENTRIES),
+    revalidate_seconds=_read_int_env("SIGNATURE_IMAGE_REVALIDATE_SECONDS", DEFAULT_REVALIDATE_SECONDS),
+)
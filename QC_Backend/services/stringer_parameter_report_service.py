@@ -1,18 +1,29 @@
 import calendar
 from copy import deepcopy
 from datetime import date
-from typing import Any, Dict, Iterable
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
 
 from generators.stringer_parameter_mappings import get_stringer_parameter_mapper
 from models.ipqc_audit_models import IPQCAudit, ipqc_audit_collection
 from models.stringer_parameter_report_models import (
+    STRINGER_REPORT_SCHEMA_VERSION,
     StringerParameterReport,
     serialize_stringer_parameter_report,
+    utc_timestamp,
 )
 
 
+logger = logging.getLogger(__name__)
+
 REPORT_SHIFTS = ("A", "B", "C")
+REPORT_LINES = ("I", "II")
 MANUAL_FIELDS = ("moduleType", "cellType", "cellWp")
+SLOT_UPDATE_ATTEMPTS = 3
+# Past this many stale slots a read rebuilds the month in full instead of patching slot by slot.
+MAX_SLOT_REFRESHES_ON_READ = 12
+SOURCE_VERSIONS_FIELD = "sourceVersions"
 
 
 def normalize_report_line(line: str) -> str:
@@ -41,14 +52,69 @@ def _audit_sort_value(audit: Dict[str, Any]) -> str:
     return str(audit.get("updated_timestamp") or audit.get("updatedAt") or audit.get("timestamp") or "")
 
 
+def _date_prefix_query(prefix: str) -> Dict[str, str]:
+    # A range on the prefix can use the line/date index, unlike an anchored $regex.
+    return {"$gte": prefix, "$lt": f"{prefix}\uffff"}
+
+
 def _get_month_audits(year: int, month: int, line: str) -> Dict[str, Dict[str, Any]]:
-    month_prefix = f"{year:04d}-{month:02d}"
-    audits = ipqc_audit_collection.find(
-        {
-            "lineNumber": line,
-            "date": {"$regex": f"^{month_prefix}"},
-        }
+    return _latest_audits_by_slot(
+        ipqc_audit_collection.find(
+            {
+                "lineNumber": line,
+                "date": _date_prefix_query(f"{year:04d}-{month:02d}"),
+            }
+        )
     )
+
+
+def _get_slot_audit(line: str, date_key: str, shift: str) -> Optional[Dict[str, Any]]:
+    audits = _latest_audits_by_slot(
+        ipqc_audit_collection.find({"lineNumber": line, "date": _date_prefix_query(date_key)})
+    )
+    return audits.get(f"{date_key}|{shift}")
+
+
+def get_source_versions(line: str, date_prefix: str) -> Dict[str, Dict[str, Any]]:
+    """Audit count and latest ``updated_timestamp`` per date/shift slot, answered from ``ipqc_line_date_shift_updated_idx``.
+
+    Every audit counts, drafts included, so a write or delete on any worker moves
+    its slot's version even when the write never went through the refresh queue.
+    """
+    versions: Dict[str, Dict[str, Any]] = {}
+    for item in ipqc_audit_collection.aggregate(
+        [
+            {"$match": {"lineNumber": line, "date": _date_prefix_query(date_prefix)}},
+            {
+                "$group": {
+                    "_id": {"date": "$date", "shift": "$shift"},
+                    "audit_count": {"$sum": 1},
+                    "updated_timestamp": {"$max": "$updated_timestamp"},
+                }
+            },
+        ]
+    ):
+        audit_date = str(item["_id"].get("date") or "").split("T")[0]
+        shift = str(item["_id"].get("shift") or "").strip().upper()
+        try:
+            date.fromisoformat(audit_date)
+        except ValueError:
+            continue
+        if shift not in REPORT_SHIFTS:
+            continue
+        version = versions.setdefault(f"{audit_date}|{shift}", {"auditCount": 0, "updatedTimestamp": ""})
+        version["auditCount"] += item["audit_count"]
+        version["updatedTimestamp"] = max(version["updatedTimestamp"], str(item.get("updated_timestamp") or ""))
+    return versions
+
+
+def stale_report_slots(report: Dict[str, Any], versions: Dict[str, Dict[str, Any]]) -> list:
+    """Slot keys whose stored source version no longer matches the audits."""
+    stored = report.get(SOURCE_VERSIONS_FIELD) or {}
+    return sorted(slot_key for slot_key in set(stored) | set(versions) if stored.get(slot_key) != versions.get(slot_key))
+
+
+def _latest_audits_by_slot(audits: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
     latest_by_slot: Dict[str, Dict[str, Any]] = {}
     for audit in audits:
         if _audit_state(audit) != "submitted":
@@ -102,6 +168,70 @@ def _build_audit_source(audit: Dict[str, Any]) -> Dict[str, str]:
     }
 
 
+def _load_audit_payload(audit: Dict[str, Any], audit_payload_cache: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    audit_id = str(audit["_id"])
+    if audit_id not in audit_payload_cache:
+        audit_data = IPQCAudit.from_dict(audit).get_data()
+        audit_payload_cache[audit_id] = {
+            "parameters": _get_stage_parameter_values(audit_data),
+            "poNumber": str(
+                audit.get("productionOrderNo")
+                or audit_data.get("productionOrderNo")
+                or ""
+            ),
+        }
+    return audit_payload_cache[audit_id]
+
+
+def build_slot_rows(
+    mapper,
+    line: str,
+    date_key: str,
+    shift: str,
+    audit: Optional[Dict[str, Any]],
+    manual_fields: Dict[str, Dict[str, str]],
+    existing_rows: Dict[str, Dict[str, Any]],
+    source_unchanged: bool,
+    force_refresh: bool = False,
+    audit_payload_cache: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> list:
+    """Build the machine rows of one date/shift slot, reusing stored values while the audit source is unchanged."""
+    audit_payload_cache = audit_payload_cache if audit_payload_cache is not None else {}
+    source = _build_audit_source(audit) if audit is not None else None
+    rows = []
+    for machine in mapper.machine_numbers:
+        row_key = make_row_key(date_key, shift, machine)
+        previous_row = existing_rows.get(row_key) or {}
+        manual = manual_fields.setdefault(
+            row_key,
+            _normalize_manual_fields(previous_row),
+        )
+
+        if audit is None:
+            po_number = ""
+            audit_values = _empty_audit_values(mapper)
+        elif source_unchanged and not force_refresh and previous_row.get("auditSource") == source:
+            po_number = str(previous_row.get("poNumber") or "")
+            audit_values = deepcopy(previous_row.get("auditValues") or _empty_audit_values(mapper))
+        else:
+            payload = _load_audit_payload(audit, audit_payload_cache)
+            po_number = payload["poNumber"]
+            audit_values = _extract_machine_values(mapper, payload["parameters"], machine)
+
+        rows.append({
+            "rowKey": row_key,
+            "date": date_key,
+            "shift": shift,
+            "line": line,
+            "poNumber": po_number,
+            "machine": machine,
+            **manual,
+            "auditValues": audit_values,
+            "auditSource": source,
+        })
+    return rows
+
+
 def build_month_structure(
     year: int,
     month: int,
@@ -135,55 +265,18 @@ def build_month_structure(
         date_key = date(year, month, day_number).isoformat()
         for shift in REPORT_SHIFTS:
             slot_key = f"{date_key}|{shift}"
-            audit = audits_by_slot.get(slot_key)
-            source = audit_sources.get(slot_key)
-            source_unchanged = source == existing_sources.get(slot_key)
-            parameter_values = None
-
-            for machine in mapper.machine_numbers:
-                row_key = make_row_key(date_key, shift, machine)
-                previous_row = existing_rows.get(row_key) or {}
-                manual = manual_fields.setdefault(
-                    row_key,
-                    _normalize_manual_fields(previous_row),
-                )
-
-                if audit is None:
-                    po_number = ""
-                    audit_values = _empty_audit_values(mapper)
-                    row_source = None
-                elif source_unchanged and not force_refresh and previous_row.get("auditSource") == source:
-                    po_number = str(previous_row.get("poNumber") or "")
-                    audit_values = deepcopy(previous_row.get("auditValues") or _empty_audit_values(mapper))
-                    row_source = source
-                else:
-                    audit_id = str(audit["_id"])
-                    if audit_id not in audit_payload_cache:
-                        audit_data = IPQCAudit.from_dict(audit).get_data()
-                        audit_payload_cache[audit_id] = {
-                            "parameters": _get_stage_parameter_values(audit_data),
-                            "poNumber": str(
-                                audit.get("productionOrderNo")
-                                or audit_data.get("productionOrderNo")
-                                or ""
-                            ),
-                        }
-                    parameter_values = audit_payload_cache[audit_id]["parameters"]
-                    po_number = audit_payload_cache[audit_id]["poNumber"]
-                    audit_values = _extract_machine_values(mapper, parameter_values, machine)
-                    row_source = source
-
-                rows.append({
-                    "rowKey": row_key,
-                    "date": date_key,
-                    "shift": shift,
-                    "line": normalized_line,
-                    "poNumber": po_number,
-                    "machine": machine,
-                    **manual,
-                    "auditValues": audit_values,
-                    "auditSource": row_source,
-                })
+            rows.extend(build_slot_rows(
+                mapper,
+                normalized_line,
+                date_key,
+                shift,
+                audits_by_slot.get(slot_key),
+                manual_fields,
+                existing_rows,
+                source_unchanged=audit_sources.get(slot_key) == existing_sources.get(slot_key),
+                force_refresh=force_refresh,
+                audit_payload_cache=audit_payload_cache,
+            ))
 
     return {
         "year": year,
@@ -200,8 +293,9 @@ def build_month_structure(
     }
 
 
-def synchronize_month_report(year: int, month: int, line: str, force_refresh: bool = False) -> Dict[str, Any]:
-    normalized_line = normalize_report_line(line)
+def _synchronize_month_document(year: int, month: int, normalized_line: str, force_refresh: bool = False) -> Dict[str, Any]:
+    # Read before the audits, so a write racing the rebuild leaves its slot looking stale.
+    source_versions = get_source_versions(normalized_line, f"{year:04d}-{month:02d}")
     existing_report = StringerParameterReport.get(year, month, normalized_line)
     synchronized = build_month_structure(
         year,
@@ -210,7 +304,7 @@ def synchronize_month_report(year: int, month: int, line: str, force_refresh: bo
         existing_report=existing_report,
         force_refresh=force_refresh,
     )
-    stored = StringerParameterReport.upsert(
+    return StringerParameterReport.upsert(
         year=year,
         month=month,
         line=normalized_line,
@@ -220,17 +314,173 @@ def synchronize_month_report(year: int, month: int, line: str, force_refresh: bo
         metadata={
             "daysInMonth": synchronized["daysInMonth"],
             "auditSourceCount": synchronized["auditSourceCount"],
+            SOURCE_VERSIONS_FIELD: source_versions,
         },
     )
-    serialized = serialize_stringer_parameter_report(stored) or {}
+
+
+def synchronize_month_report(year: int, month: int, line: str, force_refresh: bool = False) -> Dict[str, Any]:
+    normalized_line = normalize_report_line(line)
+    return _serialize_with_layout(_synchronize_month_document(year, month, normalized_line, force_refresh), normalized_line)
+
+
+def _serialize_with_layout(report: Dict[str, Any], line: str) -> Dict[str, Any]:
+    mapper = get_stringer_parameter_mapper(line)
+    serialized = serialize_stringer_parameter_report(report) or {}
     serialized.update({
-        "auditColumns": synchronized["auditColumns"],
-        "shifts": synchronized["shifts"],
-        "machineNumbers": synchronized["machineNumbers"],
+        "auditColumns": [dict(column) for column in mapper.audit_columns],
+        "shifts": list(REPORT_SHIFTS),
+        "machineNumbers": list(mapper.machine_numbers),
     })
     return serialized
 
 
+def _is_materialized(report: Optional[Dict[str, Any]]) -> bool:
+    return bool(report) and report.get("materializedSchema") == STRINGER_REPORT_SCHEMA_VERSION
+
+
+def reconcile_month_report(year: int, month: int, line: str) -> Dict[str, Any]:
+    """The stored report with every slot whose audits changed since it was written brought up to date.
+
+    The refresh queue only speeds this up; writes it never saw (another worker,
+    a restart, a path without the hook) are caught here by their slot versions.
+    """
+    report = StringerParameterReport.get(year, month, line)
+    if not _is_materialized(report):
+        return _synchronize_month_document(year, month, line)
+    stale_slots = stale_report_slots(report, get_source_versions(line, f"{year:04d}-{month:02d}"))
+    if not stale_slots:
+        return report
+    if len(stale_slots) > MAX_SLOT_REFRESHES_ON_READ:
+        return _synchronize_month_document(year, month, line)
+    for slot_key in stale_slots:
+        date_key, shift = slot_key.split("|")
+        report = refresh_report_slot(year, month, line, date_key, shift) or report
+    return report
+
+
+def get_month_report(year: int, month: int, line: str, force_refresh: bool = False) -> Dict[str, Any]:
+    """Serve the materialized report, patching stale slots and building it in full only when it is missing or outdated."""
+    normalized_line = normalize_report_line(line)
+    if force_refresh:
+        return synchronize_month_report(year, month, normalized_line, force_refresh=True)
+    return _serialize_with_layout(reconcile_month_report(year, month, normalized_line), normalized_line)
+
+
+def get_month_report_version(year: int, month: int, line: str) -> Optional[int]:
+    normalized_line = normalize_report_line(line)
+    stamp = StringerParameterReport.get_version(year, month, normalized_line)
+    if not _is_materialized(stamp) or stamp.get("version") is None:
+        return None
+    if stale_report_slots(stamp, get_source_versions(normalized_line, f"{year:04d}-{month:02d}")):
+        return None
+    return int(stamp["version"])
+
+
+def build_slot_patch(
+    report: Dict[str, Any],
+    date_key: str,
+    shift: str,
+    audit: Optional[Dict[str, Any]],
+) -> Optional[Tuple[Dict[str, Any], list]]:
+    """Return the ``$set``/``$unset`` fields that bring one date/shift slot of ``report`` up to date.
+
+    ``None`` means the stored rows are already current; a slot that is not
+    part of the stored layout raises ``LookupError`` so callers rebuild in full.
+    """
+    line = report["line"]
+    mapper = get_stringer_parameter_mapper(line)
+    slot_key = f"{date_key}|{shift}"
+    rows = report.get("rows") or []
+    slot_indexes = [
+        index
+        for index, row in enumerate(rows)
+        if isinstance(row, dict) and row.get("date") == date_key and row.get("shift") == shift
+    ]
+    if len(slot_indexes) != len(mapper.machine_numbers):
+        raise LookupError(f"Slot {slot_key} is not part of the stored report layout")
+
+    stored_source = (report.get("auditSources") or {}).get(slot_key)
+    source = _build_audit_source(audit) if audit is not None else None
+    existing_rows = {rows[index]["rowKey"]: rows[index] for index in slot_indexes}
+    manual_fields = {
+        key: _normalize_manual_fields(value)
+        for key, value in (report.get("manualFields") or {}).items()
+    }
+    slot_rows = build_slot_rows(
+        mapper,
+        line,
+        date_key,
+        shift,
+        audit,
+        manual_fields,
+        existing_rows,
+        source_unchanged=source == stored_source,
+    )
+    if source == stored_source and all(rows[index] == row for index, row in zip(slot_indexes, slot_rows)):
+        return None
+
+    audit_source_count = len(report.get("auditSources") or {})
+    if source is not None and stored_source is None:
+        audit_source_count += 1
+    elif source is None and stored_source is not None:
+        audit_source_count -= 1
+
+    set_fields: Dict[str, Any] = {
+        f"rows.{index}": row
+        for index, row in zip(slot_indexes, slot_rows)
+    }
+    set_fields["auditSourceCount"] = audit_source_count
+    unset_fields = []
+    if source is None:
+        unset_fields.append(f"auditSources.{slot_key}")
+    else:
+        set_fields[f"auditSources.{slot_key}"] = source
+    return set_fields, unset_fields
+
+
+def refresh_report_slot(year: int, month: int, line: str, date_key: str, shift: str) -> Optional[Dict[str, Any]]:
+    """Recompute the rows of a single date/shift slot in the stored month report.
+
+    Reports that have not been materialized yet are left alone; the next read
+    builds them in full. Concurrent writers are detected through the version
+    stamp, and a slot that keeps losing the race falls back to a full rebuild.
+    """
+    normalized_line = normalize_report_line(line)
+    slot_key = f"{date_key}|{shift}"
+    version_field = f"{SOURCE_VERSIONS_FIELD}.{slot_key}"
+    for _ in range(SLOT_UPDATE_ATTEMPTS):
+        report = StringerParameterReport.get(year, month, normalized_line)
+        if not _is_materialized(report):
+            return None
+        source_version = get_source_versions(normalized_line, date_key).get(slot_key)
+        audit = _get_slot_audit(normalized_line, date_key, shift)
+        try:
+            patch = build_slot_patch(report, date_key, shift, audit)
+        except LookupError:
+            break
+        set_fields, unset_fields = patch or ({}, [])
+        if source_version != (report.get(SOURCE_VERSIONS_FIELD) or {}).get(slot_key):
+            # Draft-only edits move the version without changing rows; store it so reads stop re-checking.
+            if source_version is None:
+                unset_fields = [*unset_fields, version_field]
+            else:
+                set_fields = {**set_fields, version_field: source_version}
+        if not set_fields and not unset_fields:
+            return report
+        patched = StringerParameterReport.apply_patch(
+            year,
+            month,
+            normalized_line,
+            report.get("version"),
+            set_fields,
+            unset_fields,
+        )
+        if patched is not None:
+            return patched
+    return _synchronize_month_document(year, month, normalized_line)
+
+
 def update_manual_fields(
     year: int,
     month: int,
@@ -239,6 +489,21 @@ def update_manual_fields(
     updated_by: str,
 ) -> Dict[str, Any]:
     normalized_line = normalize_report_line(line)
+    changes = list(changes)
+    for _ in range(SLOT_UPDATE_ATTEMPTS):
+        report = StringerParameterReport.get(year, month, normalized_line)
+        if not _is_materialized(report):
+            break
+        patched = StringerParameterReport.apply_patch(
+            year,
+            month,
+            normalized_line,
+            report.get("version"),
+            build_manual_fields_patch(report, changes, updated_by),
+        )
+        if patched is not None:
+            return _serialize_with_layout(patched, normalized_line)
+
     existing_report = StringerParameterReport.get(year, month, normalized_line) or {}
     manual_fields = {
         key: _normalize_manual_fields(value)
@@ -262,3 +527,125 @@ def update_manual_fields(
         updated_by,
     )
     return synchronize_month_report(year, month, normalized_line)
+
+
+def build_manual_fields_patch(report: Dict[str, Any], changes: Iterable[Dict[str, Any]], updated_by: str) -> Dict[str, Any]:
+    """Return the ``$set`` fields that apply manual edits to both ``manualFields`` and the stored rows."""
+    row_indexes = {
+        row.get("rowKey"): index
+        for index, row in enumerate(report.get("rows") or [])
+        if isinstance(row, dict)
+    }
+    manual_fields = report.get("manualFields") or {}
+    set_fields: Dict[str, Any] = {
+        "manualUpdatedAt": utc_timestamp(),
+        "manualUpdatedBy": updated_by,
+    }
+    for change in changes:
+        row_key = str(change.get("rowKey") or "")
+        if not row_key:
+            continue
+        current = _normalize_manual_fields(set_fields.get(f"manualFields.{row_key}") or manual_fields.get(row_key))
+        for field in MANUAL_FIELDS:
+            if field in change:
+                current[field] = str(change.get(field) or "")
+        set_fields[f"manualFields.{row_key}"] = current
+        row_index = row_indexes.get(row_key)
+        if row_index is not None:
+            for field, value in current.items():
+                set_fields[f"rows.{row_index}.{field}"] = value
+    return set_fields
+
+
+def audit_report_slot(audit: Optional[Dict[str, Any]]) -> Optional[Tuple[int, int, str, str, str]]:
+    """Map an IPQC audit to the (year, month, line, date, shift) report slot it feeds, if any."""
+    if not isinstance(audit, dict):
+        return None
+    line = str(audit.get("lineNumber") or "").strip()
+    shift = str(audit.get("shift") or "").strip().upper()
+    date_key = str(audit.get("date") or "").split("T")[0]
+    if line not in REPORT_LINES or shift not in REPORT_SHIFTS:
+        return None
+    try:
+        audit_date = date.fromisoformat(date_key)
+    except ValueError:
+        return None
+    return audit_date.year, audit_date.month, line, audit_date.isoformat(), shift
+
+
+class StringerReportMaterializer:
+    """Background worker that folds IPQC audit writes into the stored month reports.
+
+    Audit routes enqueue the audits they touched (before and after the write,
+    so moving an audit to another shift clears the old slot too). Slots are
+    de-duplicated while pending, so a burst of autosaves costs one refresh.
+    The queue is per process and lost on restart; reads reconcile whatever it
+    missed through the stored slot versions (``reconcile_month_report``).
+    """
+
+    def __init__(self, refresh_slot: Callable[..., Any] = refresh_report_slot, idle_wait_seconds: float = 5.0):
+        self._refresh_slot = refresh_slot
+        self._idle_wait_seconds = idle_wait_seconds
+        self._pending: Dict[Tuple[int, int, str, str, str], None] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._worker_thread = None
+
+    def enqueue_audits(self, *audits: Optional[Dict[str, Any]]) -> int:
+        audits = tuple(audit for audit in audits if isinstance(audit, dict))
+        # Drafts and returned audits never reach the report, so edits to them cost nothing here.
+        if not any(_audit_state(audit) == "submitted" for audit in audits):
+            return 0
+        slots = [slot for slot in (audit_report_slot(audit) for audit in audits) if slot is not None]
+        if not slots:
+            return 0
+        with self._lock:
+            for slot in slots:
+                self._pending[slot] = None
+        self._wakeup.set()
+        self._ensure_worker()
+        return len(slots)
+
+    @property
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def drain(self) -> int:
+        with self._lock:
+            slots = list(self._pending)
+            self._pending.clear()
+        refreshed = 0
+        for slot in slots:
+            try:
+                self._refresh_slot(*slot)
+                refreshed += 1
+            except Exception:
+                logger.exception("stringer_report_slot_refresh_failed slot=%s", "|".join(map(str, slot)))
+        return refreshed
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._stopping or (self._worker_thread is not None and self._worker_thread.is_alive()):
+                return
+            self._worker_thread = threading.Thread(
+                target=self._worker_loop,
+                name="stringer-report-materializer",
+                daemon=True,
+            )
+            self._worker_thread.start()
+
+    def _worker_loop(self) -> None:
+        while not self._stopping:
+            self._wakeup.wait(self._idle_wait_seconds)
+            self._wakeup.clear()
+            self.drain()
+
+    def shutdown(self) -> None:
+        self._stopping = True
+        self._wakeup.set()
+        self.drain()
+
+
+stringer_report_materializer = StringerReportMaterializer()
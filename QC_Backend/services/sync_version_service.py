@@ -0,0 +1,157 @@
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Iterable
+
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import PyMongoError
+
+from date_utils import utc_now
+from mongo_indexes import ensure_index_async
+
+
+logger = logging.getLogger(__name__)
+
+SYNC_VERSION_FIELD = "syncVersion"
+SYNC_COUNTERS_COLLECTION_NAME = "sync_versions"
+SYNC_TOMBSTONES_COLLECTION_NAME = "sync_tombstones"
+TOMBSTONE_RETENTION = timedelta(days=30)
+# Deltas re-send the last few versions so a write whose stamp landed after a
+# reader took its cursor is still delivered on the next poll.
+SYNC_CURSOR_OVERLAP = 32
+
+
+class InvalidSyncCursorError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class SyncCursor:
+    version: int
+    scope: str
+
+    def encode(self) -> str:
+        return f"{self.version}:{self.scope}"
+
+
+def parse_sync_cursor(value: str) -> SyncCursor:
+    version, separator, scope = (value or "").partition(":")
+    try:
+        parsed_version = int(version)
+    except ValueError as exc:
+        raise InvalidSyncCursorError("Invalid sync cursor") from exc
+    if not separator or parsed_version < 0:
+        raise InvalidSyncCursorError("Invalid sync cursor")
+    return SyncCursor(parsed_version, scope)
+
+
+def build_etag(name: str, version: int, scope: str) -> str:
+    return f'W/"{name}-{version}-{scope}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip() for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates or etag.removeprefix("W/") in candidates
+
+
+@dataclass(frozen=True)
+class SyncDelta:
+    changed: list[dict]
+    deleted: list[str]
+
+
+class CollectionSyncTracker:
+    """Version counter and tombstones that let list endpoints answer conditional and delta requests.
+
+    Writers call ``mark_changed``/``mark_deleted`` after their write, which bumps
+    a per-collection counter and stamps the documents with it. Readers take the
+    counter first: it becomes the ETag and the ``since`` cursor, and a delta is
+    the documents and tombstones stamped after the caller's cursor.
+    """
+
+    def __init__(self, collection: Any, name: str, counters_collection: Any | None = None, tombstones_collection: Any | None = None):
+        self.collection = collection
+        self.name = name
+        database = collection.database
+        self.counters_collection = counters_collection if counters_collection is not None else database[SYNC_COUNTERS_COLLECTION_NAME]
+        self.tombstones_collection = tombstones_collection if tombstones_collection is not None else database[SYNC_TOMBSTONES_COLLECTION_NAME]
+        self._indexes_ensured = False
+
+    async def ensure_indexes(self) -> None:
+        if self._indexes_ensured:
+            return
+        try:
+            await ensure_index_async(self.collection, SYNC_VERSION_FIELD, name=f"{self.name}_sync_version_idx")
+            await ensure_index_async(
+                self.tombstones_collection,
+                [("collection", ASCENDING), (SYNC_VERSION_FIELD, ASCENDING)],
+                name="sync_tombstones_collection_version_idx",
+            )
+            await ensure_index_async(
+                self.tombstones_collection,
+                "deletedAt",
+                name="sync_tombstones_deleted_at_ttl_idx",
+                expireAfterSeconds=int(TOMBSTONE_RETENTION.total_seconds()),
+            )
+            self._indexes_ensured = True
+        except PyMongoError as exc:
+            logger.warning("sync_version_indexes_failed collection=%s error=%s", self.name, exc)
+
+    async def current_version(self) -> int:
+        counter = await self.counters_collection.find_one({"_id": self.name})
+        return int((counter or {}).get("version") or 0)
+
+    async def _next_version(self) -> int:
+        counter = await self.counters_collection.find_one_and_update(
+            {"_id": self.name},
+            {"$inc": {"version": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return int(counter["version"])
+
+    async def mark_changed(self, *document_ids: Any) -> int:
+        ids = [document_id for document_id in document_ids if document_id is not None]
+        version = await self._next_version()
+        if ids:
+            await self.collection.update_many({"_id": {"$in": ids}}, {"$set": {SYNC_VERSION_FIELD: version}})
+        return version
+
+    async def mark_deleted(self, *document_ids: Any) -> int:
+        ids = [document_id for document_id in document_ids if document_id is not None]
+        version = await self._next_version()
+        if ids:
+            deleted_at = utc_now()
+            await self.tombstones_collection.insert_many([
+                {"collection": self.name, "documentId": str(document_id), SYNC_VERSION_FIELD: version, "deletedAt": deleted_at}
+                for document_id in ids
+            ])
+        return version
+
+    async def changes_since(self, since: int, query: dict | None = None, sort: Iterable[tuple[str, int]] | None = None) -> SyncDelta:
+        lower_bound = max(0, since - SYNC_CURSOR_OVERLAP)
+        changed_query = {SYNC_VERSION_FIELD: {"$gt": lower_bound}}
+        if query:
+            changed_query = {"$and": [query, changed_query]}
+        cursor = self.collection.find(changed_query)
+        if sort:
+            cursor = cursor.sort(list(sort))
+        changed = await cursor.to_list(length=None)
+        tombstones = await self.tombstones_collection.find(
+            {"collection": self.name, SYNC_VERSION_FIELD: {"$gt": lower_bound}},
+            {"documentId": 1},
+        ).to_list(length=None)
+        changed_ids = {str(document["_id"]) for document in changed}
+        deleted = sorted({tombstone["documentId"] for tombstone in tombstones} - changed_ids)
+        return SyncDelta(changed=changed, deleted=deleted)
+
+
+def build_delta_response(cursor: SyncCursor, items: list[dict], deleted: list[str], reset: bool) -> dict:
+    return {
+        "cursor": cursor.encode(),
+        "reset": reset,
+        "items": items,
+        "deleted": deleted,
+    }
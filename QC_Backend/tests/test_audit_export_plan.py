@@ -0,0 +1,89 @@
+import unittest
+from unittest.mock import patch
+
+from openpyxl import Workbook
+
+from generators.audit_mappings import export_plan
+from generators.audit_mappings.export_plan import (
+    AuditExportPlan,
+    bind_export_plan,
+    clear_audit_export_plans,
+    get_audit_export_plan,
+    get_bound_export_plan,
+    iter_cell_references,
+)
+
+
+def build_template_sheet():
+    worksheet = Workbook().active
+    worksheet.merge_cells("B2:D3")
+    worksheet.merge_cells("F10:F12")
+    return worksheet
+
+
+class AuditExportPlanTests(unittest.TestCase):
+    def tearDown(self):
+        clear_audit_export_plans()
+
+    def test_mapped_references_resolve_to_merge_anchors(self):
+        mapping = {
+            "1-1": {"2h": "C3", "4h": ["F11", "$F$12"], "8h": ("H1", "not-a-cell")},
+        }
+        plan = AuditExportPlan("II", "v1", build_template_sheet(), mapping)
+
+        self.assertEqual(plan.writable_cells["C3"], "B2")
+        self.assertEqual(plan.writable_cells["F11"], "F10")
+        self.assertEqual(plan.writable_cells["$F$12"], "F10")
+        self.assertEqual(plan.writable_cells["H1"], "H1")
+        self.assertNotIn("not-a-cell", plan.writable_cells)
+
+    def test_unmapped_references_resolve_lazily(self):
+        plan = AuditExportPlan("II", "v1", build_template_sheet(), {})
+        self.assertEqual(plan.writable_coordinate("D2"), "B2")
+        self.assertEqual(plan.writable_coordinate("B2"), "B2")
+        self.assertEqual(plan.writable_coordinate("bad ref"), "bad ref")
+
+    def test_plan_matches_merged_cell_lookup_for_every_cell(self):
+        worksheet = build_template_sheet()
+        plan = AuditExportPlan("II", "v1", worksheet, {})
+        for row in range(1, 14):
+            for column in "ABCDEFG":
+                coordinate = f"{column}{row}"
+                expected = coordinate
+                for merged_range in worksheet.merged_cells.ranges:
+                    if coordinate in merged_range:
+                        expected = merged_range.coord.split(":")[0]
+                self.assertEqual(plan.writable_coordinate(coordinate), expected)
+
+    def test_plans_are_reused_per_template_version(self):
+        with patch.object(export_plan, "get_audit_observation_mapping", return_value={"1-1": "C3"}) as build_mapping:
+            first = get_audit_export_plan("II", "v1", build_template_sheet())
+            self.assertIs(get_audit_export_plan("II", "v1", build_template_sheet()), first)
+            self.assertEqual(build_mapping.call_count, 1)
+
+            updated = get_audit_export_plan("II", "v2", build_template_sheet())
+            self.assertIsNot(updated, first)
+            self.assertEqual(build_mapping.call_count, 2)
+            self.assertNotIn(("II", "v1"), export_plan._plans)
+
+    def test_plans_without_a_template_version_are_not_cached(self):
+        with patch.object(export_plan, "get_audit_observation_mapping", return_value={"1-1": "C3"}) as build_mapping:
+            first = get_audit_export_plan("II", "", build_template_sheet())
+            self.assertIsNot(get_audit_export_plan("II", "", build_template_sheet()), first)
+            self.assertEqual(build_mapping.call_count, 2)
+            self.assertEqual(export_plan._plans, {})
+
+    def test_worksheets_are_bound_to_plans(self):
+        worksheet = build_template_sheet()
+        plan = AuditExportPlan("II", "v1", worksheet, {})
+        self.assertIsNone(get_bound_export_plan(worksheet))
+        bind_export_plan(worksheet, plan)
+        self.assertIs(get_bound_export_plan(worksheet), plan)
+
+    def test_iter_cell_references_skips_non_cell_values(self):
+        mapping = {"a": ["A1", {"b": "AB12"}], "c": "label", "d": 5}
+        self.assertEqual(list(iter_cell_references(mapping)), ["A1", "AB12"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import json
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+import numpy as np
+from bson import ObjectId, json_util
+from bson.decimal128 import Decimal128
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from models.peel_data_models import serialize_peel_docs
+from services.bson_json_response import BSONJSONResponse, ExtendedJSONResponse, dumps_bson
+
+
+def peel_document():
+    return {
+        "_id": ObjectId("6710a1b2c3d4e5f601234567"),
+        "date": "2026-10-19",
+        "shift": "A",
+        "Stringer": 3,
+        "created_at": datetime(2026, 10, 19, 6, 30, 15),
+        "updated_at": datetime(2026, 10, 19, 6, 45),
+        "Front_1_1": 1.42,
+        "Back_16_7": None,
+        "sample_results": [{"side": "Front", "bus_pad_position": 1, "value": 1.42}],
+        "remarks": "Ribbon détaché",
+    }
+
+
+class DumpsBSONTests(unittest.TestCase):
+    def test_plain_output_matches_the_serialized_peel_response(self):
+        documents = [peel_document(), peel_document()]
+        before = JSONResponse(jsonable_encoder({"count": 2, "data": serialize_peel_docs(documents)})).body
+
+        self.assertEqual(BSONJSONResponse({"count": 2, "data": documents}).body, before)
+
+    def test_extended_output_matches_json_util_round_trip(self):
+        document = {**peel_document(), "lot": Decimal128("12.50"), "tags": ("A", "B")}
+        expected = json.loads(json_util.dumps(document))
+
+        self.assertEqual(json.loads(ExtendedJSONResponse(document).body), expected)
+        self.assertEqual(expected["_id"], {"$oid": "6710a1b2c3d4e5f601234567"})
+
+    def test_numpy_values_decimals_bytes_and_non_string_keys_are_encoded(self):
+        payload = {1: np.float64(1.5), "counts": np.array([1, 2, 3]), "weight": Decimal("2.25"), "grid": b"\x00\x01"}
+
+        self.assertEqual(json.loads(dumps_bson(payload)), {"1": 1.5, "counts": [1, 2, 3], "weight": 2.25, "grid": "AAE="})
+
+    def test_unknown_types_are_rejected(self):
+        with self.assertRaises(TypeError):
+            dumps_bson({"value": object()})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import asyncio
+import unittest
+
+from pymongo.errors import OperationFailure
+
+from services.change_feed_service import (
+    ChangeFeedHub,
+    WatchedCollection,
+    format_sse,
+)
+
+
+class FakeAsyncCursor:
+    def __init__(self, documents):
+        self.documents = list(documents)
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield document
+
+
+class StandaloneCollection:
+    """Rejects change streams like a standalone mongod and serves stamped reads from a list."""
+
+    def __init__(self, documents, field_name="syncVersion"):
+        self.documents = documents
+        self.field_name = field_name
+        self.queries = []
+
+    def watch(self, **_kwargs):
+        raise OperationFailure("The $changeStream stage is only supported on replica sets", code=40573)
+
+    def _stamped(self, query, projection):
+        condition = query[self.field_name]
+        matched = [
+            {key: document[key] for key in ("_id", *projection) if key in document}
+            for document in self.documents
+            if document.get(self.field_name) is not None
+            and ("$gte" not in condition or document[self.field_name] >= condition["$gte"])
+        ]
+        return sorted(matched, key=lambda document: document[self.field_name])
+
+    async def find_one(self, query, projection=None, sort=None):
+        matched = self._stamped(query, projection)
+        return matched[-1] if matched else None
+
+    def find(self, query, projection=None, sort=None):
+        self.queries.append((query, projection))
+        return FakeAsyncCursor(self._stamped(query, projection))
+
+    async def estimated_document_count(self):
+        return len(self.documents)
+
+
+class ChangeFeedHelperTests(unittest.TestCase):
+    def test_sse_frames(self):
+        self.assertEqual(format_sse("change", '{"a":1}', 3), 'event: change\nid: 3\ndata: {"a":1}\n\n')
+
+
+class ChangeFeedHubTests(unittest.IsolatedAsyncioTestCase):
+    async def test_events_reach_only_matching_channels(self):
+        hub = ChangeFeedHub(database_factory=lambda: {}, collections=(), clock=lambda: "now")
+        tasks = hub.subscribe(["tasks"])
+        goals = hub.subscribe(["goals"])
+
+        hub.publish("tasks", "tasks", "update", "t1")
+        self.assertEqual(tasks.queue.get_nowait().documentId, "t1")
+        self.assertTrue(goals.queue.empty())
+
+    async def test_slow_subscriber_gets_a_single_resync(self):
+        hub = ChangeFeedHub(database_factory=lambda: {}, collections=(), queue_size=2, clock=lambda: "now")
+        subscription = hub.subscribe(["tasks"])
+        for index in range(3):
+            hub.publish("tasks", "tasks", "update", f"t{index}")
+
+        self.assertEqual(subscription.queue.qsize(), 1)
+        self.assertEqual(subscription.queue.get_nowait().operation, "resync")
+
+    async def test_standalone_mongo_falls_back_to_one_shared_incremental_poll(self):
+        collection = StandaloneCollection([{"_id": "t1", "title": "A", "syncVersion": 1}])
+        hub = ChangeFeedHub(
+            database_factory=lambda: {"tasks": collection},
+            collections=(WatchedCollection("tasks", "tasks", "syncVersion"),),
+            poll_interval_seconds=0.1,
+        )
+        first = hub.subscribe(["tasks"])
+        second = hub.subscribe(["tasks"])
+        await asyncio.sleep(0.05)
+        self.assertEqual(hub.mode, "polling")
+
+        collection.documents[0].update(title="B", syncVersion=2)
+        collection.documents.append({"_id": "t2", "title": "C", "syncVersion": 2})
+        events = [await asyncio.wait_for(first.queue.get(), 1) for _ in range(2)]
+        self.assertEqual([(event.operation, event.documentId) for event in events], [("update", "t1"), ("update", "t2")])
+        self.assertEqual(second.queue.qsize(), 2)
+
+        await asyncio.sleep(0.15)
+        self.assertTrue(first.queue.empty())
+        self.assertEqual(collection.queries[-1], ({"syncVersion": {"$gte": 2}}, {"syncVersion": 1}))
+        collection.documents.pop()
+        event = await asyncio.wait_for(first.queue.get(), 1)
+        self.assertEqual(event.operation, "resync")
+        queries = len(collection.queries)
+
+        hub.unsubscribe(first)
+        hub.unsubscribe(second)
+        await asyncio.sleep(0.25)
+        self.assertEqual(len(collection.queries), queries)
+        self.assertEqual(hub.mode, "idle")
+
+    async def test_only_channels_with_subscribers_are_watched(self):
+        tasks = StandaloneCollection([])
+        reports = StandaloneCollection([], "updatedAt")
+        hub = ChangeFeedHub(
+            database_factory=lambda: {"tasks": tasks, "gel_test_reports": reports},
+            collections=(
+                WatchedCollection("tasks", "tasks", "syncVersion"),
+                WatchedCollection("reports", "gel_test_reports", "updatedAt"),
+            ),
+            poll_interval_seconds=0.05,
+        )
+        task_subscription = hub.subscribe(["tasks"])
+        report_subscription = hub.subscribe(["reports"])
+        await asyncio.sleep(0.02)
+        self.assertEqual(set(hub._watchers), {"tasks", "gel_test_reports"})
+
+        hub.unsubscribe(report_subscription)
+        await asyncio.sleep(0.1)
+        self.assertEqual(set(hub._watchers), {"tasks"})
+        report_queries = len(reports.queries)
+        await asyncio.sleep(0.1)
+        self.assertEqual(len(reports.queries), report_queries)
+        self.assertGreater(len(tasks.queries), 0)
+
+        hub.unsubscribe(task_subscription)
+        self.assertEqual(hub._watchers, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import io
+import unittest
+
+from openpyxl import Workbook, load_workbook
+from openpyxl.drawing.image import Image as OpenpyxlImage
+from openpyxl.styles import Border, Font, Side
+from PIL import Image
+
+from generators.excel_template_stamping import compile_sheet_template
+
+
+def build_template_workbook():
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "Template"
+    thin = Side(style="thin")
+    for row in range(1, 8):
+        sheet.row_dimensions[row].height = 20
+        for column in range(1, 6):
+            cell = sheet.cell(row=row, column=column, value=f"H{row}{column}" if row == 1 else None)
+            cell.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+            cell.font = Font(bold=row == 1)
+    sheet.column_dimensions["B"].width = 32
+    sheet.merge_cells("A1:E1")
+    sheet.merge_cells("A3:A5")
+    sheet.page_setup.orientation = "landscape"
+    image_bytes = io.BytesIO()
+    Image.new("RGB", (40, 20), "red").save(image_bytes, format="PNG")
+    sheet.add_image(OpenpyxlImage(io.BytesIO(image_bytes.getvalue())), "B2")
+    return workbook, sheet
+
+
+def round_trip(workbook):
+    output = io.BytesIO()
+    workbook.save(output)
+    output.seek(0)
+    return load_workbook(output)
+
+
+class ExcelTemplateStampingTests(unittest.TestCase):
+    def test_stamp_matches_copy_worksheet_layout(self):
+        workbook, template_sheet = build_template_workbook()
+        compiled = compile_sheet_template(template_sheet)
+        stamped = compiled.stamp(workbook, "01.07.2026")
+        copied = workbook.copy_worksheet(template_sheet)
+
+        self.assertEqual(stamped["A1"].value, copied["A1"].value)
+        self.assertTrue(stamped["A1"].font.b)
+        self.assertEqual(stamped["C4"].border.left.style, "thin")
+        self.assertEqual(stamped.row_dimensions[2].height, 20)
+        self.assertEqual(stamped.column_dimensions["B"].width, 32)
+        self.assertEqual(stamped.page_setup.orientation, "landscape")
+        self.assertEqual(
+            sorted(item.coord for item in stamped.merged_cells.ranges),
+            sorted(item.coord for item in copied.merged_cells.ranges),
+        )
+        self.assertEqual(len(stamped._images), 1)
+
+    def test_stamped_sheets_are_independent_and_survive_save(self):
+        workbook, template_sheet = build_template_workbook()
+        compiled = compile_sheet_template(template_sheet)
+        first = compiled.stamp(workbook, "01.07.2026")
+        second = compiled.stamp(workbook, "02.07.2026")
+        first["B3"] = "filled"
+        first["A4"] = "merged position stays writable"
+        workbook.remove(template_sheet)
+
+        reloaded = round_trip(workbook)
+        self.assertEqual(reloaded.sheetnames, ["01.07.2026", "02.07.2026"])
+        self.assertEqual(reloaded["01.07.2026"]["B3"].value, "filled")
+        self.assertIsNone(reloaded["02.07.2026"]["B3"].value)
+        self.assertIn("A3:A5", {item.coord for item in reloaded["02.07.2026"].merged_cells.ranges})
+        self.assertIsNone(second["B3"].value)
+
+    def test_anchors_resolve_to_writable_top_left_cell(self):
+        _, template_sheet = build_template_workbook()
+        compiled = compile_sheet_template(template_sheet, anchors={"title": "C1", "date": "A4", "plain": "D6"})
+        self.assertEqual(compiled.anchor("title"), "A1")
+        self.assertEqual(compiled.anchor("date"), "A3")
+        self.assertEqual(compiled.anchor("plain"), "D6")
+
+    def test_stamp_rejects_foreign_workbook(self):
+        _, template_sheet = build_template_workbook()
+        compiled = compile_sheet_template(template_sheet)
+        with self.assertRaises(ValueError):
+            compiled.stamp(Workbook(), "01.07.2026")
+
+
+if __name__ == "__main__":
+    unittest.main()
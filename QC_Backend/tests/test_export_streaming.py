@@ -0,0 +1,43 @@
+import io
+import unittest
+from unittest.mock import patch
+
+from openpyxl import Workbook, load_workbook
+
+from services import export_streaming
+from services.export_streaming import build_export_response, iter_export_chunks, save_workbook_to_spool
+
+
+class ExportStreamingTests(unittest.TestCase):
+    def test_workbook_spills_to_disk_past_threshold(self):
+        workbook = Workbook()
+        for row in range(1, 200):
+            workbook.active.cell(row=row, column=1, value=f"value {row}")
+
+        with patch.object(export_streaming, "EXPORT_SPOOL_MAX_BYTES", 1024):
+            spilled = save_workbook_to_spool(workbook)
+        with patch.object(export_streaming, "EXPORT_SPOOL_MAX_BYTES", 10 * 1024 * 1024):
+            in_memory = save_workbook_to_spool(workbook)
+
+        self.assertTrue(spilled._rolled)
+        self.assertFalse(in_memory._rolled)
+        self.assertEqual(spilled.tell(), 0)
+        self.assertEqual(load_workbook(spilled).active["A199"].value, "value 199")
+        spilled.close()
+        in_memory.close()
+
+    def test_chunks_are_bounded_and_buffer_is_closed(self):
+        output = io.BytesIO(b"x" * 10)
+        self.assertEqual(list(iter_export_chunks(output, chunk_size=4)), [b"xxxx", b"xxxx", b"xx"])
+        self.assertTrue(output.closed)
+
+    def test_response_reports_length_and_attachment_name(self):
+        output = io.BytesIO(b"payload")
+        response = build_export_response(output, "Report.xlsx")
+        self.assertEqual(response.headers["content-length"], "7")
+        self.assertEqual(response.headers["content-disposition"], 'attachment; filename="Report.xlsx"')
+        self.assertEqual(response.media_type, export_streaming.XLSX_MEDIA_TYPE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,199 @@
+import unittest
+from unittest.mock import patch
+
+from pymongo.errors import OperationFailure
+
+from migrations import compound_index_plan
+from models import gel_test_models, wet_leakage_test_models
+from routes import rot_route
+from services import index_advisor_service as advisor
+from services.dashboard_analytics_service import build_dashboard_response
+
+
+def shape(equality=(), sort=(), ranges=(), weight=1, source=""):
+    return advisor.QueryShape("gel_test_reports", tuple(equality), tuple(sort), tuple(ranges), source, weight)
+
+
+class QueryShapeTests(unittest.TestCase):
+    def test_equality_sort_and_range_fields_are_separated(self):
+        result = advisor.extract_query_shape(
+            "gel_test_reports",
+            {
+                "$and": [
+                    {"shift": "A"},
+                    {"date": {"$gte": "2026-10-01", "$lte": "2026-10-07"}},
+                    {"$or": [{"name": {"$regex": "gel", "$options": "i"}}, {"lineNumber": {"$regex": "gel", "$options": "i"}}]},
+                ],
+                "workflowState": {"$in": ["submitted"]},
+                "name": {"$regex": "^G", "$options": "i"},
+            },
+            [("timestamp", -1), ("_id", -1)],
+        )
+        self.assertEqual(result.equality, ("shift", "workflowState"))
+        self.assertEqual(result.sort, (("timestamp", -1), ("_id", -1)))
+        self.assertEqual(result.ranges, ("date",))
+
+    def test_esr_keys_put_the_most_pinned_equality_field_first(self):
+        shapes = [
+            shape(equality=("lineNumber", "shift"), sort=(("timestamp", -1),), ranges=("date",)),
+            shape(equality=("shift",), weight=3),
+        ]
+        rank = advisor._equality_rank(shapes)
+        self.assertEqual(
+            advisor.esr_index_keys(shapes[0], rank),
+            (("shift", 1), ("lineNumber", 1), ("timestamp", -1), ("date", 1)),
+        )
+
+    def test_index_serves_requires_the_sort_section_and_a_bounding_range(self):
+        keys = (("shift", 1), ("timestamp", -1), ("_id", -1), ("date", 1))
+        self.assertTrue(advisor.index_serves(keys, shape(("shift",), (("timestamp", 1), ("_id", 1)), ("date",))))
+        self.assertFalse(advisor.index_serves(keys, shape(("shift",), (("timestamp", -1), ("_id", 1)))))
+        self.assertFalse(advisor.index_serves(keys, shape(("shift",), ranges=("date",))))
+        self.assertTrue(advisor.index_serves((("date", -1), ("_id", -1)), shape(ranges=("date",))))
+
+
+class ProposeIndexesTests(unittest.TestCase):
+    def test_prefix_proposals_are_folded_and_served_shapes_skipped(self):
+        shapes = [
+            shape(sort=(("timestamp", -1), ("_id", -1)), weight=5, source="register newest"),
+            shape(sort=(("timestamp", -1), ("_id", -1)), ranges=("date",), weight=4, source="register week"),
+            shape(equality=("status",), weight=2, source="status count"),
+        ]
+        proposals = advisor.propose_indexes(
+            shapes,
+            existing_indexes={"gel_test_reports": {"_id_": {"key": [("_id", 1)]}, "gel_status_idx": {"key": [("status", 1)]}}},
+            name_prefixes={"gel_test_reports": "gel"},
+        )
+
+        self.assertEqual(len(proposals), 1)
+        self.assertEqual(proposals[0].keys, (("timestamp", -1), ("_id", -1), ("date", 1)))
+        self.assertEqual(proposals[0].name, "gel_timestamp_desc_id_desc_date_esr_idx")
+        self.assertEqual(proposals[0].weight, 9)
+        self.assertEqual(proposals[0].sources, ["register newest", "register week"])
+
+    def test_existing_compound_indexes_count_against_the_budget(self):
+        shapes = [
+            shape(equality=("shift",), sort=(("timestamp", -1),), weight=5),
+            shape(equality=("workflowState",), sort=(("timestamp", -1),), weight=3),
+            shape(equality=("workflowState",), sort=(("updatedAt", -1),), weight=2),
+            shape(equality=("status",), weight=1),
+        ]
+        first = advisor.propose_indexes(shapes, max_compound_indexes=2)
+        self.assertEqual(
+            [proposal.keys for proposal in first],
+            [(("shift", 1), ("timestamp", -1)), (("workflowState", 1), ("timestamp", -1)), (("status", 1),)],
+        )
+
+        existing = {proposal.name: {"key": list(proposal.keys)} for proposal in first}
+        rerun = advisor.propose_indexes(shapes, existing_indexes={"gel_test_reports": existing}, max_compound_indexes=2)
+        self.assertEqual(rerun, [])
+
+    def test_redundant_indexes_skip_unique_and_id(self):
+        information = {
+            "_id_": {"key": [("_id", 1)]},
+            "gel_date_desc_idx": {"key": [("date", -1)]},
+            "gel_date_asc_unique_idx": {"key": [("date", 1)], "unique": True},
+            "gel_shift_idx": {"key": [("shift", 1)]},
+            "gel_name_idx": {"key": [("name", 1)]},
+        }
+        redundant = advisor.find_redundant_indexes(information, [(("date", -1), ("_id", -1)), (("shift", 1), ("timestamp", -1))])
+        self.assertEqual(redundant, ["gel_date_desc_idx", "gel_shift_idx"])
+
+
+class PlanCheckTests(unittest.TestCase):
+    def test_index_scan_without_sort_is_ok(self):
+        explain = {"queryPlanner": {"winningPlan": {"stage": "LIMIT", "inputStage": {
+            "stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "gel_timestamp_desc_id_desc_date_esr_idx"},
+        }}}}
+        check = advisor.check_winning_plan(explain)
+        self.assertTrue(check.ok)
+        self.assertEqual(check.index_names, ("gel_timestamp_desc_id_desc_date_esr_idx",))
+
+    def test_blocking_sort_and_collection_scan_are_reported(self):
+        explain = {"stages": [{"$cursor": {"queryPlanner": {"winningPlan": {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}}}}]}
+        check = advisor.check_winning_plan(explain)
+        self.assertFalse(check.ok)
+        self.assertTrue(check.collection_scan)
+        self.assertTrue(check.blocking_sort)
+
+
+class ShapeRecordingCollectionTests(unittest.TestCase):
+    def test_dashboard_builder_shapes_are_recorded(self):
+        recorder = advisor.ShapeRecordingCollection("gel_test_reports", source="dashboard", weight=4)
+        build_dashboard_response(
+            collection=recorder,
+            query={"date": {"$gte": "2026-10-01", "$lte": "2026-10-07"}},
+            view="daily",
+            total_key="total",
+            serialize_item=lambda item: item,
+            item_sort=[("date", -1), ("timestamp", -1)],
+        )
+
+        self.assertTrue(recorder.shapes)
+        self.assertTrue(all(recorded.weight == 4 and recorded.source == "dashboard" for recorded in recorder.shapes))
+        self.assertIn("date", {name for recorded in recorder.shapes for name in recorded.ranges + tuple(key for key, _ in recorded.sort)})
+
+
+class RegisterQueryTests(unittest.TestCase):
+    def test_shift_entry_registers_skip_filters_the_checksheet_lacks(self):
+        module = rot_route.ROT_ENTRY_MODULE
+
+        self.assertIsNone(compound_index_plan.build_register_query(rot_route, module, {"shift": "A"}))
+        query = compound_index_plan.build_register_query(
+            rot_route, module, {"date_from": "2026-10-01", "status_filter": "submitted"}
+        )
+        date_query, status_query = query["$and"]
+        self.assertEqual(date_query, {"date": {"$gte": "2026-10-01"}})
+        self.assertIn({"workflowState": "submitted"}, status_query["$or"])
+
+
+class FakeIndexCollection:
+    name = "fake"
+
+    def __init__(self, existing, failing=()):
+        self.indexes = {name: {"key": [("legacy", 1)]} for name in existing}
+        self.failing = set(failing)
+        self.calls = []
+
+    def index_information(self):
+        return dict(self.indexes)
+
+    def create_index(self, keys, name, **options):
+        if name in self.failing:
+            raise OperationFailure("index build failed")
+        self.calls.append(("create", name))
+        self.indexes[name] = {"key": list(keys), **options}
+        return name
+
+    def drop_index(self, name):
+        self.calls.append(("drop", name))
+        self.indexes.pop(name)
+
+
+class IndexStartupTaskTests(unittest.TestCase):
+    def test_superseded_indexes_are_dropped_after_their_replacements(self):
+        collection = FakeIndexCollection(["gel_timestamp_desc_idx", "gel_shift_idx"])
+        with patch.object(gel_test_models, "gel_test_collection", collection):
+            gel_test_models.ensure_gel_test_indexes()
+
+        drops = [index for index, (action, _) in enumerate(collection.calls) if action == "drop"]
+        creates = [index for index, (action, _) in enumerate(collection.calls) if action == "create"]
+        self.assertEqual(len(drops), 2)
+        self.assertLess(max(creates), min(drops))
+
+    def test_failed_replacement_keeps_the_superseded_indexes(self):
+        collection = FakeIndexCollection(
+            ["date_1", "wet_leakage_date_idx", "wet_leakage_created_at_desc_idx"],
+            failing=["wet_leakage_created_at_desc_id_desc_date_esr_idx"],
+        )
+        with patch.object(wet_leakage_test_models, "wet_leakage_entries_collection", collection):
+            with self.assertLogs(level="WARNING"):
+                wet_leakage_test_models.ensure_wet_leakage_indexes()
+
+        self.assertEqual([call for call in collection.calls if call[0] == "drop"], [("drop", "date_1")])
+        self.assertIn("wet_leakage_date_idx", collection.indexes)
+        self.assertIn("wet_leakage_created_at_desc_idx", collection.indexes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,212 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from bson import ObjectId
+from fastapi import HTTPException
+
+from models.ipqc_audit_models import IPQCAudit
+from routes import ipqc_audit_route
+from services.ipqc_audit_autosave_service import (
+    IPQCAuditAutosaveCache,
+    apply_ipqc_audit_delta,
+    build_data_version_filter,
+)
+
+
+def audit_data():
+    return {
+        "lineNumber": "I",
+        "date": "2026-03-01",
+        "stages": [
+            {"id": 1, "parameters": [
+                {"id": "1-1", "observations": [{"timeSlot": "2 hrs", "value": ""}]},
+            ]},
+        ],
+    }
+
+
+class ApplyAuditDeltaTests(unittest.TestCase):
+    def test_fields_and_observations_are_applied_in_place(self):
+        data = audit_data()
+        changes = apply_ipqc_audit_delta(data, {
+            "fields": {"shift": "A"},
+            "observations": [
+                {"stageId": 1, "parameterId": "1-1", "timeSlot": "2 hrs", "value": "OK"},
+                {"stageId": "1", "parameterId": "1-1", "timeSlot": "4 hrs", "value": "NG", "selectedLine": "II"},
+            ],
+        })
+        self.assertEqual(changes, 3)
+        self.assertEqual(data["shift"], "A")
+        self.assertEqual(data["stages"][0]["parameters"][0]["observations"], [
+            {"timeSlot": "2 hrs", "value": "OK"},
+            {"timeSlot": "4 hrs", "value": "NG", "selectedLine": "II"},
+        ])
+
+    def test_invalid_deltas_are_rejected(self):
+        with self.assertRaises(ValueError):
+            apply_ipqc_audit_delta(audit_data(), {"observations": [{"stageId": 9, "parameterId": "9-1", "timeSlot": "2 hrs"}]})
+        with self.assertRaises(ValueError):
+            apply_ipqc_audit_delta(audit_data(), {"fields": {"stages": []}})
+        with self.assertRaises(ValueError):
+            apply_ipqc_audit_delta(audit_data(), {"observations": [{"stageId": 1, "parameterId": "1-1"}]})
+
+    def test_unversioned_audits_match_version_zero(self):
+        self.assertIn({"dataVersion": {"$exists": False}}, build_data_version_filter(0)["$or"])
+        self.assertEqual(build_data_version_filter(3), {"dataVersion": 3})
+
+
+class AutosaveCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.saved = []
+        self.cache = IPQCAuditAutosaveCache(save_payload=lambda key, data: self.saved.append((key, data["date"])))
+        self.loads = 0
+
+    def load(self):
+        self.loads += 1
+        return audit_data()
+
+    def test_every_commit_is_written_before_the_copy_moves_on(self):
+        for version, date in enumerate(["2026-03-02", "2026-03-03"], start=1):
+            working_copy = self.cache.checkout("ipqc-audit/1.json", version - 1, self.load)
+            self.cache.commit(working_copy, {**working_copy.data, "date": date}, version)
+
+        self.assertEqual(self.loads, 1)
+        self.assertEqual(self.saved, [("ipqc-audit/1.json", "2026-03-02"), ("ipqc-audit/1.json", "2026-03-03")])
+        self.assertEqual((working_copy.version, working_copy.data["date"]), (2, "2026-03-03"))
+
+    def test_stale_copy_is_reloaded_for_newer_version(self):
+        self.cache.checkout("ipqc-audit/1.json", 0, self.load)
+        self.cache.checkout("ipqc-audit/1.json", 4, self.load)
+        self.assertEqual(self.loads, 2)
+
+    def test_failed_write_drops_the_copy_and_raises(self):
+        def failing_save(_key, _data):
+            raise RuntimeError("s3 unavailable")
+
+        cache = IPQCAuditAutosaveCache(save_payload=failing_save)
+        working_copy = cache.checkout("ipqc-audit/1.json", 0, self.load)
+        with self.assertLogs("services.ipqc_audit_autosave_service", level="ERROR"):
+            with self.assertRaises(RuntimeError):
+                cache.commit(working_copy, {**working_copy.data, "date": "2026-03-09"}, 1)
+
+        self.assertEqual(working_copy.data["date"], "2026-03-01")
+        cache.checkout("ipqc-audit/1.json", 0, self.load)
+        self.assertEqual(self.loads, 2)
+
+    def test_least_recently_used_copies_are_evicted(self):
+        cache = IPQCAuditAutosaveCache(save_payload=lambda key, data: None, max_entries=2)
+        for key in ("a.json", "b.json", "a.json", "c.json"):
+            cache.checkout(key, 0, self.load)
+        cache.checkout("b.json", 0, self.load)
+        self.assertEqual(self.loads, 4)
+
+
+
+class FakeAuditCollection:
+    def __init__(self, audit, matched_count=1):
+        self.audit = audit
+        self.matched_count = matched_count
+        self.queries = []
+        self.updates = []
+
+    def find_one(self, query, projection=None):
+        return dict(self.audit)
+
+    def update_one(self, query, update):
+        self.queries.append(query)
+        self.updates.append(update)
+        return SimpleNamespace(matched_count=self.matched_count)
+
+
+class AutosaveRouteTests(unittest.TestCase):
+    def setUp(self):
+        self.audit_id = ObjectId()
+        self.collection = FakeAuditCollection(
+            {"_id": self.audit_id, "name": "Audit 1", "timestamp": "2026-03-01T00:00:00", "s3_key": "ipqc-audit/1.json", "dataVersion": 0}
+        )
+        self.events = []
+
+    def autosave(self, save_payload):
+        cache = IPQCAuditAutosaveCache(save_payload=save_payload)
+        user = {"id": "u1", "employeeId": "E1", "name": "Operator One", "role": "Operator"}
+        with patch.object(ipqc_audit_route, "ipqc_audit_collection", self.collection), \
+                patch.object(ipqc_audit_route, "ipqc_audit_autosave_cache", cache), \
+                patch.object(ipqc_audit_route, "get_ipqc_current_user", return_value=user), \
+                patch.object(ipqc_audit_route, "can_edit_audit", return_value=True), \
+                patch.object(ipqc_audit_route, "require_edit_lock_if_operator"), \
+                patch.object(ipqc_audit_route, "queue_stringer_report_refresh", lambda *audits: self.events.append("refresh")), \
+                patch.object(IPQCAudit, "get_data", return_value=audit_data()):
+            return asyncio.run(ipqc_audit_route.autosave_ipqc_audit(
+                str(self.audit_id), {"baseVersion": 0, "fields": {"shift": "A"}}, x_employee_id="E1"
+            ))
+
+    def test_report_refresh_is_queued_after_the_s3_write(self):
+        result = self.autosave(lambda key, data: self.events.append("s3"))
+
+        self.assertEqual(self.events, ["s3", "refresh"])
+        self.assertEqual(result["dataVersion"], 1)
+
+    def test_failed_s3_write_queues_no_refresh(self):
+        def failing_save(_key, _data):
+            raise RuntimeError("s3 unavailable")
+
+        with self.assertLogs("services.ipqc_audit_autosave_service", level="ERROR"):
+            with self.assertRaises(HTTPException) as raised:
+                self.autosave(failing_save)
+
+        self.assertEqual(raised.exception.status_code, 500)
+        self.assertEqual(self.events, [])
+        self.assertEqual(len(self.collection.updates), 2)
+
+
+class FullSaveRouteTests(unittest.TestCase):
+    def setUp(self):
+        self.audit_id = ObjectId()
+        self.audit = {"_id": self.audit_id, "name": "Audit 1", "timestamp": "2026-03-01T00:00:00", "s3_key": "ipqc-audit/1.json", "dataVersion": 2}
+        self.saved = []
+
+    def save(self, collection, payload=None):
+        user = {"id": "u1", "employeeId": "E1", "name": "Operator One", "role": "Operator"}
+        with patch.object(ipqc_audit_route, "ipqc_audit_collection", collection), \
+                patch.object(ipqc_audit_route, "get_ipqc_current_user", return_value=user), \
+                patch.object(ipqc_audit_route, "can_edit_audit", return_value=True), \
+                patch.object(ipqc_audit_route, "require_edit_lock_if_operator"), \
+                patch.object(ipqc_audit_route, "validate_audit_payload"), \
+                patch.object(ipqc_audit_route, "ensure_unique_audit_name"), \
+                patch.object(ipqc_audit_route, "queue_stringer_report_refresh"), \
+                patch.object(IPQCAudit, "get_data", return_value=audit_data()), \
+                patch.object(IPQCAudit, "save_data", lambda _audit, data: self.saved.append(data) or True):
+            return asyncio.run(ipqc_audit_route.update_ipqc_audit(
+                str(self.audit_id), payload or {"data": {"shift": "A"}}, x_employee_id="E1"
+            ))
+
+    def test_save_claims_the_next_version_before_writing_s3(self):
+        collection = FakeAuditCollection(self.audit)
+
+        self.save(collection)
+
+        self.assertEqual(collection.queries[0], {"_id": self.audit_id, "dataVersion": 2})
+        self.assertEqual(collection.updates[0]["$set"]["dataVersion"], 3)
+        self.assertEqual(self.saved[0]["dataVersion"], 3)
+
+    def test_save_racing_another_writer_is_rejected_without_an_s3_write(self):
+        with self.assertRaises(HTTPException) as raised:
+            self.save(FakeAuditCollection(self.audit, matched_count=0))
+
+        self.assertEqual(raised.exception.status_code, 409)
+        self.assertEqual(self.saved, [])
+
+    def test_stale_base_version_is_rejected(self):
+        collection = FakeAuditCollection(self.audit)
+
+        with self.assertRaises(HTTPException) as raised:
+            self.save(collection, {"baseVersion": 1, "data": {"shift": "A"}})
+
+        self.assertEqual(raised.exception.status_code, 409)
+        self.assertEqual((collection.updates, self.saved), ([], []))
+
+
+if __name__ == "__main__":
+    unittest.main()
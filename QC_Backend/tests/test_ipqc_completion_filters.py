@@ -0,0 +1,41 @@
+import unittest
+from unittest.mock import patch
+
+from models.ipqc_audit_models import IPQCAudit, get_ipqc_completion_bucket
+from routes import ipqc_audit_route
+
+
+class FakeCollection:
+    def __init__(self):
+        self.updates = []
+
+    def update_one(self, query, update):
+        self.updates.append((query, update))
+
+
+class CompletionBucketTests(unittest.TestCase):
+    def test_percentages_map_to_filter_buckets(self):
+        self.assertEqual(
+            [get_ipqc_completion_bucket(value) for value in (0, 25, 26, 50, 51, 75, 76, 99, 100, None, "bad")],
+            ["0-25", "0-25", "26-50", "26-50", "51-75", "51-75", "76-99", "76-99", "100", "0-25", "0-25"],
+        )
+
+    def test_completion_range_is_an_indexed_equality_query(self):
+        self.assertEqual(ipqc_audit_route.build_completion_range_query("76-99"), {"completionBucket": "76-99"})
+        self.assertEqual(ipqc_audit_route.build_completion_range_query("unknown"), {})
+        self.assertEqual(ipqc_audit_route.build_completion_range_query(None), {})
+
+    def test_missing_bucket_is_derived_without_loading_the_payload(self):
+        collection = FakeCollection()
+        audit = {"_id": "a1", "completedStages": 31, "totalStages": 31, "completionPercentage": 100}
+        with patch.object(ipqc_audit_route, "ipqc_audit_collection", collection), \
+                patch.object(IPQCAudit, "get_data", side_effect=AssertionError("payload loaded")):
+            completion = ipqc_audit_route.ensure_completion_metadata(audit)
+
+        self.assertEqual(completion["completionBucket"], "100")
+        self.assertEqual(collection.updates, [({"_id": "a1"}, {"$set": {"completionBucket": "100"}})])
+        self.assertEqual(audit["completionBucket"], "100")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import unittest
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+
+from services.keyset_pagination import (
+    InvalidCursorError,
+    build_keyset_query,
+    decode_cursor,
+    encode_cursor,
+    paginate_keyset,
+)
+
+
+def sort_key(value):
+    return (value is not None, value if value is not None else "")
+
+
+def matches(document, query):
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(document, clause) for clause in condition):
+                return False
+            continue
+        if key == "$and":
+            if not all(matches(document, clause) for clause in condition):
+                return False
+            continue
+        value = document.get(key)
+        if isinstance(condition, dict):
+            for operator, operand in condition.items():
+                if operator == "$ne" and value == operand:
+                    return False
+                if operator in {"$lt", "$gt"}:
+                    if value is None or (operator == "$lt" and not value < operand) or (operator == "$gt" and not value > operand):
+                        return False
+        elif value != condition:
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, keys):
+        for field, direction in reversed(keys):
+            self.documents.sort(key=lambda document: sort_key(document.get(field)), reverse=direction == DESCENDING)
+        return self
+
+    def limit(self, count):
+        return self.documents[:count]
+
+
+class FakeCollection:
+    def __init__(self, documents):
+        self.documents = documents
+        self.queries = []
+        self.projections = []
+
+    def find(self, query, projection=None):
+        self.queries.append(query)
+        self.projections.append(projection)
+        return FakeCursor([document for document in self.documents if matches(document, query)])
+
+    def count_documents(self, query, limit=0):
+        total = sum(1 for document in self.documents if matches(document, query))
+        return min(total, limit) if limit else total
+
+    def estimated_document_count(self):
+        return len(self.documents)
+
+
+def collect_pages(collection, direction, page_size=3, **kwargs):
+    pages = []
+    cursor = ""
+    while cursor is not None:
+        page = paginate_keyset(collection, {}, "date", direction, page_size, cursor=cursor or None, **kwargs)
+        pages.append([document["name"] for document in page.items])
+        cursor = page.next_cursor
+    return pages
+
+
+class KeysetPaginationTests(unittest.TestCase):
+    def setUp(self):
+        dates = ["2026-03-01", "2026-03-02", "2026-03-02", "2026-03-02", None, "2026-03-04", None, "2026-03-05"]
+        self.documents = [
+            {"_id": ObjectId(f"{index:024x}"), "name": f"doc{index}", "date": date}
+            for index, date in enumerate(dates)
+        ]
+        self.collection = FakeCollection(self.documents)
+
+    def expected_order(self, direction):
+        cursor = FakeCursor(list(self.documents)).sort([("date", direction), ("_id", direction)])
+        return [document["name"] for document in cursor.documents]
+
+    def test_descending_pages_cover_ties_and_missing_values_once(self):
+        pages = collect_pages(self.collection, DESCENDING)
+        self.assertEqual([name for page in pages for name in page], self.expected_order(DESCENDING))
+        self.assertEqual([len(page) for page in pages], [3, 3, 2])
+
+    def test_ascending_pages_start_with_missing_values(self):
+        pages = collect_pages(self.collection, ASCENDING)
+        self.assertEqual([name for page in pages for name in page], self.expected_order(ASCENDING))
+        self.assertEqual(pages[0][:2], ["doc4", "doc6"])
+
+    def test_post_filter_tops_up_pages(self):
+        pages = collect_pages(self.collection, DESCENDING, page_size=2, post_filter=lambda document: document["date"] is not None)
+        self.assertEqual(pages, [["doc7", "doc5"], ["doc3", "doc2"], ["doc1", "doc0"]])
+
+    def test_total_is_bounded(self):
+        page = paginate_keyset(self.collection, {"name": {"$ne": "doc0"}}, "date", DESCENDING, 2, include_total=True)
+        self.assertEqual((page.total, page.total_is_estimate), (7, False))
+        response = page.to_response(lambda document: document["name"], 2)
+        self.assertTrue(response["has_more"])
+        self.assertEqual(response["items"], ["doc7", "doc5"])
+
+    def test_inclusion_projection_keeps_the_sort_key(self):
+        paginate_keyset(self.collection, {}, "date", DESCENDING, 2, projection={"name": 1})
+        paginate_keyset(self.collection, {}, "date", DESCENDING, 2, projection={"lines": 0})
+        self.assertEqual(self.collection.projections, [{"name": 1, "date": 1}, {"lines": 0}])
+
+    def test_cursor_round_trip_and_sort_mismatch(self):
+        token = encode_cursor("date", DESCENDING, self.documents[1])
+        self.assertEqual(decode_cursor(token, "date", DESCENDING), ("2026-03-02", self.documents[1]["_id"]))
+        with self.assertRaises(InvalidCursorError):
+            decode_cursor(token, "timestamp", DESCENDING)
+        with self.assertRaises(InvalidCursorError):
+            decode_cursor("not-a-cursor", "date", DESCENDING)
+
+    def test_keyset_query_uses_sort_value_then_id(self):
+        last_id = ObjectId()
+        self.assertEqual(build_keyset_query("timestamp", DESCENDING, "2026-03-01", last_id), {"$or": [
+            {"timestamp": {"$lt": "2026-03-01"}},
+            {"timestamp": "2026-03-01", "_id": {"$lt": last_id}},
+            {"timestamp": None},
+        ]})
+
+
+if __name__ == "__main__":
+    unittest.main()
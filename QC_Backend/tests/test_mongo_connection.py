@@ -0,0 +1,39 @@
+import threading
+import unittest
+
+import mongo_connection
+
+
+class StartupTaskTests(unittest.TestCase):
+    def test_tasks_run_concurrently_and_failures_are_reported(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def wait_for_peer():
+            barrier.wait()
+
+        def broken():
+            raise RuntimeError("index build failed")
+
+        with self.assertLogs("mongo_connection", level="INFO") as logs:
+            results = mongo_connection.run_startup_tasks(
+                {"ssh_indexes": wait_for_peer, "potting_indexes": wait_for_peer, "gel_indexes": broken},
+                max_workers=3,
+            )
+
+        by_name = {result.name: result for result in results}
+        self.assertEqual(set(by_name), {"ssh_indexes", "potting_indexes", "gel_indexes"})
+        self.assertIsNone(by_name["ssh_indexes"].error)
+        self.assertEqual(by_name["gel_indexes"].error, "index build failed")
+        self.assertTrue(any("startup_task_timing name=gel_indexes" in line and "status=failed" in line for line in logs.output))
+        self.assertTrue(any("startup_tasks_completed tasks=3 failed=1 workers=3" in line for line in logs.output))
+
+    def test_model_imports_register_index_setup_instead_of_running_it(self):
+        from models import ssh_test_models
+
+        tasks = mongo_connection.registered_startup_tasks()
+        self.assertIs(tasks["ssh_test_indexes"], ssh_test_models.ensure_ssh_indexes)
+        self.assertIs(ssh_test_models.client, mongo_connection.get_mongo_client())
+
+
+if __name__ == "__main__":
+    unittest.main()
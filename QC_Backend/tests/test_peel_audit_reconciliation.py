@@ -1,6 +1,9 @@
 from copy import deepcopy
 from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
 
+from services import peel_audit_reconciliation_service as reconciliation
 from services.peel_audit_reconciliation_service import build_source_side, reconcile_payload
 
 
@@ -116,3 +119,65 @@ def test_legacy_off_backfill_requires_explicit_migration_flag():
     front(data)["peelSync"].pop("frontSide")
     assert reconcile_payload(data, [source()], migrate_legacy=False) == []
     assert len(reconcile_payload(data, [source()], migrate_legacy=True)) == 1
+
+
+class FakeLeasedAuditCollection:
+    def __init__(self, audit, matched_count=1):
+        self.audit = audit
+        self.matched_count = matched_count
+        self.updates = []
+
+    def find_one_and_update(self, query, update, return_document=None):
+        return dict(self.audit)
+
+    def update_one(self, query, update):
+        self.updates.append((query, update))
+        return SimpleNamespace(matched_count=self.matched_count)
+
+
+def reconcile_stored_audit(payload, *, data_version=4, matched_count=1, saved=True):
+    audits = FakeLeasedAuditCollection(
+        {"_id": "audit-1", "name": "Audit 1", "timestamp": "t", "s3_key": "ipqc/1.json", "dataVersion": data_version},
+        matched_count,
+    )
+    report = MagicMock()
+    report.get_data.return_value = payload
+    report.save_data.return_value = saved
+    with patch.object(reconciliation, "ipqc_audit_collection", audits), \
+            patch.object(reconciliation, "peel_reconciliation_audit_collection", MagicMock(find_one=MagicMock(return_value=None))), \
+            patch.object(reconciliation.IPQCAudit, "from_dict", return_value=report), \
+            patch.object(reconciliation, "_source_records", return_value=[source()]):
+        try:
+            return reconciliation.reconcile_audit({"_id": "audit-1"}), audits.updates, report
+        except RuntimeError:
+            return None, audits.updates, report
+
+
+def test_reconciled_payload_bumps_data_version_in_s3_and_mongo():
+    result, updates, report = reconcile_stored_audit({**audit_side(), "dataVersion": 4})
+
+    assert result == {"updated": 1, "busy": 0}
+    claim_query, claim = updates[0]
+    assert claim_query["dataVersion"] == 4
+    assert claim["$set"]["dataVersion"] == 5
+    assert "completionPercentage" in claim["$set"]
+    assert report.save_data.call_args.args[0]["dataVersion"] == 5
+
+
+def test_reconciliation_backs_off_when_an_editor_saved_first():
+    result, updates, report = reconcile_stored_audit({**audit_side(), "dataVersion": 4}, matched_count=0)
+    assert result == {"updated": 0, "busy": 1}
+    report.save_data.assert_not_called()
+
+    result, updates, report = reconcile_stored_audit({**audit_side(), "dataVersion": 3})
+    assert result == {"updated": 0, "busy": 1}
+    assert [query for query, update in updates if "$set" in update] == []
+
+
+def test_failed_s3_write_puts_the_claimed_version_back():
+    result, updates, _report = reconcile_stored_audit({**audit_side(), "dataVersion": 4}, saved=False)
+
+    assert result is None
+    rollback_query, rollback = updates[1]
+    assert rollback_query["dataVersion"] == 5
+    assert rollback["$set"]["dataVersion"] == 4
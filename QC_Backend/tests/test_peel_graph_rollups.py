@@ -0,0 +1,171 @@
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+from extractors import peel_extractor
+from migrations import backfill_peel_graph_rollups
+from models.peel_data_models import MEASUREMENT_ARRAYS_FIELD, MEASUREMENT_SUMMARY_FIELD, normalize_peel_record, summarize_measurement_arrays
+from services import peel_graph_service
+
+
+def peel_record(date, unit, front=None, back=None):
+    record = {"date": date, "shift": "A", "Stringer": 3, "Unit": unit, "file_name": f"{date}-{unit}.docx"}
+    for side, rows in (("Front", front or {}), ("Back", back or {})):
+        for pad, values in rows.items():
+            for ribbon, value in enumerate(values, start=1):
+                record[f"{side}_{pad}_{ribbon}"] = value
+    return normalize_peel_record(record)
+
+
+class FakePeelCollection:
+    def __init__(self, records):
+        self.records = records
+        self.queries = []
+
+    def find(self, query, projection=None):
+        self.queries.append(query)
+        return [dict(record) for record in self.records if record["date"] in query["date"]["$in"]]
+
+
+class FakeRollupCollection:
+    def __init__(self, rollups=()):
+        self.rollups = list(rollups)
+        self.written = []
+        self.deleted = []
+
+    def find(self, query):
+        return [dict(rollup) for rollup in self.rollups]
+
+    def bulk_write(self, operations, ordered=True):
+        self.written.extend(operations)
+
+    def delete_one(self, query):
+        self.deleted.append(query)
+
+
+class FakeLegacyPeelCollection:
+    def __init__(self, records):
+        self.records = records
+        self.written = []
+
+    def find(self, query, projection=None):
+        return [dict(record) for record in self.records]
+
+    def bulk_write(self, operations, ordered=True):
+        self.written.extend(operations)
+
+
+def version(record_date, record_count, updated_at=datetime(2026, 10, 19, 6, 45)):
+    return {"_id": record_date, "record_count": record_count, "updated_at": updated_at}
+
+
+class MeasurementSummaryTests(unittest.TestCase):
+    def test_normalize_stores_per_face_statistics(self):
+        summary = peel_record("2026-10-01", "A", front={1: [1.0, 2.0], 2: [3.0]}, back={1: [2.0]})[MEASUREMENT_SUMMARY_FIELD]
+
+        self.assertEqual(summary["front"], {"average": 2.25, "max": 3.0, "min": 1.5})
+        self.assertEqual((summary["both"]["max"], summary["both"]["min"]), (2.5, 1.75))
+        self.assertEqual(peel_record("2026-10-01", "A", front={1: [1.2]})[MEASUREMENT_SUMMARY_FIELD]["back"],
+                         {"average": None, "max": None, "min": None})
+
+    def test_batches_mix_grid_shapes_and_skip_invalid_arrays(self):
+        wide = peel_record("2026-10-01", "A", front={18: [1.3]})[MEASUREMENT_ARRAYS_FIELD]
+        standard = peel_record("2026-10-01", "B", front={1: [1.1]})[MEASUREMENT_ARRAYS_FIELD]
+
+        summaries = summarize_measurement_arrays([wide, None, standard])
+
+        self.assertEqual([summary and summary["front"]["average"] for summary in summaries], [1.3, None, 1.1])
+
+
+class GraphRollupTests(unittest.TestCase):
+    def setUp(self):
+        self.records = [
+            peel_record("2026-10-01", "A", front={1: [1.0]}),
+            peel_record("2026-10-01", "B", front={1: [1.2], 2: [1.4]}),
+            peel_record("2026-10-02", "A", front={1: [1.4]}),
+        ]
+        self.peel = FakePeelCollection(self.records)
+
+    def load(self, rollups, versions, cell_face="front"):
+        with patch.object(peel_graph_service, "peel_data_collection", self.peel), \
+                patch.object(peel_graph_service, "peel_graph_rollup_collection", rollups):
+            return peel_graph_service.load_graph_points(3, 2026, "OCT", cell_face, versions)
+
+    def test_missing_rollups_are_rebuilt_stored_and_then_reused(self):
+        rollups = FakeRollupCollection()
+        versions = [version("2026-10-01", 2), version("2026-10-02", 1)]
+
+        points = self.load(rollups, versions)
+
+        self.assertEqual(points, peel_graph_service.build_graph_points(self.records, "front"))
+        self.assertEqual(len(rollups.written), 2)
+        stored = FakeRollupCollection(operation._doc for operation in rollups.written)
+        self.assertEqual(self.load(stored, versions, "both"), peel_graph_service.build_graph_points(self.records, "both"))
+        self.assertEqual((len(self.peel.queries), stored.written), (1, []))
+
+    def test_only_days_whose_records_changed_are_rebuilt(self):
+        rollups = FakeRollupCollection()
+        self.load(rollups, [version("2026-10-01", 2), version("2026-10-02", 1)])
+        stored = FakeRollupCollection(operation._doc for operation in rollups.written)
+
+        self.load(stored, [version("2026-10-01", 2), version("2026-10-02", 1, datetime(2026, 10, 19, 7, 0))])
+
+        self.assertEqual(self.peel.queries[-1]["date"], {"$in": ["2026-10-02"]})
+        self.assertEqual([operation._doc["date"] for operation in stored.written], ["2026-10-02"])
+
+    def test_day_without_records_drops_its_rollup(self):
+        rollups = FakeRollupCollection()
+        with patch.object(peel_graph_service, "graph_source_versions", return_value=[]), \
+                patch.object(peel_graph_service, "peel_graph_rollup_collection", rollups):
+            peel_graph_service.refresh_graph_rollup_day(3, 2026, "OCT", "2026-10-03")
+
+        self.assertEqual(rollups.deleted, [{"stringer": 3, "year": 2026, "month": "OCT", "date": "2026-10-03"}])
+
+
+class StringerBackfillTests(unittest.TestCase):
+    def test_legacy_records_get_stringer_from_stringer_or_machine(self):
+        collection = FakeLegacyPeelCollection(
+            [{"_id": 1, "stringer": "4"}, {"_id": 2, "machine": "STRINGER-7 UNIT-B"}, {"_id": 3, "machine": "UNKNOWN"}]
+        )
+        with patch.object(backfill_peel_graph_rollups, "peel_data_collection", collection):
+            changed = backfill_peel_graph_rollups.backfill_stringers(apply=True, batch_size=1)
+
+        self.assertEqual(changed, 2)
+        self.assertEqual(
+            [(operation._filter["_id"], operation._doc["$set"]["Stringer"]) for operation in collection.written],
+            [(1, 4), (2, 7)],
+        )
+
+
+class BatchRollupRefreshTests(unittest.TestCase):
+    def test_store_refreshes_each_changed_day_once_after_the_batch(self):
+        records = [{"Stringer": 3, "date": "2026-10-01", "Unit": unit} for unit in ("A", "B", "C")]
+        upsert = MagicMock(side_effect=[
+            {"inserted": True, "record": records[0]},
+            {"updated": True, "record": records[1]},
+            {"inserted": False, "updated": False, "record": records[2]},
+        ])
+        with patch.object(peel_extractor, "ensure_peel_indexes"), \
+                patch.object(peel_extractor, "upsert_extracted_peel_record", upsert), \
+                patch.object(peel_extractor, "refresh_graph_rollups_for") as refresh:
+            peel_extractor.store_in_mongodb(pd.DataFrame(records))
+
+        self.assertTrue(all(call.kwargs == {"refresh_rollups": False} for call in upsert.call_args_list))
+        refresh.assert_called_once_with(records[0], records[1])
+
+    def test_shift_refresh_reads_the_days_of_every_affected_shift_in_one_query(self):
+        peel = MagicMock()
+        peel.find.return_value = [{"Stringer": 3, "year": 2026, "month": "OCT", "date": "2026-10-01"}]
+        with patch.object(peel_extractor, "peel_data_collection", peel), \
+                patch.object(peel_extractor, "refresh_graph_rollups_for") as refresh:
+            peel_extractor._refresh_shift_graph_rollups({("2026-10-01", "A")})
+            peel_extractor._refresh_shift_graph_rollups(set())
+
+        peel.find.assert_called_once_with({"$or": [{"date": "2026-10-01", "shift": "A"}]}, peel_extractor.GRAPH_DAY_PROJECTION)
+        refresh.assert_called_once_with(*peel.find.return_value)
+
+
+if __name__ == "__main__":
+    unittest.main()
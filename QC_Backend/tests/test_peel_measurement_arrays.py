@@ -0,0 +1,100 @@
+import math
+import unittest
+
+import numpy as np
+
+from models.peel_data_models import (
+    MEASUREMENT_ARRAYS_FIELD,
+    build_measurement_arrays,
+    decode_measurement_arrays,
+    normalize_peel_record,
+    serialize_peel_doc,
+)
+from services.peel_graph_service import build_graph_points, record_statistics
+
+
+def peel_record(date="2026-10-19", unit="A", front=None, back=None, **extra):
+    record = {"date": date, "shift": "A", "Stringer": 3, "Unit": unit, "file_name": f"{date}-{unit}.docx", **extra}
+    for side, rows in (("Front", front or {}), ("Back", back or {})):
+        for pad, values in rows.items():
+            for ribbon, value in enumerate(values, start=1):
+                record[f"{side}_{pad}_{ribbon}"] = value
+    return normalize_peel_record(record)
+
+
+class MeasurementArrayTests(unittest.TestCase):
+    def test_normalize_packs_flat_keys_into_float32_grids(self):
+        record = peel_record(front={1: [1.42, 1.5], 16: [2.0]}, back={3: [0.9]}, Front_2_1="")
+        arrays = record[MEASUREMENT_ARRAYS_FIELD]
+        grids = decode_measurement_arrays(arrays)
+
+        self.assertEqual((arrays["pads"], arrays["ribbons"]), (16, 7))
+        self.assertEqual(len(arrays["front"]), 16 * 7 * 4)
+        self.assertEqual(grids["front"][0, :2].tolist(), [1.42, 1.5])
+        self.assertEqual(grids["front"][15, 0], 2.0)
+        self.assertEqual(grids["back"][2, 0], 0.9)
+        self.assertTrue(math.isnan(grids["front"][1, 0]))
+        self.assertEqual(int((~np.isnan(grids["back"])).sum()), 1)
+
+    def test_sample_results_are_used_when_flat_keys_are_absent_and_shape_grows(self):
+        arrays = build_measurement_arrays({
+            "sample_results": [
+                {"side": "Front", "bus_pad_position": 18, "ribbon": 9, "value": 1.3},
+                {"side": "Back", "bus_pad_position": 1, "ribbon": 1, "value": "n/a"},
+            ],
+        })
+        grids = decode_measurement_arrays(arrays)
+
+        self.assertEqual((arrays["pads"], arrays["ribbons"]), (18, 9))
+        self.assertEqual(grids["front"][17, 8], 1.3)
+        self.assertTrue(np.isnan(grids["back"]).all())
+
+    def test_stale_arrays_are_rebuilt_and_never_serialized(self):
+        record = peel_record(front={1: [1.0]})
+        record["Front_1_1"] = 1.8
+
+        rebuilt = normalize_peel_record(record)
+
+        self.assertEqual(decode_measurement_arrays(rebuilt[MEASUREMENT_ARRAYS_FIELD])["front"][0, 0], 1.8)
+        self.assertNotIn(MEASUREMENT_ARRAYS_FIELD, serialize_peel_doc(rebuilt))
+        self.assertIsNone(decode_measurement_arrays({"pads": 16}))
+
+
+class PeelGraphTests(unittest.TestCase):
+    def test_record_statistics_average_pads_and_sides(self):
+        arrays = peel_record(front={1: [1.0, 2.0], 2: [3.0]}, back={1: [2.0]})[MEASUREMENT_ARRAYS_FIELD]
+
+        self.assertEqual(record_statistics(arrays, "front"), (2.25, 3.0, 1.5))
+        self.assertEqual(record_statistics(arrays, "back"), (2.0, 2.0, 2.0))
+        average, maximum, minimum = record_statistics(arrays, "both")
+        self.assertAlmostEqual(average, 6.5 / 3)
+        self.assertEqual((maximum, minimum), (2.5, 1.75))
+
+    def test_both_faces_skip_max_and_min_when_one_side_is_missing(self):
+        arrays = peel_record(front={1: [1.2]})[MEASUREMENT_ARRAYS_FIELD]
+        self.assertEqual(record_statistics(arrays, "both"), (1.2, None, None))
+        self.assertEqual(record_statistics(peel_record()[MEASUREMENT_ARRAYS_FIELD], "front"), (None, None, None))
+
+    def test_graph_points_group_records_by_day(self):
+        records = [
+            peel_record("2026-10-02", "A", front={1: [1.4]}),
+            peel_record("2026-10-01", "A", front={1: [1.0]}),
+            peel_record("2026-10-01", "B", front={1: [1.2], 2: [1.4]}),
+            peel_record("2026-10-01", "B"),
+        ]
+
+        points = build_graph_points(records, "front")
+
+        self.assertEqual([point["date"] for point in points], ["2026-10-01", "2026-10-02"])
+        self.assertEqual(points[0], {
+            "date": "2026-10-01",
+            "average_value": 1.15,
+            "max_value": 1.4,
+            "min_value": 1.0,
+            "record_count": 3,
+            "unit_count": 2,
+        })
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import random
+import unittest
+from types import SimpleNamespace
+
+from services import query_profiler_service as profiler_service
+
+
+class FakeExplainDatabase:
+    def __init__(self, calls, result):
+        self.calls = calls
+        self.result = result
+
+    def command(self, command):
+        self.calls.append(command)
+        return self.result
+
+
+class FakeExplainClient:
+    def __init__(self, result):
+        self.calls = []
+        self.result = result
+
+    def __getitem__(self, name):
+        return FakeExplainDatabase(self.calls, self.result)
+
+
+def run_command(profiler, request_id, command_name, command, duration_ms=1):
+    event = SimpleNamespace(
+        connection_id=("localhost", 27017),
+        request_id=request_id,
+        command_name=command_name,
+        command=command,
+        database_name="qc",
+        duration_micros=duration_ms * 1000,
+    )
+    profiler.started(event)
+    profiler.succeeded(event)
+
+
+def build_profiler(explain_result=None, **settings):
+    client = FakeExplainClient(explain_result or {})
+    profiler = profiler_service.QueryProfiler(
+        profiler_service.QueryProfilerSettings(enabled=True, **settings),
+        explain_client_factory=lambda: client,
+        rng=random.Random(1),
+    )
+    return profiler, client
+
+
+class QueryProfilerTests(unittest.TestCase):
+    def test_per_row_lookups_are_flagged_as_n_plus_one_and_over_budget(self):
+        profiler, _ = build_profiler(default_budget=4, n_plus_one_threshold=3, explain_sample_rate=0)
+
+        with profiler.capture("GET /api/gel-test-reports/"):
+            run_command(profiler, 1, "find", {"find": "gel_reports", "filter": {"status": "approved"}})
+            for request_id, employee_id in enumerate(("E1", "E2", "E3", "E4"), start=2):
+                run_command(profiler, request_id, "find", {"find": "users", "filter": {"employeeId": employee_id}, "limit": 1})
+
+        kinds = sorted(finding.kind for finding in profiler.findings.values())
+        self.assertEqual(kinds, ["budget", "n_plus_one"])
+        n_plus_one = next(finding for finding in profiler.findings.values() if finding.kind == "n_plus_one")
+        self.assertIn('find users {"employeeId": "?"} repeated 4 times', n_plus_one.detail)
+        with self.assertRaises(profiler_service.QueryBudgetExceeded):
+            profiler.check_budgets()
+
+    def test_commands_outside_a_capture_are_ignored(self):
+        profiler, _ = build_profiler(default_budget=0, explain_sample_rate=0)
+        run_command(profiler, 1, "find", {"find": "users", "filter": {}})
+        self.assertEqual(profiler.findings, {})
+        profiler.check_budgets()
+
+    def test_collection_scans_are_explained_once_per_shape(self):
+        explain_result = {"stages": [{"$cursor": {"queryPlanner": {"winningPlan": {"stage": "FETCH", "inputStage": {"stage": "COLLSCAN"}}}}}]}
+        profiler, client = build_profiler(explain_result, explain_sample_rate=1.0, slow_command_ms=50)
+
+        for _ in range(2):
+            with profiler.capture("GET /api/peel/graph-data"):
+                run_command(profiler, 1, "aggregate", {
+                    "aggregate": "peel_data",
+                    "pipeline": [{"$match": {"year": 2026}}],
+                    "cursor": {},
+                    "lsid": {"id": "session"},
+                }, duration_ms=80)
+
+        self.assertEqual(len(client.calls), 1)
+        self.assertNotIn("lsid", client.calls[0]["explain"])
+        findings = {finding.kind: finding for finding in profiler.findings.values()}
+        self.assertEqual(findings["collection_scan"].occurrences, 1)
+        self.assertEqual(findings["slow"].occurrences, 2)
+
+    def test_route_budgets_override_the_default(self):
+        settings = profiler_service.QueryProfilerSettings(
+            route_budgets=profiler_service.parse_route_budgets("GET /api/ipqc-audits/=6; bad ;PATCH /x=two"),
+        )
+        self.assertEqual(settings.budget_for("GET /api/ipqc-audits/"), 6)
+        self.assertEqual(settings.budget_for("GET /api/tasks"), profiler_service.DEFAULT_QUERY_BUDGET)
+
+
+if __name__ == "__main__":
+    unittest.main()
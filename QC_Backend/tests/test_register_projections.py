@@ -0,0 +1,174 @@
+import copy
+import unittest
+from unittest.mock import patch
+
+from bson import ObjectId
+
+from routes import adhesion_route, gel_route, ipqc_audit_route, jb_contact_block_maintenance_route, peel_test_route
+from services.dashboard_analytics_service import build_dashboard_response
+
+
+def project(document, projection):
+    """Apply a Mongo find projection (dotted paths, through arrays) to a plain document."""
+    if any(projection.values()):
+        result = {"_id": document["_id"]}
+        for path, included in projection.items():
+            if included:
+                _copy_path(document, result, path.split("."))
+        return result
+    result = copy.deepcopy(document)
+    for path in projection:
+        _drop_path(result, path.split("."))
+    return result
+
+
+def _copy_path(source, target, parts):
+    if not isinstance(source, dict) or parts[0] not in source:
+        return
+    if len(parts) == 1:
+        target[parts[0]] = copy.deepcopy(source[parts[0]])
+        return
+    if isinstance(source[parts[0]], dict):
+        _copy_path(source[parts[0]], target.setdefault(parts[0], {}), parts[1:])
+
+
+def _drop_path(document, parts):
+    if isinstance(document, list):
+        for item in document:
+            _drop_path(item, parts)
+        return
+    if not isinstance(document, dict) or parts[0] not in document:
+        return
+    if len(parts) == 1:
+        document.pop(parts[0])
+        return
+    _drop_path(document[parts[0]], parts[1:])
+
+
+class FakeCollection:
+    def __init__(self, documents=()):
+        self.documents = list(documents)
+        self.updates = []
+        self.projections = []
+
+    def update_one(self, query, update):
+        self.updates.append((query, update))
+
+    def aggregate(self, pipeline):
+        return []
+
+    def find(self, query, projection=None):
+        self.projections.append(projection)
+        return FakeCursor([project(document, projection) if projection else document for document in self.documents])
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, *_args):
+        return self
+
+    def limit(self, count):
+        return self.documents[:count]
+
+
+def report_document(**extra):
+    return {
+        "_id": ObjectId(),
+        "name": "Report_Line-I_2026-10-19",
+        "timestamp": "2026-10-19T08:00:00",
+        "s3_key": "reports/example.json",
+        "workflowState": "submitted",
+        "status": "submitted",
+        "date": "2026-10-19",
+        "shift": "A",
+        "lineNumber": "Line-I",
+        "productionOrderNo": "PO-1",
+        "submittedAt": "2026-10-19T09:00:00",
+        "submittedBy": "Operator One",
+        "updatedAt": "2026-10-19T09:00:00",
+        # Legacy rows carry the creator only in the embedded form data, next to bulky values.
+        "formData": {"preparedBy": "Operator One", "signatureImage": "data:image/png;base64," + "A" * 4096},
+        "rowData": [{"cell": index} for index in range(200)],
+        **extra,
+    }
+
+
+class ReportRegisterProjectionTests(unittest.TestCase):
+    def assert_projection_is_lossless(self, route, model, collection_name, serialize, document):
+        collection = FakeCollection()
+        with patch.object(route, collection_name, collection), \
+                patch.object(model, "get_data", return_value={}):
+            full = serialize(copy.deepcopy(document), include_data=False)
+            projected_document = project(document, route.REGISTER_SUMMARY_PROJECTION)
+            projected = serialize(projected_document, include_data=False)
+
+        self.assertEqual(projected, full)
+        self.assertEqual(full["createdBy"], "Operator One")
+        self.assertNotIn("rowData", projected_document)
+        self.assertEqual(projected_document["formData"], {"preparedBy": "Operator One"})
+
+    def test_gel_summary_matches_the_full_document(self):
+        line = gel_route.map_po_to_fab_line("PO-1").line
+        self.assert_projection_is_lossless(
+            gel_route, gel_route.GelTestReport, "gel_test_collection", gel_route.serialize_gel_report,
+            report_document(lineNumber=line),
+        )
+
+    def test_adhesion_summary_matches_the_full_document(self):
+        line = adhesion_route.map_po_to_fab_line("PO-1").line
+        self.assert_projection_is_lossless(
+            adhesion_route, adhesion_route.AdhesionTestReport, "adhesion_test_collection", adhesion_route.serialize_adhesion_report,
+            report_document(lineNumber=line),
+        )
+
+    def test_peel_summary_matches_the_full_document(self):
+        self.assert_projection_is_lossless(
+            peel_test_route, peel_test_route.PeelTestReport, "peel_test_collection", peel_test_route.serialize_peel_report,
+            report_document(line="FAB-II Line-I", wp="WP-3", autoGenerated=True),
+        )
+
+    def test_ipqc_summary_matches_the_full_document(self):
+        self.assert_projection_is_lossless(
+            ipqc_audit_route, ipqc_audit_route.IPQCAudit, "ipqc_audit_collection", ipqc_audit_route.serialize_ipqc_audit,
+            report_document(
+                updated_timestamp="2026-10-19T09:30:00",
+                dataVersion=4,
+                moduleType="M10",
+                completedStages=12,
+                totalStages=31,
+                completionPercentage=38.7,
+                completionBucket="26-50",
+            ),
+        )
+
+
+class DashboardProjectionTests(unittest.TestCase):
+    def test_daily_items_are_fetched_with_the_item_projection(self):
+        collection = FakeCollection([report_document()])
+        response = build_dashboard_response(
+            collection=collection,
+            query={},
+            view="daily",
+            total_key="totalReports",
+            serialize_item=lambda item: sorted(item),
+            item_projection={"rowData": 0, "formData": 0},
+        )
+
+        self.assertEqual(collection.projections, [{"rowData": 0, "formData": 0}])
+        self.assertNotIn("rowData", response["items"][0])
+
+    def test_jb_contact_block_rows_drop_checker_audit_only(self):
+        row = {**jb_contact_block_maintenance_route.empty_row(), "po": "PO-1", "checkerAudit": [{"checkedBy": "A"}] * 50}
+        entry = {"_id": ObjectId(), "fab": "FAB-II Line-I", "lines": {"Line - 1": [row], "Line - 2": [row]}}
+
+        projected = project(entry, jb_contact_block_maintenance_route.REGISTER_SUMMARY_PROJECTION)
+        serialized = jb_contact_block_maintenance_route.serialize_doc(projected)
+
+        self.assertEqual(serialized["lines"]["Line - 1"][0]["po"], "PO-1")
+        self.assertEqual(serialized["lines"]["Line - 1"][0]["checkerAudit"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+import io
+import unittest
+import zipfile
+from dataclasses import replace
+from unittest.mock import patch
+
+from bson import ObjectId
+from fastapi import HTTPException
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Font
+
+from generators.excel_workbook_merge import build_unique_sheet_title, copy_sheet_into_workbook
+from services import report_export_service
+from services.report_export_service import (
+    BatchReportSelection,
+    GeneratedReport,
+    build_batch_filter_query,
+    find_batch_reports,
+    normalize_batch_format,
+    write_batch_workbook,
+    write_batch_zip,
+)
+
+
+class FakeCursor(list):
+    def sort(self, *_args, **_kwargs):
+        return self
+
+    def limit(self, *_args, **_kwargs):
+        return self
+
+
+class FakeCollection:
+    def __init__(self, documents):
+        self.documents = documents
+        self.queries = []
+
+    def find(self, query):
+        self.queries.append(query)
+        if "_id" in query:
+            wanted = set(query["_id"]["$in"])
+            return FakeCursor(document for document in self.documents if document["_id"] in wanted)
+        return FakeCursor(self.documents)
+
+
+def workbook_bytes(value, title="Sheet"):
+    workbook = Workbook()
+    worksheet = workbook.active
+    worksheet.title = title
+    worksheet["A1"] = value
+    worksheet["A1"].font = Font(bold=True)
+    worksheet.merge_cells("A1:C1")
+    worksheet.column_dimensions["A"].width = 25
+    output = io.BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+
+class BatchReportSelectionTests(unittest.TestCase):
+    def setUp(self):
+        self.gel_ids = [ObjectId(), ObjectId()]
+        self.gel_collection = FakeCollection([{"_id": object_id, "name": "gel"} for object_id in self.gel_ids])
+        self.peel_collection = FakeCollection([{"_id": ObjectId(), "name": "peel"}])
+        report_types = dict(report_export_service.BATCH_REPORT_TYPES)
+        report_types["gel"] = replace(report_types["gel"], get_collection=lambda: self.gel_collection)
+        report_types["peel"] = replace(report_types["peel"], get_collection=lambda: self.peel_collection)
+        patcher = patch.dict(report_export_service.BATCH_REPORT_TYPES, report_types)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_explicit_ids_are_fetched_in_one_query_and_keep_request_order(self):
+        selections = find_batch_reports({"reports": [
+            {"type": "gel", "id": str(self.gel_ids[1])},
+            {"type": "gel", "id": str(self.gel_ids[0])},
+            {"type": "gel", "id": str(self.gel_ids[1])},
+        ]})
+        self.assertEqual([selection.document["_id"] for selection in selections], [self.gel_ids[1], self.gel_ids[0]])
+        self.assertTrue(all(selection.explicit for selection in selections))
+        self.assertEqual(len(self.gel_collection.queries), 1)
+
+    def test_missing_explicit_report_is_not_found(self):
+        with self.assertRaises(HTTPException) as context:
+            find_batch_reports({"reports": [{"type": "gel", "id": str(ObjectId())}]})
+        self.assertEqual(context.exception.status_code, 404)
+
+    def test_filter_selects_reports_per_type(self):
+        selections = find_batch_reports({"filter": {"types": ["peel"], "date_from": "2026-03-01", "line": "II"}})
+        self.assertEqual([selection.report_type for selection in selections], ["peel"])
+        self.assertFalse(selections[0].explicit)
+        self.assertEqual(self.peel_collection.queries[0], {
+            "date": {"$gte": "2026-03-01"},
+            "$or": [{"line": "II"}, {"lineNumber": "II"}],
+        })
+
+    def test_invalid_requests_are_rejected(self):
+        with self.assertRaises(ValueError):
+            find_batch_reports({})
+        with self.assertRaises(ValueError):
+            find_batch_reports({"reports": [{"type": "unknown", "id": str(ObjectId())}]})
+        with self.assertRaises(ValueError):
+            build_batch_filter_query(report_export_service.BATCH_REPORT_TYPES["gel"], {})
+        with self.assertRaises(ValueError):
+            normalize_batch_format("pdf")
+
+    def test_batch_size_is_capped(self):
+        with patch.object(report_export_service, "BATCH_EXPORT_MAX_REPORTS", 1):
+            with self.assertRaises(ValueError):
+                find_batch_reports({"reports": [{"type": "gel", "id": str(object_id)} for object_id in self.gel_ids]})
+
+
+class BatchReportOutputTests(unittest.TestCase):
+    def test_zip_groups_reports_by_type_and_deduplicates_names(self):
+        reports = [
+            GeneratedReport("gel", "Gel_Test_A.xlsx", io.BytesIO(workbook_bytes("first"))),
+            GeneratedReport("gel", "Gel_Test_A.xlsx", io.BytesIO(workbook_bytes("second"))),
+            GeneratedReport("ipqc-audit", "Quality_Audit.xlsx", io.BytesIO(workbook_bytes("audit"))),
+        ]
+        output = io.BytesIO()
+        write_batch_zip(reports, output)
+        with zipfile.ZipFile(output) as archive:
+            self.assertEqual(archive.namelist(), [
+                "Gel/Gel_Test_A.xlsx",
+                "Gel/Gel_Test_A (2).xlsx",
+                "IPQC_Audit/Quality_Audit.xlsx",
+            ])
+            second = load_workbook(io.BytesIO(archive.read("Gel/Gel_Test_A (2).xlsx")))
+            self.assertEqual(second.active["A1"].value, "second")
+
+    def test_workbook_has_one_sheet_per_report(self):
+        reports = [
+            GeneratedReport("gel", "Gel_Test_A.xlsx", io.BytesIO(workbook_bytes("first"))),
+            GeneratedReport("peel", "Peel_Test_B.xlsx", io.BytesIO(workbook_bytes("second"))),
+        ]
+        output = io.BytesIO()
+        write_batch_workbook(reports, output)
+        combined = load_workbook(output)
+        self.assertEqual(combined.sheetnames, ["Gel_Test_A", "Peel_Test_B"])
+        sheet = combined["Peel_Test_B"]
+        self.assertEqual(sheet["A1"].value, "second")
+        self.assertTrue(sheet["A1"].font.bold)
+        self.assertEqual([str(merged) for merged in sheet.merged_cells.ranges], ["A1:C1"])
+        self.assertEqual(sheet.column_dimensions["A"].width, 25)
+
+    def test_generation_keeps_selection_order(self):
+        selections = [BatchReportSelection("gel", {"name": str(index)}, True) for index in range(6)]
+
+        def fake_generate(selection):
+            return GeneratedReport("gel", f"{selection.document['name']}.xlsx", io.BytesIO())
+
+        with patch.object(report_export_service, "generate_batch_report", side_effect=fake_generate):
+            reports = report_export_service.generate_batch_reports(selections)
+        self.assertEqual([report.filename for report in reports], [f"{index}.xlsx" for index in range(6)])
+
+    def test_failed_generation_closes_finished_outputs(self):
+        selections = [BatchReportSelection("gel", {"name": str(index)}, True) for index in range(3)]
+        outputs = []
+
+        def fake_generate(selection):
+            if selection.document["name"] == "1":
+                raise RuntimeError("template missing")
+            output = io.BytesIO()
+            outputs.append(output)
+            return GeneratedReport("gel", "report.xlsx", output)
+
+        with patch.object(report_export_service, "generate_batch_report", side_effect=fake_generate):
+            with self.assertRaises(RuntimeError):
+                report_export_service.generate_batch_reports(selections)
+        self.assertTrue(all(output.closed for output in outputs))
+
+
+class SheetTitleTests(unittest.TestCase):
+    def test_titles_are_sanitized_truncated_and_unique(self):
+        self.assertEqual(build_unique_sheet_title("a/b:c", []), "a_b_c")
+        long_title = "x" * 40
+        first = build_unique_sheet_title(long_title, [])
+        self.assertEqual(len(first), 31)
+        second = build_unique_sheet_title(long_title, [first])
+        self.assertEqual(second, f"{'x' * 27} (2)")
+
+    def test_copy_sheet_into_workbook_uses_unique_title(self):
+        source = load_workbook(io.BytesIO(workbook_bytes("value"))).active
+        target = Workbook()
+        copy_sheet_into_workbook(source, target, "Sheet")
+        self.assertEqual(target.sheetnames, ["Sheet", "Sheet (2)"])
+
+
+if __name__ == "__main__":
+    unittest.main()
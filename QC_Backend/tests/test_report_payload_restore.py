@@ -0,0 +1,103 @@
+import io
+import unittest
+from unittest.mock import patch
+
+from botocore.exceptions import ClientError
+
+from routes import report_payload_route
+from services.ipqc_audit_autosave_service import get_audit_data_version
+from services.report_payload_store import ReportPayloadStore
+
+
+class FakeS3Client:
+    def __init__(self):
+        self.objects = {}
+
+    def get_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+        return {"Body": io.BytesIO(self.objects[Key])}
+
+    def put_object(self, Bucket, Key, Body, **_kwargs):
+        self.objects[Key] = Body
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+
+class FakeS3Service:
+    def __init__(self, client):
+        self.s3_client = client
+        self.bucket_name = "bucket"
+
+
+class FakeCollection:
+    def __init__(self):
+        self.updates = []
+
+    def update_one(self, query, update):
+        self.updates.append(update["$set"])
+
+
+USER = {"id": "u1", "name": "Operator One", "employeeId": "E1"}
+
+
+class RestoreReportPayloadTests(unittest.TestCase):
+    def setUp(self):
+        client = FakeS3Client()
+        self.store = ReportPayloadStore(lambda: FakeS3Service(client), encoding="gzip")
+        self.collection = FakeCollection()
+
+    def restore(self, report_type, report, version):
+        config = report_payload_route.PayloadReportType(
+            **{**report_payload_route.PAYLOAD_REPORT_TYPES[report_type].__dict__, "collection": self.collection}
+        )
+        with patch.object(report_payload_route, "report_payload_store", self.store), \
+                patch.dict(report_payload_route.PAYLOAD_REPORT_TYPES, {report_type: config}):
+            return report_payload_route.restore_report_payload(config, report, version, USER)
+
+    def test_form_report_summary_fields_follow_the_restored_payload(self):
+        report = {"_id": "r1", "name": "Gel 1", "timestamp": "2026-10-01T00:00:00", "s3_key": "gel/1.json", "workflowState": "draft"}
+        self.store.save("gel/1.json", {"form_data": {"gel_editable_42_date": "2026-10-01", "gel_editable_53_shift": "A"}})
+        self.store.save("gel/1.json", {"form_data": {"gel_editable_42_date": "2026-10-02", "gel_editable_53_shift": "B"}})
+
+        restored = self.restore("gel", report, 1)
+
+        update = self.collection.updates[-1]
+        self.assertEqual((update["date"], update["shift"], update["status"]), ("2026-10-01", "A", "draft"))
+        self.assertEqual((restored["version"], restored["restoredFrom"]), (3, 1))
+
+    def test_ipqc_payload_and_mongo_agree_on_the_bumped_data_version(self):
+        report = {
+            "_id": "a1",
+            "name": "Audit 1",
+            "timestamp": "2026-10-01T00:00:00",
+            "s3_key": "ipqc/1.json",
+            "status": "draft",
+            "dataVersion": 4,
+        }
+        self.store.save("ipqc/1.json", {"date": "2026-10-01", "shift": "A", "lineNumber": "I", "dataVersion": 1, "stages": []})
+        self.store.save("ipqc/1.json", {"date": "2026-10-02", "shift": "B", "lineNumber": "II", "dataVersion": 4, "stages": []})
+
+        with patch.object(report_payload_route.ipqc_audit_route, "queue_stringer_report_refresh") as queue_refresh:
+            self.restore("ipqc-audit", report, 1)
+
+        update = self.collection.updates[-1]
+        payload = self.store.load("ipqc/1.json")
+        self.assertEqual(update["dataVersion"], 5)
+        self.assertEqual(get_audit_data_version(payload), 5)
+        self.assertEqual((update["date"], update["shift"], update["lineNumber"]), ("2026-10-01", "A", "I"))
+        queue_refresh.assert_called_once_with(report, {**report, **update})
+
+    def test_form_report_restore_does_not_queue_a_stringer_refresh(self):
+        report = {"_id": "r1", "name": "Gel 1", "timestamp": "2026-10-01T00:00:00", "s3_key": "gel/1.json", "workflowState": "draft"}
+        self.store.save("gel/1.json", {"form_data": {"gel_editable_42_date": "2026-10-01"}})
+
+        with patch.object(report_payload_route.ipqc_audit_route, "queue_stringer_report_refresh") as queue_refresh:
+            self.restore("gel", report, 1)
+
+        queue_refresh.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import hashlib
+import io
+import json
+import unittest
+
+from botocore.exceptions import ClientError
+
+from services.report_payload_store import ReportPayloadStore, diff_payloads
+
+
+class FakeS3Client:
+    def __init__(self, objects=None):
+        self.objects = dict(objects or {})
+        self.puts = []
+        self.gets = []
+        self.before_put = None
+
+    def etag(self, key):
+        return f'"{hashlib.md5(self.objects[key]).hexdigest()}"' if key in self.objects else None
+
+    def get_object(self, Bucket, Key):
+        self.gets.append(Key)
+        if Key not in self.objects:
+            raise ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+        return {"Body": io.BytesIO(self.objects[Key]), "ETag": self.etag(Key)}
+
+    def put_object(self, Bucket, Key, Body, IfMatch=None, IfNoneMatch=None, **_kwargs):
+        if self.before_put is not None and Key.endswith("manifest.json"):
+            hook, self.before_put = self.before_put, None
+            hook(Key)
+        if (IfNoneMatch == "*" and Key in self.objects) or (IfMatch is not None and IfMatch != self.etag(Key)):
+            raise ClientError({"Error": {"Code": "PreconditionFailed"}}, "PutObject")
+        self.puts.append(Key)
+        self.objects[Key] = Body
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+
+class FakeS3Service:
+    def __init__(self, client):
+        self.s3_client = client
+        self.bucket_name = "bucket"
+
+
+def build_store(objects=None, **kwargs):
+    client = FakeS3Client(objects)
+    store = ReportPayloadStore(lambda: FakeS3Service(client), encoding="gzip", clock=lambda: "2026-03-01T00:00:00+00:00", **kwargs)
+    return store, client
+
+
+PAYLOAD = {"form_data": {"name": "Gel Test", "notes": "ünïcode"}, "averages": {"a": "1.0"}}
+
+
+class ReportPayloadStoreTests(unittest.TestCase):
+    def test_versions_are_compressed_and_loaded_through_manifest(self):
+        store, client = build_store()
+        first = store.save("reports/gel/1.json", PAYLOAD)
+        stored = client.objects[first.key]
+
+        self.assertTrue(first.key.startswith("reports/gel/1/versions/"))
+        self.assertTrue(first.key.endswith(".json.gz"))
+        self.assertLess(len(stored), len(json.dumps(PAYLOAD, ensure_ascii=False, indent=2).encode("utf-8")))
+        self.assertEqual(store.load("reports/gel/1.json"), PAYLOAD)
+        self.assertEqual(json.loads(client.objects["reports/gel/1/manifest.json"])["latest"], 1)
+
+    def test_unchanged_save_writes_nothing(self):
+        store, client = build_store()
+        store.save("reports/gel/1.json", PAYLOAD)
+        puts = len(client.puts)
+        self.assertEqual(store.save("reports/gel/1.json", dict(PAYLOAD)).version, 1)
+        self.assertEqual(len(client.puts), puts)
+
+    def test_restore_reuses_stored_object_and_records_new_version(self):
+        store, client = build_store()
+        store.save("reports/gel/1.json", PAYLOAD)
+        store.save("reports/gel/1.json", {**PAYLOAD, "averages": {"a": "2.0"}})
+        puts = len(client.puts)
+
+        restored = store.restore("reports/gel/1.json", 1)
+        self.assertEqual((restored.version, restored.restoredFrom), (3, 1))
+        self.assertEqual(len(client.puts), puts + 1)
+        self.assertEqual(store.load("reports/gel/1.json"), PAYLOAD)
+        self.assertEqual(store.diff("reports/gel/1.json", 2, 1), [
+            {"op": "replace", "path": "averages/a", "old": "2.0", "new": "1.0"},
+        ])
+
+    def test_history_is_capped_and_pruned(self):
+        store, client = build_store(max_versions=2)
+        for index in range(4):
+            store.save("reports/gel/1.json", {"value": index})
+        versions = store.list_versions("reports/gel/1.json")
+        self.assertEqual([entry.version for entry in versions], [3, 4])
+        version_keys = [key for key in client.objects if "/versions/" in key]
+        self.assertEqual(sorted(version_keys), sorted(entry.key for entry in versions))
+
+    def test_legacy_payload_is_read_until_next_save_and_deleted_with_history(self):
+        legacy = json.dumps(PAYLOAD, indent=2).encode("utf-8")
+        store, client = build_store({"reports/ipqc/1.json": legacy})
+        self.assertEqual(store.load("reports/ipqc/1.json"), PAYLOAD)
+        self.assertEqual(store.list_versions("reports/ipqc/1.json"), [])
+
+        store.save("reports/ipqc/1.json", {"stages": []})
+        self.assertEqual(store.load("reports/ipqc/1.json"), {"stages": []})
+        store.delete("reports/ipqc/1.json")
+        self.assertEqual(client.objects, {})
+        with self.assertRaises(FileNotFoundError):
+            store.load("reports/ipqc/1.json")
+
+    def test_manifest_written_by_another_worker_is_merged_not_overwritten(self):
+        store, client = build_store()
+        other_store = ReportPayloadStore(lambda: FakeS3Service(client), encoding="gzip", clock=lambda: "2026-03-01T00:00:00+00:00")
+        store.save("reports/gel/1.json", PAYLOAD)
+        changed = {**PAYLOAD, "averages": {"a": "2.0"}}
+
+        client.before_put = lambda key: other_store.save("reports/gel/1.json", changed)
+        latest = store.save("reports/gel/1.json", {**PAYLOAD, "averages": {"a": "3.0"}})
+
+        self.assertEqual(latest.version, 3)
+        self.assertEqual([entry.version for entry in store.list_versions("reports/gel/1.json")], [1, 2, 3])
+        self.assertEqual(store.load_version("reports/gel/1.json", 2), changed)
+
+    def test_first_manifest_write_does_not_replace_a_concurrent_one(self):
+        store, client = build_store()
+        other_store = ReportPayloadStore(lambda: FakeS3Service(client), encoding="gzip", clock=lambda: "2026-03-01T00:00:00+00:00")
+        client.before_put = lambda key: other_store.save("reports/gel/1.json", PAYLOAD)
+
+        latest = store.save("reports/gel/1.json", {**PAYLOAD, "averages": {"a": "3.0"}})
+
+        self.assertEqual(latest.version, 2)
+        self.assertEqual(store.load_version("reports/gel/1.json", 1), PAYLOAD)
+
+
+class DiffPayloadsTests(unittest.TestCase):
+    def test_nested_changes_are_reported_with_paths(self):
+        old = {"stages": [{"observations": [{"value": "OK"}]}], "shift": "A"}
+        new = {"stages": [{"observations": [{"value": "NG"}, {"value": ""}]}], "date": "2026-03-01"}
+        self.assertEqual(diff_payloads(old, new), [
+            {"op": "add", "path": "date", "new": "2026-03-01"},
+            {"op": "remove", "path": "shift", "old": "A"},
+            {"op": "replace", "path": "stages/0/observations/0/value", "old": "OK", "new": "NG"},
+            {"op": "add", "path": "stages/0/observations/1", "new": {"value": ""}},
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from services import request_metrics_service as metrics
+
+
+def build_app(route_path, work):
+    async def app(scope, receive, send):
+        scope["route"] = SimpleNamespace(path=route_path)
+        work()
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": b'{"ok":', "more_body": True})
+        await send({"type": "http.response.body", "body": b"true}"})
+    return app
+
+
+async def call(middleware, path="/api/ssh-test-reports/entries/2026-03-01/A"):
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        sent.append(message)
+
+    await middleware({"type": "http", "method": "GET", "path": path, "headers": []}, receive, send)
+    return sent
+
+
+class RequestMetricsMiddlewareTests(unittest.IsolatedAsyncioTestCase):
+    async def test_backend_time_is_reported_per_request_and_route(self):
+        registry = metrics.RequestMetricsRegistry()
+        timer = metrics.MongoCommandTimer()
+
+        def work():
+            timer.succeeded(SimpleNamespace(command_name="find", duration_micros=4000))
+            timer.succeeded(SimpleNamespace(command_name="aggregate", duration_micros=6000))
+            metrics.record_backend_call(metrics.S3_BACKEND, "GetObject", 0.02)
+
+        sent = await call(metrics.RequestMetricsMiddleware(build_app("/api/ssh-test-reports/entries/{date}/{shift}", work), registry))
+
+        headers = dict(sent[0]["headers"])
+        self.assertIn(b'mongo;desc="2 calls";dur=10.0', headers[b"server-timing"])
+        self.assertIn(b's3;desc="1 calls";dur=20.0', headers[b"server-timing"])
+        rendered = registry.render()
+        self.assertIn('qc_http_requests_total{method="GET",route="/api/ssh-test-reports/entries/{date}/{shift}",status="200"} 1', rendered)
+        self.assertIn('qc_http_response_bytes_total{method="GET",route="/api/ssh-test-reports/entries/{date}/{shift}"} 11', rendered)
+        self.assertIn('qc_http_request_backend_seconds_total{method="GET",route="/api/ssh-test-reports/entries/{date}/{shift}",backend="mongo"} 0.01', rendered)
+
+    async def test_worker_threads_bill_the_request_that_submitted_them(self):
+        registry = metrics.RequestMetricsRegistry()
+
+        def work():
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                futures = [
+                    metrics.submit_in_request_context(executor, metrics.record_backend_call, metrics.OPENPYXL_BACKEND, "generate_report", 0.5)
+                    for _ in range(2)
+                ]
+                for future in futures:
+                    future.result()
+            # Plain submissions run outside the request context and are only counted globally.
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                executor.submit(metrics.record_backend_call, metrics.OPENPYXL_BACKEND, "generate_report", 0.5).result()
+
+        sent = await call(metrics.RequestMetricsMiddleware(build_app("/api/report-exports/batch", work), registry))
+
+        self.assertIn(b'openpyxl;desc="2 calls";dur=1000.0', dict(sent[0]["headers"])[b"server-timing"])
+
+
+class RequestMetricsRegistryTests(unittest.TestCase):
+    def test_histogram_buckets_are_cumulative_and_labels_escaped(self):
+        registry = metrics.RequestMetricsRegistry(buckets=(0.1, 1.0))
+        registry.observe_request("GET", "/a", 200, 0.05, 10, {})
+        registry.observe_request("GET", "/a", 200, 0.5, 10, {})
+        registry.observe_request("GET", "/a", 500, 3.0, 10, {})
+        registry.observe_backend("mongo", 'fi"nd', 0.25)
+
+        rendered = registry.render()
+
+        self.assertIn('qc_http_request_duration_seconds_bucket{method="GET",route="/a",le="0.1"} 1', rendered)
+        self.assertIn('qc_http_request_duration_seconds_bucket{method="GET",route="/a",le="1.0"} 2', rendered)
+        self.assertIn('qc_http_request_duration_seconds_bucket{method="GET",route="/a",le="+Inf"} 3', rendered)
+        self.assertIn('qc_http_request_duration_seconds_count{method="GET",route="/a"} 3', rendered)
+        self.assertIn('qc_backend_calls_total{backend="mongo",operation="fi\\"nd"} 1', rendered)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import gzip
+import json
+import unittest
+from datetime import datetime, timezone
+
+from bson import ObjectId
+
+from services import response_compression as compression
+from services.conditional_response import ResponseValidators, build_validators
+
+
+def build_app(body, content_type=b"application/json", chunks=1):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", content_type)]})
+        size = len(body) // chunks + 1
+        parts = [body[index:index + size] for index in range(0, len(body), size)] or [b""]
+        for index, part in enumerate(parts):
+            await send({"type": "http.response.body", "body": part, "more_body": index < len(parts) - 1})
+    return app
+
+
+async def call(middleware, accept_encoding="gzip, deflate"):
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        sent.append(message)
+
+    headers = [(b"accept-encoding", accept_encoding.encode("latin-1"))] if accept_encoding else []
+    await middleware({"type": "http", "method": "GET", "path": "/api/peel/graph-data", "headers": headers}, receive, send)
+    return sent
+
+
+class CompressionMiddlewareTests(unittest.IsolatedAsyncioTestCase):
+    body = json.dumps({"data": [{"date": f"2026-10-{day:02d}", "average_value": 1.42} for day in range(1, 29)] * 4}).encode()
+
+    async def test_large_json_is_gzipped_with_length_and_vary(self):
+        sent = await call(compression.CompressionMiddleware(build_app(self.body), minimum_size=1024))
+
+        headers = dict(sent[0]["headers"])
+        self.assertEqual(headers[b"content-encoding"], b"gzip")
+        self.assertEqual(headers[b"vary"], b"Accept-Encoding")
+        self.assertEqual(int(headers[b"content-length"]), len(sent[1]["body"]))
+        self.assertEqual(gzip.decompress(sent[1]["body"]), self.body)
+
+    async def test_small_streamed_and_binary_bodies_pass_through(self):
+        small = await call(compression.CompressionMiddleware(build_app(b'{"ok":true}'), minimum_size=1024))
+        streamed = await call(compression.CompressionMiddleware(build_app(self.body, chunks=3), minimum_size=1024))
+        workbook = await call(compression.CompressionMiddleware(
+            build_app(self.body, content_type=b"application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+            minimum_size=1024,
+        ))
+
+        for sent in (small, streamed, workbook):
+            self.assertNotIn(b"content-encoding", dict(sent[0]["headers"]))
+        self.assertEqual(b"".join(message["body"] for message in streamed[1:]), self.body)
+
+    async def test_requests_without_accept_encoding_are_untouched(self):
+        sent = await call(compression.CompressionMiddleware(build_app(self.body), minimum_size=1024), accept_encoding="")
+        self.assertEqual(sent[1]["body"], self.body)
+
+    def test_encoding_choice_honours_quality_values(self):
+        self.assertEqual(compression.choose_encoding("gzip, deflate, br", brotli_available=True), "br")
+        self.assertEqual(compression.choose_encoding("gzip, deflate, br", brotli_available=False), "gzip")
+        self.assertEqual(compression.choose_encoding("br;q=0, gzip;q=0.5", brotli_available=True), "gzip")
+        self.assertIsNone(compression.choose_encoding("gzip;q=0, identity", brotli_available=True))
+        self.assertEqual(compression.choose_encoding("*", brotli_available=False), "gzip")
+
+
+class ResponseValidatorTests(unittest.TestCase):
+    def documents(self):
+        return [
+            {"_id": ObjectId("6710a1b2c3d4e5f601234567"), "updated_at": datetime(2026, 10, 18, 9, 30, 15, 250000), "Front_1_1": 1.4},
+            {"_id": ObjectId("6710a1b2c3d4e5f601234568"), "updated_at": "2026-10-19T06:45:00+00:00", "Front_1_1": 1.6},
+        ]
+
+    def test_etag_follows_the_version_stamps(self):
+        documents = self.documents()
+        validators = build_validators(documents, "peel-graph-v1")
+
+        self.assertNotIn("Last-Modified", validators.headers)
+        self.assertEqual(build_validators(self.documents(), "peel-graph-v1"), validators)
+
+        documents[0]["updated_at"] = datetime(2026, 10, 19, 10, 0)
+        self.assertNotEqual(build_validators(documents, "peel-graph-v1").etag, validators.etag)
+        self.assertNotEqual(build_validators(documents[:1], "peel-graph-v1").etag, validators.etag)
+        self.assertNotEqual(build_validators(self.documents(), "peel-graph-v2").etag, validators.etag)
+
+    def test_preconditions_prefer_if_none_match(self):
+        validators = ResponseValidators(etag='W/"peel-graph-v1-abc"', last_modified=datetime(2026, 10, 19, 6, 45, tzinfo=timezone.utc))
+
+        self.assertTrue(validators.matches(validators.etag))
+        self.assertTrue(validators.matches(None, "Mon, 19 Oct 2026 06:45:00 GMT"))
+        self.assertFalse(validators.matches(None, "Mon, 19 Oct 2026 06:44:59 GMT"))
+        self.assertFalse(validators.matches('W/"stale"', "Mon, 19 Oct 2026 06:45:00 GMT"))
+        self.assertEqual(validators.not_modified_response().status_code, 304)
+
+    def test_deleted_row_is_not_hidden_by_if_modified_since(self):
+        documents = self.documents()
+        validators = build_validators(documents[1:], "peel-graph-v1")
+
+        self.assertNotEqual(validators.etag, build_validators(documents, "peel-graph-v1").etag)
+        self.assertFalse(validators.matches(None, "Mon, 19 Oct 2026 06:45:00 GMT"))
+
+    def test_unstamped_documents_are_hashed_whole_without_last_modified(self):
+        rows = [{"_id": ObjectId(), "posting_date": "2026-10-19T00:00:00", "grade": "B"}]
+        validators = build_validators(rows, "bgrade-date-range")
+
+        self.assertNotIn("Last-Modified", validators.headers)
+        rows[0]["grade"] = "O"
+        self.assertNotEqual(build_validators(rows, "bgrade-date-range").etag, validators.etag)
+
+    def test_hashed_documents_ignore_the_stamp(self):
+        audit = {"_id": ObjectId(), "updated_timestamp": "2026-10-19T06:45:00+00:00", "lockedBy": None}
+        validators = build_validators([audit], "ipqc-audit", hash_documents=True)
+
+        self.assertNotIn("Last-Modified", validators.headers)
+        audit["lockedBy"] = "Operator One"
+        self.assertNotEqual(build_validators([audit], "ipqc-audit", hash_documents=True).etag, validators.etag)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from unittest.mock import patch
+
+from services import shift_compliance_service as compliance
+
+
+class FakeAggregateCollection:
+    def __init__(self, groups=None, error=None):
+        self.groups = groups or []
+        self.error = error
+        self.pipelines = []
+
+    def aggregate(self, pipeline):
+        if self.error:
+            raise self.error
+        self.pipelines.append(pipeline)
+        return list(self.groups)
+
+
+def group(date_key, line, shift=None, **states):
+    slot = {"date": date_key, "line": line}
+    if shift is not None:
+        slot["shift"] = shift
+    counts = {state: states.get(state, 0) for state in ("draft", "submitted", "returned", "approved")}
+    return {"_id": slot, "entries": sum(counts.values()), **counts}
+
+
+def build_modules(shift_collection, daily_collection):
+    return (
+        compliance.ComplianceModule("ssh", "SSH", lambda: shift_collection, ("lineGroup",), default_line=compliance.FAB_LINE_I),
+        compliance.ComplianceModule("rot", "RoT", lambda: daily_collection, ("fabLine", "lineGroup"), per_shift=False),
+    )
+
+
+class ShiftComplianceMatrixTests(unittest.TestCase):
+    def build(self, shift_collection, daily_collection, **kwargs):
+        modules = build_modules(shift_collection, daily_collection)
+        with patch.object(compliance, "COMPLIANCE_MODULES", modules), \
+                patch.object(compliance, "COMPLIANCE_MODULES_BY_KEY", {module.key: module for module in modules}):
+            return compliance.build_compliance_matrix(date_from="2026-03-01", date_to="2026-03-02", **kwargs)
+
+    def test_matrix_marks_filled_and_missing_slots_per_module(self):
+        shift_collection = FakeAggregateCollection([
+            group("2026-03-02", "Line-I", "A", approved=1),
+            group("2026-03-02", "FAB-II Line-I", "A", draft=1),
+            group("2026-03-01", None, "B", submitted=1),
+            group("2026-03-01", "Line-II", "G", submitted=1),
+        ])
+        daily_collection = FakeAggregateCollection([group("2026-03-01", "FAB-II Line-II", approved=1)])
+
+        matrix = self.build(shift_collection, daily_collection)
+
+        rows = {(row["date"], row["shift"], row["line"]): row["cells"] for row in matrix["rows"]}
+        self.assertEqual(len(rows), 2 * 4 * 2)
+        self.assertEqual(rows[("2026-03-02", "A", "FAB-II Line-I")], {"ssh": {"state": "draft", "entries": 2}})
+        self.assertEqual(rows[("2026-03-01", "B", "FAB-II Line-I")]["ssh"]["state"], "submitted")
+        self.assertEqual(rows[("2026-03-02", "C", "FAB-II Line-II")]["ssh"]["state"], "missing")
+        self.assertEqual(rows[("2026-03-01", None, "FAB-II Line-II")], {"rot": {"state": "approved", "entries": 1}})
+        self.assertEqual(matrix["summary"]["ssh"], {"expected": 12, "filled": 2, "missing": 10, "draft": 1, "submitted": 1, "returned": 0, "approved": 0})
+        self.assertEqual(matrix["summary"]["rot"]["filled"], 1)
+        self.assertEqual(shift_collection.pipelines[0][0]["$match"]["date"], {"$gte": "2026-03-01", "$lt": "2026-03-03"})
+
+    def test_failed_module_is_reported_without_hiding_the_others(self):
+        matrix = self.build(FakeAggregateCollection(error=RuntimeError("boom")), FakeAggregateCollection())
+
+        self.assertEqual(matrix["errors"], {"ssh": "boom"})
+        self.assertTrue(all(row["cells"]["ssh"]["state"] == "unavailable" for row in matrix["rows"] if row["shift"]))
+        self.assertEqual(matrix["summary"]["rot"]["missing"], 4)
+
+    def test_module_filter_and_range_are_validated(self):
+        matrix = self.build(FakeAggregateCollection(), FakeAggregateCollection(), module_keys="rot")
+        self.assertEqual([module["key"] for module in matrix["modules"]], ["rot"])
+        self.assertTrue(all(row["shift"] is None for row in matrix["rows"]))
+
+        with self.assertRaises(ValueError):
+            compliance.resolve_matrix_modules("ssh,unknown")
+        with self.assertRaises(ValueError):
+            compliance.resolve_matrix_dates("2026-03-05", "2026-03-01")
+        with self.assertRaises(ValueError):
+            compliance.resolve_matrix_dates("2026-01-01", "2026-03-01")
+
+
+if __name__ == "__main__":
+    unittest.main()
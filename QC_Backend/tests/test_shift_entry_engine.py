@@ -0,0 +1,146 @@
+import unittest
+
+from bson import ObjectId
+from fastapi import HTTPException
+
+from services import shift_entry_workflow_service as workflow
+
+
+SUPERVISOR = {"id": "u1", "employeeId": "E1", "name": "Sam Supervisor", "role": "Supervisor"}
+
+
+class FakeCollection:
+    def __init__(self, documents):
+        self.documents = documents
+        self.find_calls = 0
+
+    def find(self, query, projection=None):
+        self.find_calls += 1
+        ids = set(query["_id"]["$in"])
+        return [document for document in self.documents if document["_id"] in ids]
+
+
+class FakeModel:
+    collection = None
+
+    @classmethod
+    def get_by_id(cls, entry_id):
+        return next((document for document in cls.collection.documents if str(document["_id"]) == entry_id), None)
+
+    @classmethod
+    def update_by_id(cls, entry_id, data, unset=None):
+        cls.updates.append((entry_id, data, unset))
+        return True
+
+    @classmethod
+    def delete_by_id(cls, entry_id):
+        cls.deleted.append(entry_id)
+        return True
+
+
+def build_module(documents, **overrides):
+    collection = FakeCollection(documents)
+    model = type("Model", (FakeModel,), {"collection": collection, "updates": [], "deleted": []})
+    module = workflow.ShiftEntryModule(
+        label="test",
+        model=model,
+        collection=collection,
+        serialize_entry=lambda entry, user=None, include_permissions=False: {"id": str(entry["_id"])},
+        serialize_summary=lambda entry, user=None: {"id": str(entry["_id"])},
+        build_search_query=lambda search: {},
+        build_filter_query=lambda **filters: {},
+        sort_options={"date-newest": ("date", -1)},
+        **overrides,
+    )
+    return module, model, collection
+
+
+def entry(state, **fields):
+    return {"_id": ObjectId(), "workflowState": state, "date": "2026-03-02", **fields}
+
+
+class ShiftEntryEngineTests(unittest.TestCase):
+    def test_bulk_approve_reads_the_selection_once(self):
+        submitted, draft = entry("submitted"), entry("draft")
+        module, model, collection = build_module([submitted, draft], approval_signature="approvedBy")
+
+        result = workflow.bulk_approve_shift_entries(
+            module,
+            lambda: SUPERVISOR,
+            {"entryIds": [str(submitted["_id"]), str(draft["_id"]), str(ObjectId()), "bad"]},
+        )
+
+        self.assertEqual(collection.find_calls, 1)
+        self.assertEqual(result["approved"], 1)
+        self.assertEqual(result["skipped"], {"Draft": 1})
+        self.assertEqual([failure["reason"] for failure in result["failed"]], ["Not Found", "Invalid ID"])
+        entry_id, update_data, unset_data = model.updates[0]
+        self.assertEqual(entry_id, str(submitted["_id"]))
+        self.assertEqual(update_data["signatures"]["approvedBy"], "Sam Supervisor")
+        self.assertEqual(set(unset_data), set(workflow.LOCK_FIELDS))
+
+    def test_approval_merges_whole_document_when_model_requires_it(self):
+        submitted = entry("submitted", readings=[1, 2])
+        module, model, _ = build_module(
+            [submitted],
+            update_with_existing_entry=True,
+            approval_fields=lambda existing, user, now: {"approvedBySignature": user["name"]},
+        )
+
+        workflow.approve_shift_entry(module, lambda: SUPERVISOR, str(submitted["_id"]))
+
+        _, update_data, _ = model.updates[0]
+        self.assertEqual(update_data["readings"], [1, 2])
+        self.assertEqual(update_data["workflowState"], "approved")
+        self.assertEqual(update_data["approvedBySignature"], "Sam Supervisor")
+
+    def test_bulk_delete_is_rejected_before_any_delete_when_guarded(self):
+        deletable, signed = entry("submitted"), entry("submitted", signoffHistory=[{"action": "approved"}])
+        module, model, _ = build_module(
+            [deletable, signed],
+            delete_guard=lambda existing: "Signed" if existing.get("signoffHistory") else None,
+        )
+
+        with self.assertRaises(HTTPException) as raised:
+            workflow.bulk_delete_shift_entries(module, lambda: SUPERVISOR, {"entryIds": [str(deletable["_id"]), str(signed["_id"])]})
+
+        self.assertEqual(raised.exception.status_code, 409)
+        self.assertEqual(model.deleted, [])
+
+    def test_return_requires_comments(self):
+        submitted = entry("submitted")
+        module, model, _ = build_module([submitted])
+
+        with self.assertRaises(HTTPException) as raised:
+            workflow.return_shift_entry(module, lambda: SUPERVISOR, str(submitted["_id"]), {"returnComments": "  "})
+
+        self.assertEqual(raised.exception.status_code, 400)
+        self.assertEqual(model.updates, [])
+
+
+    def test_missing_signatures_follow_the_module_default(self):
+        submitted = entry("submitted")
+        verified, _, _ = build_module([submitted])
+        approved, _, _ = build_module([submitted], approval_signature="approvedBy", default_signatures={})
+
+        self.assertEqual(
+            workflow.build_approval_update(verified, submitted, SUPERVISOR, "now")["signatures"],
+            {"preparedBy": "", "verifiedBy": "Sam Supervisor"},
+        )
+        self.assertEqual(workflow.build_approval_update(approved, submitted, SUPERVISOR, "now")["signatures"], {"approvedBy": "Sam Supervisor"})
+
+    def test_user_lookup_failures_are_reported_by_the_operation(self):
+        module, _, _ = build_module([])
+
+        def load_user():
+            raise RuntimeError("users unavailable")
+
+        with self.assertRaises(HTTPException) as raised:
+            workflow.approve_shift_entry(module, load_user, str(ObjectId()))
+
+        self.assertEqual(raised.exception.status_code, 500)
+        self.assertEqual(raised.exception.detail, "Failed to approve entry: users unavailable")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+
+from models.potting_ratio_models import _InMemoryCollection
+from services import shift_line_stats_service as line_stats
+
+
+def ratio_outcome(line):
+    if not line.get("ratio"):
+        return None
+    return {"ok": "pass", "bad": "fail"}.get(line["ratio"], "")
+
+
+class FakeBulkResult:
+    def __init__(self, modified_count):
+        self.modified_count = modified_count
+
+
+class FakeStatsCollection:
+    name = "fake_entries"
+
+    def __init__(self, documents, groups=()):
+        self.documents = documents
+        self.groups = list(groups)
+        self.pipelines = []
+        self.bulk_writes = 0
+
+    def find(self, query, projection=None):
+        version = query[line_stats.LINE_STATS_VERSION_FIELD]["$ne"]
+        return [document for document in self.documents if document.get(line_stats.LINE_STATS_VERSION_FIELD) != version]
+
+    def bulk_write(self, updates, ordered=True):
+        self.bulk_writes += 1
+        by_id = {document["_id"]: document for document in self.documents}
+        for update in updates:
+            by_id[update._filter["_id"]].update(update._doc["$set"])
+        return FakeBulkResult(len(updates))
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        return list(self.groups)
+
+
+class ShiftLineStatsTests(unittest.TestCase):
+    def test_flags_are_attached_only_when_lines_are_saved(self):
+        update_data = line_stats.attach_line_stats({"lines": {"1": {"ratio": "ok"}, "2": {"ratio": "?"}}}, ratio_outcome)
+
+        self.assertEqual(update_data[line_stats.LINE_STATS_FIELD], [
+            {"line": "1", "filled": 1, "pass": 1, "fail": 0},
+            {"line": "2", "filled": 1, "pass": 0, "fail": 0},
+        ])
+        self.assertEqual(update_data[line_stats.LINE_STATS_VERSION_FIELD], line_stats.LINE_STATS_VERSION)
+        self.assertEqual(line_stats.attach_line_stats({"signatures": {}}, ratio_outcome), {"signatures": {}})
+
+    def test_grouped_totals_fold_into_the_shift_stats_shape(self):
+        stats = line_stats.fold_monthly_line_stats(2026, 2, [
+            {"_id": {"shift": "A", "line": "1"}, "filled": 10, "pass": 8, "fail": 1},
+            {"_id": {"shift": "A", "line": "2"}, "filled": 4, "pass": 4, "fail": 0},
+            {"_id": {"shift": "C", "line": "2"}, "filled": 2, "pass": 0, "fail": 2},
+            {"_id": {"shift": "G", "line": "1"}, "filled": 9, "pass": 9, "fail": 0},
+        ])
+
+        self.assertEqual(stats["totalPossibleEntries"], 28 * 3 * 2)
+        self.assertEqual((stats["filledEntries"], stats["passCount"], stats["failCount"]), (16, 12, 3))
+        self.assertEqual(stats["completionRate"], 10)
+        self.assertEqual(stats["shiftStats"]["A"], {"filled": 14, "pass": 12, "fail": 1, "lines": {"1": 10, "2": 4}})
+        self.assertEqual(stats["shiftStats"]["B"], {"filled": 0, "pass": 0, "fail": 0, "lines": {"1": 0, "2": 0}})
+
+    def test_stale_entries_are_counted_without_writing_on_read(self):
+        legacy = {"_id": 1, "shift": "B", "lines": {"1": {"ratio": "bad"}, "2": {}}}
+        current = {"_id": 2, line_stats.LINE_STATS_VERSION_FIELD: line_stats.LINE_STATS_VERSION}
+        collection = FakeStatsCollection([legacy, current], groups=[{"_id": {"shift": "B", "line": "1"}, "filled": 1, "pass": 1, "fail": 0}])
+
+        stats = line_stats.aggregate_monthly_line_stats(collection, 2026, 3, ratio_outcome)
+
+        self.assertEqual(collection.bulk_writes, 0)
+        self.assertNotIn(line_stats.LINE_STATS_FIELD, legacy)
+        self.assertEqual(collection.pipelines[0][0]["$match"][line_stats.LINE_STATS_VERSION_FIELD], line_stats.LINE_STATS_VERSION)
+        self.assertEqual(stats["shiftStats"]["B"], {"filled": 2, "pass": 1, "fail": 1, "lines": {"1": 2, "2": 0}})
+
+    def test_refresh_stores_flags_for_stale_entries(self):
+        legacy = {"_id": 1, "lines": {"1": {"ratio": "bad"}, "2": {}}}
+        current = {"_id": 2, line_stats.LINE_STATS_VERSION_FIELD: line_stats.LINE_STATS_VERSION}
+        collection = FakeStatsCollection([legacy, current])
+
+        self.assertEqual(line_stats.refresh_stale_line_stats(collection, ratio_outcome), 1)
+
+        self.assertEqual(legacy[line_stats.LINE_STATS_FIELD][0], {"line": "1", "filled": 1, "pass": 0, "fail": 1})
+        self.assertEqual(legacy[line_stats.LINE_STATS_VERSION_FIELD], line_stats.LINE_STATS_VERSION)
+
+    def test_in_memory_fallback_serves_monthly_stats(self):
+        collection = _InMemoryCollection()
+        for entry_id, shift, ratio in (("e1", "A", "ok"), ("e2", "A", "bad"), ("e3", "B", None)):
+            entry = line_stats.attach_line_stats({"lines": {"1": {"ratio": ratio}}}, ratio_outcome)
+            collection._store[entry_id] = {"_id": entry_id, "year": 2026, "month": 3, "shift": shift, **entry}
+        collection._store["legacy"] = {"_id": "legacy", "year": 2026, "month": 3, "shift": "C", "lines": {"2": {"ratio": "ok"}}}
+
+        stats = line_stats.aggregate_monthly_line_stats(collection, 2026, 3, ratio_outcome)
+
+        self.assertEqual(stats["shiftStats"]["A"], {"filled": 2, "pass": 1, "fail": 1, "lines": {"1": 2, "2": 0}})
+        self.assertEqual(stats["shiftStats"]["C"]["lines"], {"1": 0, "2": 1})
+        self.assertEqual(line_stats.refresh_stale_line_stats(collection, ratio_outcome), 1)
+        self.assertEqual(collection._store["legacy"][line_stats.LINE_STATS_VERSION_FIELD], line_stats.LINE_STATS_VERSION)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import asyncio
+import io
+import unittest
+from unittest.mock import MagicMock, patch
+
+from botocore.exceptions import ClientError
+from PIL import Image
+
+from routes import user_route
+from services.signature_image_cache import SignatureImageCache, etag_matches
+
+
+def png_bytes(size=(300, 100), color=(0, 0, 0, 255)):
+    output = io.BytesIO()
+    Image.new("RGBA", size, color).save(output, format="PNG")
+    return output.getvalue()
+
+
+class FakeS3Client:
+    def __init__(self, objects):
+        self.objects = objects
+        self.calls = []
+
+    def get_object(self, **request):
+        self.calls.append(request)
+        data, etag = self.objects[request["Key"]]
+        if request.get("IfNoneMatch") == f'"{etag}"':
+            raise ClientError(
+                {"Error": {"Code": "304"}, "ResponseMetadata": {"HTTPStatusCode": 304}},
+                "GetObject",
+            )
+        return {"Body": io.BytesIO(data), "ETag": f'"{etag}"', "ContentType": "image/png"}
+
+
+class FakeS3Service:
+    def __init__(self, client):
+        self.s3_client = client
+        self.bucket_name = "bucket"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def build_cache(objects, **kwargs):
+    client = FakeS3Client(objects)
+    clock = FakeClock()
+    cache = SignatureImageCache(lambda: FakeS3Service(client), clock=clock, **kwargs)
+    return cache, client, clock
+
+
+class SignatureImageCacheTests(unittest.TestCase):
+    def test_fresh_entries_are_served_from_memory(self):
+        cache, client, _ = build_cache({"users/signatures/1.png": (png_bytes(), "v1")})
+        first = cache.get("users/signatures/1.png")
+        second = cache.get("users/signatures/1.png")
+        self.assertIs(first, second)
+        self.assertEqual(first.etag, "v1")
+        self.assertEqual(len(client.calls), 1)
+
+    def test_stale_entries_revalidate_with_conditional_get(self):
+        objects = {"users/signatures/1.png": (png_bytes(), "v1")}
+        cache, client, clock = build_cache(objects, revalidate_seconds=60)
+        original = cache.get("users/signatures/1.png")
+        clock.now = 61
+        self.assertIs(cache.get("users/signatures/1.png"), original)
+        self.assertEqual(client.calls[-1]["IfNoneMatch"], '"v1"')
+
+        objects["users/signatures/1.png"] = (png_bytes(color=(255, 0, 0, 255)), "v2")
+        clock.now = 200
+        self.assertEqual(cache.get("users/signatures/1.png").etag, "v2")
+
+    def test_least_recently_used_entry_is_evicted(self):
+        objects = {f"users/signatures/{index}.png": (png_bytes(), str(index)) for index in range(3)}
+        cache, client, _ = build_cache(objects, max_entries=2)
+        cache.get("users/signatures/0.png")
+        cache.get("users/signatures/1.png")
+        cache.get("users/signatures/0.png")
+        cache.get("users/signatures/2.png")
+        cache.get("users/signatures/0.png")
+        self.assertEqual(len(client.calls), 3)
+        cache.get("users/signatures/1.png")
+        self.assertEqual(len(client.calls), 4)
+
+    def test_thumbnail_is_rendered_once_at_slot_size(self):
+        cache, client, _ = build_cache({"users/signatures/1.png": (png_bytes(), "v1")})
+        thumbnail = cache.get_thumbnail("users/signatures/1.png", 120, 45, scale=2)
+        self.assertIs(cache.get_thumbnail("users/signatures/1.png", 120, 45, scale=2), thumbnail)
+        with Image.open(io.BytesIO(thumbnail)) as image:
+            self.assertEqual(image.size, (240, 90))
+        self.assertEqual(len(client.calls), 1)
+
+    def test_invalidate_forces_fresh_download(self):
+        cache, client, _ = build_cache({"users/signatures/1.png": (png_bytes(), "v1")})
+        cache.get_thumbnail("users/signatures/1.png", 120, 45)
+        cache.invalidate("users/signatures/1.png")
+        cache.get("users/signatures/1.png")
+        self.assertEqual(len(client.calls), 2)
+        self.assertNotIn("IfNoneMatch", client.calls[-1])
+
+    def test_etag_matching_accepts_weak_lists_and_wildcard(self):
+        self.assertTrue(etag_matches('W/"abc", "def"', "def"))
+        self.assertTrue(etag_matches("*", "abc"))
+        self.assertFalse(etag_matches('"abc"', "def"))
+        self.assertFalse(etag_matches(None, "abc"))
+
+
+class SignatureImageRouteTests(unittest.TestCase):
+    def test_browser_revalidates_instead_of_caching_for_minutes(self):
+        image = MagicMock(etag="abc", data=b"png", content_type="image/png")
+        with patch.object(user_route, "signature_image_cache", MagicMock(get=MagicMock(return_value=image))), \
+                patch.object(user_route, "extract_signature_key", return_value="signatures/E1.png"):
+            response = asyncio.run(user_route.get_signature_image("signatures/E1.png", None))
+            revalidated = asyncio.run(user_route.get_signature_image("signatures/E1.png", '"abc"'))
+
+        self.assertEqual(response.headers["cache-control"], "private, no-cache")
+        self.assertEqual(response.headers["etag"], '"abc"')
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated.headers["cache-control"], "private, no-cache")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from services import stringer_parameter_report_service as service
+
+
+def submitted_audit(audit_id="a1", date_key="2026-03-02", shift="B", updated="2026-03-02T10:00:00"):
+    return {
+        "_id": audit_id,
+        "name": f"Audit {audit_id}",
+        "lineNumber": "I",
+        "date": date_key,
+        "shift": shift,
+        "workflowState": "submitted",
+        "updated_timestamp": updated,
+        "productionOrderNo": "PO-7",
+    }
+
+
+def build_report(audits_by_slot=None):
+    with patch.object(service, "_get_month_audits", return_value=audits_by_slot or {}):
+        report = service.build_month_structure(2026, 3, "I")
+    report.update({"version": 4, "materializedSchema": service.STRINGER_REPORT_SCHEMA_VERSION})
+    return report
+
+
+class StringerReportSlotPatchTests(unittest.TestCase):
+    def setUp(self):
+        ipqc_audit = MagicMock()
+        ipqc_audit.from_dict.return_value.get_data.return_value = {"stages": []}
+        patcher = patch.object(service, "IPQCAudit", ipqc_audit)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_audit_slot_mapping(self):
+        self.assertEqual(service.audit_report_slot(submitted_audit(date_key="2026-03-02T08:00:00")), (2026, 3, "I", "2026-03-02", "B"))
+        self.assertIsNone(service.audit_report_slot({**submitted_audit(), "shift": "G"}))
+        self.assertIsNone(service.audit_report_slot({**submitted_audit(), "lineNumber": "III"}))
+        self.assertIsNone(service.audit_report_slot({**submitted_audit(), "date": "not-a-date"}))
+
+    def test_patch_only_touches_the_audited_slot(self):
+        report = build_report()
+        audit = submitted_audit()
+
+        set_fields, unset_fields = service.build_slot_patch(report, "2026-03-02", "B", audit)
+
+        row_fields = [key for key in set_fields if key.startswith("rows.")]
+        self.assertEqual(len(row_fields), 6)
+        for key in row_fields:
+            row = set_fields[key]
+            self.assertEqual(report["rows"][int(key.split(".")[1])]["rowKey"], row["rowKey"])
+            self.assertEqual((row["date"], row["shift"], row["poNumber"]), ("2026-03-02", "B", "PO-7"))
+        self.assertEqual(set_fields["auditSources.2026-03-02|B"]["auditId"], "a1")
+        self.assertEqual(set_fields["auditSourceCount"], 1)
+        self.assertEqual(unset_fields, [])
+
+    def test_unchanged_slot_needs_no_write_and_removed_audit_clears_it(self):
+        audit = submitted_audit()
+        report = build_report({"2026-03-02|B": audit})
+
+        self.assertIsNone(service.build_slot_patch(report, "2026-03-02", "B", audit))
+
+        set_fields, unset_fields = service.build_slot_patch(report, "2026-03-02", "B", None)
+        self.assertEqual(unset_fields, ["auditSources.2026-03-02|B"])
+        self.assertEqual(set_fields["auditSourceCount"], 0)
+        self.assertTrue(all(set_fields[key]["auditSource"] is None for key in set_fields if key.startswith("rows.")))
+
+    def test_slot_outside_the_stored_layout_is_rejected(self):
+        with self.assertRaises(LookupError):
+            service.build_slot_patch(build_report(), "2026-04-01", "A", None)
+
+    def test_manual_fields_patch_updates_map_and_rows(self):
+        report = build_report()
+        row_key = service.make_row_key("2026-03-01", "A", 2)
+        row_index = next(index for index, row in enumerate(report["rows"]) if row["rowKey"] == row_key)
+
+        set_fields = service.build_manual_fields_patch(report, [{"rowKey": row_key, "cellWp": "7.5"}], "QA")
+
+        self.assertEqual(set_fields[f"manualFields.{row_key}"], {"moduleType": "", "cellType": "", "cellWp": "7.5"})
+        self.assertEqual(set_fields[f"rows.{row_index}.cellWp"], "7.5")
+        self.assertEqual(set_fields["manualUpdatedBy"], "QA")
+
+
+def slot_version(count=1, updated="2026-03-02T10:00:00"):
+    return {"auditCount": count, "updatedTimestamp": updated}
+
+
+class StringerReportReconcileTests(unittest.TestCase):
+    def setUp(self):
+        ipqc_audit = MagicMock()
+        ipqc_audit.from_dict.return_value.get_data.return_value = {"stages": []}
+        patcher = patch.object(service, "IPQCAudit", ipqc_audit)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_source_versions_merge_slot_spellings_and_skip_unusable_dates(self):
+        groups = [
+            {"_id": {"date": "2026-03-02", "shift": "B"}, "audit_count": 1, "updated_timestamp": "2026-03-02T10:00:00"},
+            {"_id": {"date": "2026-03-02T08:00:00", "shift": "b"}, "audit_count": 2, "updated_timestamp": "2026-03-02T11:00:00"},
+            {"_id": {"date": "2026-03-0x", "shift": "A"}, "audit_count": 1, "updated_timestamp": None},
+            {"_id": {"date": "2026-03-03", "shift": "G"}, "audit_count": 1, "updated_timestamp": None},
+        ]
+        collection = MagicMock()
+        collection.aggregate.return_value = groups
+        with patch.object(service, "ipqc_audit_collection", collection):
+            versions = service.get_source_versions("I", "2026-03")
+
+        self.assertEqual(versions, {"2026-03-02|B": slot_version(3, "2026-03-02T11:00:00")})
+
+    def test_stale_slots_cover_changed_added_and_removed_versions(self):
+        report = {service.SOURCE_VERSIONS_FIELD: {"2026-03-01|A": slot_version(), "2026-03-02|B": slot_version()}}
+        versions = {"2026-03-02|B": slot_version(2), "2026-03-03|C": slot_version()}
+
+        self.assertEqual(service.stale_report_slots(report, versions), ["2026-03-01|A", "2026-03-02|B", "2026-03-03|C"])
+        self.assertEqual(service.stale_report_slots({service.SOURCE_VERSIONS_FIELD: versions}, versions), [])
+
+    def test_read_patches_only_slots_missed_by_the_queue(self):
+        report = {**build_report(), service.SOURCE_VERSIONS_FIELD: {"2026-03-02|B": slot_version()}}
+        versions = {"2026-03-02|B": slot_version(), "2026-03-05|A": slot_version()}
+        with patch.object(service.StringerParameterReport, "get", return_value=report), \
+                patch.object(service, "get_source_versions", return_value=versions), \
+                patch.object(service, "refresh_report_slot", return_value=report) as refresh_slot, \
+                patch.object(service, "_synchronize_month_document") as synchronize:
+            self.assertIs(service.reconcile_month_report(2026, 3, "I"), report)
+
+        refresh_slot.assert_called_once_with(2026, 3, "I", "2026-03-05", "A")
+        synchronize.assert_not_called()
+
+    def test_slot_refresh_stores_a_moved_version_even_when_rows_are_unchanged(self):
+        audit = submitted_audit()
+        report = {**build_report({"2026-03-02|B": audit}), service.SOURCE_VERSIONS_FIELD: {"2026-03-02|B": slot_version()}}
+        draft_edit = slot_version(2, "2026-03-02T12:00:00")
+        with patch.object(service.StringerParameterReport, "get", return_value=report), \
+                patch.object(service.StringerParameterReport, "apply_patch", return_value=report) as apply_patch, \
+                patch.object(service, "get_source_versions", return_value={"2026-03-02|B": draft_edit}), \
+                patch.object(service, "_get_slot_audit", return_value=audit):
+            service.refresh_report_slot(2026, 3, "I", "2026-03-02", "B")
+
+        set_fields, unset_fields = apply_patch.call_args.args[4:]
+        self.assertEqual(set_fields, {"sourceVersions.2026-03-02|B": draft_edit})
+        self.assertEqual(unset_fields, [])
+
+
+class StringerReportMaterializerTests(unittest.TestCase):
+    def test_pending_slots_are_deduplicated_and_drafts_ignored(self):
+        refreshed = []
+        materializer = service.StringerReportMaterializer(refresh_slot=lambda *slot: refreshed.append(slot), idle_wait_seconds=0.01)
+
+        self.assertEqual(materializer.enqueue_audits({**submitted_audit(), "workflowState": "draft"}), 0)
+        materializer.enqueue_audits(submitted_audit(), submitted_audit(updated="later"), submitted_audit(shift="C"))
+        materializer.shutdown()
+        materializer._worker_thread.join(1)
+
+        self.assertEqual(sorted(refreshed), [(2026, 3, "I", "2026-03-02", "B"), (2026, 3, "I", "2026-03-02", "C")])
+        self.assertEqual(materializer.pending_count, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
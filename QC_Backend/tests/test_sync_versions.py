@@ -0,0 +1,126 @@
+import unittest
+
+from services.sync_version_service import (
+    SYNC_CURSOR_OVERLAP,
+    CollectionSyncTracker,
+    InvalidSyncCursorError,
+    SyncCursor,
+    build_etag,
+    etag_matches,
+    parse_sync_cursor,
+)
+
+
+def matches(document, query):
+    for key, condition in query.items():
+        if key == "$and":
+            if not all(matches(document, clause) for clause in condition):
+                return False
+            continue
+        value = document.get(key)
+        if isinstance(condition, dict):
+            if "$gt" in condition and (value is None or not value > condition["$gt"]):
+                return False
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class FakeAsyncCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, keys):
+        for field, direction in reversed(keys):
+            self.documents.sort(key=lambda document: document.get(field), reverse=direction == -1)
+        return self
+
+    async def to_list(self, length=None):
+        return list(self.documents)
+
+
+class FakeAsyncCollection:
+    def __init__(self, documents=None):
+        self.documents = list(documents or [])
+        self.database = None
+
+    def find(self, query, projection=None):
+        return FakeAsyncCursor([dict(document) for document in self.documents if matches(document, query)])
+
+    async def find_one(self, query):
+        return next((dict(document) for document in self.documents if matches(document, query)), None)
+
+    async def find_one_and_update(self, query, update, upsert=False, return_document=None):
+        document = next((document for document in self.documents if matches(document, query)), None)
+        if document is None and upsert:
+            document = dict(query)
+            self.documents.append(document)
+        for field, amount in update.get("$inc", {}).items():
+            document[field] = document.get(field, 0) + amount
+        return dict(document)
+
+    async def update_many(self, query, update):
+        for document in self.documents:
+            if matches(document, query):
+                document.update(update["$set"])
+
+    async def insert_many(self, documents):
+        self.documents.extend(documents)
+
+
+def build_tracker(documents):
+    collection = FakeAsyncCollection(documents)
+    counters = FakeAsyncCollection()
+    tombstones = FakeAsyncCollection()
+    return CollectionSyncTracker(collection, "tasks", counters, tombstones), collection
+
+
+class SyncCursorTests(unittest.TestCase):
+    def test_cursor_round_trip_and_rejects_garbage(self):
+        self.assertEqual(parse_sync_cursor(SyncCursor(12, "meeting").encode()), SyncCursor(12, "meeting"))
+        for value in ("", "12", "abc:meeting", "-1:all"):
+            with self.assertRaises(InvalidSyncCursorError):
+                parse_sync_cursor(value)
+
+    def test_etag_matching_accepts_lists_weak_and_wildcard(self):
+        etag = build_etag("tasks", 4, "all")
+        self.assertEqual(etag, 'W/"tasks-4-all"')
+        self.assertTrue(etag_matches('"other", W/"tasks-4-all"', etag))
+        self.assertTrue(etag_matches('"tasks-4-all"', etag))
+        self.assertTrue(etag_matches("*", etag))
+        self.assertFalse(etag_matches('W/"tasks-3-all"', etag))
+        self.assertFalse(etag_matches(None, etag))
+
+
+class CollectionSyncTrackerTests(unittest.IsolatedAsyncioTestCase):
+    async def test_writes_bump_the_counter_and_stamp_documents(self):
+        tracker, collection = build_tracker([{"_id": "a"}, {"_id": "b"}])
+        self.assertEqual(await tracker.current_version(), 0)
+
+        self.assertEqual(await tracker.mark_changed("a"), 1)
+        self.assertEqual(await tracker.mark_deleted("b"), 2)
+        self.assertEqual(await tracker.current_version(), 2)
+        self.assertEqual(collection.documents[0]["syncVersion"], 1)
+        self.assertNotIn("syncVersion", collection.documents[1])
+
+    async def test_delta_returns_changed_documents_and_tombstones_after_cursor(self):
+        tracker, collection = build_tracker([{"_id": "old"}, {"_id": "new"}, {"_id": "gone"}])
+        for _ in range(SYNC_CURSOR_OVERLAP + 1):
+            await tracker.mark_changed("old")
+        since = await tracker.current_version()
+        collection.documents = [document for document in collection.documents if document["_id"] != "gone"]
+        await tracker.mark_deleted("gone")
+        await tracker.mark_changed("new")
+
+        delta = await tracker.changes_since(since)
+        self.assertEqual(sorted(document["_id"] for document in delta.changed), ["new", "old"])
+        self.assertEqual(delta.deleted, ["gone"])
+
+        delta = await tracker.changes_since(since + SYNC_CURSOR_OVERLAP + 2)
+        self.assertEqual((delta.changed, delta.deleted), ([], []))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,11 @@
 import logging
-from pymongo import MongoClient
 from datetime import datetime
-from constants import MONGODB_URI, MONGODB_DB_NAME
+from constants import MONGODB_DB_NAME
+from mongo_connection import get_mongo_client, register_startup_task
 
 logger = logging.getLogger(__name__)
 
-client = MongoClient(MONGODB_URI)
+client = get_mongo_client()
 db = client[MONGODB_DB_NAME]
 users_collection = db["users"]
 
@@ -14,6 +14,7 @@ def generate_password(name: str, employee_id: str) -> str:
     last_four_employee = employee_id[-4:]
     return f"{first_two_letters}{last_four_employee}"
 
+@register_startup_task("initial_admin")
 def create_initial_admin():
     admin_exists = users_collection.find_one({"role": "Admin"})
     if not admin_exists:
@@ -31,5 +32,3 @@ def create_initial_admin():
         }
         users_collection.insert_one(initial_admin)
         logger.info("initial_admin_user_created")
-
-create_initial_admin()
@@ -12,6 +12,7 @@ import {
     fetchAssignmentUsers,
     type AssignmentUserOption,
 } from '../utilities/assignmentUsers';
+import { CHANGE_FEED_SYNC_DELAY_MS, subscribeToChangeFeed } from '../utilities/changeFeed';
 import { normalizeAssignedTo } from '../utilities/taskAssignments';
 import {
     getCurrentTaskManagementUser,
@@ -250,12 +251,29 @@ export default function DailyMeetingPage() {
         };
 
         void syncTasks(true);
+        let isFeedConnected = false;
+        let feedSyncTimer: number | undefined;
+        const unsubscribeFromChanges = subscribeToChangeFeed(['tasks'], {
+            onChange: () => {
+                window.clearTimeout(feedSyncTimer);
+                feedSyncTimer = window.setTimeout(() => {
+                    void syncTasks(false);
+                }, CHANGE_FEED_SYNC_DELAY_MS);
+            },
+            onConnectionChange: (isConnected) => {
+                isFeedConnected = isConnected;
+            },
+        });
         const pollTimer = window.setInterval(() => {
-            void syncTasks(false);
+            if (!isFeedConnected) {
+                void syncTasks(false);
+            }
         }, 10000);
 
         return () => {
             isActive = false;
+            unsubscribeFromChanges();
+            window.clearTimeout(feedSyncTimer);
             window.clearInterval(pollTimer);
         };
     }, [showAlert]);
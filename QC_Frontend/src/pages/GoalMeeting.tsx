@@ -41,6 +41,7 @@ import {
     type GoalFilters,
     type GoalSortOption,
 } from '../utilities/goalUtils';
+import { CHANGE_FEED_SYNC_DELAY_MS, subscribeToChangeFeed } from '../utilities/changeFeed';
 import { normalizeAssignedTo } from '../utilities/taskAssignments';
 import {
     getCurrentTaskManagementUser,
@@ -870,12 +871,29 @@ export default function GoalMeeting() {
         };
 
         void syncGoals(true);
+        let isFeedConnected = false;
+        let feedSyncTimer: number | undefined;
+        const unsubscribeFromChanges = subscribeToChangeFeed(['goals'], {
+            onChange: () => {
+                window.clearTimeout(feedSyncTimer);
+                feedSyncTimer = window.setTimeout(() => {
+                    void syncGoals(false);
+                }, CHANGE_FEED_SYNC_DELAY_MS);
+            },
+            onConnectionChange: (isConnected) => {
+                isFeedConnected = isConnected;
+            },
+        });
         const pollTimer = window.setInterval(() => {
-            void syncGoals(false);
+            if (!isFeedConnected) {
+                void syncGoals(false);
+            }
         }, 10000);
 
         return () => {
             isActive = false;
+            unsubscribeFromChanges();
+            window.clearTimeout(feedSyncTimer);
             window.clearInterval(pollTimer);
         };
     }, [showAlert]);
@@ -1,6 +1,6 @@
 import { useState, useEffect, useMemo, useCallback, useRef } from 'react';
 import { initialStages } from '../audit-data';
-import { AuditData, ObservationValue, StageData } from '../types/audit';
+import { AuditData, ObservationData, ObservationValue, StageData } from '../types/audit';
 import { useAlert } from '../context/AlertContext';
 import { useConfirmModal } from '../context/ConfirmModalContext';
 import { useLine } from '../context/LineContext';
@@ -46,6 +46,51 @@ const COMPLETION_METADATA_KEYS = new Set([
     'selectedLine',
 ]);
 
+type AuditAutosaveDelta = {
+    fields: Record<string, unknown>;
+    observations: Array<Partial<ObservationData> & { stageId: number; parameterId: string; timeSlot: string }>;
+};
+
+const OBSERVATION_DELTA_KEYS = ['value', 'sampleReadings', 'selectedLine', 'lineMapping'] as const;
+
+// Returns null when the stage/parameter layout changed, so the caller falls back to a full save.
+const buildAuditAutosaveDelta = (previous: AuditData, next: AuditData): AuditAutosaveDelta | null => {
+    const fields: Record<string, unknown> = {};
+    const previousRecord = previous as unknown as Record<string, unknown>;
+    Object.entries(next as unknown as Record<string, unknown>).forEach(([key, value]) => {
+        if (key !== 'stages' && JSON.stringify(value) !== JSON.stringify(previousRecord[key])) {
+            fields[key] = value;
+        }
+    });
+
+    const observations: AuditAutosaveDelta['observations'] = [];
+    if ((next.stages || []).length !== (previous.stages || []).length) return null;
+    for (const stage of next.stages || []) {
+        const previousStage = previous.stages.find(item => item.id === stage.id);
+        if (!previousStage || previousStage.parameters.length !== stage.parameters.length) return null;
+        for (const parameter of stage.parameters) {
+            const previousParameter = previousStage.parameters.find(item => item.id === parameter.id);
+            if (!previousParameter || previousParameter.observations.length > parameter.observations.length) return null;
+            for (const observation of parameter.observations) {
+                const previousObservation = previousParameter.observations.find(item => item.timeSlot === observation.timeSlot);
+                if (previousObservation && JSON.stringify(previousObservation) === JSON.stringify(observation)) continue;
+                const change: AuditAutosaveDelta['observations'][number] = {
+                    stageId: stage.id,
+                    parameterId: parameter.id,
+                    timeSlot: observation.timeSlot,
+                };
+                OBSERVATION_DELTA_KEYS.forEach(key => {
+                    if (observation[key] !== undefined) {
+                        (change as Record<string, unknown>)[key] = observation[key];
+                    }
+                });
+                observations.push(change);
+            }
+        }
+    }
+    return { fields, observations };
+};
+
 type StageCompletionStatus = 'not_started' | 'in_progress' | 'completed';
 type AuditWorkflowState = 'draft' | 'submitted' | 'approved' | 'returned';
 type AuditDisplayStatus = AuditWorkflowState;
@@ -646,6 +691,8 @@ export default function QualityAudit() {
     const [employeeId, setEmployeeId] = useState<string | null>(null);
     const [isAutosaving, setIsAutosaving] = useState(false);
     const lastSavedDataRef = useRef<string>('');
+    const lastSavedAuditDataRef = useRef<AuditData | null>(null);
+    const dataVersionRef = useRef<number | null>(null);
     const currentChecksheetIdRef = useRef<string | null>(null);
     const savedChecksheetsRef = useRef<SavedChecksheet[]>([]);
     const lastSelectedAuditIdRef = useRef<string | null>(null);
@@ -798,6 +845,19 @@ export default function QualityAudit() {
             return response.json();
         },
 
+        autosaveAudit: async (id: string, delta: AuditAutosaveDelta & { baseVersion: number; name: string }): Promise<any> => {
+            const response = await fetch(`${IPQC_API_BASE_URL}/${id}/autosave`, {
+                method: 'PATCH',
+                headers: authHeaders(true, true),
+                body: JSON.stringify(delta),
+            });
+            if (!response.ok) {
+                const errorText = await response.text();
+                throw new Error(`Failed to autosave audit: ${response.status} ${errorText}`);
+            }
+            return response.json();
+        },
+
         updateAudit: async (id: string, audit: any): Promise<any> => {
             const response = await fetch(`${IPQC_API_BASE_URL}/${id}`, {
                 method: 'PUT',
@@ -1363,6 +1423,8 @@ export default function QualityAudit() {
             setCurrentChecksheetMeta(checksheet);
         }
         lastSavedDataRef.current = savedSnapshot;
+        lastSavedAuditDataRef.current = fallbackData ?? null;
+        dataVersionRef.current = typeof response?.dataVersion === 'number' ? response.dataVersion : null;
         if (getLatestSnapshot() === savedSnapshot) {
             setHasUnsavedChanges(false);
             setStageChanges(new Set());
@@ -1532,8 +1594,28 @@ export default function QualityAudit() {
                 isAutosavingRef.current = true;
                 setIsAutosaving(true);
                 const payload = buildChecksheetPayload();
+                const savedData = payload.data as AuditData;
+                const delta = lastSavedAuditDataRef.current && dataVersionRef.current !== null
+                    ? buildAuditAutosaveDelta(lastSavedAuditDataRef.current, savedData)
+                    : null;
+                if (delta && dataVersionRef.current !== null) {
+                    try {
+                        const response = await apiService.autosaveAudit(currentChecksheetIdRef.current, {
+                            ...delta,
+                            name: payload.name,
+                            baseVersion: dataVersionRef.current,
+                        });
+                        dataVersionRef.current = response.dataVersion;
+                        lastSavedAuditDataRef.current = savedData;
+                        lastSavedDataRef.current = snapshotToSave;
+                        setHasUnsavedChanges(getLatestSnapshot() !== snapshotToSave);
+                        return;
+                    } catch (error) {
+                        console.warn('Delta autosave failed, falling back to full save:', error);
+                    }
+                }
                 const response = await apiService.updateAudit(currentChecksheetIdRef.current, payload);
-                markChecksheetSaved(response, payload.data as AuditData, snapshotToSave);
+                markChecksheetSaved(response, savedData, snapshotToSave);
             } catch (error) {
                 console.error('Error autosaving checksheet:', error);
             } finally {
@@ -1832,6 +1914,8 @@ export default function QualityAudit() {
         setStageChanges(new Set());
         setHasUnsavedChanges(false);
         lastSavedDataRef.current = '';
+        lastSavedAuditDataRef.current = null;
+        dataVersionRef.current = null;
         autoLoadDraftKeyRef.current = '';
     };
 
@@ -2100,6 +2184,8 @@ export default function QualityAudit() {
             setLineNumber(loadedLineNumber);
             
             lastSavedDataRef.current = getAuditSnapshot(mergedData, loadedAuditBy, loadedReviewedBy, loadedAuditByImage, loadedReviewedByImage);
+            lastSavedAuditDataRef.current = null;
+            dataVersionRef.current = null;
             autoLoadDraftKeyRef.current = getDraftLookupKey(mergedData.lineNumber, mergedData.date, mergedData.shift);
 
             const willBeEditable = isSystemAdminRole
@@ -39,6 +39,7 @@ interface StringerReportResponse {
     machineNumbers: number[];
     auditSourceCount?: number;
     syncedAt?: string;
+    version?: number;
 }
 
 type ManualValuesMap = Record<string, ManualValues>;
@@ -123,6 +124,7 @@ export default function StringerParameterReport() {
     const manualValuesRef = useRef(manualValues);
     const savedManualValuesRef = useRef(savedManualValues);
     const dirtyCountRef = useRef(0);
+    const reportVersionRef = useRef<number | null>(null);
 
     useEffect(() => {
         manualValuesRef.current = manualValues;
@@ -155,6 +157,7 @@ export default function StringerParameterReport() {
         preserveLocalManualValues = false
     ) => {
         const serverManualValues = buildManualValuesMap(payload.rows || []);
+        reportVersionRef.current = payload.version ?? null;
         setReport(payload);
         setRows(payload.rows || []);
         setSavedManualValues(serverManualValues);
@@ -181,7 +184,10 @@ export default function StringerParameterReport() {
         preserveLocalManualValues = false,
         silent = false
     ) => {
-        if (!silent) setIsLoading(true);
+        if (!silent) {
+            setIsLoading(true);
+            reportVersionRef.current = null;
+        }
         try {
             const query = new URLSearchParams({
                 year: String(year),
@@ -189,6 +195,10 @@ export default function StringerParameterReport() {
                 line,
                 refresh: String(forceRefresh),
             });
+            // Background polls only download the report when its stored version moved on.
+            if (silent && !forceRefresh && reportVersionRef.current !== null) {
+                query.set('knownVersion', String(reportVersionRef.current));
+            }
             const response = await fetch(`${API_BASE_URL}/monthly?${query}`, {
                 headers: authHeaders(),
             });
@@ -197,6 +207,7 @@ export default function StringerParameterReport() {
                 throw new Error(error.detail || 'Failed to load report');
             }
             const result = await response.json();
+            if (result.unchanged) return;
             applyReportPayload(result.data as StringerReportResponse, preserveLocalManualValues);
             if (forceRefresh && !silent) showAlert('success', 'Report refreshed from IPQC audits');
         } catch (error) {
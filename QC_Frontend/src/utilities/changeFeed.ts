@@ -0,0 +1,59 @@
+const CHANGE_FEED_URL = (import.meta.env.VITE_API_URL) + '/changes/stream';
+// Coalesces bursts of change events into a single refetch.
+export const CHANGE_FEED_SYNC_DELAY_MS = 250;
+
+export type ChangeFeedChannel = 'tasks' | 'goals' | 'reports';
+
+export interface ChangeFeedEvent {
+    channel: ChangeFeedChannel;
+    collection: string;
+    operation: 'insert' | 'update' | 'replace' | 'delete' | 'resync';
+    documentId: string | null;
+    revision: number;
+    occurredAt: string;
+}
+
+interface ChangeFeedOptions {
+    onChange: (event: ChangeFeedEvent | null) => void;
+    onConnectionChange?: (isConnected: boolean) => void;
+}
+
+export const isChangeFeedSupported = () => typeof window !== 'undefined' && 'EventSource' in window;
+
+/**
+ * Subscribe to server-sent change events. `onChange(null)` is fired whenever the
+ * stream (re)connects so callers can resync anything missed while disconnected.
+ * Returns an unsubscribe function; callers keep polling while disconnected.
+ */
+export const subscribeToChangeFeed = (
+    channels: ChangeFeedChannel[],
+    { onChange, onConnectionChange }: ChangeFeedOptions,
+): (() => void) => {
+    if (!isChangeFeedSupported()) {
+        onConnectionChange?.(false);
+        return () => undefined;
+    }
+
+    const source = new EventSource(`${CHANGE_FEED_URL}?channels=${encodeURIComponent(channels.join(','))}`);
+
+    source.addEventListener('ready', () => {
+        onConnectionChange?.(true);
+        onChange(null);
+    });
+    source.addEventListener('change', (message) => {
+        try {
+            onChange(JSON.parse((message as MessageEvent<string>).data) as ChangeFeedEvent);
+        } catch (error) {
+            console.error('Failed to parse change feed event:', error);
+            onChange(null);
+        }
+    });
+    source.onerror = () => {
+        onConnectionChange?.(false);
+    };
+
+    return () => {
+        source.close();
+        onConnectionChange?.(false);
+    };
+};
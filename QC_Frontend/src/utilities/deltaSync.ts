@@ -0,0 +1,61 @@
+interface DeltaSyncRecord {
+    id: string;
+    createdAt: string;
+}
+
+interface DeltaSyncResponse<T> {
+    cursor: string;
+    reset: boolean;
+    items: T[];
+    deleted: string[];
+}
+
+interface DeltaSyncState<T> {
+    cursor: string;
+    etag: string | null;
+    items: T[];
+}
+
+export const mergeDeltaRecords = <T extends DeltaSyncRecord>(current: T[], delta: DeltaSyncResponse<T>): T[] => {
+    if (delta.reset) {
+        return delta.items;
+    }
+
+    const replacedIds = new Set([...delta.deleted, ...delta.items.map((item) => item.id)]);
+    return [...delta.items, ...current.filter((item) => !replacedIds.has(item.id))].sort(
+        (left, right) => Date.parse(right.createdAt) - Date.parse(left.createdAt),
+    );
+};
+
+/**
+ * Keeps the last list returned by a `?since=` endpoint so repeated polls only
+ * download what changed, or nothing at all when the ETag still matches.
+ */
+export const createDeltaSyncClient = <T extends DeltaSyncRecord>(
+    baseUrl: string,
+    readJsonResponse: <R>(response: Response) => Promise<R>,
+) => {
+    let state: DeltaSyncState<T> | null = null;
+
+    return async (headers: Record<string, string> = {}): Promise<T[]> => {
+        const baseState = state;
+        const response = await fetch(`${baseUrl}?since=${encodeURIComponent(baseState?.cursor ?? '')}`, {
+            headers: {
+                ...headers,
+                ...(baseState?.etag ? { 'If-None-Match': baseState.etag } : {}),
+            },
+        });
+
+        if (response.status === 304 && baseState) {
+            return baseState.items;
+        }
+
+        const delta = await readJsonResponse<DeltaSyncResponse<T>>(response);
+        const items = mergeDeltaRecords(baseState?.items ?? [], delta);
+        // A slower overlapping poll must not roll the cache back to an older cursor.
+        if (state === baseState) {
+            state = { cursor: delta.cursor, etag: response.headers.get('ETag'), items };
+        }
+        return items;
+    };
+};
@@ -5,6 +5,7 @@ import {
     type GoalData,
     type GoalMilestone,
 } from './goalUtils';
+import { createDeltaSyncClient } from './deltaSync';
 import { getAuthHeaders } from './rbac';
 import { normalizeAssignedTo } from './taskAssignments';
 
@@ -205,9 +206,10 @@ async function readJsonResponse<T>(response: Response): Promise<T> {
     return responseData as T;
 }
 
+const syncGoalRecords = createDeltaSyncClient<GoalApiRecord>(GOAL_API_BASE_URL, readJsonResponse);
+
 export async function fetchGoals(): Promise<GoalData[]> {
-    const response = await fetch(GOAL_API_BASE_URL);
-    const goals = await readJsonResponse<GoalApiRecord[]>(response);
+    const goals = await syncGoalRecords();
     return goals.map(normalizeGoal);
 }
 
@@ -1,4 +1,5 @@
 import { type TaskCardData } from '../components/TaskCard';
+import { createDeltaSyncClient } from './deltaSync';
 import { toISTStartOfDayIso } from './istDate';
 import { normalizeAssignedTo } from './taskAssignments';
 
@@ -150,11 +151,10 @@ async function readJsonResponse<T>(response: Response): Promise<T> {
     return responseData as T;
 }
 
+const syncTaskRecords = createDeltaSyncClient<TaskApiRecord>(TASK_API_BASE_URL, readJsonResponse);
+
 export async function fetchTasks(): Promise<TaskCardData[]> {
-    const response = await fetch(TASK_API_BASE_URL, {
-        headers: getTaskRequestHeaders(),
-    });
-    const tasks = await readJsonResponse<TaskApiRecord[]>(response);
+    const tasks = await syncTaskRecords(getTaskRequestHeaders());
     return tasks.map(normalizeTask);
 }
 